@@ -10,6 +10,7 @@ urlpatterns = [
     
     # 기존 API들 (RAG 기능 통합)
     path('chat-api/', views.chat_api, name='chat_api'),
+    path('chat-api/stream/', views.chat_api_stream, name='chat_api_stream'),
     path('upload-file/', views.upload_file, name='upload_file'),
     
     # 새로운 RAG 관련 API들
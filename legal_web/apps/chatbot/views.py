@@ -2,10 +2,12 @@
 from django.shortcuts import render
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
 from django.contrib.auth.decorators import login_required
 from openai import OpenAI
 import os
 import json
+from collections.abc import Mapping
 
 import fitz                   # PyMuPDF (PDF)
 import docx                   # python-docx (DOCX)
@@ -14,10 +16,14 @@ from django.core.files.base import ContentFile
 
 # RAG 관련 임포트 추가
 from apps.rag.services.document_processor import DocumentProcessor
-from apps.rag.services.rag_engine import RAGEngine
+from apps.rag.services.engine_cache import load_engine
 from apps.rag.services.translator import AnalysisService
 from apps.rag.models import Document, ChatSession, ChatMessage
 from apps.rag.utils.file_handler import FileHandler
+from apps.rag.services.job_queue import is_async_ingestion_enabled
+from apps.documents.index_store import load_session_index
+from apps.rag.services.streaming import iter_completion_text, sse_event, sse_response
+from django.urls import reverse
 
 client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
 
@@ -113,10 +119,38 @@ def chat_api(request):
 
 def _handle_rag_chat(user, message, document_id, language):
     """RAG 기반 채팅 처리"""
+    prepared = _prepare_rag_chat(user, message, document_id, language)
+    if 'reply' in prepared:
+        return prepared
+    
+    # 응답 생성
+    analysis_service = AnalysisService()
+    response = analysis_service.generate_document_based_answer(
+        message, prepared['context'], language
+    )
+    
+    _save_rag_chat(prepared, message, response)
+    
+    return _rag_chat_result(prepared, response)
+
+def _prepare_rag_chat(user, message, document_id, language):
+    """문서 조회, 검색, 컨텍스트 구성 (답변 생성 전 단계)
+
+    바로 돌려줄 답변(문서 없음, 처리 중, 관련 없는 질문)이면 'reply'가 들어있는 결과를 반환합니다.
+    """
     try:
         # 문서 조회
         document = Document.objects.get(id=document_id, user=user)
         
+        if not document.is_ready:
+            from apps.rag.views import DOCUMENT_NOT_READY_MESSAGE
+            return {
+                'reply': DOCUMENT_NOT_READY_MESSAGE,
+                'rag_used': False,
+                'search_info': f'문서 처리 중 ({document.processing_stage or document.processing_status})',
+                'document_title': document.title
+            }
+        
         # 채팅 세션 생성 또는 조회
         chat_session, created = ChatSession.objects.get_or_create(
             user=user,
@@ -127,9 +161,8 @@ def _handle_rag_chat(user, message, document_id, language):
             }
         )
         
-        # RAG 엔진 초기화 및 검색
-        rag_engine = RAGEngine()
-        rag_engine.process_document(document.text_content)
+        # 저장된 검색 아티팩트로 RAG 엔진 복원 (같은 버전이면 워커 캐시 재사용)
+        rag_engine = load_engine(document)
         
         # RAG 검색 수행
         search_results = rag_engine.search(message, top_k=3)
@@ -147,7 +180,7 @@ def _handle_rag_chat(user, message, document_id, language):
         context_parts = []
         for result in search_results:
             chunk = result['chunk']
-            if isinstance(chunk, dict):
+            if isinstance(chunk, Mapping):
                 article_info = f"제{chunk.get('article_num', '?')}조({chunk.get('article_title', 'Unknown')})"
                 chunk_text = chunk.get('text', '')
             else:
@@ -157,42 +190,15 @@ def _handle_rag_chat(user, message, document_id, language):
             method = result['method']
             context_parts.append(f"[{article_info} - {method}로 검색됨]\n{chunk_text}")
         
-        context = "\n\n".join(context_parts)
-        
-        # 응답 생성
-        analysis_service = AnalysisService()
-        response = analysis_service.generate_document_based_answer(
-            message, context, language
-        )
-        
         # 검색 정보 구성
         article_count = len(search_results)
-        search_info = f"🔍 문서 기반 답변: {article_count}개 조항 (100% 계약서 내용 기반)"
-        
-        # 메시지 저장
-        ChatMessage.objects.create(
-            session=chat_session,
-            message_type='user',
-            content=message
-        )
-        
-        ChatMessage.objects.create(
-            session=chat_session,
-            message_type='assistant',
-            content=response,
-            search_results=[{
-                'method': result['method'],
-                'score': result['score']
-            } for result in search_results]
-        )
         
         return {
-            'reply': response + f"\n\n{search_info}",
-            'rag_used': True,
-            'search_info': search_info,
-            'document_title': document.title,
-            'contract_type': document.contract_type,
-            'search_results': search_results[:3]  # 최대 3개
+            'document': document,
+            'chat_session': chat_session,
+            'search_results': search_results,
+            'context': "\n\n".join(context_parts),
+            'search_info': f"🔍 문서 기반 답변: {article_count}개 조항 (100% 계약서 내용 기반)"
         }
         
     except Document.DoesNotExist:
@@ -205,6 +211,124 @@ def _handle_rag_chat(user, message, document_id, language):
         print(f"❌ RAG 채팅 처리 오류: {str(e)}")
         raise e
 
+def _save_rag_chat(prepared, message, response):
+    """질문과 답변 메시지 저장"""
+    ChatMessage.objects.create(
+        session=prepared['chat_session'],
+        message_type='user',
+        content=message
+    )
+    
+    return ChatMessage.objects.create(
+        session=prepared['chat_session'],
+        message_type='assistant',
+        content=response,
+        search_results=[{
+            'method': result['method'],
+            'score': result['score']
+        } for result in prepared['search_results']]
+    )
+
+def _rag_chat_result(prepared, response):
+    return {
+        'reply': response + f"\n\n{prepared['search_info']}",
+        'rag_used': True,
+        'search_info': prepared['search_info'],
+        'document_title': prepared['document'].title,
+        'contract_type': prepared['document'].contract_type,
+        'search_results': prepared['search_results'][:3]  # 최대 3개
+    }
+
+@csrf_exempt
+@require_POST
+def chat_api_stream(request):
+    """채팅 스트리밍 API (SSE) - chat_api와 같은 요청 형식, 답변 조각을 생성되는 대로 전송"""
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({'error': '잘못된 요청 형식입니다.'}, status=400)
+    
+    user_message = data.get('message', '').strip()
+    document_id = data.get('document_id')
+    language = data.get('language', '한국어')
+    use_rag = data.get('use_rag', True)
+    mode = data.get('mode', 'default')
+    
+    if not user_message:
+        return JsonResponse({'error': '메시지가 없습니다.'}, status=400)
+    
+    # 🔥 RAG 기능 사용 (문서가 있고 사용자가 로그인된 경우)
+    if document_id and request.user.is_authenticated and use_rag:
+        try:
+            prepared = _prepare_rag_chat(request.user, user_message, document_id, language)
+            return sse_response(_stream_rag_chat(prepared, user_message, language))
+        except Exception as e:
+            print(f"❌ RAG 처리 실패, 일반 채팅으로 폴백: {str(e)}")
+    
+    return sse_response(_stream_general_chat(user_message, language, mode))
+
+def _stream_rag_chat(prepared, message, language):
+    """RAG 답변 SSE 이벤트 생성기 (답변 저장은 스트림 완료 후)"""
+    try:
+        if 'reply' in prepared:
+            yield sse_event('meta', {key: value for key, value in prepared.items() if key != 'reply'})
+            yield sse_event('token', {'text': prepared['reply']})
+            yield sse_event('done', {'reply': prepared['reply'], 'message_id': None})
+            return
+        
+        document = prepared['document']
+        yield sse_event('meta', {
+            'rag_used': True,
+            'search_info': prepared['search_info'],
+            'document_title': document.title,
+            'contract_type': document.contract_type,
+        })
+        
+        analysis_service = AnalysisService()
+        answer_parts = []
+        for delta in analysis_service.stream_document_based_answer(message, prepared['context'], language):
+            answer_parts.append(delta)
+            yield sse_event('token', {'text': delta})
+        
+        response = ''.join(answer_parts).strip()
+        ai_message = _save_rag_chat(prepared, message, response)
+        result = _rag_chat_result(prepared, response)
+        yield sse_event('token', {'text': f"\n\n{prepared['search_info']}"})
+        yield sse_event('done', {
+            'reply': result['reply'],
+            'message_id': str(ai_message.id),
+            'search_results': result['search_results']
+        })
+        
+    except Exception as e:
+        print(f"❌ RAG 스트리밍 처리 오류: {str(e)}")
+        yield sse_event('error', {'error': f'채팅 처리 중 오류 발생: {str(e)}'})
+
+def _stream_general_chat(message, language, mode):
+    """일반 채팅 SSE 이벤트 생성기"""
+    try:
+        yield sse_event('meta', {'rag_used': False, 'search_info': '일반 AI 응답'})
+        
+        reply_parts = []
+        for delta in iter_completion_text(
+            client,
+            model="gpt-3.5-turbo",
+            messages=[
+                {"role": "system", "content": _get_system_prompt(language, mode)},
+                {"role": "user", "content": message}
+            ],
+            max_tokens=1000,
+            temperature=0.3
+        ):
+            reply_parts.append(delta)
+            yield sse_event('token', {'text': delta})
+        
+        yield sse_event('done', {'reply': ''.join(reply_parts).strip(), 'message_id': None})
+        
+    except Exception as e:
+        print(f"❌ 채팅 스트리밍 오류: {str(e)}")
+        yield sse_event('error', {'error': f'채팅 처리 중 오류 발생: {str(e)}'})
+
 def _get_system_prompt(language, mode):
     """모드별 시스템 프롬프트 반환"""
     prompts = {
@@ -263,11 +387,8 @@ def upload_file(request):
             print(f"[RAG] '약관' 질문 처리 시작 (세션: {session_id})")
             faiss_data = None
             if isinstance(user, AnonymousUser):
-                encoded_index = request.session.get(f'rag_index_b64_{session_id}')
-                chunks = request.session.get(f'rag_chunks_{session_id}')
-                if encoded_index and chunks:
-                    faiss_data = {'index': pickle.loads(base64.b64decode(encoded_index)), 'chunks': chunks}
-                else:
+                faiss_data = load_session_index(request.session, session_id)
+                if faiss_data is None:
                     return JsonResponse({'error': '분석된 약관 정보가 없습니다. 파일을 다시 업로드해주세요.'}, status=400)
 
             result = rag_services.get_answer(
@@ -301,6 +422,7 @@ def upload_file(request):
 
 def _handle_rag_upload(request, uploaded_file, language):
     """RAG 시스템을 사용한 파일 업로드 처리"""
+    global current_document_data
     try:
         # 파일 검증
         if not FileHandler.validate_file(uploaded_file):
@@ -322,17 +444,38 @@ def _handle_rag_upload(request, uploaded_file, language):
             file=file_path,
             file_type=uploaded_file.name.split('.')[-1].lower(),
             file_size=uploaded_file.size,
-            text_content=''
+            text_content='',
+            processing_status='queued' if is_async_ingestion_enabled() else 'processing'
         )
         
+        # 백그라운드 작업으로 처리 (작업 ID만 즉시 반환)
+        if is_async_ingestion_enabled():
+            from apps.rag.views import enqueue_document_processing
+            job = enqueue_document_processing(document, language)
+            
+            current_document_data[request.user.id] = {
+                'document_id': str(document.id),
+                'title': document.title,
+                'contract_type': None,
+                'chunk_count': 0
+            }
+            
+            return JsonResponse({
+                'rag_processed': False,
+                'queued': True,
+                'document_id': str(document.id),
+                'job_id': str(job.id),
+                'status_url': reverse('rag:job_status', kwargs={'job_id': job.id}),
+                'message': f'📥 문서 처리 대기 중: {document.title}'
+            }, status=202)
+        
         # RAG 처리
-        from apps.rag.views import DocumentUploadView
+        from apps.rag.views import DocumentUploadView, discard_document
         upload_view = DocumentUploadView()
         result = upload_view._process_document(document, language)
         
         if result['success']:
             # 전역 변수에 현재 문서 정보 저장 (세션 개선 가능)
-            global current_document_data
             current_document_data[request.user.id] = {
                 'document_id': str(document.id),
                 'title': document.title,
@@ -350,7 +493,7 @@ def _handle_rag_upload(request, uploaded_file, language):
                 'message': f'✅ RAG 처리 완료: {result.get("contract_type", "계약서")} 유형 감지'
             })
         else:
-            document.delete()
+            discard_document(document)
             return JsonResponse({'error': result['error']}, status=500)
             
     except Exception as e:
@@ -1,17 +1,44 @@
 # teamproject/legal_web/apps/documents/doc_retriever.py
 
 # 표준 라이브러리
-import re
+import threading
 import uuid
 
 # 서드파티 라이브러리
 import numpy as np
-import faiss
-import fitz
 import docx
 from django.conf import settings
 from qdrant_client import QdrantClient, models
 
+from apps.rag.services import qdrant_registry
+from apps.rag.services.embedding_cache import cached_embeddings
+from apps.rag.services.pdf_extractor import extract_pdf_text
+from apps.rag.services.qdrant_scroll import iter_scroll
+from apps.rag.services.qdrant_upsert import upsert_points
+from .embedding_batches import EmbeddingBatcher
+from .local_index import build_local_index, index_memory_bytes, search_local_index
+from .text_splitter import format_terms_chunk, split_terms_spans
+
+# 임베딩 모델 (캐시 키에도 사용)
+OPENAI_EMBEDDING_MODEL = "text-embedding-3-small"
+
+# 회원 문서 컬렉션 (모든 문서를 하나의 컬렉션에 저장)
+QDRANT_COLLECTION_NAME = "legal_documents"
+QDRANT_PAYLOAD_INDEXES = (
+    ("user_id", "integer"),
+    ("session_id", "keyword"),
+    ("chunk_index", "integer"),
+    # 계약서용 추가 인덱스
+    ("article_num", "integer"),
+    ("type", "keyword"),
+)
+# 포인트 ID 생성용 네임스페이스 (사용자 + 세션 + 청크 순서 → 고정 UUID)
+QDRANT_POINT_NAMESPACE = uuid.UUID('744e9356-1637-4879-a8b3-797a8fdfb59f')
+
+# 이 프로세스에서 준비를 확인한 컬렉션
+_ensured_collections = set()
+_ensured_collections_lock = threading.Lock()
+
 # --- 파일에서 텍스트 추출 ---
 def get_document_text(uploaded_file):
     print(f"🔄 get_document_text 함수 시작: {uploaded_file.name}")
@@ -22,8 +49,7 @@ def get_document_text(uploaded_file):
 
     try:
         if ext == 'pdf':
-            doc = fitz.open(stream=uploaded_file.read(), filetype='pdf')
-            text = "\n".join(page.get_text() for page in doc)
+            text = extract_pdf_text(uploaded_file.read())['text']
         elif ext == 'docx':
             document = docx.Document(uploaded_file)
             text = "\n".join(p.text for p in document.paragraphs)
@@ -42,78 +68,20 @@ def get_document_text(uploaded_file):
 
 # --- 텍스트 처리 및 벡터화 ---
 
-def recursive_split(text, separators, chunk_size):
-    """재귀적으로 텍스트를 나누는 헬퍼 함수"""
-    if len(text) <= chunk_size:
-        return [text]
-    
-    # 가장 우선순위 높은 구분자부터 시도
-    current_separator = separators[0]
-    next_separators = separators[1:]
-    
-    # 현재 구분자로 나눌 수 없으면, 다음 구분자로 시도
-    if current_separator == "" or not next_separators:
-        # 더 이상 나눌 구분자가 없으면, 글자 수로 강제 분할
-        return [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)]
-
-    # 구분자로 분할 시도
-    try:
-        parts = re.split(f'({current_separator})', text)
-    except re.error:
-        # 정규식이 아닌 일반 문자열로 분할
-        parts = text.split(current_separator)
-
-    chunks = []
-    current_chunk = ""
-    for part in parts:
-        if len(current_chunk) + len(part) <= chunk_size:
-            current_chunk += part
-        else:
-            # 현재 청크가 너무 길면, 더 작은 구분자로 다시 나눔
-            if current_chunk:
-                chunks.extend(recursive_split(current_chunk, next_separators, chunk_size))
-            current_chunk = part
-    if current_chunk:
-        chunks.extend(recursive_split(current_chunk, next_separators, chunk_size))
-        
-    return chunks
-
 def split_text_into_chunks_terms(text: str, chunk_size: int = 1500):
     """
     LangChain의 RecursiveCharacterTextSplitter와 유사한 방식으로,
     여러 구분자를 사용하여 텍스트를 안정적으로 분할합니다.
+    (구간 계산은 text_splitter.split_terms_spans, 여기서는 청크 문자열만 생성)
     """
     if not text or not text.strip():
         return []
 
     print(f"🔄 [최종 청킹 함수] 시작: chunk_size={chunk_size}")
 
-    # 구분자 우선순위: 조항 > 문단 > 문장 > 공백
-    separators = [
-        r'\n제\s*\d+\s*조',  # 조항 (가장 큰 단위)
-        '\n\n',            # 문단
-        '\n',              # 줄바꿈
-        '. ',              # 문장
-        ' ',               # 단어
-        ''                 # 마지막 강제 분할
-    ]
-    
-    # 1. 재귀적 분할 수행
-    initial_chunks = recursive_split(text, separators, chunk_size)
-    
-    # 2. 메타데이터 추가 (각 청크가 어떤 조항에 속하는지 파악)
-    final_chunks = []
-    current_article_title = "서문"
-    article_pattern = r'(제\s*\d+\s*조[^\n]*)'
-
-    for chunk in initial_chunks:
-        match = re.search(article_pattern, chunk)
-        if match:
-            # 청크에서 새로운 조항 제목이 발견되면, 현재 조항 제목을 업데이트
-            current_article_title = match.group(1).strip()
-        
-        final_chunks.append(f"참고 조항: {current_article_title}\n\n내용:\n{chunk.strip()}")
-        
+    spans = split_terms_spans(text, chunk_size)
+    final_chunks = [format_terms_chunk(text, span) for span in spans]
+
     print(f"🏁 [최종 청킹 함수] 종료: {len(final_chunks)}개 청크 생성")
     return final_chunks
 
@@ -125,55 +93,84 @@ import time
 def get_embeddings(client, texts: list[str]): 
     """
     텍스트 목록을 여러 배치로 나누어 OpenAI 임베딩 API를 호출합니다.
+    이미 임베딩한 적 있는 텍스트는 임베딩 캐시에서 가져오고 나머지만 호출합니다.
     """
-    BATCH_SIZE = 100 
-    
-    all_embeddings = []
-    
     print(f"🔄 get_embeddings 함수 시작: {len(texts)}개 텍스트")
-    
-    for i in range(0, len(texts), BATCH_SIZE):
-        batch = texts[i : i + BATCH_SIZE]
-        batch_num = i//BATCH_SIZE + 1
-        print(f"    - 배치 #{batch_num} 처리 중 ({len(batch)}개 청크)...")
-        
-        try:
-            response = client.embeddings.create(
-                input=batch,
-                model="text-embedding-3-small"
-            )           
-            # 결과 저장
-            batch_embeddings = [np.array(embedding.embedding, dtype='float32') for embedding in response.data]
-            all_embeddings.extend(batch_embeddings)
-
-        except Exception as e:
-            print(f"❌ get_embeddings 함수 오류 발생: {e}")
-            raise
 
-    print(f"🤖 OpenAI 임베딩 API 호출 성공: {len(all_embeddings)}개 벡터 생성")
+    all_embeddings = cached_embeddings(
+        OPENAI_EMBEDDING_MODEL, texts, lambda missing: _request_embeddings(client, missing)
+    )
+
     print(f"🏁 get_embeddings 함수 종료: 벡터 차원 {len(all_embeddings[0]) if all_embeddings else 0}")
     return all_embeddings
 
 
+def _request_embeddings(client, texts: list[str]):
+    """OpenAI 임베딩 API 호출 (토큰 기준 배치, 여러 배치 동시 요청, 실패 배치만 재시도)"""
+    def request_batch(batch):
+        response = client.embeddings.create(input=batch, model=OPENAI_EMBEDDING_MODEL)
+        # 동시 요청이라 응답 순서를 index 기준으로 확인
+        data = sorted(response.data, key=lambda item: item.index)
+        return [np.array(embedding.embedding, dtype='float32') for embedding in data]
+
+    try:
+        all_embeddings = EmbeddingBatcher(request_batch, OPENAI_EMBEDDING_MODEL).embed(texts)
+    except Exception as e:
+        print(f"❌ get_embeddings 함수 오류 발생: {e}")
+        raise
+
+    print(f"🤖 OpenAI 임베딩 API 호출 성공: {len(all_embeddings)}개 벡터 생성")
+    return all_embeddings
+
+
 #  Qdrant 관련 함수 (회원용)
 # ======================================================================
 
 def get_qdrant_client():
-    """Qdrant 클라이언트를 초기화하여 반환합니다."""
-    print("🔄 get_qdrant_client 함수 시작")
+    """프로세스 공용 Qdrant 클라이언트를 반환합니다. (미설정 시 None)"""
+    return qdrant_registry.get_qdrant_client()
 
-    try:
-        # settings.py에 정의된 값을 사용하여 클라이언트 생성
-        client = QdrantClient(
-            url=settings.QDRANT_URL,
-            api_key=settings.QDRANT_API_KEY,
-        )
-        print("🔗 Qdrant 클라이언트 연결 성공")
-        print("🏁 get_qdrant_client 함수 종료")
-        return client
-    except Exception as e:
-        print(f"❌ get_qdrant_client 함수 오류 발생: {e}")
-        raise
+def qdrant_point_id(user_id: int, session_id: str, chunk_index: int) -> str:
+    """사용자/세션/청크 순서로 결정되는 포인트 ID (재처리·재시도 시 중복 방지)"""
+    return str(uuid.uuid5(QDRANT_POINT_NAMESPACE, f"{user_id}:{session_id}:{chunk_index}"))
+
+
+def ensure_qdrant_collection(client: QdrantClient, collection_name: str = None):
+    """컬렉션과 필터용 페이로드 인덱스 준비 (프로세스당 한 번만 서버에 확인)"""
+    collection_name = collection_name or QDRANT_COLLECTION_NAME
+    if collection_name in _ensured_collections:
+        return
+
+    with _ensured_collections_lock:
+        if collection_name in _ensured_collections:
+            return
+
+        if client.collection_exists(collection_name):
+            print(f"📁 기존 컬렉션 '{collection_name}' 확인 완료")
+        else:
+            print(f"📁 컬렉션 '{collection_name}' 생성 중...")
+            try:
+                client.create_collection(
+                    collection_name=collection_name,
+                    vectors_config=models.VectorParams(
+                        size=1536,  # text-embedding-3-small의 벡터 차원
+                        distance=models.Distance.COSINE
+                    )
+                )
+            except Exception:
+                # 다른 워커가 동시에 생성한 경우
+                if not client.collection_exists(collection_name):
+                    raise
+
+        # 메타데이터 필터링을 위한 인덱스 (이미 있으면 무시됨)
+        for field_name, field_schema in QDRANT_PAYLOAD_INDEXES:
+            try:
+                client.create_payload_index(collection_name=collection_name, field_name=field_name, field_schema=field_schema)
+            except Exception as e:
+                print(f"⚠️ 페이로드 인덱스 '{field_name}' 생성 실패: {e}")
+
+        _ensured_collections.add(collection_name)
+        print(f"📁 컬렉션 '{collection_name}' 및 인덱스 준비 완료")
 
 def upsert_vectors_to_qdrant(client: QdrantClient, chunks: list[str], vectors: list, user_id: int, session_id: str, payloads: list[dict] = None):
     """
@@ -201,33 +198,10 @@ def upsert_vectors_to_qdrant(client: QdrantClient, chunks: list[str], vectors: l
     if payloads and len(chunks) != len(payloads):
         raise ValueError(f"청크 개수({len(chunks)})와 페이로드 개수({len(payloads)})가 일치하지 않습니다.")
 
-    collection_name = "legal_documents"  # 모든 문서를 하나의 컬렉션에 저장
+    collection_name = QDRANT_COLLECTION_NAME  # 모든 문서를 하나의 컬렉션에 저장
 
-    # 1. 컬렉션이 없으면 생성
-    try:
-        client.get_collection(collection_name=collection_name)
-        print(f"📁 기존 컬렉션 '{collection_name}' 확인 완료")
-    except Exception:  # 존재하지 않으면 에러 발생
-        print(f"📁 컬렉션 '{collection_name}' 생성 중...")
-        client.create_collection(
-            collection_name=collection_name,
-            vectors_config=models.VectorParams(
-                size=1536,  # text-embedding-3-small의 벡터 차원
-                distance=models.Distance.COSINE
-            )
-        )
-        # 메타데이터 필터링을 위한 인덱스 생성
-        client.create_payload_index(collection_name=collection_name, field_name="user_id", field_schema="integer")
-        client.create_payload_index(collection_name=collection_name, field_name="session_id", field_schema="keyword")
-
-        # 계약서용 추가 인덱스 (있어도 오류 안남)
-        try:
-            client.create_payload_index(collection_name=collection_name, field_name="article_num", field_schema="integer")
-            client.create_payload_index(collection_name=collection_name, field_name="type", field_schema="keyword")
-        except:
-            pass  # 이미 존재하면 무시
-                
-            print(f"📁 컬렉션 '{collection_name}' 및 인덱스 생성 완료")
+    # 1. 컬렉션이 없으면 생성 (프로세스당 한 번만 확인)
+    ensure_qdrant_collection(client, collection_name)
 
     # 2. Qdrant에 저장할 포인트(Point) 생성
     print("📦 포인트 데이터 생성 중...")
@@ -249,31 +223,47 @@ def upsert_vectors_to_qdrant(client: QdrantClient, chunks: list[str], vectors: l
                 "user_id": user_id,
                 "session_id": session_id
             }
+        payload["chunk_index"] = i
 
         points.append(
             models.PointStruct(
-                id=str(uuid.uuid4()),  # 각 포인트마다 고유 ID 생성
+                id=qdrant_point_id(user_id, session_id, i),  # 같은 세션을 다시 처리해도 같은 ID로 덮어씀
                 vector=vectors[i].tolist(),  # 미리 계산된 벡터를 list 형태로 변환
                 payload=payload
             )
         )
 
-    # 3. 데이터 업서트(Upsert)
-    if points:
-        try: # 전체 upsert 시도를 try 블록으로 감싸는 것이 좋습니다.
-            print(f"💾 Qdrant에 {len(points)}개 포인트 업서트 중...")
-            client.upsert(collection_name=collection_name, points=points, wait=True)
-            print(f"✅ Qdrant에 {len(points)}개의 포인트를 저장했습니다. (user: {user_id}, session: {session_id})")
-            print(f"🏁 upsert_vectors_to_qdrant 함수 종료: {len(points)}개 포인트 저장 완료")
-            return True
-        except Exception as e:
-            print(f"❌ Qdrant 저장 실패: {str(e)}")
-            print(f"🏁 upsert_vectors_to_qdrant 함수 종료: 오류 발생")
-            return False
-    else: # points가 비어있을 경우 (chunks가 비어있으면 이미 종료되었지만, 혹시 모를 상황 대비)
-        print("⚠️ 저장할 포인트가 없어 업서트 작업을 건너뜁니다.")
-        print("🏁 upsert_vectors_to_qdrant 함수 종료: 저장할 포인트 없음")
-        return True # 저장이 필요 없었으므로 성공으로 간주
+    # 3. 데이터 업서트(Upsert) - 배치로 나눠 동시에 전송, 연결 오류 배치만 재시도
+    try:
+        print(f"💾 Qdrant에 {len(points)}개 포인트 업서트 중...")
+        batch_count = upsert_points(client, collection_name, points)
+
+        # 이전 처리에서 남은 청크 정리: 현재 청크 수 이후의 청크 + chunk_index가 없는 이전 방식(uuid4 ID) 포인트
+        # (고정 ID로 덮어쓰이지 않으므로 지우지 않으면 검색 결과에 옛 청크가 중복으로 나옴)
+        # wait=True 작업이라 wait=False로 보낸 앞선 upsert가 모두 반영된 뒤 완료됨 (일관성 확인)
+        client.delete(
+            collection_name=collection_name,
+            points_selector=models.FilterSelector(
+                filter=models.Filter(
+                    must=[
+                        models.FieldCondition(key="user_id", match=models.MatchValue(value=user_id)),
+                        models.FieldCondition(key="session_id", match=models.MatchValue(value=session_id)),
+                    ],
+                    should=[
+                        models.FieldCondition(key="chunk_index", range=models.Range(gte=len(points))),
+                        models.IsEmptyCondition(is_empty=models.PayloadField(key="chunk_index")),
+                    ]
+                )
+            ),
+            wait=True
+        )
+        print(f"✅ Qdrant에 {len(points)}개의 포인트를 저장했습니다. ({batch_count}개 배치, user: {user_id}, session: {session_id})")
+        print(f"🏁 upsert_vectors_to_qdrant 함수 종료: {len(points)}개 포인트 저장 완료")
+        return True
+    except Exception as e:
+        print(f"❌ Qdrant 저장 실패: {str(e)}")
+        print(f"🏁 upsert_vectors_to_qdrant 함수 종료: 오류 발생")
+        return False
 
 def search_qdrant(client: QdrantClient, embedding_client, query: str, user_id: int, session_id: str, top_k=5):
     """
@@ -281,7 +271,7 @@ def search_qdrant(client: QdrantClient, embedding_client, query: str, user_id: i
     """
     print(f"🔄 search_qdrant 함수 시작: query='{query[:50]}...', user_id={user_id}, session_id={session_id}, top_k={top_k}")
 
-    collection_name = "legal_documents"
+    collection_name = QDRANT_COLLECTION_NAME
 
     # 1. 질문을 벡터로 변환
     print("🔍 검색 쿼리를 벡터로 변환 중...")
@@ -320,39 +310,39 @@ def search_qdrant(client: QdrantClient, embedding_client, query: str, user_id: i
 # --- FAISS 인덱스 생성 (비회원용) ---
 def create_faiss_index_from_vectors(vectors: list[np.ndarray]):
     """
-    벡터 리스트를 받아 FAISS 인덱스를 생성합니다.
+    벡터 리스트를 받아 비회원용 로컬 인덱스를 생성합니다.
+    청크 수가 적으면 NumPy 행렬, 많으면 FAISS 내적 인덱스를 사용합니다 (local_index 참고).
     """
     if not vectors:
         print("⚠️ 벡터가 없어 인덱스를 생성할 수 없습니다")
         return None
 
-    print(f"🔧 FAISS 인덱스 생성 중... (차원: {len(vectors[0])})")
-    vector_array = np.stack(vectors).astype(np.float32)
-    dimension = vector_array.shape[1]
-
-    index = faiss.IndexFlatL2(dimension)
-    index.add(vector_array)  # type: ignore # pylint: disable=no-value-for-parameter
-    print(f"✅ FAISS 인덱스 생성 완료: {index.ntotal}개 벡터 추가")
+    print(f"🔧 로컬 인덱스 생성 중... (차원: {len(vectors[0])}, {len(vectors)}개)")
+    index = build_local_index(vectors)
+    print(f"✅ 로컬 인덱스 생성 완료: {type(index).__name__}, {index.ntotal}개 벡터, {index_memory_bytes(index) / 1024:.0f}KB")
     return index
 
 # --- FAISS 인덱스 검색 (비회원용) ---
-def search_faiss_index(index: faiss.Index, chunks: list[str], client, query: str, top_k=5):
+def search_faiss_index(index, chunks: list[str], client, query: str, top_k=5):
     """
-    메모리의 FAISS 인덱스에서 관련 문서를 검색합니다.
+    로컬 인덱스에서 관련 문서를 검색합니다.
     """
     print(f"🔄 search_faiss_index 함수 시작: query='{query[:50]}...', top_k={top_k}, 총 {len(chunks)}개 청크")
+    results = search_faiss_index_many(index, chunks, client, [query], top_k=top_k)[0]
+    print(f"🏁 search_faiss_index 함수 종료: {len(results)}개 문서 검색 완료")
+    return results
 
-    try:
-        print("🔍 검색 쿼리를 임베딩으로 변환 중...")
-        query_embedding = get_embeddings(client, [query])[0]
 
-        print("🔍 FAISS 인덱스에서 검색 수행 중...")
-        distances, indices = index.search(np.array([query_embedding]), top_k)
+def search_faiss_index_many(index, chunks: list[str], client, queries: list[str], top_k=5):
+    """
+    여러 질문을 임베딩 1회, 검색 1회로 한 번에 처리합니다. (질문 순서대로 결과 목록 반환)
+    """
+    try:
+        query_embeddings = get_embeddings(client, queries)
+        scores, indices = search_local_index(index, query_embeddings, top_k)
 
-        results = [chunks[i] for i in indices[0]]
-        print(f"✅ FAISS 검색 완료: {len(results)}개 결과 반환")
-        print(f"📊 검색 거리: {distances[0].tolist()}")
-        print(f"🏁 search_faiss_index 함수 종료: {len(results)}개 문서 검색 완료")
+        results = [[chunks[i] for i in row if i >= 0] for row in indices]
+        print(f"✅ 로컬 인덱스 검색 완료: 질문 {len(queries)}개, 유사도 {[round(float(row[0]), 3) for row in scores if len(row)]}")
         return results
     except Exception as e:
         print(f"❌ search_faiss_index 함수 오류 발생: {e}")
@@ -360,27 +350,37 @@ def search_faiss_index(index: faiss.Index, chunks: list[str], client, query: str
 
 
 
+def iter_chunks_from_qdrant(client: QdrantClient, user_id: int, session_id: str, page_size: int = 256,
+                            payload_fields=("text",), ordered: bool = False, prefetch_pages: int = 2):
+    """
+    특정 사용자와 세션의 청크 페이로드를 페이지 단위로 이어 받아 하나씩 반환합니다.
+    문서 크기와 상관없이 메모리에는 몇 페이지만 유지합니다.
+
+    Args:
+        payload_fields: 받아올 페이로드 필드 (None이면 전체)
+        ordered: True면 chunk_index 순서로 반환 (chunk_index가 없는 이전 데이터는 제외됨)
+        prefetch_pages: 미리 받아 둘 페이지 수
+    """
+    scroll_filter = models.Filter(
+        must=[
+            models.FieldCondition(key="user_id", match=models.MatchValue(value=user_id)),
+            models.FieldCondition(key="session_id", match=models.MatchValue(value=session_id)),
+        ]
+    )
+    for point in iter_scroll(client, QDRANT_COLLECTION_NAME, scroll_filter, page_size=page_size,
+                             payload_fields=payload_fields, order_by="chunk_index" if ordered else None,
+                             prefetch_pages=prefetch_pages):
+        yield point.payload
+
+
 def get_all_chunks_from_qdrant(client: QdrantClient, user_id: int, session_id: str):
     """특정 사용자와 세션에 해당하는 모든 청크를 Qdrant에서 가져옵니다."""
     print(f"🔄 Qdrant에서 모든 청크 로딩 시작: user_id={user_id}, session_id={session_id}")
     try:
-        # scroll API를 사용하여 모든 포인트를 가져옵니다.
-        # 실제 운영에서는 데이터가 매우 클 경우 성능 문제가 있을 수 있습니다.
-        scrolled_points = client.scroll(
-            collection_name="legal_documents",
-            scroll_filter=models.Filter(
-                must=[
-                    models.FieldCondition(key="user_id", match=models.MatchValue(value=user_id)),
-                    models.FieldCondition(key="session_id", match=models.MatchValue(value=session_id)),
-                ]
-            ),
-            limit=1000, # 한 번에 가져올 개수
-            with_payload=True,
-            with_vectors=False
-        )
-        all_chunks = [point.payload['text'] for point in scrolled_points[0]]
+        # 한 번의 scroll(1000개)로 끝내지 않고 다음 페이지를 끝까지 따라감
+        all_chunks = [payload['text'] for payload in iter_chunks_from_qdrant(client, user_id, session_id)]
         print(f"✅ Qdrant에서 {len(all_chunks)}개 청크 로딩 완료.")
         return all_chunks
     except Exception as e:
         print(f"❌ Qdrant에서 모든 청크 로딩 실패: {e}")
-        return []
\ No newline at end of file
+        return []
@@ -2,6 +2,8 @@ import re
 import traceback
 from . import doc_retriever
 from . import translation_content
+from apps.rag.services.analysis_pool import run_chains
+from apps.rag.services.term_matcher import get_term_matcher, CONTRACT_TYPE, LEGAL_TERM
 
 
 def extract_articles_with_content(text):
@@ -64,15 +66,13 @@ def detect_contract_type(text):
     """계약서 유형 자동 감지"""
     print("🎯 계약서 유형 자동 감지 시작...")
 
+    # 전체 용어를 한 번의 스캔으로 매칭
+    matched = get_term_matcher().matched_terms(text, group=CONTRACT_TYPE)
+
     type_scores = {}
     for contract_type, terms in CONTRACT_TYPES_TERMS.items():
-        score = 0
-        matched_terms = []
-
-        for term in terms:
-            if term in text:
-                score += 1
-                matched_terms.append(term)
+        matched_terms = [term for term in matched.get((CONTRACT_TYPE, contract_type), []) if term in terms]
+        score = len(matched_terms)
 
         if score > 0:
             type_scores[contract_type] = {
@@ -231,15 +231,32 @@ def enhance_document_texts(document_chunks: list[dict], user_id: int = None, ses
         return [], []
 
 def unified_analysis_with_translation(client, text: str, target_language: str):
-    """강화된 한국어 분석 + 번역 통합 함수 - 안전성 강화 버전"""
+    """강화된 한국어 분석 + 번역 통합 함수 - 요약/위험분석 흐름 동시 실행"""
     print(f"🌍 {target_language} 통일된 분석 시작 (강화된 한국어 기준)")
 
-    try:
-        # 1단계: 강화된 한국어 분석
-        print("📋 1단계: 강화된 한국어 기준 분석 수행...")
-        
-        # 요약 생성 - 모듈 호출 방식을 직접 함수 호출로 변경
+    needs_translation = target_language != "ko"
+
+    def summary_chain():
         summary_result = translation_content.enhanced_korean_based_summary(client, text)
+        if not summary_result.get('success', False) or not needs_translation:
+            return summary_result, None
+        # 번역 실패시 translate_to_target_language가 한국어 텍스트를 그대로 돌려줌
+        korean_summary_text = summary_result.get('summary_text', '')
+        return summary_result, translation_content.translate_to_target_language(client, korean_summary_text, target_language, "요약")
+
+    def risk_chain():
+        # 품질 미달시 retry_enhanced_risk_analysis 재시도까지 이 흐름 안에서 처리
+        risk_result = translation_content.enhanced_korean_based_risk_analysis(client, text)
+        if not risk_result.get('success', False) or not needs_translation:
+            return risk_result, None
+        korean_risk_analysis_text = risk_result.get('risk_analysis_text', '')
+        return risk_result, translation_content.translate_to_target_language(client, korean_risk_analysis_text, target_language, "위험분석")
+
+    try:
+        # 한국어 분석과 번역을 흐름별로 이어서 실행, 요약/위험분석 흐름은 동시에 진행
+        print("📋 한국어 기준 분석" + (f" + {target_language} 번역" if needs_translation else "") + " 수행...")
+        (summary_result, translated_summary_text), (risk_result, translated_risk_text) = run_chains(summary_chain, risk_chain)
+
         if not summary_result.get('success', False):
             print(f"ERROR: [unified_analysis_with_translation] 한국어 요약 생성 실패: {summary_result.get('error')}")
             error_msg = summary_result.get('error', '요약 생성 실패')
@@ -249,50 +266,21 @@ def unified_analysis_with_translation(client, text: str, target_language: str):
 
         korean_summary_text = summary_result.get('summary_text', '')
 
-        # 위험 분석 생성 - 모듈 호출 방식을 직접 함수 호출로 변경
-        risk_result = translation_content.enhanced_korean_based_risk_analysis(client, text)
         if not risk_result.get('success', False):
             print(f"ERROR: [unified_analysis_with_translation] 한국어 위험 분석 실패: {risk_result.get('error')}")
-            error_msg = risk_result.get('error', '위험 분석 실패')
             # 폴백 텍스트 사용
             fallback_risk = risk_result.get('risk_analysis_text')
             return korean_summary_text, fallback_risk
-            
-        korean_risk_analysis_text = risk_result.get('risk_analysis_text', '')
 
-        print("📋 1단계 완료: 한국어 분석 성공.")
+        korean_risk_analysis_text = risk_result.get('risk_analysis_text', '')
 
         # 한국어인 경우, 바로 텍스트 반환
-        if target_language == "ko":
+        if not needs_translation:
             print("✅ 최종 결과 반환 (언어: ko)")
             return korean_summary_text, korean_risk_analysis_text
 
-        # 2단계: 다른 언어인 경우 번역 수행
-        print(f"🔄 2단계: {target_language}로 번역 수행...")
-
-        # 요약 번역 - 모듈 호출 방식을 직접 함수 호출로 변경
-        translated_summary_result = translation_content.translate_to_target_language(client, korean_summary_text, target_language, "요약")
-        if not translated_summary_result.get('success', False):
-            print(f"ERROR: [unified_analysis_with_translation] 요약 번역 실패: {translated_summary_result.get('error')}")
-            # 번역 실패시 한국어 텍스트라도 반환
-            translated_summary_text = translated_summary_result.get('translated_text', korean_summary_text)
-        else:
-            translated_summary_text = translated_summary_result.get('translated_text', korean_summary_text)
-
-        # 위험분석 번역 - 모듈 호출 방식을 직접 함수 호출로 변경
-        translated_risk_result = translation_content.translate_to_target_language(client, korean_risk_analysis_text, target_language, "위험분석")
-        if not translated_risk_result.get('success', False):
-            print(f"ERROR: [unified_analysis_with_translation] 위험 분석 번역 실패: {translated_risk_result.get('error')}")
-            # 번역 실패시 한국어 텍스트라도 반환
-            translated_risk_text = translated_risk_result.get('translated_text', korean_risk_analysis_text)
-        else:
-            translated_risk_text = translated_risk_result.get('translated_text', korean_risk_analysis_text)
-
-        print(f"🔄 2단계 완료: {target_language}로 번역 성공.")
-
-        # 최종적으로 번역된 텍스트를 담은 튜플 반환
         print(f"✅ 최종 결과 반환 (언어: {target_language})")
-        return translated_summary_text, translated_risk_text
+        return translated_summary_text or korean_summary_text, translated_risk_text or korean_risk_analysis_text
 
     except Exception as e:
         print(f"CRITICAL ERROR: [unified_analysis_with_translation] 함수 전체에서 예외 발생: {e}")
@@ -511,15 +499,8 @@ def format_contract_analysis_result(detected_contract_type, confidence, analysis
 def extract_legal_terms_from_korean_text(text):
     """한국어 텍스트에서만 어려운 법률 용어 추출 및 설명 제공"""
     legal_terms = IMPROVED_LANGUAGES["한국어"]["legal_terms"]
-    found_terms = {}
-
-    for term, explanation in legal_terms.items():
-        if term in text:
-            found_terms[term] = explanation
-        elif len(term) >= 3:
-            pattern = term + r'[은는이가을를의에서로부터까지와과도나며으로써에게에서부터]'
-            if re.search(pattern, text):
-                found_terms[term] = explanation
+    matched = get_term_matcher().matched_terms(text, group=LEGAL_TERM).get((LEGAL_TERM, "한국어"), [])
+    found_terms = {term: legal_terms[term] for term in matched if term in legal_terms}
 
     if found_terms:
         explanations = []
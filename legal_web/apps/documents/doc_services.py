@@ -7,12 +7,14 @@ from django.contrib.auth.models import AnonymousUser
 from . import doc_retriever
 from . import doc_prompt_manager
 from . import doc_retriever_content
+from . import map_reduce
+from apps.rag.services.analysis_pool import run_chains
+from apps.rag.services.llm_cache import cached_chat_completion
 
 import traceback
 
 # 클라이언트 초기화 (settings.py에 OPENAI_API_KEY 설정)
 client = OpenAI(api_key=settings.OPENAI_API_KEY)
-qdrant_client = doc_retriever.get_qdrant_client()
 
 import re
 
@@ -40,12 +42,12 @@ def _translate_text(text: str, language: str) -> str:
 
     try:
         # 4. API 호출
-        response = client.chat.completions.create(
+        translated_text = cached_chat_completion(
+            client,
             model="gpt-4o-mini",
             messages=[{"role": "user", "content": prompt}],
             temperature=0.1,
-        )
-        translated_text = response.choices[0].message.content.strip()
+        ).strip()
 
         # 5. 후처리 로직
         print("  - 번역 완료. 후처리 시작...")
@@ -107,43 +109,37 @@ def analyze_terms_document(user, uploaded_file, session_id, language='ko', doc_t
 
         # --- 2. 요약 및 위험 분석 ---
         try:
-            # --- 2-1. Map-Reduce 요약 ---
+            # --- 2-1. Map-Reduce 요약 (조각 요약 동시 실행, 토큰 예산 기반 묶음) ---
             summary_chunks = doc_retriever.split_text_into_chunks_terms(document_text, chunk_size=4000)
-            individual_summaries = []
-            for i, chunk in enumerate(summary_chunks):
+
+            def summarize_chunk(chunk):
                 summary_prompt = doc_prompt_manager.get_summarize_chunk_terms_prompt(chunk, doc_type_name)
-                response = client.chat.completions.create(
-                    model="gpt-4o-mini", messages=[{"role": "user", "content": summary_prompt}],
+                return cached_chat_completion(
+                    client, model="gpt-4o-mini", messages=[{"role": "user", "content": summary_prompt}],
                     max_tokens=300, temperature=0.3
                 )
-                individual_summaries.append(response.choices[0].message.content)
-            print(f"  - [Map 단계 완료] 생성한 개별 요약본 : {len(individual_summaries)}개")
-
-            # --- 2-2. 재귀적 요약 (Reduce 단계) ---
-            current_summaries = individual_summaries
-            while len(current_summaries) > 1:
-                print(f"    - 현재 요약본 {len(current_summaries)}개를 그룹으로 묶어 다시 요약합니다...")
-                next_level_summaries = []
-                # 10개씩 묶어서 처리
-                for i in range(0, len(current_summaries), 10):
-                    batch = current_summaries[i:i+10]
-                    reduce_prompt = doc_prompt_manager.get_combine_summaries_terms_prompt(batch, doc_type_name)
-                    intermediate_summary = client.chat.completions.create(
-                        model="gpt-4o-mini", messages=[{"role": "user", "content": reduce_prompt}],
-                        max_tokens=1500, temperature=0.5
-                    ).choices[0].message.content
-                    next_level_summaries.append(intermediate_summary)
-                current_summaries = next_level_summaries
-
-            final_summary_ko = current_summaries[0] if current_summaries else "요약 생성에 실패했습니다."
-            print("  - [Reduce 단계 완료] 최종 요약본을 생성")
-
-            # --- 2-3. 위험 요소 분석 ---
-            risk_text_ko_prompt = doc_prompt_manager.get_risk_factors_terms_prompt(document_text)
-            risk_text_ko = client.chat.completions.create(
-                model="gpt-4o-mini", messages=[{"role": "user", "content": risk_text_ko_prompt}],
-                max_tokens=1000, temperature=0.3
-            ).choices[0].message.content
+
+            def combine_summaries(batch):
+                reduce_prompt = doc_prompt_manager.get_combine_summaries_terms_prompt(batch, doc_type_name)
+                return cached_chat_completion(
+                    client, model="gpt-4o-mini", messages=[{"role": "user", "content": reduce_prompt}],
+                    max_tokens=1500, temperature=0.5
+                )
+
+            # --- 2-2. 위험 요소 분석 (원문 전체 기준이라 요약과 독립적) ---
+            def analyze_risk():
+                risk_text_ko_prompt = doc_prompt_manager.get_risk_factors_terms_prompt(document_text)
+                return cached_chat_completion(
+                    client, model="gpt-4o-mini", messages=[{"role": "user", "content": risk_text_ko_prompt}],
+                    max_tokens=1000, temperature=0.3
+                )
+
+            summarizer = map_reduce.MapReduceSummarizer(summarize_chunk, combine_summaries)
+            summary_result, risk_text_ko = run_chains(lambda: summarizer.run(summary_chunks), analyze_risk)
+
+            final_summary_ko = summary_result.summary or "요약 생성에 실패했습니다."
+            timings = ", ".join(f"{t.phase}{t.level}={t.seconds:.1f}초" for t in summary_result.levels)
+            print(f"  - [Reduce 단계 완료] 최종 요약본을 생성 ({timings})")
             print("  - [2단계 완료] 위험 요소 분석 완료")
 
         except Exception as summary_e:
@@ -177,7 +173,7 @@ def analyze_terms_document(user, uploaded_file, session_id, language='ko', doc_t
             storage_data = {"type": "faiss", "index": faiss_index, "chunks": qa_chunks}
             print("  - 비회원용 FAISS 인덱스 및 청크 저장 완료.")
         else:
-            doc_retriever.upsert_vectors_to_qdrant(qdrant_client, qa_chunks, vectors, user.id, session_id)
+            doc_retriever.upsert_vectors_to_qdrant(doc_retriever.get_qdrant_client(), qa_chunks, vectors, user.id, session_id)
             storage_data = {"type": "qdrant"}
 
                     
@@ -272,7 +268,8 @@ def analyze_contract_document(user, uploaded_file, session_id, language='ko'):
             print("  - 비회원용 FAISS 인덱스 및 청크 저장 완료.")
         else:
             print("  - 회원: Qdrant DB에 벡터 저장 시작...")
-            # qdrant_client가 미리 정의되었는지 확인
+            # 공용 Qdrant 클라이언트 확인 (미설정이면 None)
+            qdrant_client = doc_retriever.get_qdrant_client()
             if qdrant_client is None:
                 print("  - Qdrant 클라이언트가 정의되지 않았습니다 (회원인데 DB 연결 실패).")
                 return {"success": False, "error": "데이터베이스 연결 오류 (Qdrant 클라이언트 없음).", "status_code": 500}
@@ -0,0 +1,131 @@
+# apps/documents/embedding_batches.py
+"""토큰 기반 임베딩 배치 계획 및 동시 요청
+
+고정 개수(100개씩) 대신 요청당 토큰 상한까지 채워 배치를 만들고,
+여러 배치를 동시에 보내 순차 왕복 대기 시간을 없앱니다.
+실패한 배치만 지수 백오프로 다시 보내며, 결과는 입력 순서대로 돌려줍니다.
+토큰 추정이 실제보다 작아 요청 상한 초과로 거절된 배치는 반으로 나눠 다시 보냅니다.
+"""
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, List, Optional, Sequence
+
+import openai
+from django.conf import settings
+
+from .tokens import count_tokens
+
+# 일시적인 오류만 재시도 (잘못된 요청 등은 바로 실패)
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.APITimeoutError,
+    openai.InternalServerError,
+)
+
+# 백오프 상한(초)
+MAX_BACKOFF_SECONDS = 30
+
+# 요청 토큰 상한 초과 거절(400)을 알아보는 오류 메시지 조각
+TOO_LARGE_MARKERS = ('max_tokens_per_request', 'tokens per request', 'too many tokens', 'maximum context length')
+
+
+def plan_embedding_batches(token_counts: Sequence[int], max_tokens: int, max_items: int) -> List[range]:
+    """순서를 유지하며 토큰/개수 상한 안에서 연속 구간으로 배치 구성
+
+    상한을 넘는 텍스트 하나는 단독 배치가 됩니다.
+    """
+    batches = []
+    start, current_tokens = 0, 0
+    for idx, tokens in enumerate(token_counts):
+        if idx > start and (current_tokens + tokens > max_tokens or idx - start >= max_items):
+            batches.append(range(start, idx))
+            start, current_tokens = idx, 0
+        current_tokens += tokens
+    if start < len(token_counts):
+        batches.append(range(start, len(token_counts)))
+    return batches
+
+
+def _is_batch_too_large(error: Exception) -> bool:
+    """요청 토큰 상한 초과로 거절된 배치인지 (나눠 보내면 성공할 수 있는 잘못된 요청)"""
+    if not isinstance(error, openai.BadRequestError):
+        return False
+    message = str(error).lower()
+    return any(marker in message for marker in TOO_LARGE_MARKERS)
+
+
+def _backoff_seconds(attempt: int, base: float) -> float:
+    # 동시에 실패한 배치들이 같은 순간에 재시도하지 않도록 지터 추가
+    return min(MAX_BACKOFF_SECONDS, base * (2 ** attempt)) * (0.5 + random.random() / 2)
+
+
+class EmbeddingBatcher:
+    """토큰 예산 배치 + 동시 요청 + 배치 단위 재시도"""
+
+    def __init__(self, request_fn: Callable[[List[str]], List], model: str,
+                 max_tokens: Optional[int] = None, max_items: Optional[int] = None,
+                 max_workers: Optional[int] = None, max_retries: Optional[int] = None,
+                 backoff_base: float = 1.0, token_counter: Optional[Callable[[str], int]] = None):
+        self.request_fn = request_fn
+        self.max_tokens = max_tokens or getattr(settings, 'EMBEDDING_BATCH_MAX_TOKENS', 200000)
+        self.max_items = max_items or getattr(settings, 'EMBEDDING_BATCH_MAX_ITEMS', 512)
+        self.max_workers = max_workers or getattr(settings, 'EMBEDDING_MAX_CONCURRENCY', 4)
+        self.max_retries = max_retries if max_retries is not None else getattr(settings, 'EMBEDDING_MAX_RETRIES', 5)
+        self.backoff_base = backoff_base
+        self.token_counter = token_counter or (lambda text: count_tokens(text, model))
+
+    def _request_with_retry(self, batch_num: int, batch: List[str]) -> List:
+        attempt = 0
+        while True:
+            try:
+                vectors = self.request_fn(batch)
+                if len(vectors) != len(batch):
+                    raise ValueError(f"배치 #{batch_num}: 요청 {len(batch)}개, 응답 {len(vectors)}개")
+                return vectors
+            except RETRYABLE_ERRORS as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = _backoff_seconds(attempt, self.backoff_base)
+                attempt += 1
+                print(f"    - ⚠️ 배치 #{batch_num} 실패 ({type(e).__name__}), {delay:.1f}초 후 재시도 {attempt}/{self.max_retries}")
+                time.sleep(delay)
+            except openai.BadRequestError as e:
+                # 텍스트 하나가 상한을 넘으면 나눌 수 없으므로 그대로 실패
+                if len(batch) < 2 or not _is_batch_too_large(e):
+                    raise
+                middle = len(batch) // 2
+                print(f"    - ⚠️ 배치 #{batch_num}가 토큰 상한 초과로 거절됨, {middle}개/{len(batch) - middle}개로 나눠 재요청")
+                return (list(self._request_with_retry(batch_num, batch[:middle]))
+                        + list(self._request_with_retry(batch_num, batch[middle:])))
+
+    def embed(self, texts: Sequence[str]) -> List:
+        """입력 순서대로 벡터 목록 반환"""
+        texts = list(texts)
+        if not texts:
+            return []
+
+        batches = plan_embedding_batches([self.token_counter(text) for text in texts],
+                                         self.max_tokens, self.max_items)
+        print(f"    - 임베딩 {len(texts)}개를 {len(batches)}개 배치로 요청 (동시 {min(self.max_workers, len(batches))}개)")
+
+        if len(batches) == 1:
+            return list(self._request_with_retry(1, texts))
+
+        results = [None] * len(texts)
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(batches))) as executor:
+            futures = {
+                executor.submit(self._request_with_retry, num, [texts[i] for i in batch]): batch
+                for num, batch in enumerate(batches, start=1)
+            }
+            try:
+                for future in as_completed(futures):
+                    batch = futures[future]
+                    results[batch.start:batch.stop] = future.result()
+            except Exception:
+                # 한 배치가 최종 실패하면 아직 시작하지 않은 배치는 보내지 않음
+                for pending in futures:
+                    pending.cancel()
+                raise
+        return results
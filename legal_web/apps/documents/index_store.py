@@ -0,0 +1,186 @@
+# apps/documents/index_store.py
+"""비회원 FAISS 인덱스 서버 측 저장소
+
+분석 결과 인덱스(local_index)를 세션에 pickle/base64로 넣는 대신 로컬 파일로 저장하고,
+세션에는 작은 핸들 문자열만 남깁니다. 검색할 때는 인덱스 파일을 메모리 매핑(mmap)으로
+열어 복사 없이 사용하므로 세션 크기와 읽기/쓰기 비용이 문서 크기와 무관해집니다.
+
+- 마지막 사용 후 TTL이 지난 인덱스는 정리 시 삭제
+- 전체 용량이 상한을 넘으면 가장 오래 사용되지 않은 인덱스부터 삭제
+- 최근 연 인덱스는 프로세스 메모리에 LRU로 유지
+"""
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from django.conf import settings
+
+from .local_index import load_local_index, save_local_index
+
+# 상한 초과 시 이 비율까지 줄여 두어 매 저장마다 정리하지 않도록
+EVICTION_TARGET_RATIO = 0.9
+
+# 사용 시간 갱신 최소 간격(초) - 검색마다 파일 시간을 바꾸지 않도록
+TOUCH_INTERVAL_SECONDS = 60
+
+_HANDLE_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+
+def session_index_key(session_id: str) -> str:
+    """세션에 핸들을 저장하는 키"""
+    return f'rag_index_handle_{session_id}'
+
+
+class SessionIndexStore:
+    """핸들 → (로컬 벡터 인덱스, 청크, 메타데이터) 파일 저장소"""
+
+    def __init__(self, directory: str, ttl_seconds: int, max_bytes: int, memory_items: int = 32):
+        self.directory = str(directory)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.memory_items = memory_items
+
+        self._lock = threading.Lock()
+        self._loaded = OrderedDict()  # handle -> {'index', 'chunks', 'payloads'}
+
+    def _paths(self, handle: str):
+        base = os.path.join(self.directory, handle)
+        return base + '.index', base + '.json'
+
+    def save(self, index, chunks: List[str], payloads: Optional[List[Dict]] = None) -> str:
+        """인덱스와 청크를 파일로 저장하고 핸들 반환"""
+        os.makedirs(self.directory, exist_ok=True)
+        handle = uuid.uuid4().hex
+        index_path, meta_path = self._paths(handle)
+
+        # 다른 프로세스가 쓰다 만 파일을 읽지 않도록 임시 파일에 쓴 뒤 교체
+        index_info = save_local_index(index, index_path + '.tmp')
+        os.replace(index_path + '.tmp', index_path)
+        with open(meta_path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump({'index': index_info, 'chunks': chunks, 'payloads': payloads}, f, ensure_ascii=False, default=str)
+        os.replace(meta_path + '.tmp', meta_path)
+
+        print(f"💾 비회원 인덱스 저장: {handle} ({index.ntotal}개 벡터)")
+        try:
+            self.cleanup(keep=handle)
+        except OSError as e:
+            print(f"⚠️ 인덱스 저장소 정리 실패: {e}")
+        return handle
+
+    def load(self, handle: str) -> Optional[Dict]:
+        """핸들로 인덱스 열기 (없거나 만료되었으면 None)"""
+        if not handle or not _HANDLE_PATTERN.match(handle):
+            return None
+        index_path, meta_path = self._paths(handle)
+
+        try:
+            modified_at = os.path.getmtime(meta_path)
+        except OSError:
+            with self._lock:
+                self._loaded.pop(handle, None)
+            return None
+
+        now = time.time()
+        if now - modified_at > self.ttl_seconds:
+            self.delete(handle)
+            return None
+        if now - modified_at > TOUCH_INTERVAL_SECONDS:
+            os.utime(meta_path)
+
+        with self._lock:
+            entry = self._loaded.get(handle)
+            if entry is not None:
+                self._loaded.move_to_end(handle)
+                return entry
+
+        with open(meta_path, encoding='utf-8') as f:
+            meta = json.load(f)
+        index = load_local_index(index_path, meta.get('index'))
+        entry = {'index': index, 'chunks': meta['chunks'], 'payloads': meta.get('payloads')}
+
+        with self._lock:
+            self._loaded[handle] = entry
+            while len(self._loaded) > self.memory_items:
+                self._loaded.popitem(last=False)
+        return entry
+
+    def delete(self, handle: str):
+        with self._lock:
+            self._loaded.pop(handle, None)
+        for path in self._paths(handle):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def cleanup(self, keep: Optional[str] = None) -> int:
+        """만료된 인덱스와 용량 초과분 삭제 (오래 사용되지 않은 것부터, keep은 제외)"""
+        if not os.path.isdir(self.directory):
+            return 0
+
+        now = time.time()
+        entries = []
+        total = 0
+        for name in os.listdir(self.directory):
+            if not name.endswith('.json'):
+                continue
+            handle = name[:-len('.json')]
+            index_path, meta_path = self._paths(handle)
+            try:
+                size = os.path.getsize(meta_path) + os.path.getsize(index_path)
+                modified_at = os.path.getmtime(meta_path)
+            except OSError:
+                continue
+            total += size
+            if handle != keep:
+                entries.append((modified_at, handle, size))
+
+        removed = 0
+        target = int(self.max_bytes * EVICTION_TARGET_RATIO)
+        over_limit = total > self.max_bytes
+        for modified_at, handle, size in sorted(entries):
+            expired = now - modified_at > self.ttl_seconds
+            if not expired and not (over_limit and total > target):
+                continue
+            self.delete(handle)
+            total -= size
+            removed += 1
+
+        if removed:
+            print(f"🧹 비회원 인덱스 정리: {removed}개 삭제 ({total / (1024 * 1024):.1f}MB 유지)")
+        return removed
+
+
+_index_store = None
+_index_store_lock = threading.Lock()
+
+
+def get_index_store() -> SessionIndexStore:
+    """프로세스 공용 비회원 인덱스 저장소"""
+    global _index_store
+    if _index_store is None:
+        with _index_store_lock:
+            if _index_store is None:
+                directory = getattr(settings, 'RAG_INDEX_STORE_DIR', None) or settings.BASE_DIR / 'cache' / 'session_indexes'
+                ttl = getattr(settings, 'RAG_INDEX_STORE_TTL_SECONDS', 86400)
+                max_bytes = getattr(settings, 'RAG_INDEX_STORE_MAX_MB', 1024) * 1024 * 1024
+                memory_items = getattr(settings, 'RAG_INDEX_STORE_MEMORY_ITEMS', 32)
+                _index_store = SessionIndexStore(directory, ttl, max_bytes, memory_items)
+    return _index_store
+
+
+def save_session_index(storage_data: Dict) -> Optional[str]:
+    """분석 결과의 FAISS storage_data를 저장하고 세션에 넣을 핸들 반환"""
+    if storage_data.get('type') != 'faiss' or storage_data.get('index') is None or storage_data.get('chunks') is None:
+        return None
+    return get_index_store().save(storage_data['index'], storage_data['chunks'], storage_data.get('payloads'))
+
+
+def load_session_index(session, session_id: str) -> Optional[Dict]:
+    """세션의 핸들로 비회원 인덱스 열기"""
+    return get_index_store().load(session.get(session_index_key(session_id)))
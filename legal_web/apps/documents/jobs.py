@@ -0,0 +1,56 @@
+# apps/documents/jobs.py
+"""문서 분석 백그라운드 작업 처리 함수 (apps/rag/services/job_queue.py의 JOB_HANDLERS에 등록)"""
+from django.contrib.auth.models import AnonymousUser
+from django.core.files.storage import default_storage
+
+from . import doc_services as services
+from .index_store import save_session_index, session_index_key
+
+
+def analyze_document_job(job, progress):
+    """업로드된 약관/계약서 분석"""
+    payload = job.payload
+    user = job.user or AnonymousUser()
+    doc_type = payload['doc_type']
+    session_id = payload['session_id']
+
+    progress('analyzing', 10)
+    try:
+        with default_storage.open(payload['file_path'], 'rb') as stored_file:
+            # 원래 파일명으로 확장자 판별
+            stored_file.name = payload['file_name']
+            analyze = services.analyze_terms_document if doc_type == 'terms' else services.analyze_contract_document
+            result = analyze(
+                user=user,
+                uploaded_file=stored_file,
+                session_id=session_id,
+                language=payload.get('language', 'ko')
+            )
+    except Exception:
+        # 예외는 run_job이 재시도하므로 마지막 시도에서만 업로드 파일 삭제
+        if job.attempts >= job.max_attempts:
+            default_storage.delete(payload['file_path'])
+        raise
+    default_storage.delete(payload['file_path'])
+
+    if result is None or not result.get('success', False):
+        return {
+            'success': False,
+            'error': (result or {}).get('error', '문서 분석 중 알 수 없는 오류 발생'),
+            'status_code': (result or {}).get('status_code', 500)
+        }
+
+    progress('saving', 90)
+    job_result = {
+        'success': True,
+        'summary': result.get('summary'),
+        'text': result.get('text'),
+        'message': result.get('message', '분석이 완료되었습니다.')
+    }
+
+    # 비회원 FAISS 인덱스는 서버 저장소에 두고, 상태 조회 시 핸들만 요청자 세션으로 옮김
+    handle = save_session_index(result.get('storage_data', {}))
+    if handle:
+        job_result['session_data'] = {session_index_key(session_id): handle}
+
+    return job_result
@@ -0,0 +1,129 @@
+# apps/documents/local_index.py
+"""비회원 문서용 로컬 벡터 인덱스
+
+문서 크기에 따라 검색 방식을 고릅니다.
+- 청크 수가 적으면 FAISS 없이 NumPy 행렬-벡터 곱 (인덱스 구성 비용 없음)
+- 그 이상은 FAISS 내적(IndexFlatIP / IndexScalarQuantizer) 인덱스
+
+OpenAI 임베딩은 단위 벡터이므로 L2 거리 대신 내적(=코사인 유사도)으로 검색하며,
+저장 형식은 float32 / float16 / int8(스칼라 양자화) 중 선택해 메모리를 2~4배 줄일 수 있습니다.
+두 방식 모두 FAISS와 같은 `search(queries, k) -> (scores, indices)` 형태로 여러 질문을 한 번에 검색합니다.
+"""
+from typing import Dict, Optional, Sequence, Tuple
+
+import faiss
+import numpy as np
+from django.conf import settings
+
+STORAGE_TYPES = ('float32', 'float16', 'int8')
+
+# int8 양자화 범위 (최대 절댓값 성분을 127에 대응)
+_INT8_MAX = 127.0
+
+# 인덱스 데이터를 복사하지 않고 파일을 직접 매핑 (구버전 faiss는 일반 mmap 플래그)
+_MMAP_FLAGS = getattr(faiss, 'IO_FLAG_MMAP_IFC', faiss.IO_FLAG_MMAP) | faiss.IO_FLAG_READ_ONLY
+
+
+def _normalize(vectors) -> np.ndarray:
+    matrix = np.array(vectors, dtype=np.float32, ndmin=2)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class NumpyVectorIndex:
+    """소규모 문서용 행렬-벡터 곱 검색 (FAISS 인덱스와 같은 search 인터페이스)"""
+
+    def __init__(self, matrix: np.ndarray, scale: float = 1.0):
+        self.matrix = matrix
+        self.scale = scale
+
+    @classmethod
+    def from_vectors(cls, vectors: np.ndarray, storage: str = 'float32') -> 'NumpyVectorIndex':
+        if storage == 'int8':
+            # 고차원 단위 벡터는 성분이 작으므로 실제 최대 절댓값 기준으로 범위를 맞춤
+            scale = float(np.abs(vectors).max() or 1.0) / _INT8_MAX
+            quantized = np.clip(np.rint(vectors / scale), -127, 127).astype(np.int8)
+            return cls(quantized, scale=scale)
+        return cls(vectors.astype(storage))
+
+    @property
+    def ntotal(self) -> int:
+        return self.matrix.shape[0]
+
+    @property
+    def d(self) -> int:
+        return self.matrix.shape[1]
+
+    def search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        queries = np.asarray(queries, dtype=np.float32)
+        k = min(k, self.ntotal)
+        if k <= 0:
+            empty = np.empty((len(queries), 0))
+            return empty.astype(np.float32), empty.astype(np.int64)
+
+        scores = (queries @ self.matrix.astype(np.float32, copy=False).T) * self.scale
+        if k < self.ntotal:
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            top = np.tile(np.arange(self.ntotal), (len(queries), 1))
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        return np.take_along_axis(top_scores, order, axis=1), np.take_along_axis(top, order, axis=1)
+
+
+def _build_faiss_index(matrix: np.ndarray, storage: str):
+    dimension = matrix.shape[1]
+    if storage == 'float32':
+        index = faiss.IndexFlatIP(dimension)
+    else:
+        quantizer_type = faiss.ScalarQuantizer.QT_fp16 if storage == 'float16' else faiss.ScalarQuantizer.QT_8bit
+        index = faiss.IndexScalarQuantizer(dimension, quantizer_type, faiss.METRIC_INNER_PRODUCT)
+        index.train(matrix)  # pylint: disable=no-value-for-parameter
+    index.add(matrix)  # pylint: disable=no-value-for-parameter
+    return index
+
+
+def build_local_index(vectors: Sequence[np.ndarray], storage: Optional[str] = None,
+                      numpy_max: Optional[int] = None):
+    """벡터 수에 맞는 로컬 인덱스 생성 (벡터는 단위 길이로 정규화)"""
+    storage = storage or getattr(settings, 'RAG_LOCAL_INDEX_STORAGE', 'float16')
+    if storage not in STORAGE_TYPES:
+        raise ValueError(f"지원하지 않는 저장 형식입니다: {storage} ({', '.join(STORAGE_TYPES)})")
+    if numpy_max is None:
+        numpy_max = getattr(settings, 'RAG_LOCAL_INDEX_NUMPY_MAX', 500)
+
+    matrix = _normalize(np.stack(vectors))
+    if len(matrix) <= numpy_max:
+        return NumpyVectorIndex.from_vectors(matrix, storage)
+    return _build_faiss_index(matrix, storage)
+
+
+def search_local_index(index, query_vectors, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """여러 질문 벡터를 한 번에 검색 (FAISS는 벡터 수가 k보다 적으면 나머지 자리를 -1로 채움)"""
+    return index.search(_normalize(query_vectors), top_k)
+
+
+def index_memory_bytes(index) -> int:
+    """인덱스 벡터 저장에 쓰는 메모리 (벤치마크/로그용)"""
+    if isinstance(index, NumpyVectorIndex):
+        return index.matrix.nbytes
+    return int(faiss.serialize_index(index).size)
+
+
+def save_local_index(index, path: str) -> Dict:
+    """파일로 저장하고 복원에 필요한 정보 반환"""
+    if isinstance(index, NumpyVectorIndex):
+        with open(path, 'wb') as f:
+            np.save(f, index.matrix)
+        return {'kind': 'numpy', 'scale': index.scale}
+    faiss.write_index(index, path)
+    return {'kind': 'faiss'}
+
+
+def load_local_index(path: str, info: Optional[Dict] = None):
+    """저장된 인덱스를 메모리 매핑으로 열기 (복사 없이 파일을 직접 사용)"""
+    info = info or {}
+    if info.get('kind') == 'numpy':
+        return NumpyVectorIndex(np.load(path, mmap_mode='r'), scale=info.get('scale', 1.0))
+    return faiss.read_index(path, _MMAP_FLAGS)
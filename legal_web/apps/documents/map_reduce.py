@@ -0,0 +1,99 @@
+# apps/documents/map_reduce.py
+"""Map-Reduce 요약 실행기
+
+Map 단계는 조각별 요약을 제한된 개수만큼 동시에 실행하고,
+Reduce 단계는 고정 개수(10개씩)가 아니라 토큰 예산에 맞춰 최대한 많이 묶어
+트리 단계 수를 줄입니다. 같은 단계의 묶음들도 동시에 요약하므로 전체 소요 시간은
+대략 (단계 수 × LLM 호출 1회) 수준이 됩니다.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, NamedTuple, Optional
+
+from django.conf import settings
+
+from .tokens import count_tokens
+
+
+class LevelTiming(NamedTuple):
+    """단계별 실행 기록"""
+    level: int
+    phase: str  # 'map' 또는 'reduce'
+    inputs: int
+    outputs: int
+    seconds: float
+
+
+class MapReduceResult(NamedTuple):
+    summary: Optional[str]
+    levels: List[LevelTiming]
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(level.seconds for level in self.levels)
+
+
+def plan_reduce_groups(token_counts: List[int], token_budget: int) -> List[List[int]]:
+    """토큰 예산 안에서 순서를 유지하며 묶음 구성 (요약본 번호 목록의 목록)
+
+    예산을 넘는 요약본이 있어도 단계가 줄어들도록 묶음마다 최소 2개는 담습니다.
+    """
+    groups = []
+    current, current_tokens = [], 0
+    for idx, tokens in enumerate(token_counts):
+        if len(current) >= 2 and current_tokens + tokens > token_budget:
+            groups.append(current)
+            current, current_tokens = [], 0
+        current.append(idx)
+        current_tokens += tokens
+    if current:
+        # 마지막에 하나만 남으면 앞 묶음에 붙여 불필요한 재요약을 피함
+        if len(current) == 1 and groups:
+            groups[-1].extend(current)
+        else:
+            groups.append(current)
+    return groups
+
+
+class MapReduceSummarizer:
+    """조각 요약(map) → 토큰 예산 기반 묶음 요약(reduce) 반복"""
+
+    def __init__(self, map_fn: Callable[[str], str], reduce_fn: Callable[[List[str]], str],
+                 reduce_token_budget: Optional[int] = None, max_workers: Optional[int] = None,
+                 token_counter: Callable[[str], int] = count_tokens):
+        self.map_fn = map_fn
+        self.reduce_fn = reduce_fn
+        self.reduce_token_budget = reduce_token_budget or getattr(settings, 'MAP_REDUCE_TOKEN_BUDGET', 12000)
+        self.max_workers = max(1, max_workers or getattr(settings, 'MAP_REDUCE_MAX_WORKERS', 8))
+        self.token_counter = token_counter
+
+    def run(self, chunks: List[str]) -> MapReduceResult:
+        levels = []
+        if not chunks:
+            return MapReduceResult(None, levels)
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(chunks)),
+                                thread_name_prefix='map-reduce') as executor:
+            # Map 단계: 조각별 요약 (결과 순서는 원문 순서 유지)
+            start_time = time.time()
+            summaries = list(executor.map(self.map_fn, chunks))
+            levels.append(LevelTiming(0, 'map', len(chunks), len(summaries), time.time() - start_time))
+            print(f"  - [Map 단계 완료] 개별 요약본 {len(summaries)}개 ({levels[-1].seconds:.2f}초)")
+
+            # Reduce 단계: 하나가 남을 때까지 토큰 예산 단위로 묶어 재요약
+            level = 0
+            while len(summaries) > 1:
+                level += 1
+                start_time = time.time()
+                groups = plan_reduce_groups([self.token_counter(summary) for summary in summaries],
+                                            self.reduce_token_budget)
+                print(f"    - Reduce {level}단계: 요약본 {len(summaries)}개 → {len(groups)}개 묶음")
+
+                batches = [[summaries[idx] for idx in group] for group in groups]
+                next_summaries = list(executor.map(self.reduce_fn, batches))
+                levels.append(LevelTiming(level, 'reduce', len(summaries), len(next_summaries),
+                                          time.time() - start_time))
+                print(f"    - Reduce {level}단계 완료 ({levels[-1].seconds:.2f}초)")
+                summaries = next_summaries
+
+        return MapReduceResult(summaries[0], levels)
@@ -1,3 +1,249 @@
-from django.test import TestCase
+from django.test import TestCase, SimpleTestCase
+
+import os
+import tempfile
+import time
+import uuid
+from unittest import mock
+
+import faiss
+import httpx
+import numpy as np
+import openai
+from qdrant_client import QdrantClient, models
+
+from . import doc_retriever
+from .embedding_batches import EmbeddingBatcher, plan_embedding_batches
+from .index_store import SessionIndexStore
+from .local_index import NumpyVectorIndex, build_local_index, search_local_index
+from .map_reduce import MapReduceSummarizer, plan_reduce_groups
+from .tokens import count_tokens
+from .text_splitter import PREAMBLE_TITLE, format_terms_chunk, split_terms_spans
 
 # Create your tests here.
+
+
+class MapReduceSummarizerTestCase(SimpleTestCase):
+    """토큰 예산 기반 Map-Reduce 요약 테스트"""
+
+    def test_groups_respect_token_budget(self):
+        groups = plan_reduce_groups([400] * 10, token_budget=1000)
+        self.assertEqual(groups, [[0, 1], [2, 3], [4, 5], [6, 7], [8, 9]])
+
+    def test_oversized_summaries_still_pair_up(self):
+        groups = plan_reduce_groups([5000, 5000, 5000], token_budget=1000)
+        self.assertEqual(groups, [[0, 1, 2]])
+
+    def test_run_keeps_order_and_records_levels(self):
+        summarizer = MapReduceSummarizer(
+            map_fn=lambda chunk: chunk.upper(),
+            reduce_fn=lambda batch: '+'.join(batch),
+            reduce_token_budget=2, max_workers=4,
+            token_counter=len,
+        )
+        result = summarizer.run(['a', 'b', 'c', 'd', 'e'])
+
+        self.assertEqual(result.summary, 'A+B+C+D+E')
+        self.assertEqual([level.phase for level in result.levels], ['map', 'reduce', 'reduce'])
+        self.assertEqual(result.levels[0].outputs, 5)
+
+    def test_single_chunk_skips_reduce(self):
+        summarizer = MapReduceSummarizer(lambda chunk: chunk, lambda batch: 'x', max_workers=2)
+        result = summarizer.run(['only'])
+        self.assertEqual(result.summary, 'only')
+        self.assertEqual(len(result.levels), 1)
+
+
+class EmbeddingBatcherTestCase(SimpleTestCase):
+    """토큰 기반 임베딩 배치 테스트"""
+
+    def test_batches_respect_token_and_item_limits(self):
+        self.assertEqual(plan_embedding_batches([3, 3, 3, 3], max_tokens=6, max_items=10), [range(0, 2), range(2, 4)])
+        self.assertEqual(plan_embedding_batches([1, 1, 1], max_tokens=100, max_items=2), [range(0, 2), range(2, 3)])
+        self.assertEqual(plan_embedding_batches([50, 1], max_tokens=10, max_items=10), [range(0, 1), range(1, 2)])
+
+    def test_retries_failed_batch_only_and_keeps_order(self):
+        calls = []
+        request = httpx.Request('POST', 'https://api.openai.com/v1/embeddings')
+
+        def request_fn(batch):
+            calls.append(tuple(batch))
+            if batch == ['c', 'd'] and calls.count(('c', 'd')) == 1:
+                raise openai.APIConnectionError(request=request)
+            return [f"v-{text}" for text in batch]
+
+        batcher = EmbeddingBatcher(request_fn, 'model', max_tokens=2, max_items=10, max_workers=3,
+                                   max_retries=2, backoff_base=0, token_counter=lambda text: 1)
+        vectors = batcher.embed(['a', 'b', 'c', 'd', 'e'])
+
+        self.assertEqual(vectors, ['v-a', 'v-b', 'v-c', 'v-d', 'v-e'])
+        self.assertEqual(calls.count(('a', 'b')), 1)
+        self.assertEqual(calls.count(('c', 'd')), 2)
+
+    def test_splits_batch_rejected_as_too_large(self):
+        calls = []
+        response = httpx.Response(400, request=httpx.Request('POST', 'https://api.openai.com/v1/embeddings'))
+
+        def request_fn(batch):
+            calls.append(tuple(batch))
+            if len(batch) > 2:
+                raise openai.BadRequestError('Requested 400000 tokens, max 300000 tokens per request',
+                                             response=response, body=None)
+            return [f"v-{text}" for text in batch]
+
+        batcher = EmbeddingBatcher(request_fn, 'model', max_workers=1, backoff_base=0, token_counter=lambda text: 1)
+        self.assertEqual(batcher.embed(['a', 'b', 'c', 'd', 'e']), ['v-a', 'v-b', 'v-c', 'v-d', 'v-e'])
+        self.assertEqual(calls, [('a', 'b', 'c', 'd', 'e'), ('a', 'b'), ('c', 'd', 'e'), ('c',), ('d', 'e')])
+
+        # 다른 잘못된 요청은 나누지 않고 바로 실패
+        def invalid_fn(batch):
+            raise openai.BadRequestError("'$.input' is invalid", response=response, body=None)
+
+        with self.assertRaises(openai.BadRequestError):
+            EmbeddingBatcher(invalid_fn, 'model', token_counter=lambda text: 1).embed(['a', 'b'])
+
+
+class TokenCountTestCase(SimpleTestCase):
+    """토큰 수 계산 테스트"""
+
+    def test_fallback_estimate_is_conservative_for_korean(self):
+        with mock.patch('apps.documents.tokens.TIKTOKEN_AVAILABLE', False):
+            self.assertEqual(count_tokens('보증금 반환'), 2 * 5 + 1)
+            self.assertEqual(count_tokens('deposit'), 2)
+            self.assertEqual(count_tokens(''), 0)
+
+
+class QdrantSessionUpsertTestCase(SimpleTestCase):
+    """세션 청크 재색인 시 이전 포인트 정리 테스트 (로컬 메모리 Qdrant)"""
+
+    def setUp(self):
+        self.client = QdrantClient(':memory:')
+        patcher = mock.patch.object(doc_retriever, '_ensured_collections', set())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        doc_retriever.ensure_qdrant_collection(self.client)
+
+    def upsert(self, texts, session_id='s1'):
+        vectors = [np.ones(1536, dtype=np.float32)] * len(texts)
+        return doc_retriever.upsert_vectors_to_qdrant(self.client, texts, vectors, 1, session_id)
+
+    def stored_texts(self):
+        points, _ = self.client.scroll(doc_retriever.QDRANT_COLLECTION_NAME, limit=100)
+        return sorted((point.payload['session_id'], point.payload['text']) for point in points)
+
+    def test_reindex_removes_legacy_and_trailing_points(self):
+        # chunk_index 없이 uuid4 ID로 저장된 이전 방식 포인트
+        self.client.upsert(doc_retriever.QDRANT_COLLECTION_NAME, [
+            models.PointStruct(id=str(uuid.uuid4()), vector=[0.1] * 1536,
+                               payload={'text': text, 'user_id': 1, 'session_id': session_id})
+            for text, session_id in (('옛 청크', 's1'), ('다른 세션', 's2'))
+        ])
+
+        self.assertTrue(self.upsert(['가', '나', '다']))
+        self.assertTrue(self.upsert(['가', '나']))
+        self.assertEqual(self.stored_texts(), [('s1', '가'), ('s1', '나'), ('s2', '다른 세션')])
+
+
+class SessionIndexStoreTestCase(SimpleTestCase):
+    """비회원 인덱스 저장소 테스트"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.store = SessionIndexStore(self.tmpdir.name, ttl_seconds=3600, max_bytes=1024 * 1024)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def make_index(self, count=4):
+        index = faiss.IndexFlatL2(4)
+        index.add(np.eye(4, dtype=np.float32)[:count])
+        return index
+
+    def test_saved_index_is_searchable_by_handle(self):
+        handle = self.store.save(self.make_index(), ['가', '나', '다', '라'])
+        self.store._loaded.clear()
+
+        entry = self.store.load(handle)
+        _, indices = entry['index'].search(np.eye(4, dtype=np.float32)[2:3], 1)
+        self.assertEqual(entry['chunks'][indices[0][0]], '다')
+        self.assertIsNone(self.store.load('../' + handle))
+
+    def test_expired_and_least_recent_indexes_are_removed(self):
+        old = self.store.save(self.make_index(), ['a'] * 4)
+        os.utime(os.path.join(self.tmpdir.name, old + '.json'), (time.time() - 7200,) * 2)
+        self.assertIsNone(self.store.load(old))
+
+        small = SessionIndexStore(self.tmpdir.name, ttl_seconds=3600, max_bytes=1)
+        first = small.save(self.make_index(), ['a'] * 4)
+        second = small.save(self.make_index(), ['b'] * 4)
+        self.assertIsNone(small.load(first))
+        self.assertEqual(small.load(second)['chunks'], ['b'] * 4)
+
+    def test_numpy_index_round_trips_through_store(self):
+        index = build_local_index(list(np.eye(4, dtype=np.float32)), 'int8', numpy_max=10)
+        handle = self.store.save(index, ['가', '나', '다', '라'])
+        self.store._loaded.clear()
+
+        entry = self.store.load(handle)
+        self.assertIsInstance(entry['index'], NumpyVectorIndex)
+        _, indices = search_local_index(entry['index'], np.eye(4, dtype=np.float32)[3:4], 1)
+        self.assertEqual(entry['chunks'][indices[0][0]], '라')
+
+
+class LocalIndexTestCase(SimpleTestCase):
+    """문서 크기별 로컬 벡터 인덱스 테스트"""
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.vectors = list(rng.standard_normal((40, 16)).astype(np.float32))
+
+    def test_backend_depends_on_size(self):
+        self.assertIsInstance(build_local_index(self.vectors, 'float32', numpy_max=40), NumpyVectorIndex)
+        self.assertIsInstance(build_local_index(self.vectors, 'float32', numpy_max=10), faiss.IndexFlatIP)
+
+    def test_quantized_backends_agree_on_batched_search(self):
+        queries = np.stack(self.vectors[:5])
+        for numpy_max in (40, 0):
+            for storage in ('float32', 'float16', 'int8'):
+                index = build_local_index(self.vectors, storage, numpy_max=numpy_max)
+                _, indices = search_local_index(index, queries, 3)
+                self.assertEqual(indices[:, 0].tolist(), [0, 1, 2, 3, 4], (numpy_max, storage))
+
+    def test_top_k_larger_than_index(self):
+        index = build_local_index(self.vectors[:2], 'float16', numpy_max=10)
+        scores, indices = search_local_index(index, self.vectors[0], 5)
+        self.assertEqual(indices.shape, (1, 2))
+        self.assertAlmostEqual(float(scores[0][0]), 1.0, places=2)
+
+
+class TermsSplitterTestCase(SimpleTestCase):
+    """위치 기반 약관 분할 테스트"""
+
+    def setUp(self):
+        articles = "".join(
+            f"\n제{num}조(조항 {num})\n" + "회사는 이용자에게 서비스를 제공한다. " * 8 for num in range(1, 6)
+        )
+        self.text = "이 약관은 서비스 이용 조건을 정합니다. " * 6 + articles
+
+    def test_spans_cover_text_within_chunk_size(self):
+        spans = split_terms_spans(self.text, chunk_size=120)
+        self.assertEqual(spans[0].start, 0)
+        self.assertEqual(spans[-1].end, len(self.text))
+        for prev, span in zip(spans, spans[1:]):
+            self.assertEqual(prev.end, span.start)
+        self.assertTrue(all(span.end - span.start <= 120 for span in spans))
+        self.assertEqual("".join(span.text(self.text) for span in spans), self.text)
+
+    def test_article_titles_follow_headings(self):
+        spans = split_terms_spans(self.text, chunk_size=120)
+        self.assertEqual(spans[0].article_title, PREAMBLE_TITLE)
+        # 조항 구분자 앞에서 나뉘므로 제목은 청크 안에서 보이는 부분까지만 포함
+        titles = list(dict.fromkeys(span.article_title[:4] for span in spans))
+        self.assertEqual(titles, [PREAMBLE_TITLE] + [f"제{num}조" for num in range(1, 6)])
+
+    def test_format_chunk_and_empty_text(self):
+        span = split_terms_spans(self.text, chunk_size=120)[0]
+        self.assertEqual(format_terms_chunk(self.text, span),
+                         f"참고 조항: {PREAMBLE_TITLE}\n\n내용:\n{span.text(self.text).strip()}")
+        self.assertEqual(split_terms_spans("  \n "), [])
+
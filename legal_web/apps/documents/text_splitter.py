@@ -0,0 +1,96 @@
+# apps/documents/text_splitter.py
+"""약관 문서 분할 (위치 기반)
+
+원문 문자열 하나를 그대로 두고 (시작, 끝, 조항 제목) 구간만 계산합니다.
+구분자 우선순위(조항 > 문단 > 줄바꿈 > 문장 > 단어 > 글자 수)로 나누고, 인접한 조각은
+chunk_size를 넘지 않는 한 이어 붙이는 방식은 RecursiveCharacterTextSplitter와 같지만,
+조각을 문자열로 잘라 붙이지 않고 위치만 늘려 가므로 전체 작업이 (문서 길이 × 구분자 단계 수)에 비례합니다.
+
+조항 제목도 잘라 낸 청크 문자열이 아니라 원문의 청크 구간 안에서 바로 찾으므로, 분할이 끝난 뒤에도
+원문 외에는 (시작, 끝, 제목) 목록만 남습니다. 청크 문자열은 span.text(원문)으로 필요할 때만 만듭니다.
+"""
+import re
+from bisect import bisect_right
+from itertools import accumulate, chain, repeat
+from typing import List, NamedTuple
+
+# 구분자 우선순위: 조항 > 문단 > 줄바꿈 > 문장 > 단어 (마지막은 글자 수로 강제 분할)
+# 조항 구분자만 정규식이고 나머지는 str.split으로 나누는 일반 문자열
+TERMS_SEPARATORS = (re.compile(r'(\n제\s*\d+\s*조)'), '\n\n', '\n', '. ', ' ')
+
+# 조항 제목 ("제 3 조" 형태부터 같은 줄 끝까지)
+ARTICLE_TITLE_PATTERN = re.compile(r'제\s*\d+\s*조[^\n]*')
+
+# 조항 제목이 나오기 전 청크의 제목
+PREAMBLE_TITLE = "서문"
+
+
+class TextSpan(NamedTuple):
+    """원문에서 청크 하나의 위치와 소속 조항 제목"""
+    start: int
+    end: int
+    article_title: str
+
+    def text(self, source: str) -> str:
+        return source[self.start:self.end]
+
+
+def _part_bounds(segment: str, separator, offset: int) -> List[int]:
+    """구분자도 하나의 조각으로 볼 때 조각 경계 위치 목록 (처음은 offset, 마지막은 구간 끝)"""
+    if isinstance(separator, str):
+        # 문자열 구분자는 조각 사이마다 같은 길이이므로 조각 길이와 번갈아 누적
+        width = len(separator)
+        lengths = chain.from_iterable(zip(map(len, segment.split(separator)), repeat(width)))
+        bounds = list(accumulate(lengths, initial=offset))
+        bounds.pop()
+        return bounds
+    return list(accumulate(map(len, separator.split(segment)), initial=offset))
+
+
+def _split_range(text: str, start: int, end: int, chunk_size: int, level: int, out: List):
+    if end - start <= chunk_size:
+        out.append((start, end))
+        return
+
+    if level >= len(TERMS_SEPARATORS):
+        out.extend((i, min(i + chunk_size, end)) for i in range(start, end, chunk_size))
+        return
+
+    # 조각 경계(누적 길이)는 C 수준에서 한 번에 계산하고, 인접 조각을 chunk_size 안에서 최대한 이어 붙인
+    # 끝 경계를 이분 탐색으로 찾음 (파이썬 반복은 조각 수가 아니라 청크 수만큼)
+    bounds = _part_bounds(text[start:end], TERMS_SEPARATORS[level], start)
+    position, start_index = start, 0
+    while position < end:
+        index = bisect_right(bounds, position + chunk_size, start_index) - 1
+        if bounds[index] > position:
+            out.append((position, bounds[index]))
+        else:
+            # 다음 조각 하나가 chunk_size보다 크면 그 조각만 다음 구분자로 다시 분할
+            index = bisect_right(bounds, position, start_index)
+            _split_range(text, position, bounds[index], chunk_size, level + 1, out)
+        position, start_index = bounds[index], index
+
+
+def split_terms_spans(text: str, chunk_size: int = 1500) -> List[TextSpan]:
+    """약관 텍스트를 청크 구간 목록으로 분할 (각 청크 길이 ≤ chunk_size)"""
+    if not text or not text.strip():
+        return []
+
+    ranges = []
+    _split_range(text, 0, len(text), chunk_size, 0, ranges)
+
+    # 청크 구간 안에서 처음 나오는 조항 제목으로 현재 조항을 갱신 (다음 청크들이 이어받음)
+    # 구간이 겹치지 않으므로 원문 전체를 한 번만 훑음
+    title = PREAMBLE_TITLE
+    spans = []
+    for start, end in ranges:
+        heading = ARTICLE_TITLE_PATTERN.search(text, start, end)
+        if heading is not None:
+            title = heading.group().strip()
+        spans.append(TextSpan(start, end, title))
+    return spans
+
+
+def format_terms_chunk(text: str, span: TextSpan) -> str:
+    """검색/요약용 청크 문자열 (조항 제목 머리말 포함)"""
+    return f"참고 조항: {span.article_title}\n\n내용:\n{span.text(text).strip()}"
@@ -0,0 +1,42 @@
+# apps/documents/tokens.py
+"""LLM 입력 토큰 수 계산
+
+tiktoken(requirements.txt)으로 모델 인코딩에 맞춰 정확히 세고, 설치되지 않은 환경에서는
+문자 종류별 상한에 가까운 값으로 넉넉하게 추정합니다 (예산 계획용이므로 과대 추정이 안전).
+"""
+import re
+from functools import lru_cache
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+DEFAULT_MODEL = "gpt-4o-mini"
+
+# 추정용 비율: 한글/한자/가나는 글자당 2토큰 (cl100k에서 한글 음절은 대개 1토큰을 넘음),
+# 그 외는 약 4글자당 1토큰
+_CJK_PATTERN = re.compile(r'[\u1100-\u11ff\u3040-\u30ff\u3130-\u318f\u4e00-\u9fff\uac00-\ud7af]')
+_TOKENS_PER_CJK_CHAR = 2
+_CHARS_PER_TOKEN_OTHER = 4
+
+
+@lru_cache(maxsize=8)
+def _get_encoding(model: str):
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+
+def count_tokens(text: str, model: str = DEFAULT_MODEL) -> int:
+    """텍스트의 토큰 수 (tiktoken 미설치 시 추정값)"""
+    if not text:
+        return 0
+    if TIKTOKEN_AVAILABLE:
+        return len(_get_encoding(model).encode(text))
+
+    cjk_count = len(_CJK_PATTERN.findall(text))
+    other_count = len(text) - cjk_count
+    return cjk_count * _TOKENS_PER_CJK_CHAR + -(-other_count // _CHARS_PER_TOKEN_OTHER)
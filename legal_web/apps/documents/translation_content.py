@@ -1,5 +1,7 @@
 # ========================== 🔥 핵심: 한국어 기준 번역 방식 ==========================
 from openai import APIError
+from apps.rag.services.llm_cache import cached_chat_completion
+from apps.rag.services.term_matcher import get_term_matcher, CONTRACT_TYPE, KEY_INFO, RISK
 
 def enhanced_korean_based_risk_analysis(client, text):
     """강화된 한국어 기준 위험 분석 생성 - 구체성과 실용성 대폭 향상"""
@@ -63,7 +65,8 @@ def enhanced_korean_based_risk_analysis(client, text):
 • **예상 손실**: ○○원 또는 ○○% 수준의 손해배상
 • **주의사항**: ○○를 반드시 확인하고 ○○해야 함"""
 
-        response = client.chat.completions.create(
+        risk_analysis_text = cached_chat_completion(
+            client,
             model="gpt-3.5-turbo",
             messages=[
                 {"role": "system", "content": """당신은 계약서 위험 분석 전문가입니다. 다음 원칙을 엄격히 따르세요:
@@ -84,9 +87,7 @@ def enhanced_korean_based_risk_analysis(client, text):
             ],
             max_tokens=1500,
             temperature=0.05
-        )
-
-        risk_analysis_text = response.choices[0].message.content.strip()
+        ).strip()
         
         # 품질 검증 및 처리
         if validate_risk_analysis_quality(risk_analysis_text):
@@ -195,7 +196,8 @@ def enhanced_korean_based_summary(client, text: str) -> dict:
 각 항목에 대해 계약서의 구체적인 조항을 인용하면서 상세히 분석해주세요.
 일반적이고 모호한 표현보다는 계약서에 실제로 명시된 내용을 기반으로 구체적으로 설명하세요."""
 
-        response = client.chat.completions.create(
+        summary_text = cached_chat_completion(
+            client,
             model="gpt-3.5-turbo",
             messages=[
                 {"role": "system", "content": """당신은 계약서 전문 분석가입니다. 다음 원칙을 따르세요:
@@ -207,9 +209,7 @@ def enhanced_korean_based_summary(client, text: str) -> dict:
             ],
             max_tokens=1200,
             temperature=0.1
-        )
-
-        summary_text = response.choices[0].message.content.strip()
+        ).strip()
         print("✅ 강화된 한국어 요약 생성 완료.")
         return {
             "success": True,
@@ -308,7 +308,8 @@ Traduzca esto al español natural manteniendo la estructura exacta."""
         return korean_text
 
     try:
-        response = client.chat.completions.create(
+        translated_content = cached_chat_completion(
+            client,
             model="gpt-3.5-turbo",
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -317,9 +318,7 @@ Traduzca esto al español natural manteniendo la estructura exacta."""
             max_tokens=2000,  # 번역용으로 충분한 토큰
             temperature=0.1,   # 번역의 일관성을 위해 낮은 온도
             stop=None
-        )
-
-        translated_content = response.choices[0].message.content.strip()
+        ).strip()
         print(f"✅ {target_language} 번역 완료")
         return translated_content
 
@@ -338,28 +337,26 @@ def extract_key_contract_info(text):
     }
 
     try:
+        # 전체 용어를 한 번의 스캔으로 매칭
+        matcher = get_term_matcher()
+        hits = matcher.find_all(text)
+        matched = matcher.matched_terms(text, hits=hits)
+
         # 계약 유형 감지
         for contract_type in CONTRACT_TYPES_TERMS.keys():
-            if any(term in text for term in CONTRACT_TYPES_TERMS[contract_type][:3]):
+            if any(term in CONTRACT_TYPES_TERMS[contract_type][:3] for term in matched.get((CONTRACT_TYPE, contract_type), [])):
                 info['contract_type'] = contract_type
                 break
 
         # 핵심 키워드 추출
-        import re
-
         # 금액 관련 용어
-        financial_pattern = r'(대금|비용|요금|수수료|보증금|위약금|연체료|지체상금|계약금|잔금)'
-        financial_matches = re.findall(financial_pattern, text)
-        info['financial_terms'] = list(set(financial_matches)) if financial_matches else []
+        info['financial_terms'] = list(set(matcher.leftmost_terms(hits, (KEY_INFO, 'financial_terms'))))
 
         # 기간 관련 용어
-        period_pattern = r'(기간|기한|일자|날짜|시점|시기|완료|종료|만료)'
-        period_matches = re.findall(period_pattern, text)
-        info['period_terms'] = list(set(period_matches)) if period_matches else []
+        info['period_terms'] = list(set(matcher.leftmost_terms(hits, (KEY_INFO, 'period_terms'))))
 
         # 일반 키워드
-        general_keywords = ['계약', '당사자', '의무', '권리', '책임', '조건', '기준', '방법']
-        info['keywords'] = [kw for kw in general_keywords if kw in text]
+        info['keywords'] = matched.get((KEY_INFO, 'keywords'), [])
 
     except Exception as e:
         print(f"❌ 핵심 정보 추출 중 오류 발생: {e}")
@@ -438,19 +435,13 @@ def extract_detailed_risk_info(text):
     }
 
     try:
-        import re
-
-        # 각 패턴별로 안전하게 추출
-        patterns = {
-            'liability_terms': r'(손해배상|배상책임|배상의무|손실보상|피해보상|손해|배상)',
-            'termination_terms': r'(해지|해제|종료|중단|파기|취소|철회)',
-            'obligation_terms': r'(의무|책임|이행|준수|완수|수행|실행)',
-            'penalty_terms': r'(위약금|연체료|지체상금|벌금|과태료|제재|처벌|징계)'
-        }
+        # 전체 위험 용어를 한 번의 스캔으로 매칭한 뒤 분류별로 안전하게 추출
+        matcher = get_term_matcher()
+        hits = matcher.find_all(text)
 
-        for key, pattern in patterns.items():
+        for key in ['liability_terms', 'termination_terms', 'obligation_terms', 'penalty_terms']:
             try:
-                matches = re.findall(pattern, text)
+                matches = matcher.leftmost_terms(hits, (RISK, key))
                 if matches:
                     # 중복 제거하고 리스트로 저장
                     unique_matches = list(set(matches))
@@ -540,7 +531,8 @@ def retry_enhanced_risk_analysis(client, text, risk_info):
 
 위 형식으로 5가지 위험을 모두 분석하세요. "위험이 있다", "주의가 필요하다" 같은 모호한 표현은 사용 금지입니다."""
 
-        response = client.chat.completions.create(
+        retry_result = cached_chat_completion(
+            client,
             model="gpt-3.5-turbo",
             messages=[
                 {"role": "system", "content": "계약서 위험분석 전문가. 반드시 구체적이고 실용적인 분석만 제공. 모호한 표현 절대 금지."},
@@ -548,9 +540,7 @@ def retry_enhanced_risk_analysis(client, text, risk_info):
             ],
             max_tokens=1500,
             temperature=0.03
-        )
-
-        retry_result = response.choices[0].message.content.strip()
+        ).strip()
         print("✅ 재시도 위험분석 완료.")
         return {
             "success": True,
@@ -1,10 +1,13 @@
-import pickle
-import base64
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_POST
+from django.core.files.storage import default_storage
+from django.core.files.base import ContentFile
+from django.urls import reverse
 
 from . import doc_services as services
+from .index_store import save_session_index, session_index_key
+from apps.rag.services.job_queue import enqueue_job, is_async_ingestion_enabled
 
 @csrf_exempt
 @require_POST
@@ -21,6 +24,36 @@ def analyze_document_view(request):
     if not all([uploaded_file, doc_type, session_id]):
         return JsonResponse({'error': '파일, 문서 유형, 세션 ID가 모두 필요합니다.'}, status=400)
 
+    if doc_type not in ('terms', 'contract'):
+        return JsonResponse({'error': f'지원하지 않는 문서 유형입니다: {doc_type}'}, status=400)
+
+    # 백그라운드 작업으로 처리 (작업 ID만 즉시 반환, 결과는 상태 조회 API로)
+    if is_async_ingestion_enabled():
+        file_path = default_storage.save(
+            f'analyze_jobs/{session_id}/{uploaded_file.name}',
+            ContentFile(uploaded_file.read())
+        )
+        if not request.session.session_key:
+            request.session.create()
+
+        job = enqueue_job(
+            'documents_analyze',
+            payload={
+                'file_path': file_path,
+                'file_name': uploaded_file.name,
+                'doc_type': doc_type,
+                'session_id': session_id,
+                'language': language,
+            },
+            user=request.user,
+            session_key=request.session.session_key
+        )
+        return JsonResponse({
+            'job_id': str(job.id),
+            'status_url': reverse('rag:job_status', kwargs={'job_id': job.id}),
+            'message': '문서 분석을 시작했습니다.'
+        }, status=202)
+
     # 문서 유형에 따른 분기 처리
     if doc_type == 'terms':
         # 약관 처리: RAG 기반 분석
@@ -55,26 +88,18 @@ def analyze_document_view(request):
             status=status_code
         )
 
-    # --- 수정된 FAISS 인덱스 세션 저장 로직 ---
-    # doc_type에 관계없이 result에 'faiss' 유형의 storage_data가 있으면 저장
+    # --- 비회원 FAISS 인덱스 저장 (서버 파일 저장소, 세션에는 핸들만) ---
     storage_data = result.get('storage_data', {})
-    if storage_data.get('type') == 'faiss': # 이 조건만으로 충분함
-        faiss_index = storage_data.get('index')
-        chunks = storage_data.get('chunks')
-
-        if faiss_index is not None and chunks is not None:
-            try:
-                serialized_index = pickle.dumps(faiss_index)
-                encoded_index_str = base64.b64encode(serialized_index).decode('utf-8')
-
-                request.session[f'rag_index_b64_{session_id}'] = encoded_index_str
-                request.session[f'rag_chunks_{session_id}'] = chunks
-                print(f"비회원 문서 분석 완료. FAISS 데이터를 세션에 저장함 (세션키: {session_id}, 문서 유형: {doc_type})")
-            except Exception as e:
-                print(f"FAISS 인덱스 직렬화/저장 오류: {e}")
-        else:
-            print(f"⚠️ FAISS 인덱스 또는 청크가 None이어서 세션에 저장하지 못했습니다. index={faiss_index is not None}, chunks={chunks is not None}")
-    # --- 수정된 FAISS 인덱스 세션 저장 로직 끝 ---
+    if storage_data.get('type') == 'faiss':
+        try:
+            handle = save_session_index(storage_data)
+            if handle:
+                request.session[session_index_key(session_id)] = handle
+                print(f"비회원 문서 분석 완료. FAISS 인덱스 핸들을 세션에 저장함 (세션키: {session_id}, 문서 유형: {doc_type})")
+            else:
+                print(f"⚠️ FAISS 인덱스 또는 청크가 None이어서 저장하지 못했습니다. index={storage_data.get('index') is not None}, chunks={storage_data.get('chunks') is not None}")
+        except Exception as e:
+            print(f"FAISS 인덱스 저장 오류: {e}")
 
     return JsonResponse({
         'summary': result.get('summary'),
@@ -0,0 +1,59 @@
+# apps/rag/jobs.py
+"""RAG 앱 백그라운드 작업 처리 함수 (services/job_queue.py의 JOB_HANDLERS에 등록)"""
+from .models import Document
+
+
+def process_document_job(job, progress):
+    """업로드된 문서의 텍스트 추출, 인덱싱, 분석
+
+    OpenAI/Qdrant 일시 오류 같은 예외는 그대로 던져 run_job이 재시도하게 하고,
+    문서(수정본이면 새 파일)는 마지막 시도까지 실패한 경우에만 정리합니다.
+    """
+    from .views import DocumentUploadView
+
+    document = job.document
+    if document is None:
+        return {'success': False, 'error': '처리할 문서가 삭제되었습니다.'}
+
+    language = job.payload.get('language', '한국어')
+    revision = job.payload.get('revision')
+    final_attempt = job.attempts >= job.max_attempts
+    view = DocumentUploadView()
+    if revision:
+        # 수정본: 실패해도 이전 버전 문서는 유지
+        try:
+            result = view._process_revision(document, revision, language, progress=progress, raise_errors=True)
+        except Exception:
+            if final_attempt:
+                # 청크 교체까지 끝났으면 새 파일이 문서 파일이므로 남겨 둠
+                saved = Document.objects.filter(pk=document.pk, file=revision['file']).exists()
+                view._discard_revision(document, revision, saved)
+            raise
+        if not result['success']:
+            return result
+    else:
+        try:
+            result = view._process_document(document, language, progress=progress, raise_errors=True)
+        except Exception:
+            if final_attempt:
+                _discard_document(job, document)
+            raise
+        if not result['success']:
+            _discard_document(job, document)  # 처리 실패시 삭제 (재시도해도 같은 결과)
+            return result
+
+    return {
+        'success': True,
+        'document_id': str(document.id),
+        'contract_type': result.get('contract_type'),
+        'chunk_count': result.get('chunk_count'),
+        'vector_indexed': result.get('vector_indexed'),
+        'revision': result.get('revision'),
+    }
+
+
+def _discard_document(job, document):
+    from .views import discard_document
+
+    discard_document(document)
+    job.document = None  # DB에서는 SET_NULL, 삭제된 인스턴스를 들고 있으면 작업 저장이 거부됨
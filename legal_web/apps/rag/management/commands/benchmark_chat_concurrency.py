@@ -0,0 +1,87 @@
+# apps/rag/management/commands/benchmark_chat_concurrency.py
+import asyncio
+import statistics
+import time
+
+import httpx
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+# 비교할 채팅 API (동기 / 비동기)
+ENDPOINTS = {
+    'sync': 'rag:chat_message',
+    'async': 'rag:chat_message_async',
+}
+
+
+class Command(BaseCommand):
+    help = (
+        '동시 채팅 처리량 비교 (동기 / 비동기 채팅 API). '
+        '실행 중인 서버에 요청을 보내므로 먼저 ASGI 서버를 띄워 두세요 '
+        '(예: uvicorn config.asgi:application --workers 1). '
+        '요청마다 채팅 메시지가 저장되니 벤치마크용 세션을 사용하세요.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', type=str, default='http://127.0.0.1:8000')
+        parser.add_argument('--session-id', type=str, required=True, help='로그인 사용자의 채팅 세션 ID')
+        parser.add_argument('--cookie', type=str, required=True, help='로그인 세션 쿠키 값 (sessionid)')
+        parser.add_argument('--message', type=str, default='계약 해지 조건은?')
+        parser.add_argument('--concurrency', type=str, default='1,10,50,100', help='동시 요청 수 목록 (쉼표 구분)')
+        parser.add_argument('--requests', type=int, default=100, help='단계별 총 요청 수')
+        parser.add_argument('--modes', type=str, default='sync,async', help='비교할 API (sync, async)')
+        parser.add_argument('--timeout', type=float, default=120.0)
+
+    def handle(self, *args, **options):
+        modes = [mode.strip() for mode in options['modes'].split(',') if mode.strip()]
+        unknown = set(modes) - set(ENDPOINTS)
+        if unknown:
+            raise CommandError(f"알 수 없는 API: {', '.join(sorted(unknown))} ({', '.join(ENDPOINTS)})")
+        levels = [int(level) for level in options['concurrency'].split(',') if level.strip()]
+
+        self.stdout.write(
+            f"{'API':>6} {'동시 요청':>9} {'요청 수':>7} {'실패':>5} {'처리량(req/s)':>14} "
+            f"{'p50(ms)':>9} {'p95(ms)':>9} {'최대(ms)':>9}"
+        )
+        for mode in modes:
+            url = options['base_url'].rstrip('/') + reverse(ENDPOINTS[mode])
+            for level in levels:
+                elapsed, latencies, failures = asyncio.run(self._run(url, level, options))
+                latencies.sort()
+                p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] if latencies else 0.0
+                self.stdout.write(
+                    f"{mode:>6} {level:>9} {options['requests']:>7} {failures:>5} "
+                    f"{len(latencies) / elapsed:>14.2f} "
+                    f"{(statistics.median(latencies) if latencies else 0.0) * 1000:>9.0f} "
+                    f"{p95 * 1000:>9.0f} {(latencies[-1] if latencies else 0.0) * 1000:>9.0f}"
+                )
+
+        self.stdout.write(self.style.SUCCESS('✅ 동시 채팅 벤치마크 완료'))
+
+    async def _run(self, url, concurrency, options):
+        """요청을 concurrency개씩 동시에 보내고 (총 시간, 성공 요청 지연 목록, 실패 수) 반환"""
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies = []
+        failures = 0
+        payload = {'session_id': options['session_id'], 'message': options['message']}
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+        async with httpx.AsyncClient(cookies={'sessionid': options['cookie']}, timeout=options['timeout'],
+                                     limits=limits) as client:
+            async def send():
+                nonlocal failures
+                async with semaphore:
+                    started = time.perf_counter()
+                    try:
+                        response = await client.post(url, json=payload)
+                        ok = response.status_code == 200 and response.json().get('success')
+                    except (httpx.HTTPError, ValueError):
+                        ok = False
+                    if ok:
+                        latencies.append(time.perf_counter() - started)
+                    else:
+                        failures += 1
+
+            started = time.perf_counter()
+            await asyncio.gather(*(send() for _ in range(options['requests'])))
+            return time.perf_counter() - started, latencies, failures
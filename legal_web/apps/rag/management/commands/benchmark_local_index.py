@@ -0,0 +1,60 @@
+# apps/rag/management/commands/benchmark_local_index.py
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from apps.documents.local_index import (
+    STORAGE_TYPES, build_local_index, index_memory_bytes, search_local_index
+)
+
+
+class Command(BaseCommand):
+    help = '비회원 로컬 벡터 인덱스 성능 비교 (문서 크기별 NumPy/FAISS, 저장 형식별)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=str, default='50,200,1000,5000,20000', help='청크 수 목록 (쉼표 구분)')
+        parser.add_argument('--dim', type=int, default=1536, help='벡터 차원 (text-embedding-3-small: 1536)')
+        parser.add_argument('--queries', type=int, default=32, help='묶음 검색 질문 수')
+        parser.add_argument('--top-k', type=int, default=5)
+        parser.add_argument('--repeat', type=int, default=20, help='단일 질문 검색 반복 횟수')
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['sizes'].split(',') if size.strip()]
+        dim, top_k = options['dim'], options['top_k']
+        rng = np.random.default_rng(0)
+
+        self.stdout.write(
+            f"{'청크 수':>8} {'방식':>18} {'형식':>8} {'생성(ms)':>9} {'메모리(KB)':>11} "
+            f"{'단일(ms)':>9} {'묶음/질문(ms)':>14} {'recall@k':>9}"
+        )
+        for size in sizes:
+            vectors = rng.standard_normal((size, dim)).astype(np.float32)
+            queries = vectors[rng.integers(0, size, options['queries'])] + \
+                rng.standard_normal((options['queries'], dim)).astype(np.float32) * 0.5
+
+            # 정답 기준: float32 전체 비교
+            _, expected = search_local_index(build_local_index(list(vectors), 'float32', numpy_max=size), queries, top_k)
+
+            for numpy_max in (size, 0):
+                for storage in STORAGE_TYPES:
+                    started = time.perf_counter()
+                    index = build_local_index(list(vectors), storage, numpy_max=numpy_max)
+                    build_ms = (time.perf_counter() - started) * 1000
+
+                    started = time.perf_counter()
+                    for i in range(options['repeat']):
+                        search_local_index(index, queries[i % len(queries)], top_k)
+                    single_ms = (time.perf_counter() - started) * 1000 / options['repeat']
+
+                    started = time.perf_counter()
+                    _, found = search_local_index(index, queries, top_k)
+                    batch_ms = (time.perf_counter() - started) * 1000 / len(queries)
+
+                    recall = np.mean([len(set(a) & set(b)) / top_k for a, b in zip(found, expected)])
+                    self.stdout.write(
+                        f"{size:>8} {type(index).__name__:>18} {storage:>8} {build_ms:>9.1f} "
+                        f"{index_memory_bytes(index) / 1024:>11.0f} {single_ms:>9.3f} {batch_ms:>14.3f} {recall:>9.3f}"
+                    )
+
+        self.stdout.write(self.style.SUCCESS('✅ 로컬 인덱스 벤치마크 완료'))
@@ -0,0 +1,91 @@
+# apps/rag/management/commands/benchmark_pdf_extraction.py
+import io
+import time
+
+import fitz  # PyMuPDF
+from django.core.management.base import BaseCommand
+
+from apps.rag.services.pdf_extractor import extract_pdf_text, get_pdf_executor
+
+try:
+    import PyPDF2
+except ImportError:
+    PyPDF2 = None
+
+ARTICLE_TEXT = (
+    "제{num}조(계약의 이행) 을은 갑에게 본 계약에서 정한 용역을 성실히 제공하여야 하며, "
+    "갑은 용역대금을 매월 말일까지 지급한다. 당사자 일방이 본 조의 의무를 위반한 경우 "
+    "상대방은 서면으로 시정을 요구할 수 있고, 14일 이내에 시정되지 않으면 계약을 해지할 수 있다."
+)
+
+
+def make_contract_pdf(pages: int, articles_per_page: int = 6) -> bytes:
+    """벤치마크용 계약서 PDF 생성 (한글 내장 글꼴 사용)"""
+    doc = fitz.open()
+    num = 1
+    for _ in range(pages):
+        page = doc.new_page()
+        text = "\n\n".join(ARTICLE_TEXT.format(num=num + i) for i in range(articles_per_page))
+        num += articles_per_page
+        page.insert_textbox(fitz.Rect(50, 50, 545, 790), text, fontname='korea', fontsize=10)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def extract_with_pypdf2(data: bytes) -> str:
+    """기존 추출 방식 (PyPDF2 페이지 순차 추출)"""
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    return "\n".join(page.extract_text() for page in reader.pages)
+
+
+class Command(BaseCommand):
+    help = 'PDF 텍스트 추출 성능 비교 (PyPDF2 / PyMuPDF 순차 / PyMuPDF 페이지 병렬)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pages', type=str, default='50,200,500', help='생성할 계약서 페이지 수 목록 (쉼표 구분)')
+        parser.add_argument('--file', type=str, help='생성 대신 측정할 PDF 파일 경로')
+        parser.add_argument('--repeat', type=int, default=3, help='방식별 반복 횟수 (최소 시간 사용)')
+        parser.add_argument('--pages-per-task', type=int, default=32)
+
+    def handle(self, *args, **options):
+        if options['file']:
+            with open(options['file'], 'rb') as f:
+                samples = [(options['file'], f.read())]
+        else:
+            samples = []
+            for pages in [int(p) for p in options['pages'].split(',') if p.strip()]:
+                self.stdout.write(f"📄 {pages}페이지 계약서 생성 중...")
+                samples.append((f"{pages}p", make_contract_pdf(pages)))
+
+        # 풀 생성/워커 기동 시간은 측정에서 제외 (서버에서는 프로세스당 한 번)
+        get_pdf_executor()
+        warmup = make_contract_pdf(64)
+        extract_pdf_text(warmup, parallel_min_pages=1, pages_per_task=1)
+
+        methods = [
+            ('PyMuPDF 순차', lambda data: extract_pdf_text(data, parallel_min_pages=10 ** 9)['text']),
+            ('PyMuPDF 병렬', lambda data: extract_pdf_text(
+                data, parallel_min_pages=1, pages_per_task=options['pages_per_task'])['text']),
+        ]
+        if PyPDF2 is not None:
+            methods.insert(0, ('PyPDF2', extract_with_pypdf2))
+        else:
+            self.stdout.write(self.style.WARNING('⚠️ PyPDF2 미설치로 기존 방식은 측정하지 않습니다'))
+
+        self.stdout.write(f"{'문서':>12} {'방식':>14} {'시간(ms)':>10} {'페이지/초':>10} {'추출 글자 수':>12}")
+        for name, data in samples:
+            with fitz.open(stream=data, filetype='pdf') as doc:
+                page_count = doc.page_count
+            for method_name, extract in methods:
+                best = float('inf')
+                text = ''
+                for _ in range(options['repeat']):
+                    started = time.perf_counter()
+                    text = extract(data)
+                    best = min(best, time.perf_counter() - started)
+                self.stdout.write(
+                    f"{name:>12} {method_name:>14} {best * 1000:>10.1f} {page_count / best:>10.0f} {len(text):>12,}"
+                )
+
+        self.stdout.write(self.style.SUCCESS('✅ PDF 추출 벤치마크 완료'))
@@ -0,0 +1,122 @@
+# apps/rag/management/commands/benchmark_terms_splitter.py
+import re
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.documents.text_splitter import format_terms_chunk, split_terms_spans
+
+ARTICLE_TEXT = (
+    "\n제{num}조(서비스의 제공) 회사는 이용자에게 약관에서 정한 서비스를 제공합니다. "
+    "회사는 서비스 제공을 위하여 필요한 경우 정기점검을 실시할 수 있으며, 점검 시간은 서비스 화면에 공지합니다.\n"
+    "① 이용자는 서비스 이용 시 관계 법령과 본 약관을 준수하여야 합니다. "
+    "② 회사는 이용자가 본 조를 위반한 경우 서비스 이용을 제한할 수 있습니다.\n\n"
+)
+
+LEGACY_SEPARATORS = [r'\n제\s*\d+\s*조', '\n\n', '\n', re.escape('. '), ' ', '']
+
+
+def make_terms_text(size_mb: float) -> str:
+    """벤치마크용 약관 텍스트 생성 (size_mb 메가바이트 분량의 조항 반복)"""
+    target = int(size_mb * 1024 * 1024)
+    parts = []
+    length = 0
+    num = 1
+    while length < target:
+        part = ARTICLE_TEXT.format(num=num)
+        parts.append(part)
+        length += len(part.encode('utf-8'))
+        num += 1
+    return "".join(parts)
+
+
+def legacy_recursive_split(text, separators, chunk_size):
+    """기존 분할 방식 (조각 문자열을 잘라 붙이며 재귀 분할)"""
+    if len(text) <= chunk_size:
+        return [text]
+
+    current_separator = separators[0]
+    next_separators = separators[1:]
+    if current_separator == "" or not next_separators:
+        return [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)]
+
+    parts = re.split(f'({current_separator})', text)
+    chunks = []
+    current_chunk = ""
+    for part in parts:
+        if len(current_chunk) + len(part) <= chunk_size:
+            current_chunk += part
+        else:
+            if current_chunk:
+                chunks.extend(legacy_recursive_split(current_chunk, next_separators, chunk_size))
+            current_chunk = part
+    if current_chunk:
+        chunks.extend(legacy_recursive_split(current_chunk, next_separators, chunk_size))
+    return chunks
+
+
+def legacy_split_terms(text: str, chunk_size: int):
+    """기존 방식 전체 (재귀 분할 + 청크마다 조항 제목 검색)"""
+    chunks = legacy_recursive_split(text, LEGACY_SEPARATORS, chunk_size)
+    results = []
+    current_title = "서문"
+    for chunk in chunks:
+        match = re.search(r'(제\s*\d+\s*조[^\n]*)', chunk)
+        if match:
+            current_title = match.group(1).strip()
+        results.append(f"참고 조항: {current_title}\n\n내용:\n{chunk.strip()}")
+    return results
+
+
+def spans_split_terms(text: str, chunk_size: int):
+    """위치 기반 분할 후 청크 문자열 생성 (doc_retriever와 동일한 사용 방식)"""
+    return [format_terms_chunk(text, span) for span in split_terms_spans(text, chunk_size)]
+
+
+class Command(BaseCommand):
+    help = '약관 분할 성능 비교 (기존 재귀 분할 / 위치 기반 분할)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes-mb', type=str, default='1,4,8', help='생성할 약관 크기(MB) 목록 (쉼표 구분)')
+        parser.add_argument('--file', type=str, help='생성 대신 측정할 약관 텍스트 파일 경로 (UTF-8)')
+        parser.add_argument('--chunk-size', type=int, default=1500)
+        parser.add_argument('--repeat', type=int, default=3, help='방식별 반복 횟수 (최소 시간 사용)')
+        parser.add_argument('--single-line', action='store_true', help='줄바꿈을 없앤 같은 크기 약관도 측정')
+        parser.add_argument('--skip-legacy', action='store_true', help='기존 방식 측정 생략 (큰 문서용)')
+
+    def handle(self, *args, **options):
+        if options['file']:
+            with open(options['file'], encoding='utf-8') as f:
+                samples = [(options['file'], f.read())]
+        else:
+            samples = []
+            for size in [value for value in options['sizes_mb'].split(',') if value.strip()]:
+                text = make_terms_text(float(size))
+                samples.append((f"{size}MB", text))
+                if options['single_line']:
+                    # 줄바꿈 없이 추출된 약관 (문장/단어 단계까지 내려가는 경우)
+                    samples.append((f"{size}MB 한줄", text.replace('\n', ' ')))
+
+        methods = [('위치 기반', spans_split_terms)]
+        if not options['skip_legacy']:
+            methods.insert(0, ('기존 재귀', legacy_split_terms))
+
+        self.stdout.write(f"{'문서':>12} {'방식':>8} {'시간(ms)':>10} {'MB/초':>8} {'청크 수':>8} {'결과 일치':>8}")
+        for name, text in samples:
+            size_mb = len(text.encode('utf-8')) / 1024 / 1024
+            baseline = None
+            for method_name, split in methods:
+                best = float('inf')
+                chunks = []
+                for _ in range(options['repeat']):
+                    started = time.perf_counter()
+                    chunks = split(text, options['chunk_size'])
+                    best = min(best, time.perf_counter() - started)
+                if baseline is None:
+                    baseline = chunks
+                same = '-' if baseline is chunks else ('예' if chunks == baseline else '아니오')
+                self.stdout.write(
+                    f"{name:>12} {method_name:>8} {best * 1000:>10.1f} {size_mb / best:>8.1f} {len(chunks):>8,} {same:>8}"
+                )
+
+        self.stdout.write(self.style.SUCCESS('✅ 약관 분할 벤치마크 완료'))
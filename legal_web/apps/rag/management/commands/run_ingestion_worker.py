@@ -0,0 +1,50 @@
+# apps/rag/management/commands/run_ingestion_worker.py
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from apps.rag.services.job_queue import claim_next_job, default_worker_id, requeue_stale_jobs, run_job
+
+class Command(BaseCommand):
+    help = '문서 처리 작업 워커 (여러 프로세스를 띄우면 작업을 나눠서 처리)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--worker-id', type=str, default=None, help='워커 식별자 (기본: 호스트명:PID)')
+        parser.add_argument('--poll-interval', type=float, default=2.0, help='대기 작업이 없을 때 조회 간격(초)')
+        parser.add_argument('--max-jobs', type=int, default=0, help='처리할 최대 작업 수 (0이면 무제한)')
+        parser.add_argument('--once', action='store_true', help='대기 중인 작업을 모두 처리하면 종료')
+
+    def handle(self, *args, **options):
+        worker_id = options['worker_id'] or default_worker_id()
+        poll_interval = options['poll_interval']
+        max_jobs = options['max_jobs']
+
+        self.stdout.write(f"🔧 문서 처리 워커 시작: {worker_id}")
+        processed = 0
+
+        try:
+            while True:
+                close_old_connections()
+                requeue_stale_jobs()
+
+                job = claim_next_job(worker_id)
+                if job is None:
+                    if options['once']:
+                        break
+                    time.sleep(poll_interval)
+                    continue
+
+                start_time = time.time()
+                success = run_job(job)
+                processed += 1
+
+                status = self.style.SUCCESS('완료') if success else self.style.ERROR('실패')
+                self.stdout.write(f"{status} {job.job_type} ({job.id}) - {time.time() - start_time:.2f}초")
+
+                if max_jobs and processed >= max_jobs:
+                    break
+        except KeyboardInterrupt:
+            self.stdout.write("\n⏹️ 워커 종료 요청")
+
+        self.stdout.write(self.style.SUCCESS(f"✅ 워커 종료: {processed}개 작업 처리"))
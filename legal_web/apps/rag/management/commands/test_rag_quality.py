@@ -29,9 +29,8 @@ class Command(BaseCommand):
             from apps.rag.models import Document
             document = Document.objects.get(id=document_id)
             
-            # RAG 엔진 초기화
-            rag_engine = RAGEngine()
-            rag_engine.process_document(document.text_content)
+            # 저장된 검색 아티팩트로 RAG 엔진 복원
+            rag_engine = RAGEngine.load(document)
             
             for query in test_queries:
                 self.stdout.write(f"\n🔍 테스트 쿼리: '{query}'")
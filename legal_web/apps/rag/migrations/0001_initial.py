@@ -0,0 +1,178 @@
+# Generated by Django 5.2.2 on 2026-10-18 13:44
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Document',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=255, verbose_name='문서 제목')),
+                ('file', models.FileField(upload_to='documents/%Y/%m/%d/', verbose_name='파일')),
+                ('file_type', models.CharField(max_length=10, verbose_name='파일 형식')),
+                ('file_size', models.PositiveIntegerField(verbose_name='파일 크기 (bytes)')),
+                ('contract_type', models.CharField(blank=True, choices=[('근로계약서', '근로계약서'), ('용역계약서', '용역계약서'), ('매매계약서', '매매계약서'), ('임대차계약서', '임대차계약서'), ('비밀유지계약서', '비밀유지계약서'), ('공급계약서', '공급계약서'), ('프랜차이즈 계약서', '프랜차이즈 계약서'), ('MOU', 'MOU'), ('주식양도계약서', '주식양도계약서'), ('라이선스 계약서', '라이선스 계약서'), ('합작투자계약서', '합작투자계약서'), ('위임계약서', '위임계약서'), ('기술이전계약서', '기술이전계약서'), ('하도급계약서', '하도급계약서'), ('광고대행계약서', '광고대행계약서'), ('컨설팅계약서', '컨설팅계약서'), ('출판계약서', '출판계약서'), ('건설공사계약서', '건설공사계약서'), ('임의규약계약서', '임의규약계약서'), ('투자계약서', '투자계약서'), ('기타', '기타')], max_length=50, null=True, verbose_name='계약서 유형')),
+                ('confidence_score', models.FloatField(blank=True, null=True, verbose_name='유형 감지 신뢰도')),
+                ('text_content', models.TextField(verbose_name='추출된 텍스트')),
+                ('page_offsets', models.JSONField(blank=True, null=True, verbose_name='페이지 시작 위치')),
+                ('chunk_count', models.PositiveIntegerField(default=0, verbose_name='청크 개수')),
+                ('vector_indexed', models.BooleanField(default=False, verbose_name='벡터 인덱스 생성 여부')),
+                ('qdrant_collection_name', models.CharField(blank=True, max_length=100, null=True)),
+                ('keyword_index', models.JSONField(blank=True, null=True, verbose_name='키워드 인덱스')),
+                ('artifact_version', models.PositiveIntegerField(default=0, verbose_name='검색 아티팩트 버전')),
+                ('artifact_format', models.PositiveSmallIntegerField(default=0, verbose_name='검색 아티팩트 형식')),
+                ('processing_status', models.CharField(choices=[('queued', '대기 중'), ('processing', '처리 중'), ('completed', '처리 완료'), ('failed', '처리 실패')], default='completed', max_length=20, verbose_name='처리 상태')),
+                ('processing_stage', models.CharField(blank=True, default='', max_length=50, verbose_name='처리 단계')),
+                ('processing_progress', models.PositiveSmallIntegerField(default=0, verbose_name='처리 진행률(%)')),
+                ('processing_error', models.TextField(blank=True, default='', verbose_name='처리 오류')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='생성일시')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='수정일시')),
+                ('processed_at', models.DateTimeField(blank=True, null=True, verbose_name='처리 완료일시')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='documents', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': '계약서 문서',
+                'verbose_name_plural': '계약서 문서들',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ChatSession',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=255, verbose_name='세션 제목')),
+                ('language', models.CharField(default='한국어', max_length=10, verbose_name='사용 언어')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('message_count', models.PositiveIntegerField(default=0, verbose_name='메시지 수')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chat_sessions', to=settings.AUTH_USER_MODEL)),
+                ('document', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chat_sessions', to='rag.document')),
+            ],
+            options={
+                'verbose_name': '채팅 세션',
+                'verbose_name_plural': '채팅 세션들',
+                'ordering': ['-updated_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DocumentChunk',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('text', models.TextField(verbose_name='청크 텍스트')),
+                ('chunk_type', models.CharField(choices=[('article', '조항'), ('paragraph', '문단'), ('section', '섹션')], default='paragraph', max_length=20)),
+                ('article_num', models.PositiveIntegerField(blank=True, null=True, verbose_name='조항 번호')),
+                ('article_title', models.CharField(blank=True, max_length=255, null=True, verbose_name='조항 제목')),
+                ('chunk_index', models.PositiveIntegerField(verbose_name='청크 순서')),
+                ('char_count', models.PositiveIntegerField(verbose_name='문자 수')),
+                ('vector_id', models.PositiveIntegerField(blank=True, null=True, verbose_name='벡터 DB ID')),
+                ('embedding', models.BinaryField(blank=True, null=True, verbose_name='임베딩 벡터 (float32)')),
+                ('content_hash', models.CharField(blank=True, default='', max_length=64, verbose_name='청크 내용 해시')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('document', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chunks', to='rag.document')),
+            ],
+            options={
+                'verbose_name': '문서 청크',
+                'verbose_name_plural': '문서 청크들',
+                'ordering': ['document', 'chunk_index'],
+                'unique_together': {('document', 'chunk_index')},
+            },
+        ),
+        migrations.CreateModel(
+            name='ChatMessage',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('message_type', models.CharField(choices=[('user', '사용자'), ('assistant', 'AI 어시스턴트'), ('system', '시스템')], max_length=20)),
+                ('content', models.TextField(verbose_name='메시지 내용')),
+                ('search_results', models.JSONField(blank=True, null=True, verbose_name='RAG 검색 결과')),
+                ('search_method', models.CharField(blank=True, max_length=100, null=True, verbose_name='검색 방법')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('response_time', models.FloatField(blank=True, null=True, verbose_name='응답 시간(초)')),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='messages', to='rag.chatsession')),
+                ('used_chunks', models.ManyToManyField(blank=True, to='rag.documentchunk', verbose_name='사용된 청크들')),
+            ],
+            options={
+                'verbose_name': '채팅 메시지',
+                'verbose_name_plural': '채팅 메시지들',
+                'ordering': ['session', 'created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='UserPreference',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('preferred_language', models.CharField(default='한국어', max_length=10, verbose_name='선호 언어')),
+                ('search_top_k', models.PositiveIntegerField(default=3, verbose_name='검색 결과 수')),
+                ('enable_vector_search', models.BooleanField(default=True, verbose_name='벡터 검색 사용')),
+                ('show_search_details', models.BooleanField(default=False, verbose_name='검색 상세 정보 표시')),
+                ('auto_translate', models.BooleanField(default=True, verbose_name='자동 번역')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='rag_preference', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': '사용자 설정',
+                'verbose_name_plural': '사용자 설정들',
+            },
+        ),
+        migrations.CreateModel(
+            name='DocumentAnalysis',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('analysis_type', models.CharField(choices=[('summary', '요약'), ('risk_analysis', '위험 분석'), ('full_analysis', '전체 분석')], max_length=20)),
+                ('language', models.CharField(default='한국어', max_length=10, verbose_name='분석 언어')),
+                ('content', models.TextField(verbose_name='분석 내용')),
+                ('key_findings', models.JSONField(blank=True, null=True, verbose_name='주요 발견사항')),
+                ('risk_score', models.FloatField(blank=True, null=True, verbose_name='위험 점수')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('processing_time', models.FloatField(blank=True, null=True, verbose_name='처리 시간(초)')),
+                ('document', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='analyses', to='rag.document')),
+            ],
+            options={
+                'verbose_name': '문서 분석',
+                'verbose_name_plural': '문서 분석들',
+                'ordering': ['-created_at'],
+                'unique_together': {('document', 'analysis_type', 'language')},
+            },
+        ),
+        migrations.CreateModel(
+            name='IngestionJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('job_type', models.CharField(choices=[('rag_document', 'RAG 문서 처리'), ('documents_analyze', '문서 분석')], max_length=30)),
+                ('status', models.CharField(choices=[('queued', '대기 중'), ('running', '처리 중'), ('completed', '완료'), ('failed', '실패')], default='queued', max_length=20)),
+                ('session_key', models.CharField(blank=True, max_length=40, null=True)),
+                ('payload', models.JSONField(default=dict, verbose_name='작업 입력')),
+                ('result', models.JSONField(blank=True, null=True, verbose_name='작업 결과')),
+                ('error', models.TextField(blank=True, default='', verbose_name='오류 내용')),
+                ('stage', models.CharField(blank=True, default='', max_length=50, verbose_name='처리 단계')),
+                ('progress', models.PositiveSmallIntegerField(default=0, verbose_name='진행률(%)')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='시도 횟수')),
+                ('max_attempts', models.PositiveSmallIntegerField(default=3, verbose_name='최대 시도 횟수')),
+                ('worker_id', models.CharField(blank=True, default='', max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('heartbeat_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('document', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='jobs', to='rag.document')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='ingestion_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': '문서 처리 작업',
+                'verbose_name_plural': '문서 처리 작업들',
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='rag_ingesti_status_eb0b67_idx')],
+            },
+        ),
+    ]
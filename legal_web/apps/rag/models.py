@@ -33,6 +33,13 @@ class Document(models.Model):
         ('기타', '기타'),
     ]
 
+    PROCESSING_STATUS = [
+        ('queued', '대기 중'),
+        ('processing', '처리 중'),
+        ('completed', '처리 완료'),
+        ('failed', '처리 실패'),
+    ]
+
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='documents')
     title = models.CharField(max_length=255, verbose_name='문서 제목')
@@ -52,12 +59,30 @@ class Document(models.Model):
     
     # 문서 내용
     text_content = models.TextField(verbose_name='추출된 텍스트')
+    # PDF 페이지별 text_content 시작 위치 (인용 시 페이지 번호 표시용)
+    page_offsets = models.JSONField(null=True, blank=True, verbose_name='페이지 시작 위치')
     chunk_count = models.PositiveIntegerField(default=0, verbose_name='청크 개수')
     
     # 벡터 인덱스 정보
     vector_indexed = models.BooleanField(default=False, verbose_name='벡터 인덱스 생성 여부')
     qdrant_collection_name = models.CharField(max_length=100, null=True, blank=True)
     
+    # 검색 아티팩트 (업로드 시 한 번 생성하여 채팅마다 재사용)
+    keyword_index = models.JSONField(null=True, blank=True, verbose_name='키워드 인덱스')
+    artifact_version = models.PositiveIntegerField(default=0, verbose_name='검색 아티팩트 버전')
+    artifact_format = models.PositiveSmallIntegerField(default=0, verbose_name='검색 아티팩트 형식')
+    
+    # 백그라운드 처리 상태 (동기 처리된 문서는 바로 completed)
+    processing_status = models.CharField(
+        max_length=20,
+        choices=PROCESSING_STATUS,
+        default='completed',
+        verbose_name='처리 상태'
+    )
+    processing_stage = models.CharField(max_length=50, blank=True, default='', verbose_name='처리 단계')
+    processing_progress = models.PositiveSmallIntegerField(default=0, verbose_name='처리 진행률(%)')
+    processing_error = models.TextField(blank=True, default='', verbose_name='처리 오류')
+    
     # 메타데이터
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='생성일시')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='수정일시')
@@ -82,6 +107,11 @@ class Document(models.Model):
         """파일 크기를 MB 단위로 반환"""
         return round(self.file_size / (1024 * 1024), 2)
 
+    @property
+    def is_ready(self):
+        """채팅에 사용할 수 있는지 (처리 완료 여부)"""
+        return self.processing_status == 'completed'
+
 class DocumentChunk(models.Model):
     """문서 청크 모델 (조항별 분할된 내용)"""
     
@@ -108,6 +138,10 @@ class DocumentChunk(models.Model):
     
     # 벡터 임베딩 정보
     vector_id = models.PositiveIntegerField(null=True, blank=True, verbose_name='벡터 DB ID')
+    embedding = models.BinaryField(null=True, blank=True, verbose_name='임베딩 벡터 (float32)')
+    
+    # 수정본 재업로드 시 바뀐 조항만 다시 처리하기 위한 내용 해시 (비어 있으면 저장된 필드로 계산)
+    content_hash = models.CharField(max_length=64, blank=True, default='', verbose_name='청크 내용 해시')
     
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -238,4 +272,57 @@ class UserPreference(models.Model):
         verbose_name_plural = '사용자 설정들'
 
     def __str__(self):
-        return f"{self.user.username}의 RAG 설정"
\ No newline at end of file
+        return f"{self.user.username}의 RAG 설정"
+
+class IngestionJob(models.Model):
+    """문서 처리 백그라운드 작업 (DB 큐, run_ingestion_worker가 처리)"""
+
+    JOB_TYPES = [
+        ('rag_document', 'RAG 문서 처리'),
+        ('documents_analyze', '문서 분석'),
+    ]
+
+    STATUS_CHOICES = [
+        ('queued', '대기 중'),
+        ('running', '처리 중'),
+        ('completed', '완료'),
+        ('failed', '실패'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    job_type = models.CharField(max_length=30, choices=JOB_TYPES)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+
+    # 요청자 정보 (비회원은 세션 키로 확인)
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='ingestion_jobs')
+    session_key = models.CharField(max_length=40, null=True, blank=True)
+    document = models.ForeignKey(Document, on_delete=models.SET_NULL, null=True, blank=True, related_name='jobs')
+
+    # 작업 입력 및 결과
+    payload = models.JSONField(default=dict, verbose_name='작업 입력')
+    result = models.JSONField(null=True, blank=True, verbose_name='작업 결과')
+    error = models.TextField(blank=True, default='', verbose_name='오류 내용')
+
+    # 진행 상황
+    stage = models.CharField(max_length=50, blank=True, default='', verbose_name='처리 단계')
+    progress = models.PositiveSmallIntegerField(default=0, verbose_name='진행률(%)')
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name='시도 횟수')
+    max_attempts = models.PositiveSmallIntegerField(default=3, verbose_name='최대 시도 횟수')
+    worker_id = models.CharField(max_length=100, blank=True, default='')
+
+    # 메타데이터
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = '문서 처리 작업'
+        verbose_name_plural = '문서 처리 작업들'
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_job_type_display()} [{self.get_status_display()}] {self.progress}%"
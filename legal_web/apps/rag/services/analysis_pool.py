@@ -0,0 +1,55 @@
+# apps/rag/services/analysis_pool.py
+"""분석용 LLM 호출 동시 실행
+
+요약과 위험분석은 서로 독립적이므로 "요약 → 번역", "위험분석 → 번역" 두 흐름을
+동시에 실행합니다. 번역은 자기 한국어 원문이 나오는 즉시 시작되므로 전체 소요 시간이
+가장 긴 흐름 하나 정도로 줄어듭니다. 스레드 풀은 프로세스 전체가 함께 쓰며,
+풀 크기(ANALYSIS_MAX_WORKERS)가 동시에 나가는 분석 호출 수의 상한이 됩니다.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List
+
+from django.conf import settings
+
+_executor = None
+_executor_lock = threading.Lock()
+_worker_state = threading.local()
+
+
+def is_parallel_analysis_enabled() -> bool:
+    return getattr(settings, 'ANALYSIS_PARALLEL', False)
+
+
+def get_analysis_executor() -> ThreadPoolExecutor:
+    """프로세스 공용 분석 스레드 풀 (처음 호출 시 생성)"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                max_workers = max(1, getattr(settings, 'ANALYSIS_MAX_WORKERS', 4))
+                _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='analysis')
+                print(f"🔧 분석 스레드 풀 생성: 최대 {max_workers}개 동시 호출")
+    return _executor
+
+
+def _run_in_worker(chain: Callable[[], Any]) -> Any:
+    _worker_state.active = True
+    try:
+        return chain()
+    finally:
+        _worker_state.active = False
+
+
+def run_chains(*chains: Callable[[], Any]) -> List[Any]:
+    """인자 없는 함수들을 동시에 실행하고 넘긴 순서대로 결과 반환
+
+    동시 실행이 꺼져 있거나 이미 풀 안에서 호출된 경우(풀 고갈 방지)에는 순서대로 실행합니다.
+    각 함수에서 난 예외는 순차 실행 때와 마찬가지로 호출한 쪽으로 전달됩니다.
+    """
+    if len(chains) < 2 or not is_parallel_analysis_enabled() or getattr(_worker_state, 'active', False):
+        return [chain() for chain in chains]
+
+    executor = get_analysis_executor()
+    futures = [executor.submit(_run_in_worker, chain) for chain in chains]
+    return [future.result() for future in futures]
@@ -0,0 +1,101 @@
+# apps/rag/services/article_diff.py
+"""수정본 조항 비교 (청크 내용 해시 기반)
+
+같은 계약서의 수정본을 다시 올리면 새로 추출한 청크와 이전 버전의 DocumentChunk 행을
+내용 해시로 짝지어 나눕니다.
+
+- reused: 내용이 같은 청크 (이전 행 ID와 저장된 임베딩을 그대로 사용, 재임베딩 없음)
+- added: 새로 생기거나 내용이 바뀐 청크 (임베딩 생성 필요)
+- removed: 새 버전에 없는 이전 청크 (행/벡터 삭제)
+
+바뀐 조항은 이전 청크 삭제 + 새 청크 추가로 다룹니다. 같은 내용의 청크가 여러 개면 문서 순서대로
+짝지으므로, 앞쪽에 조항이 추가/삭제되어 뒤 조항들의 순서가 밀려도 내용이 같으면 재사용됩니다.
+"""
+from collections import defaultdict, deque
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+from .chunk_table import chunk_content_hash
+
+# 이전 청크를 읽을 DocumentChunk 컬럼 (해시가 비어 있는 이전 행은 저장된 필드로 계산)
+PREVIOUS_CHUNK_FIELDS = ('id', 'content_hash', 'chunk_index', 'embedding',
+                         'chunk_type', 'article_num', 'article_title', 'text')
+
+
+class PreviousChunk(NamedTuple):
+    """이전 버전의 청크 (DocumentChunk 행)"""
+    chunk_id: str
+    content_hash: str
+    chunk_index: int
+    embedding: Optional[bytes]
+
+
+class ArticleDiff:
+    """새 청크 순서 기준의 비교 결과"""
+
+    def __init__(self, chunk_count: int):
+        self.chunk_count = chunk_count
+        self.reused: Dict[int, PreviousChunk] = {}  # 새 청크 순서 → 재사용할 이전 청크
+        self.added: List[int] = []  # 새로 임베딩할 청크 순서
+        self.removed: List[PreviousChunk] = []  # 삭제할 이전 청크
+
+    @property
+    def moved(self) -> List[int]:
+        """재사용하지만 순서가 바뀐 청크 (새 청크 순서)"""
+        return [index for index, previous in self.reused.items() if previous.chunk_index != index]
+
+    @property
+    def unchanged(self) -> bool:
+        """내용이 바뀐 청크가 없는지 (문서 단위 분석 재사용 여부)"""
+        return not self.added and not self.removed
+
+    def summary(self) -> Dict[str, int]:
+        return {
+            'chunk_count': self.chunk_count,
+            'reused': len(self.reused),
+            'added': len(self.added),
+            'removed': len(self.removed),
+            'moved': len(self.moved),
+        }
+
+
+def load_previous_chunks(document) -> List[PreviousChunk]:
+    """문서에 저장된 청크를 순서대로 읽기"""
+    rows = document.chunks.order_by('chunk_index').values_list(*PREVIOUS_CHUNK_FIELDS)
+    return [
+        PreviousChunk(
+            str(chunk_id),
+            content_hash or chunk_content_hash(chunk_type, article_num, article_title, text),
+            chunk_index,
+            bytes(embedding) if embedding is not None else None,
+        )
+        for chunk_id, content_hash, chunk_index, embedding, chunk_type, article_num, article_title, text in rows
+    ]
+
+
+def diff_articles(new_hashes: Sequence[str], previous: Iterable[PreviousChunk], reuse: bool = True) -> ArticleDiff:
+    """새 청크 해시 목록과 이전 청크 비교
+
+    Args:
+        new_hashes: 새 버전 청크 순서대로의 내용 해시
+        previous: 이전 버전 청크
+        reuse: False면 모든 청크를 새로 처리 (이전 청크는 모두 삭제 대상)
+    """
+    previous = sorted(previous, key=lambda chunk: chunk.chunk_index)
+    candidates = defaultdict(deque)
+    if reuse:
+        for chunk in previous:
+            # 임베딩이 없는 행은 재사용할 벡터가 없으므로 새 청크로 처리
+            if chunk.embedding is not None:
+                candidates[chunk.content_hash].append(chunk)
+
+    diff = ArticleDiff(len(new_hashes))
+    for index, content_hash in enumerate(new_hashes):
+        queue = candidates.get(content_hash)
+        if queue:
+            diff.reused[index] = queue.popleft()
+        else:
+            diff.added.append(index)
+
+    reused_ids = {chunk.chunk_id for chunk in diff.reused.values()}
+    diff.removed = [chunk for chunk in previous if chunk.chunk_id not in reused_ids]
+    return diff
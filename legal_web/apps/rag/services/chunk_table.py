@@ -0,0 +1,174 @@
+# apps/rag/services/chunk_table.py
+"""문서 청크 테이블 (위치 기반)
+
+청크마다 text/header/body 문자열과 dict를 따로 두지 않고, 원문 문자열 하나와
+청크별 (시작, 끝) 위치 배열, 조항 번호/제목/유형/청크 ID만 보관합니다.
+청크 내용은 ChunkView로 꺼낼 때 원문에서 잘라 만듭니다.
+
+ChunkView는 읽기 전용 Mapping이라 기존 청크 dict처럼 chunk['text'], chunk.get('article_num')으로
+읽을 수 있고, Qdrant 페이로드로도 그대로 넘길 수 있습니다 ({**chunk}).
+
+청크마다 내용 해시(content_hash)를 계산할 수 있어, 수정본을 다시 올릴 때 이전 버전과 조항 단위로
+비교하는 데 씁니다 (services/article_diff.py).
+"""
+import hashlib
+import operator
+from array import array
+from collections.abc import Mapping, Sequence
+from typing import Iterable, Iterator, Optional, Tuple
+
+# 청크 유형 (DocumentChunk.CHUNK_TYPES와 같은 값, types 배열에는 순서 번호로 저장)
+CHUNK_TYPES = ('article', 'paragraph', 'section')
+
+# 조항 번호가 없는 청크 (article_nums 배열 값)
+NO_ARTICLE_NUM = -1
+
+# ChunkView 키 (검색 결과/Qdrant 페이로드 필드)
+CHUNK_FIELDS = ('text', 'article_num', 'article_title', 'type', 'chunk_id')
+_CHUNK_FIELD_SET = frozenset(CHUNK_FIELDS)
+
+# DB 행으로 복원할 때 청크 사이에 넣는 구분 문자
+ROW_SEPARATOR = "\n\n"
+
+# 내용 해시 계산 시 필드 사이 구분 문자
+_HASH_FIELD_SEPARATOR = "\x1f"
+
+
+def chunk_content_hash(chunk_type: str, article_num: Optional[int], article_title: Optional[str], text: str) -> str:
+    """청크 내용 해시 (유형/조항 번호/제목/본문이 모두 같을 때만 같은 값, sha256 16진수 64자)"""
+    fields = (chunk_type, '' if article_num is None else str(article_num), article_title or '', text)
+    return hashlib.sha256(_HASH_FIELD_SEPARATOR.join(fields).encode('utf-8')).hexdigest()
+
+
+class ChunkView(Mapping):
+    """테이블의 청크 하나 (필드는 읽을 때 계산)"""
+    __slots__ = ('table', 'index')
+
+    def __init__(self, table: 'ChunkTable', index: int):
+        self.table = table
+        self.index = index
+
+    def __getitem__(self, key):
+        if key not in _CHUNK_FIELD_SET:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(CHUNK_FIELDS)
+
+    def __len__(self):
+        return len(CHUNK_FIELDS)
+
+    def __repr__(self):
+        return f"<ChunkView {self.index}: {self.type} {self.article_num} {self.article_title!r}>"
+
+    @property
+    def text(self) -> str:
+        table = self.table
+        return table.source[table.starts[self.index]:table.ends[self.index]]
+
+    @property
+    def article_num(self) -> Optional[int]:
+        article_num = self.table.article_nums[self.index]
+        return None if article_num == NO_ARTICLE_NUM else article_num
+
+    @property
+    def article_title(self) -> str:
+        return self.table.titles[self.index]
+
+    @property
+    def type(self) -> str:
+        return CHUNK_TYPES[self.table.types[self.index]]
+
+    @property
+    def chunk_id(self) -> Optional[str]:
+        return self.table.chunk_ids[self.index]
+
+    @property
+    def header(self) -> str:
+        """조항은 첫 줄, 문단은 앞 50자"""
+        if self.type == 'article':
+            return self.text.partition('\n')[0]
+        return self.text[:50] + "..."
+
+    @property
+    def body(self) -> str:
+        """조항은 첫 줄 다음부터, 문단은 전체"""
+        if self.type == 'article':
+            return self.text.partition('\n')[2]
+        return self.text
+
+    @property
+    def content_hash(self) -> str:
+        """청크 내용 해시 (DocumentChunk.content_hash)"""
+        return chunk_content_hash(self.type, self.article_num, self.article_title, self.text)
+
+
+class ChunkTable(Sequence):
+    """원문 + 청크별 위치/메타데이터 배열
+
+    검색 엔진이 캐시에 오래 들고 있는 구조라 청크 수만큼의 dict/문자열 사본을 만들지 않으며,
+    배열과 문자열만으로 이루어져 있어 pickle 크기도 원문 크기와 비슷합니다.
+    """
+    __slots__ = ('source', 'starts', 'ends', 'article_nums', 'types', 'titles', 'chunk_ids')
+
+    def __init__(self, source: str = ""):
+        self.source = source
+        self.starts = array('q')
+        self.ends = array('q')
+        self.article_nums = array('q')
+        self.types = bytearray()
+        self.titles = []
+        self.chunk_ids = []
+
+    def append(self, start: int, end: int, article_num: Optional[int], article_title: str,
+               chunk_type: str, chunk_id: Optional[str] = None):
+        self.starts.append(start)
+        self.ends.append(end)
+        self.article_nums.append(NO_ARTICLE_NUM if article_num is None else article_num)
+        self.types.append(CHUNK_TYPES.index(chunk_type))
+        self.titles.append(article_title or '')
+        self.chunk_ids.append(chunk_id)
+
+    def set_chunk_ids(self, chunk_ids: Iterable[Optional[str]]):
+        """청크 순서대로 ID 지정 (DocumentChunk PK)"""
+        self.chunk_ids = [str(chunk_id) if chunk_id else None for chunk_id in chunk_ids]
+        if len(self.chunk_ids) != len(self.starts):
+            raise ValueError(f"청크 ID 수({len(self.chunk_ids)})가 청크 수({len(self.starts)})와 다릅니다.")
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple]) -> 'ChunkTable':
+        """(chunk_id, text, chunk_type, article_num, article_title) 행으로 테이블 구성
+
+        행 텍스트를 한 번 이어 붙여 원문으로 쓰고, 각 행의 위치만 기록합니다.
+        """
+        table = cls()
+        parts = []
+        position = 0
+        for chunk_id, text, chunk_type, article_num, article_title in rows:
+            if parts:
+                parts.append(ROW_SEPARATOR)
+                position += len(ROW_SEPARATOR)
+            parts.append(text)
+            table.append(position, position + len(text), article_num, article_title, chunk_type,
+                         str(chunk_id) if chunk_id else None)
+            position += len(text)
+        table.source = ''.join(parts)
+        return table
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __getitem__(self, index: int) -> ChunkView:
+        index = operator.index(index)  # numpy 정수 인덱스도 허용
+        if index < 0:
+            index += len(self.starts)
+        if not 0 <= index < len(self.starts):
+            raise IndexError(index)
+        return ChunkView(self, index)
+
+    def __iter__(self) -> Iterator[ChunkView]:
+        return (ChunkView(self, index) for index in range(len(self.starts)))
+
+    def __repr__(self):
+        return f"<ChunkTable {len(self)}개 청크, 원문 {len(self.source):,}자>"
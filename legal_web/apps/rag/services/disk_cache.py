@@ -0,0 +1,178 @@
+# apps/rag/services/disk_cache.py
+"""로컬 디스크 LRU 캐시 (SQLite 파일 하나)
+
+여러 워커 프로세스가 같은 파일을 함께 쓰며(WAL 모드), 전체 크기가 상한을 넘으면
+가장 오래 사용되지 않은 항목부터 지웁니다. 항목별 만료 시간(TTL)도 지정할 수 있습니다.
+"""
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# 상한 초과 시 이 비율까지 줄여 두어 매 저장마다 정리하지 않도록
+EVICTION_TARGET_RATIO = 0.9
+
+# 접근 시간 갱신 최소 간격(초) - 조회마다 쓰기가 일어나지 않도록
+TOUCH_INTERVAL_SECONDS = 60
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entries (
+    key BLOB PRIMARY KEY,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    accessed_at REAL NOT NULL,
+    expires_at REAL
+);
+CREATE INDEX IF NOT EXISTS cache_entries_accessed_at ON cache_entries (accessed_at);
+"""
+
+
+class DiskLRUCache:
+    """크기 제한 LRU 캐시 (키/값은 bytes)"""
+
+    def __init__(self, path: str, max_bytes: int, name: str = 'cache'):
+        self.path = str(path)
+        self.max_bytes = max_bytes
+        self.name = name
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'writes': 0, 'evictions': 0}
+        self._total_bytes = None
+
+    def _connection(self) -> sqlite3.Connection:
+        """스레드별 연결 (처음 사용할 때 파일/테이블 생성)"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.executescript(_SCHEMA)
+            self._local.connection = connection
+        return connection
+
+    def get_many(self, keys: List[bytes]) -> Dict[bytes, bytes]:
+        """여러 키 한 번에 조회 (만료되지 않은 항목만)"""
+        if not keys:
+            return {}
+
+        connection = self._connection()
+        now = time.time()
+        found = {}
+        stale = []
+
+        unique_keys = list(dict.fromkeys(keys))
+        # SQLite 변수 개수 제한을 피하기 위해 나눠서 조회
+        for start in range(0, len(unique_keys), 500):
+            batch = unique_keys[start:start + 500]
+            placeholders = ','.join('?' * len(batch))
+            rows = connection.execute(
+                f'SELECT key, value, accessed_at, expires_at FROM cache_entries WHERE key IN ({placeholders})',
+                batch
+            ).fetchall()
+            for key, value, accessed_at, expires_at in rows:
+                if expires_at is not None and expires_at <= now:
+                    continue
+                found[bytes(key)] = value
+                if now - accessed_at > TOUCH_INTERVAL_SECONDS:
+                    stale.append(key)
+
+        if stale:
+            connection.executemany('UPDATE cache_entries SET accessed_at = ? WHERE key = ?',
+                                   [(now, key) for key in stale])
+
+        with self._lock:
+            self._counters['hits'] += len(found)
+            self._counters['misses'] += len(unique_keys) - len(found)
+        return found
+
+    def get(self, key: bytes) -> Optional[bytes]:
+        return self.get_many([key]).get(key)
+
+    def set_many(self, items: Iterable[Tuple[bytes, bytes]], ttl: Optional[float] = None):
+        """여러 항목 저장 후 필요하면 오래된 항목 정리"""
+        now = time.time()
+        expires_at = now + ttl if ttl else None
+        rows = [(key, value, len(value), now, expires_at) for key, value in items]
+        if not rows:
+            return
+
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            connection.executemany(
+                'INSERT OR REPLACE INTO cache_entries (key, value, size, accessed_at, expires_at) VALUES (?, ?, ?, ?, ?)',
+                rows
+            )
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+
+        with self._lock:
+            self._counters['writes'] += len(rows)
+            if self._total_bytes is not None:
+                self._total_bytes += sum(row[2] for row in rows)
+
+        if self._current_total_bytes() > self.max_bytes:
+            self.evict()
+
+    def set(self, key: bytes, value: bytes, ttl: Optional[float] = None):
+        self.set_many([(key, value)], ttl=ttl)
+
+    def delete(self, key: bytes):
+        self._connection().execute('DELETE FROM cache_entries WHERE key = ?', (key,))
+        self._total_bytes = None
+
+    def _current_total_bytes(self) -> int:
+        # 다른 프로세스도 쓰므로 메모리 값은 근사치, 정리 직전에만 다시 계산
+        if self._total_bytes is None:
+            row = self._connection().execute('SELECT COALESCE(SUM(size), 0) FROM cache_entries').fetchone()
+            self._total_bytes = row[0]
+        return self._total_bytes
+
+    def evict(self) -> int:
+        """만료 항목과 오래 사용되지 않은 항목 삭제 (상한의 90%까지)"""
+        connection = self._connection()
+        connection.execute('DELETE FROM cache_entries WHERE expires_at IS NOT NULL AND expires_at <= ?', (time.time(),))
+        self._total_bytes = None
+
+        target = int(self.max_bytes * EVICTION_TARGET_RATIO)
+        total = self._current_total_bytes()
+        if total <= target:
+            return 0
+
+        removed = 0
+        cursor = connection.execute('SELECT key, size FROM cache_entries ORDER BY accessed_at')
+        victims = []
+        for key, size in cursor:
+            if total <= target:
+                break
+            victims.append((key,))
+            total -= size
+        cursor.close()
+        if victims:
+            connection.executemany('DELETE FROM cache_entries WHERE key = ?', victims)
+            removed = len(victims)
+
+        with self._lock:
+            self._counters['evictions'] += removed
+            self._total_bytes = total
+        print(f"🧹 {self.name} 캐시 정리: {removed}개 삭제 ({total / (1024 * 1024):.1f}MB 유지)")
+        return removed
+
+    def clear(self):
+        self._connection().execute('DELETE FROM cache_entries')
+        self._total_bytes = 0
+
+    def stats(self) -> Dict:
+        """적중률 등 캐시 통계 (이 프로세스 기준)"""
+        with self._lock:
+            counters = dict(self._counters)
+        lookups = counters['hits'] + counters['misses']
+        counters['hit_rate'] = round(counters['hits'] / lookups, 4) if lookups else 0.0
+        counters['total_bytes'] = self._current_total_bytes()
+        counters['max_bytes'] = self.max_bytes
+        return counters
@@ -1,9 +1,12 @@
 # apps/rag/services/document_processor.py
 import re
-import PyPDF2
 import docx
 from typing import List, Dict, Any, Tuple, Optional
 
+from .chunk_table import ChunkTable
+from .pdf_extractor import extract_pdf_text
+from .term_matcher import get_term_matcher, CONTRACT_TYPE, KEY_INFO, RISK
+
 # 계약서 유형별 전문 용어 데이터베이스
 CONTRACT_TYPES_TERMS = {
     "근로계약서": ["근로시간", "임금", "퇴직금", "연차휴가", "수습기간", "근로기준법", "계약기간", "해고", "업무내용", "복무규정", "연장근로", "야간근로", "휴게시간", "직무기술서", "취업규칙", "복리후생", "직급체계", "경력직", "정규직", "직장 내 괴롭힘 방지"],
@@ -51,43 +54,75 @@ CONTRACT_TYPE_DESCRIPTIONS = {
     "투자계약서": "투자와 지분참여에 관한 계약서"
 }
 
+# 핵심 정보 추출용 용어 (목록 앞쪽이 같은 위치에서 우선 매칭)
+KEY_INFO_TERMS = {
+    'financial_terms': ["대금", "비용", "요금", "수수료", "보증금", "위약금", "연체료", "지체상금", "계약금", "잔금"],
+    'period_terms': ["기간", "기한", "일자", "날짜", "시점", "시기", "완료", "종료", "만료"],
+    'keywords': ["계약", "당사자", "의무", "권리", "책임", "조건", "기준", "방법"],
+}
+
+# 위험 분석용 용어 (목록 앞쪽이 같은 위치에서 우선 매칭)
+RISK_TERMS = {
+    'liability_terms': ["손해배상", "배상책임", "배상의무", "손실보상", "피해보상", "손해", "배상"],
+    'termination_terms': ["해지", "해제", "종료", "중단", "파기", "취소", "철회"],
+    'obligation_terms': ["의무", "책임", "이행", "준수", "완수", "수행", "실행"],
+    'penalty_terms': ["위약금", "연체료", "지체상금", "벌금", "과태료", "제재", "처벌", "징계"],
+}
+
+
+def _strip_bounds(text: str, start: int, end: int) -> Tuple[int, int]:
+    """text[start:end].strip()의 원문 위치"""
+    segment = text[start:end]
+    stripped = segment.strip()
+    if not stripped:
+        return start, start
+    start += len(segment) - len(segment.lstrip())
+    return start, start + len(stripped)
+
+
 class DocumentProcessor:
     """문서 처리 클래스"""
     
     @staticmethod
     def extract_text_from_file(file_path: str, file_name: str) -> str:
         """파일에서 텍스트 추출"""
+        return DocumentProcessor.extract_document(file_path, file_name)['text']
+
+    @staticmethod
+    def extract_document(file_path: str, file_name: str) -> Dict[str, Any]:
+        """파일에서 텍스트와 페이지 시작 위치 추출 (PDF만 page_offsets 제공)
+
+        실패하면 'text'에 "❌"로 시작하는 안내 문구를 담아 반환합니다.
+        """
         file_ext = file_name.lower().split('.')[-1]
         try:
             if file_ext == 'pdf':
-                with open(file_path, 'rb') as f:
-                    reader = PyPDF2.PdfReader(f)
-                    return "\n".join([page.extract_text() for page in reader.pages])
+                extracted = extract_pdf_text(file_path)
+                print(f"📄 PDF 추출 완료: {extracted['page_count']}페이지, {len(extracted['text'])}자")
+                return {'text': extracted['text'], 'page_offsets': extracted['page_offsets']}
             elif file_ext == 'docx':
                 doc = docx.Document(file_path)
-                return "\n".join([paragraph.text for paragraph in doc.paragraphs])
+                return {'text': "\n".join([paragraph.text for paragraph in doc.paragraphs]), 'page_offsets': None}
             elif file_ext == 'txt':
                 with open(file_path, 'r', encoding='utf-8') as f:
-                    return f.read()
+                    return {'text': f.read(), 'page_offsets': None}
             else:
-                return "❌ 지원하지 않는 파일 형식입니다."
+                return {'text': "❌ 지원하지 않는 파일 형식입니다.", 'page_offsets': None}
         except Exception as e:
-            return f"❌ 파일 읽기 오류: {str(e)}"
+            return {'text': f"❌ 파일 읽기 오류: {str(e)}", 'page_offsets': None}
 
     @staticmethod
     def detect_contract_type(text: str) -> Tuple[Optional[str], Optional[Dict], Dict]:
         """계약서 유형 자동 감지"""
         print("🎯 계약서 유형 자동 감지 시작...")
 
+        # 전체 용어를 한 번의 스캔으로 매칭
+        matched = get_term_matcher().matched_terms(text, group=CONTRACT_TYPE)
+
         type_scores = {}
         for contract_type, terms in CONTRACT_TYPES_TERMS.items():
-            score = 0
-            matched_terms = []
-
-            for term in terms:
-                if term in text:
-                    score += 1
-                    matched_terms.append(term)
+            matched_terms = matched.get((CONTRACT_TYPE, contract_type), [])
+            score = len(matched_terms)
 
             if score > 0:
                 type_scores[contract_type] = {
@@ -108,11 +143,11 @@ class DocumentProcessor:
             return None, None, {}
 
     @staticmethod
-    def extract_articles_with_content(text: str) -> List[Dict]:
-        """조항별 정밀 추출"""
+    def extract_articles_with_content(text: str) -> ChunkTable:
+        """조항별 정밀 추출 (원문 위치 기반 청크 테이블 반환)"""
         print("📄 조항별 정밀 추출 시작...")
 
-        chunks = []
+        chunks = ChunkTable(text)
         article_pattern = r'제\s*(\d+)\s*조\s*\(([^)]+)\)'
         articles = list(re.finditer(article_pattern, text))
 
@@ -129,37 +164,24 @@ class DocumentProcessor:
                 else:
                     end_pos = len(text)
 
-                full_content = text[start_pos:end_pos].strip()
-                lines = full_content.split('\n')
-                header = lines[0] if lines else ""
-                body = '\n'.join(lines[1:]) if len(lines) > 1 else ""
-
-                if len(full_content) > 10:
-                    chunk_data = {
-                        'text': full_content,
-                        'article_num': article_num,
-                        'article_title': article_title,
-                        'header': header,
-                        'body': body,
-                        'type': 'article'
-                    }
-                    chunks.append(chunk_data)
-                    print(f"✅ 제{article_num}조({article_title}) 추출: {len(full_content)}자")
+                start, end = _strip_bounds(text, start_pos, end_pos)
+                if end - start > 10:
+                    chunks.append(start, end, article_num, article_title, 'article')
+                    print(f"✅ 제{article_num}조({article_title}) 추출: {end - start}자")
 
         # 조항이 부족한 경우 문단별 추가
         if len(chunks) < 5:
             print("📋 조항이 부족하여 문단별 보완...")
-            paragraphs = [p.strip() for p in text.split('\n') if len(p.strip()) > 50]
-
-            for i, para in enumerate(paragraphs[:10]):
-                chunks.append({
-                    'text': para,
-                    'article_num': None,
-                    'article_title': f"문단 {i+1}",
-                    'header': para[:50] + "...",
-                    'body': para,
-                    'type': 'paragraph'
-                })
+            paragraph_count = 0
+            line_start = 0
+            for line in text.split('\n'):
+                start, end = _strip_bounds(text, line_start, line_start + len(line))
+                line_start += len(line) + 1
+                if end - start > 50:
+                    paragraph_count += 1
+                    chunks.append(start, end, None, f"문단 {paragraph_count}", 'paragraph')
+                    if paragraph_count >= 10:
+                        break
 
         print(f"✅ 총 {len(chunks)}개 청크 생성")
         return chunks
@@ -174,24 +196,25 @@ class DocumentProcessor:
             'period_terms': []
         }
 
+        matcher = get_term_matcher()
+        hits = matcher.find_all(text)
+        matched = matcher.matched_terms(text, hits=hits)
+
         # 계약 유형 감지
-        for contract_type in CONTRACT_TYPES_TERMS.keys():
-            if any(term in text for term in CONTRACT_TYPES_TERMS[contract_type][:3]):
+        for contract_type, terms in CONTRACT_TYPES_TERMS.items():
+            if any(term in terms[:3] for term in matched.get((CONTRACT_TYPE, contract_type), [])):
                 info['contract_type'] = contract_type
                 break
 
         # 핵심 키워드 추출
         # 금액 관련 용어
-        financial_pattern = r'(대금|비용|요금|수수료|보증금|위약금|연체료|지체상금|계약금|잔금)'
-        info['financial_terms'] = list(set(re.findall(financial_pattern, text)))
+        info['financial_terms'] = list(set(matcher.leftmost_terms(hits, (KEY_INFO, 'financial_terms'))))
 
         # 기간 관련 용어
-        period_pattern = r'(기간|기한|일자|날짜|시점|시기|완료|종료|만료)'
-        info['period_terms'] = list(set(re.findall(period_pattern, text)))
+        info['period_terms'] = list(set(matcher.leftmost_terms(hits, (KEY_INFO, 'period_terms'))))
 
         # 일반 키워드
-        general_keywords = ['계약', '당사자', '의무', '권리', '책임', '조건', '기준', '방법']
-        info['keywords'] = [kw for kw in general_keywords if kw in text]
+        info['keywords'] = matched.get((KEY_INFO, 'keywords'), [])
 
         return info
 
@@ -206,21 +229,11 @@ class DocumentProcessor:
             'penalty_terms': []
         }
 
-        # 손해배상 관련
-        liability_pattern = r'(손해배상|배상책임|배상의무|손실보상|피해보상|손해|배상)'
-        risk_info['liability_terms'] = list(set(re.findall(liability_pattern, text)))
-
-        # 해지 관련
-        termination_pattern = r'(해지|해제|종료|중단|파기|취소|철회)'
-        risk_info['termination_terms'] = list(set(re.findall(termination_pattern, text)))
-
-        # 의무 관련
-        obligation_pattern = r'(의무|책임|이행|준수|완수|수행|실행)'
-        risk_info['obligation_terms'] = list(set(re.findall(obligation_pattern, text)))
-
-        # 제재 관련
-        penalty_pattern = r'(위약금|연체료|지체상금|벌금|과태료|제재|처벌|징계)'
-        risk_info['penalty_terms'] = list(set(re.findall(penalty_pattern, text)))
+        # 손해배상/해지/의무/제재 관련 용어를 한 번의 스캔으로 추출
+        matcher = get_term_matcher()
+        hits = matcher.find_all(text)
+        for name in RISK_TERMS:
+            risk_info[name] = list(set(matcher.leftmost_terms(hits, (RISK, name))))
 
         # 전체 위험 키워드
         risk_info['risk_keywords'] = (
@@ -0,0 +1,119 @@
+# apps/rag/services/embedding_cache.py
+"""내용 주소 기반 임베딩 캐시
+
+(모델, 차원, 정규화된 텍스트)의 해시를 키로 float16 벡터를 디스크에 저장합니다.
+키와 벡터가 어긋나지 않도록 임베딩도 키와 같은 정규화된 텍스트로 계산합니다.
+같은 조항, 같은 문서 재업로드, 반복 질문은 임베딩 호출 없이 바로 벡터를 돌려받습니다.
+OpenAI 임베딩(doc_retriever.get_embeddings)과 로컬 모델(EmbeddingService.encode)이
+같은 캐시를 함께 씁니다.
+"""
+import hashlib
+import re
+import threading
+import unicodedata
+from typing import Callable, List, Optional, Sequence
+
+import numpy as np
+from django.conf import settings
+
+from .disk_cache import DiskLRUCache
+
+# 캐시 키 형식이 바뀌면 올려서 기존 항목을 자연스럽게 무효화
+KEY_VERSION = 'v2'
+
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+def normalize_embedding_text(text: str) -> str:
+    """임베딩/캐시 키용 텍스트 정규화 (유니코드 NFC, 공백 축약)
+
+    대소문자는 임베딩 결과에 영향을 주므로 그대로 둡니다.
+    """
+    return _WHITESPACE_PATTERN.sub(' ', unicodedata.normalize('NFC', text or '')).strip()
+
+
+def embedding_key(model: str, dimensions: Optional[int], text: str) -> bytes:
+    """정규화된 텍스트(normalize_embedding_text 결과)의 캐시 키"""
+    raw = f"{KEY_VERSION}\0{model}\0{dimensions or 0}\0{text}"
+    return hashlib.sha256(raw.encode('utf-8')).digest()
+
+
+def _to_float16_bytes(vector) -> bytes:
+    return np.asarray(vector, dtype=np.float32).astype(np.float16).tobytes()
+
+
+def _from_float16_bytes(value: bytes) -> np.ndarray:
+    return np.frombuffer(value, dtype=np.float16).astype(np.float32)
+
+
+class EmbeddingCache:
+    """임베딩 캐시 (배치 내 중복 제거 + 디스크 LRU)"""
+
+    def __init__(self, store: DiskLRUCache):
+        self.store = store
+
+    def embed(self, model: str, texts: Sequence[str],
+              compute: Callable[[List[str]], Sequence], dimensions: Optional[int] = None) -> List[np.ndarray]:
+        """캐시에 없는 텍스트만 compute로 계산해 입력 순서대로 벡터 반환
+
+        compute에는 키를 만든 정규화된 텍스트를 넘기므로, 공백만 다른 텍스트는 같은 벡터를 공유합니다.
+        캐시 적중 여부와 상관없이 같은 텍스트는 항상 같은 벡터가 되도록
+        새로 계산한 벡터도 float16으로 한 번 변환한 값을 돌려줍니다.
+        """
+        texts = [normalize_embedding_text(text) for text in texts]
+        keys = [embedding_key(model, dimensions, text) for text in texts]
+        try:
+            cached = self.store.get_many(keys)
+        except Exception as e:
+            print(f"⚠️ 임베딩 캐시 조회 실패, 직접 계산합니다: {e}")
+            cached = {}
+
+        # 배치 안의 중복 텍스트는 한 번만 계산
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in missing:
+                missing[key] = text
+
+        if missing:
+            vectors = compute(list(missing.values()))
+            new_items = [(key, _to_float16_bytes(vector)) for key, vector in zip(missing.keys(), vectors)]
+            try:
+                self.store.set_many(new_items)
+            except Exception as e:
+                print(f"⚠️ 임베딩 캐시 저장 실패: {e}")
+            cached.update(new_items)
+
+        print(f"🗂️ 임베딩 캐시: {len(texts)}개 중 {len(texts) - len(missing)}개 재사용, {len(missing)}개 계산 ({model})")
+        return [_from_float16_bytes(cached[key]) for key in keys]
+
+    def stats(self):
+        return self.store.stats()
+
+
+_embedding_cache = None
+_embedding_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """프로세스 공용 임베딩 캐시 (비활성화 시 None)"""
+    global _embedding_cache
+    if not getattr(settings, 'RAG_EMBEDDING_CACHE', False):
+        return None
+
+    if _embedding_cache is None:
+        with _embedding_cache_lock:
+            if _embedding_cache is None:
+                path = getattr(settings, 'RAG_EMBEDDING_CACHE_PATH', None) or settings.BASE_DIR / 'cache' / 'embeddings.sqlite3'
+                max_bytes = getattr(settings, 'RAG_EMBEDDING_CACHE_MAX_MB', 512) * 1024 * 1024
+                _embedding_cache = EmbeddingCache(DiskLRUCache(path, max_bytes, name='임베딩'))
+    return _embedding_cache
+
+
+def cached_embeddings(model: str, texts: Sequence[str], compute: Callable[[List[str]], Sequence],
+                      dimensions: Optional[int] = None) -> List[np.ndarray]:
+    """캐시가 켜져 있으면 캐시를 거쳐, 아니면 바로 계산 (어느 쪽이든 정규화된 텍스트로 계산)"""
+    cache = get_embedding_cache()
+    if cache is None:
+        texts = [normalize_embedding_text(text) for text in texts]
+        return [np.asarray(vector, dtype=np.float32) for vector in compute(texts)]
+    return cache.embed(model, texts, compute, dimensions=dimensions)
@@ -0,0 +1,128 @@
+# apps/rag/services/embedding_registry.py
+"""프로세스 단위 임베딩 모델 레지스트리
+
+SentenceTransformer 모델을 워커 프로세스당 한 번만 로딩해 모든 요청이 공유합니다.
+pre-fork 서버(gunicorn --preload)에서는 포크 전에 preload()를 호출하면
+모델 가중치가 copy-on-write로 워커들 사이에 공유됩니다.
+"""
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from django.conf import settings
+
+DEFAULT_EMBEDDING_MODEL = 'all-MiniLM-L6-v2'
+
+# 로딩 실패 후 재시도까지 대기 시간 (매 요청마다 수 초씩 재로딩 시도 방지)
+RETRY_AFTER_FAILURE_SECONDS = 60
+
+
+def default_model_name() -> str:
+    """settings에 지정된 기본 임베딩 모델 이름"""
+    return getattr(settings, 'RAG_EMBEDDING_MODEL', None) or DEFAULT_EMBEDDING_MODEL
+
+
+def _current_rss_bytes() -> Optional[int]:
+    """현재 프로세스의 상주 메모리(RSS) 크기"""
+    try:
+        with open('/proc/self/statm') as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+
+    try:
+        import resource
+        # 리눅스가 아니면 최대 RSS로 근사 (macOS는 바이트, 그 외는 KB 단위)
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return max_rss if os.uname().sysname == 'Darwin' else max_rss * 1024
+    except Exception:
+        return None
+
+
+def _parameter_bytes(model) -> Optional[int]:
+    """모델 가중치가 차지하는 메모리 크기"""
+    try:
+        return sum(p.numel() * p.element_size() for p in model.parameters())
+    except Exception:
+        return None
+
+
+class EmbeddingModelRegistry:
+    """스레드 안전한 지연 로딩 임베딩 모델 레지스트리"""
+
+    def __init__(self):
+        self._models = {}
+        self._stats = {}
+        self._failures = {}
+        self._lock = threading.Lock()
+
+    def get(self, model_name: Optional[str] = None):
+        """모델 반환 (처음 호출 시 한 번만 로딩)"""
+        model_name = model_name or default_model_name()
+
+        model = self._models.get(model_name)
+        if model is not None:
+            return model
+
+        with self._lock:
+            model = self._models.get(model_name)
+            if model is None:
+                model = self._load(model_name)
+        return model
+
+    def preload(self, model_name: Optional[str] = None) -> bool:
+        """포크 전 미리 로딩 (실패해도 서버 기동은 계속)"""
+        try:
+            self.get(model_name)
+            return True
+        except Exception as e:
+            print(f"⚠️ 임베딩 모델 사전 로딩 실패: {e}")
+            return False
+
+    def is_loaded(self, model_name: Optional[str] = None) -> bool:
+        return (model_name or default_model_name()) in self._models
+
+    def stats(self) -> Dict[str, Dict]:
+        """모델별 로딩 시간 및 메모리 사용량"""
+        return {name: dict(info) for name, info in self._stats.items()}
+
+    def _load(self, model_name: str):
+        failed_at = self._failures.get(model_name)
+        if failed_at and time.time() - failed_at < RETRY_AFTER_FAILURE_SECONDS:
+            raise RuntimeError(f"임베딩 모델 '{model_name}' 로딩이 최근 실패하여 재시도를 보류합니다")
+
+        # torch 등 무거운 의존성은 실제 로딩 시점에만 import
+        from sentence_transformers import SentenceTransformer
+
+        print(f"🔧 임베딩 모델 로딩 중: {model_name} (pid={os.getpid()})")
+        rss_before = _current_rss_bytes()
+        start_time = time.perf_counter()
+
+        try:
+            model = SentenceTransformer(model_name)
+        except Exception:
+            self._failures[model_name] = time.time()
+            raise
+
+        load_time = time.perf_counter() - start_time
+        rss_after = _current_rss_bytes()
+
+        self._models[model_name] = model
+        self._failures.pop(model_name, None)
+        self._stats[model_name] = {
+            'load_time_seconds': round(load_time, 3),
+            'parameter_bytes': _parameter_bytes(model),
+            'rss_delta_bytes': (rss_after - rss_before) if rss_before is not None and rss_after is not None else None,
+            'loaded_at': time.time(),
+            'pid': os.getpid(),
+        }
+
+        param_mb = (self._stats[model_name]['parameter_bytes'] or 0) / (1024 * 1024)
+        print(f"✅ 임베딩 모델 로딩 완료: {model_name} ({load_time:.2f}초, 가중치 {param_mb:.1f}MB)")
+        return model
+
+
+# 프로세스 전역 레지스트리
+embedding_registry = EmbeddingModelRegistry()
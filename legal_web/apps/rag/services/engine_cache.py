@@ -0,0 +1,199 @@
+# apps/rag/services/engine_cache.py
+"""복원된 RAG 엔진 프로세스 내 캐시
+
+같은 계약서에 이어지는 질문마다 DocumentChunk 행을 읽어 청크/역색인/임베딩 행렬을
+다시 만들지 않도록, 복원된 엔진을 (문서 ID, 아티팩트 버전)을 키로 워커 메모리에 보관합니다.
+재처리하면 아티팩트 버전이 바뀌어 자연히 새 키가 되고, 이전 버전은 같은 문서의 새 엔진이
+들어올 때 또는 명시적 무효화(재처리/삭제) 시 정리됩니다.
+
+캐시된 엔진은 여러 요청 스레드가 동시에 검색하므로 읽기 전용으로만 사용합니다
+(검색 결과의 청크 dict도 수정하지 말 것). 메모리 사용량은 근사치로 계산해
+전체 예산을 넘으면 가장 오래 쓰지 않은 엔진부터 내보냅니다.
+"""
+import sys
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from django.conf import settings
+
+from .rag_engine import RAGEngine
+
+
+def _deep_sizeof(obj, seen: set) -> int:
+    """컨테이너/문자열/객체 속성을 따라가며 대략적인 메모리 사용량 합산"""
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_deep_sizeof(key, seen) + _deep_sizeof(value, seen) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(_deep_sizeof(item, seen) for item in obj)
+    elif not isinstance(obj, (str, bytes, bytearray, type)):
+        if hasattr(obj, '__dict__'):
+            size += _deep_sizeof(vars(obj), seen)
+        # __slots__ 클래스(ChunkTable 등)는 슬롯 값을 따라감
+        for cls in type(obj).__mro__:
+            for name in getattr(cls, '__slots__', ()):
+                if hasattr(obj, name):
+                    size += _deep_sizeof(getattr(obj, name), seen)
+    return size
+
+
+def estimate_engine_bytes(engine: RAGEngine) -> int:
+    """엔진이 문서별로 들고 있는 데이터의 근사 크기 (공유 Qdrant/임베딩 모델은 제외)"""
+    seen = set()
+    return sum(
+        _deep_sizeof(part, seen)
+        for part in (engine.document_chunks, engine.keyword_index, engine._term_index,
+                     engine._relevance_gate, engine.chunk_embeddings)
+        if part is not None
+    )
+
+
+def engine_cache_key(document) -> Tuple[str, int]:
+    return str(document.id), document.artifact_version
+
+
+class EngineCache:
+    """(문서 ID, 아티팩트 버전) → 복원된 엔진 LRU (메모리 예산 기준)"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # 키 → (엔진, 근사 크기)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    def get(self, key: Tuple[str, int]) -> Optional[RAGEngine]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def put(self, key: Tuple[str, int], engine: RAGEngine) -> RAGEngine:
+        """엔진 저장 후 캐시에 남은 엔진 반환 (동시에 먼저 저장된 엔진이 있으면 그것을 사용)"""
+        # 캐시 밖에서 크기 계산 (청크가 많으면 수 ms)
+        size = estimate_engine_bytes(engine)
+        if engine.chunk_embeddings is not None:
+            engine.chunk_embeddings.setflags(write=False)
+
+        with self._lock:
+            existing = self._entries.get(key)
+            if existing is not None:
+                self._entries.move_to_end(key)
+                return existing[0]
+
+            if size > self.max_bytes:
+                print(f"⚠️ 엔진 크기({size / 1024 / 1024:.1f}MB)가 캐시 예산보다 커서 캐시하지 않습니다: {key[0]}")
+                return engine
+
+            # 같은 문서의 이전 버전은 더 이상 쓰이지 않음
+            for old_key in [k for k in self._entries if k[0] == key[0]]:
+                self._remove(old_key)
+                self._invalidations += 1
+
+            self._entries[key] = (engine, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self._evictions += 1
+        return engine
+
+    def invalidate(self, document_id) -> int:
+        """문서의 모든 버전 엔진 제거 (재처리/삭제 시)"""
+        document_id = str(document_id)
+        with self._lock:
+            keys = [key for key in self._entries if key[0] == document_id]
+            for key in keys:
+                self._remove(key)
+            self._invalidations += len(keys)
+        return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _remove(self, key: Tuple[str, int]):
+        _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def stats(self) -> Dict:
+        """적중/미스/내보낸 수와 메모리 사용량 (이 워커 기준)"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'engines': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': self._hits / lookups if lookups else 0.0,
+                'evictions': self._evictions,
+                'invalidations': self._invalidations,
+            }
+
+
+_engine_cache = None
+_engine_cache_lock = threading.Lock()
+
+
+def get_engine_cache() -> Optional[EngineCache]:
+    """워커 공용 엔진 캐시 (비활성화 시 None)"""
+    global _engine_cache
+    if not getattr(settings, 'RAG_ENGINE_CACHE', False):
+        return None
+
+    if _engine_cache is None:
+        with _engine_cache_lock:
+            if _engine_cache is None:
+                _engine_cache = EngineCache(getattr(settings, 'RAG_ENGINE_CACHE_MAX_MB', 256) * 1024 * 1024)
+    return _engine_cache
+
+
+def load_engine(document) -> RAGEngine:
+    """캐시된 엔진 또는 저장된 아티팩트로 새로 복원한 엔진
+
+    아티팩트가 없어 문서를 재처리하는 경우는 캐시하지 않습니다 (처리 완료 후 버전이 생김).
+    """
+    engine_cache = get_engine_cache()
+    if engine_cache is None or not RAGEngine.has_artifacts(document):
+        return RAGEngine.load(document)
+
+    key = engine_cache_key(document)
+    engine = engine_cache.get(key)
+    if engine is None:
+        engine = engine_cache.put(key, RAGEngine.load(document))
+    return engine
+
+
+async def aload_engine(document) -> RAGEngine:
+    """load_engine의 비동기 버전"""
+    engine_cache = get_engine_cache()
+    if engine_cache is None or not RAGEngine.has_artifacts(document):
+        return await RAGEngine.aload(document)
+
+    key = engine_cache_key(document)
+    engine = engine_cache.get(key)
+    if engine is None:
+        engine = engine_cache.put(key, await RAGEngine.aload(document))
+    return engine
+
+
+def invalidate_document_engine(document_id) -> int:
+    """문서 재처리/삭제 시 캐시된 엔진 제거"""
+    engine_cache = get_engine_cache()
+    return engine_cache.invalidate(document_id) if engine_cache is not None else 0
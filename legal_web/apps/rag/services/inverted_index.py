@@ -0,0 +1,188 @@
+# apps/rag/services/inverted_index.py
+"""문서 청크용 문자 n-gram 역색인
+
+한국어는 띄어쓰기와 조사 때문에 단어 단위 색인이 잘 맞지 않으므로
+문자 1~3-gram으로 색인하고, 포스팅에 청크별 제목/본문 등장 횟수를 함께 둡니다.
+질의어가 3자 이하면 포스팅 빈도가 곧 등장 횟수이고, 더 긴 질의어는 조사를 떼어낸 뒤
+포스팅 교집합으로 후보 청크만 골라 원문에서 실제 등장 횟수를 확인합니다.
+"""
+import re
+from array import array
+from collections import Counter, defaultdict
+from collections.abc import Mapping, Sequence
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .chunk_table import ChunkTable
+
+NGRAM_SIZES = (1, 2, 3)
+MAX_NGRAM = max(NGRAM_SIZES)
+
+# 포스팅 배열 한 항목 (청크 번호, 제목 빈도, 본문 빈도)의 길이
+POSTING_WIDTH = 3
+
+# 질의어 끝에서 떼어낼 조사 (긴 것부터 검사)
+PARTICLES = sorted([
+    '에서부터', '으로부터', '에게서', '으로써', '으로서', '까지', '부터', '에서', '에게',
+    '으로', '이나', '이며', '와의', '과의', '보다', '처럼', '마다',
+    '의', '가', '이', '을', '를', '에', '로', '은', '는', '과', '와', '도', '나', '며', '만',
+], key=len, reverse=True)
+
+# 조사를 떼어낸 뒤 남아야 하는 최소 어간 길이 ('합의' → '합' 같은 오분리 방지)
+MIN_STEM_LENGTH = 2
+
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+_EDGE_PUNCTUATION_PATTERN = re.compile(r'^[^\w]+|[^\w]+$')
+
+
+def normalize_text(text: str) -> str:
+    """색인/검증용 텍스트 정규화 (소문자, 공백 축약)"""
+    return _WHITESPACE_PATTERN.sub(' ', text or '').strip().lower()
+
+
+def normalize_term(word: str, strip_particles: bool = True) -> str:
+    """질의어 정규화 (앞뒤 문장부호 제거, 조사 제거)"""
+    term = _EDGE_PUNCTUATION_PATTERN.sub('', normalize_text(word))
+
+    if strip_particles:
+        for particle in PARTICLES:
+            if term.endswith(particle) and len(term) - len(particle) >= MIN_STEM_LENGTH:
+                return term[:-len(particle)]
+    return term
+
+
+def _ngrams(text: str, n: int):
+    return (text[i:i + n] for i in range(len(text) - n + 1))
+
+
+def _gram_counts(text: str) -> Counter:
+    """텍스트의 1~3-gram별 등장 횟수"""
+    counts = Counter()
+    for n in NGRAM_SIZES:
+        counts.update([text[i:i + n] for i in range(len(text) - n + 1)])
+    return counts
+
+
+def _term_counter(term: str) -> Callable[[str, int, int], int]:
+    """정규화된 질의어의 원문 구간 내 등장 횟수를 세는 함수
+
+    원문을 정규화한 뒤 str.count로 세는 것과 같은 결과를 원문 사본 없이 얻습니다.
+    공백도 대소문자 구분도 없는 질의어(대부분의 한국어 질의어)는 str.count를 그대로 쓰고,
+    그 밖에는 공백을 연속 공백/줄바꿈으로, 대소문자를 무시하는 패턴으로 셉니다.
+    """
+    if ' ' not in term and term.upper() == term:
+        return lambda source, start, end: source.count(term, start, end)
+    pattern = re.compile(r'\s+'.join(map(re.escape, term.split(' '))), re.IGNORECASE)
+    return lambda source, start, end: sum(1 for _ in pattern.finditer(source, start, end))
+
+
+class InvertedIndex:
+    """청크 목록에 대한 n-gram 역색인 (문서당 한 번 생성)
+
+    n-gram마다 정수 배열 하나에 (청크 번호, 제목 빈도, 본문 빈도)를 청크 번호 순으로 이어 붙여 보관합니다.
+    빈도는 겹치는 등장도 하나씩 셉니다. 본문은 정규화한 사본을 두지 않고 청크 목록(ChunkTable)을 그대로
+    참조하며, 긴 질의어는 후보 청크의 원문 구간에서만 셉니다.
+    """
+
+    def __init__(self, chunks: Sequence[Mapping]):
+        self.chunks = chunks
+        self.titles = []
+        postings = defaultdict(list)
+        # 조항 번호 → 첫 청크 번호
+        self.article_positions = {}
+
+        for idx, chunk in enumerate(chunks):
+            title = normalize_text(chunk.get('article_title') or '')
+            body = normalize_text(chunk.get('text') or '')
+            self.titles.append(title)
+
+            article_num = chunk.get('article_num')
+            if article_num is not None and article_num not in self.article_positions:
+                self.article_positions[article_num] = idx
+
+            title_counts = _gram_counts(title)
+            body_counts = _gram_counts(body)
+            for gram, body_count in body_counts.items():
+                postings[gram].extend((idx, title_counts.pop(gram, 0), body_count))
+            for gram, title_count in title_counts.items():
+                postings[gram].extend((idx, title_count, 0))
+
+        # 청크별 빈도 dict 대신 n-gram당 정수 배열 하나로 고정 (문서당 n-gram 수만큼 쌓여 엔진 메모리 대부분을
+        # 차지하며, 배열은 GC 추적 대상도 아님)
+        self.postings = {gram: array('i', entries) for gram, entries in postings.items()}
+
+    def __len__(self):
+        return len(self.titles)
+
+    def _body_span(self, idx: int) -> Tuple[str, int, int]:
+        """청크 본문의 (원문, 시작, 끝) - ChunkTable이면 원문을 자르지 않고 위치만 사용"""
+        chunks = self.chunks
+        if isinstance(chunks, ChunkTable):
+            return chunks.source, chunks.starts[idx], chunks.ends[idx]
+        text = chunks[idx].get('text') or ''
+        return text, 0, len(text)
+
+    def _body_count(self, idx: int, counter: Callable[[str, int, int], int]) -> int:
+        """원문 본문에서 질의어 등장 횟수 (겹치지 않게)"""
+        return counter(*self._body_span(idx))
+
+    def _posting_counts(self, gram: str) -> Dict[int, Tuple[int, int]]:
+        """n-gram 포스팅의 청크별 (제목 빈도, 본문 빈도)"""
+        posting = self.postings.get(gram)
+        if not posting:
+            return {}
+        return {posting[i]: (posting[i + 1], posting[i + 2]) for i in range(0, len(posting), POSTING_WIDTH)}
+
+    def candidates(self, term: str) -> List[int]:
+        """질의어의 n-gram이 모두 있는 청크 번호 (포스팅 교집합)"""
+        if not term:
+            return []
+        grams = dict.fromkeys(_ngrams(term, min(len(term), MAX_NGRAM)))
+        postings = sorted((self.postings.get(gram, array('i'))[::POSTING_WIDTH] for gram in grams), key=len)
+        if not postings[0]:
+            return []
+
+        result = set(postings[0])
+        for posting in postings[1:]:
+            result.intersection_update(posting)
+            if not result:
+                break
+        return sorted(result)
+
+    def frequencies(self, term: str) -> Dict[int, Tuple[int, int]]:
+        """청크별 (제목 등장 횟수, 본문 등장 횟수)
+
+        n-gram 크기 이하의 질의어는 포스팅 빈도를 그대로 쓰고, 더 긴 질의어는 후보 청크만 원문에서 셉니다.
+        """
+        term = normalize_text(term)
+        if len(term) <= MAX_NGRAM:
+            return self._posting_counts(term) if term else {}
+
+        hits = {}
+        counter = _term_counter(term)
+        for idx in self.candidates(term):
+            title_count = self.titles[idx].count(term)
+            body_count = self._body_count(idx, counter)
+            if title_count or body_count:
+                hits[idx] = (title_count, body_count)
+        return hits
+
+    def chunks_containing(self, term: str) -> List[int]:
+        """본문에 질의어가 들어있는 청크 번호"""
+        return [idx for idx, (_, body_count) in self.frequencies(term).items() if body_count]
+
+    def contains(self, term: str) -> bool:
+        """문서 본문 어딘가에 질의어가 있는지 (첫 확인에서 종료)"""
+        term = normalize_text(term)
+        if len(term) <= MAX_NGRAM:
+            posting = self.postings.get(term, ()) if term else ()
+            return any(posting[i + 2] for i in range(0, len(posting), POSTING_WIDTH))
+        counter = _term_counter(term)
+        return any(self._body_count(idx, counter) for idx in self.candidates(term))
+
+    def body_count(self, idx: int, term: str) -> int:
+        term = normalize_text(term)
+        return self._body_count(idx, _term_counter(term)) if term else 0
+
+    def article_position(self, article_num: int) -> Optional[int]:
+        """조항 번호의 청크 번호"""
+        return self.article_positions.get(article_num)
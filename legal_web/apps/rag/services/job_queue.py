@@ -0,0 +1,257 @@
+# apps/rag/services/job_queue.py
+"""DB 기반 문서 처리 작업 큐
+
+업로드 요청은 작업만 등록하고 바로 응답하며, `run_ingestion_worker` 관리 명령이
+대기 중인 작업을 SELECT ... FOR UPDATE SKIP LOCKED로 하나씩 가져가 처리합니다.
+워커 프로세스를 늘리면 처리량이 그만큼 늘어납니다.
+처리 중에는 별도 스레드가 heartbeat_at을 주기적으로 갱신하므로, 분석처럼 긴 단계도
+중단된 작업으로 오인되어 다시 대기열에 들어가지 않습니다.
+"""
+import os
+import socket
+import threading
+import traceback
+from datetime import timedelta
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from ..models import Document, IngestionJob
+
+# 작업 유형별 처리 함수 (handler(job, progress) → {'success': bool, ...})
+# 예외를 던지면 재시도, success=False를 반환하면 재시도 없이 실패 처리
+JOB_HANDLERS = {
+    'rag_document': 'apps.rag.jobs.process_document_job',
+    'documents_analyze': 'apps.documents.jobs.analyze_document_job',
+}
+
+
+def is_async_ingestion_enabled() -> bool:
+    return getattr(settings, 'RAG_ASYNC_INGESTION', False)
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def enqueue_job(job_type: str, payload: Dict, user=None, document=None, session_key=None) -> IngestionJob:
+    """작업 등록"""
+    job = IngestionJob.objects.create(
+        job_type=job_type,
+        payload=payload,
+        user=user if user is not None and user.is_authenticated else None,
+        document=document,
+        session_key=session_key,
+        max_attempts=getattr(settings, 'RAG_JOB_MAX_ATTEMPTS', 3),
+        stage='queued'
+    )
+
+    if document is not None:
+        _update_document(document.id, status='queued', stage='queued', progress=0, error='')
+
+    print(f"📥 작업 등록: {job.job_type} ({job.id})")
+    return job
+
+
+def claim_next_job(worker_id: str) -> Optional[IngestionJob]:
+    """대기 중인 가장 오래된 작업을 가져와 실행 상태로 변경 (다른 워커와 겹치지 않음)"""
+    with transaction.atomic():
+        job = (IngestionJob.objects
+               .select_for_update(skip_locked=True)
+               .filter(status='queued')
+               .order_by('created_at')
+               .first())
+        if job is None:
+            return None
+
+        now = timezone.now()
+        job.status = 'running'
+        job.attempts += 1
+        job.worker_id = worker_id
+        job.started_at = now
+        job.heartbeat_at = now
+        job.stage = 'started'
+        job.save(update_fields=['status', 'attempts', 'worker_id', 'started_at', 'heartbeat_at', 'stage'])
+
+    if job.document_id:
+        _update_document(job.document_id, status='processing', stage='started', progress=job.progress)
+    return job
+
+
+def requeue_stale_jobs() -> int:
+    """진행 보고가 끊긴 실행 중 작업을 다시 대기열로 (워커 비정상 종료 대비)"""
+    stale_seconds = getattr(settings, 'RAG_JOB_STALE_SECONDS', 600)
+    threshold = timezone.now() - timedelta(seconds=stale_seconds)
+
+    requeued = 0
+    with transaction.atomic():
+        stale_jobs = (IngestionJob.objects
+                      .select_for_update(skip_locked=True)
+                      .filter(status='running', heartbeat_at__lt=threshold))
+        for job in stale_jobs:
+            error = f"워커 응답 없음 ({job.worker_id}, {stale_seconds}초 초과)"
+            if job.attempts < job.max_attempts:
+                _mark_queued(job, error)
+                requeued += 1
+            else:
+                _mark_failed(job, error)
+
+    if requeued:
+        print(f"⚠️ 중단된 작업 {requeued}개를 다시 대기열에 넣었습니다")
+    return requeued
+
+
+class JobProgress:
+    """처리 함수에 넘기는 진행 상황 보고 콜백"""
+
+    def __init__(self, job: IngestionJob):
+        self.job = job
+
+    def __call__(self, stage: str, progress: int):
+        progress = max(0, min(100, int(progress)))
+        self.job.stage = stage
+        self.job.progress = progress
+        self.job.heartbeat_at = timezone.now()
+        IngestionJob.objects.filter(pk=self.job.pk).update(
+            stage=stage, progress=progress, heartbeat_at=self.job.heartbeat_at
+        )
+        if self.job.document_id:
+            # 처리 함수가 들고 있는 인스턴스도 맞춰 두어 document.save()가 진행 상황을 되돌리지 않도록
+            document = self.job.document
+            if document is not None:
+                document.processing_status = 'processing'
+                document.processing_stage = stage
+                document.processing_progress = progress
+            _update_document(self.job.document_id, status='processing', stage=stage, progress=progress)
+        print(f"⏳ [{self.job.job_type}] {stage} ({progress}%)")
+
+
+class JobHeartbeat:
+    """처리 함수가 실행되는 동안 주기적으로 heartbeat_at 갱신 (with 블록으로 사용)
+
+    진행 보고(JobProgress)는 단계가 바뀔 때만 오므로, 한 단계가 RAG_JOB_STALE_SECONDS보다
+    오래 걸려도 살아 있는 작업이 requeue_stale_jobs에 다시 대기열로 들어가지 않도록 합니다.
+    """
+
+    def __init__(self, job: IngestionJob, interval: Optional[float] = None):
+        self.job = job
+        self.interval = interval if interval is not None else getattr(settings, 'RAG_JOB_HEARTBEAT_SECONDS', 60)
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"job-heartbeat-{job.pk}", daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stopped.set()
+        self._thread.join()
+
+    def touch(self):
+        """이 워커가 실행 중인 작업이면 heartbeat_at 갱신"""
+        IngestionJob.objects.filter(pk=self.job.pk, status='running', worker_id=self.job.worker_id).update(
+            heartbeat_at=timezone.now()
+        )
+
+    def _run(self):
+        try:
+            while not self._stopped.wait(self.interval):
+                try:
+                    self.touch()
+                except Exception as e:
+                    print(f"⚠️ 작업 heartbeat 갱신 실패: {e}")
+        finally:
+            connection.close()  # 이 스레드의 DB 연결 정리
+
+
+def run_job(job: IngestionJob) -> bool:
+    """작업 실행 및 결과 기록"""
+    print(f"🔧 작업 시작: {job.job_type} ({job.id}, {job.attempts}/{job.max_attempts}회차)")
+
+    try:
+        handler = import_string(JOB_HANDLERS[job.job_type])
+        with JobHeartbeat(job):
+            result = handler(job, JobProgress(job))
+    except Exception as e:
+        traceback.print_exc()
+        error = f"{type(e).__name__}: {e}"
+        if job.attempts < job.max_attempts:
+            print(f"⚠️ 작업 실패, 재시도 예정: {error}")
+            _mark_queued(job, error)
+        else:
+            print(f"❌ 작업 최종 실패: {error}")
+            _mark_failed(job, error)
+        return False
+
+    if result.get('success'):
+        job.status = 'completed'
+        job.stage = 'completed'
+        job.progress = 100
+        job.result = result
+        job.error = ''
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'stage', 'progress', 'result', 'error', 'finished_at'])
+        if job.document_id:
+            _update_document(job.document_id, status='completed', stage='completed', progress=100, error='')
+        print(f"✅ 작업 완료: {job.job_type} ({job.id})")
+        return True
+
+    job.result = result
+    _mark_failed(job, result.get('error', '알 수 없는 오류'))
+    print(f"❌ 작업 실패: {job.error}")
+    return False
+
+
+def job_status_payload(job: IngestionJob) -> Dict:
+    """상태 조회 API 응답"""
+    data = {
+        'job_id': str(job.id),
+        'job_type': job.job_type,
+        'status': job.status,
+        'stage': job.stage,
+        'progress': job.progress,
+        'attempts': job.attempts,
+        'document_id': str(job.document_id) if job.document_id else None,
+        'error': job.error or None,
+    }
+    if job.status == 'completed':
+        data['result'] = job.result
+    return data
+
+
+def _mark_queued(job: IngestionJob, error: str):
+    job.status = 'queued'
+    job.stage = 'retry_queued'
+    job.error = error
+    job.save(update_fields=['status', 'stage', 'error'])
+    if job.document_id:
+        _update_document(job.document_id, status='queued', stage='retry_queued', error=error)
+
+
+def _mark_failed(job: IngestionJob, error: str):
+    job.status = 'failed'
+    job.stage = 'failed'
+    job.error = error
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'stage', 'error', 'result', 'finished_at'])
+    if job.document_id:
+        # 수정본 반영 실패는 이전 버전이 그대로 남아 있으므로 문서는 사용 가능한 상태로 둠
+        status = 'completed' if job.payload.get('revision') else 'failed'
+        _update_document(job.document_id, status=status, stage='failed', error=error)
+
+
+def _update_document(document_id, status=None, stage=None, progress=None, error=None):
+    fields = {}
+    if status is not None:
+        fields['processing_status'] = status
+    if stage is not None:
+        fields['processing_stage'] = stage
+    if progress is not None:
+        fields['processing_progress'] = progress
+    if error is not None:
+        fields['processing_error'] = error
+    if fields:
+        Document.objects.filter(pk=document_id).update(**fields)
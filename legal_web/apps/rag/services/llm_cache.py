@@ -0,0 +1,131 @@
+# apps/rag/services/llm_cache.py
+"""결정적 LLM 응답 캐시 (번역/요약/위험분석)
+
+(모델, temperature, max_tokens, 프롬프트 해시)를 키로 chat.completions 응답 텍스트를
+디스크에 저장합니다. 같은 문서를 다시 분석하면 LLM을 호출하지 않고 이전 결과를 돌려줍니다.
+채팅 답변처럼 매번 새로 생성해야 하는 호출은 캐시를 거치지 않습니다.
+비동기 뷰는 AsyncOpenAI 클라이언트와 acached_chat_completion을 사용합니다.
+"""
+import asyncio
+import hashlib
+import json
+import threading
+from typing import Dict, Optional
+
+from django.conf import settings
+
+from .disk_cache import DiskLRUCache
+
+# 캐시 키 형식이 바뀌면 올려서 기존 항목을 자연스럽게 무효화
+KEY_VERSION = 'v1'
+
+
+def completion_key(**kwargs) -> bytes:
+    """요청 파라미터 전체(모델, 온도, 토큰 상한, 메시지 등)의 해시"""
+    raw = json.dumps({'v': KEY_VERSION, **kwargs}, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode('utf-8')).digest()
+
+
+class LLMResponseCache:
+    """LLM 응답 텍스트 캐시 (디스크 LRU + TTL)"""
+
+    def __init__(self, store: DiskLRUCache, ttl: Optional[float] = None):
+        self.store = store
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._saved_tokens = 0
+
+    def _lookup(self, key: bytes, model: Optional[str]) -> Optional[str]:
+        try:
+            cached = self.store.get(key)
+        except Exception as e:
+            print(f"⚠️ LLM 캐시 조회 실패, 직접 호출합니다: {e}")
+            return None
+
+        if cached is None:
+            return None
+        record = json.loads(cached)
+        with self._lock:
+            self._saved_tokens += record.get('tokens', 0)
+        print(f"💾 LLM 캐시 적중 ({model})")
+        return record['content']
+
+    def _save(self, key: bytes, response, ttl: Optional[float]) -> str:
+        content = response.choices[0].message.content or ''
+
+        # 빈 응답은 저장하지 않아 다음 요청에서 다시 시도
+        if content.strip():
+            usage = getattr(response, 'usage', None)
+            record = {'content': content, 'tokens': getattr(usage, 'total_tokens', 0) or 0}
+            try:
+                self.store.set(key, json.dumps(record, ensure_ascii=False).encode('utf-8'),
+                               ttl=ttl if ttl is not None else self.ttl)
+            except Exception as e:
+                print(f"⚠️ LLM 캐시 저장 실패: {e}")
+        return content
+
+    def complete(self, client, ttl: Optional[float] = None, **kwargs) -> str:
+        """캐시에 있으면 저장된 텍스트, 없으면 호출 후 저장"""
+        key = completion_key(**kwargs)
+        cached = self._lookup(key, kwargs.get('model'))
+        if cached is not None:
+            return cached
+        return self._save(key, client.chat.completions.create(**kwargs), ttl)
+
+    async def acomplete(self, client, ttl: Optional[float] = None, **kwargs) -> str:
+        """complete의 비동기 버전 (client는 AsyncOpenAI, 디스크 입출력은 스레드에서)"""
+        key = completion_key(**kwargs)
+        cached = await asyncio.to_thread(self._lookup, key, kwargs.get('model'))
+        if cached is not None:
+            return cached
+        response = await client.chat.completions.create(**kwargs)
+        return await asyncio.to_thread(self._save, key, response, ttl)
+
+    def stats(self) -> Dict:
+        """적중률, 절약한 토큰 수 등 캐시 통계 (이 프로세스 기준)"""
+        counters = self.store.stats()
+        with self._lock:
+            counters['saved_tokens'] = self._saved_tokens
+        return counters
+
+
+_llm_cache = None
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """프로세스 공용 LLM 응답 캐시 (비활성화 시 None)"""
+    global _llm_cache
+    if not getattr(settings, 'RAG_LLM_CACHE', False):
+        return None
+
+    if _llm_cache is None:
+        with _llm_cache_lock:
+            if _llm_cache is None:
+                path = getattr(settings, 'RAG_LLM_CACHE_PATH', None) or settings.BASE_DIR / 'cache' / 'llm_responses.sqlite3'
+                max_bytes = getattr(settings, 'RAG_LLM_CACHE_MAX_MB', 256) * 1024 * 1024
+                ttl = getattr(settings, 'RAG_LLM_CACHE_TTL_SECONDS', 0) or None
+                _llm_cache = LLMResponseCache(DiskLRUCache(path, max_bytes, name='LLM 응답'), ttl=ttl)
+    return _llm_cache
+
+
+def cached_chat_completion(client, *, cache: bool = True, ttl: Optional[float] = None, **kwargs) -> str:
+    """chat.completions 호출 후 응답 텍스트 반환
+
+    cache=False이거나 캐시가 꺼져 있으면 항상 새로 호출합니다.
+    ttl을 주면 해당 호출 결과만 그 시간(초) 뒤 만료됩니다.
+    """
+    llm_cache = get_llm_cache() if cache else None
+    if llm_cache is None:
+        response = client.chat.completions.create(**kwargs)
+        return response.choices[0].message.content or ''
+    return llm_cache.complete(client, ttl=ttl, **kwargs)
+
+
+async def acached_chat_completion(client, *, cache: bool = True, ttl: Optional[float] = None, **kwargs) -> str:
+    """cached_chat_completion의 비동기 버전 (client는 AsyncOpenAI)"""
+    llm_cache = get_llm_cache() if cache else None
+    if llm_cache is None:
+        response = await client.chat.completions.create(**kwargs)
+        return response.choices[0].message.content or ''
+    return await llm_cache.acomplete(client, ttl=ttl, **kwargs)
@@ -0,0 +1,66 @@
+# apps/rag/services/openai_client.py
+"""프로세스 공용 OpenAI / AsyncOpenAI 클라이언트
+
+요청마다 OpenAI/AsyncOpenAI(각자 httpx 연결 풀)를 새로 만들면 keep-alive 연결을 재사용하지 못하고
+닫히지 않은 클라이언트가 쌓이므로, 처음 사용할 때 한 번 만든 클라이언트를 함께 씁니다.
+동기 클라이언트는 스레드 간에 안전하게 공유되므로 프로세스당 하나입니다.
+
+httpx 비동기 연결은 만들어진 이벤트 루프에 묶이므로 이벤트 루프마다 하나씩 둡니다.
+ASGI 워커는 루프가 하나라 프로세스당 클라이언트 하나이고, WSGI에서 요청마다 만들어지는 임시 루프는
+루프가 정리될 때 클라이언트 참조도 함께 사라집니다.
+"""
+import asyncio
+import os
+import threading
+import weakref
+from typing import Optional
+
+import openai
+
+_client = None
+_clients = weakref.WeakKeyDictionary()  # 이벤트 루프 → AsyncOpenAI
+_loopless_client = None  # 실행 중인 루프 밖에서 요청된 경우 (생성만 하고 호출은 루프 안에서)
+_lock = threading.Lock()
+
+
+def _api_key(api_key: Optional[str]) -> str:
+    api_key = api_key or os.getenv('OPENAI_API_KEY')
+    if not api_key:
+        raise ValueError("OPENAI_API_KEY가 설정되지 않았습니다.")
+    return api_key
+
+
+def _create(api_key: Optional[str]) -> openai.AsyncOpenAI:
+    print("✅ AsyncOpenAI 클라이언트 생성")
+    return openai.AsyncOpenAI(api_key=_api_key(api_key))
+
+
+def get_openai_client(api_key: Optional[str] = None) -> openai.OpenAI:
+    """프로세스 공용 OpenAI 클라이언트 (처음 호출 시 생성)"""
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                _client = openai.OpenAI(api_key=_api_key(api_key))
+                print("✅ OpenAI 클라이언트 생성")
+    return _client
+
+
+def get_async_openai_client(api_key: Optional[str] = None) -> openai.AsyncOpenAI:
+    """현재 이벤트 루프의 공용 AsyncOpenAI 클라이언트 (처음 호출 시 생성)"""
+    global _loopless_client
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+
+    with _lock:
+        if loop is None:
+            if _loopless_client is None:
+                _loopless_client = _create(api_key)
+            return _loopless_client
+
+        client = _clients.get(loop)
+        if client is None:
+            client = _clients[loop] = _create(api_key)
+        return client
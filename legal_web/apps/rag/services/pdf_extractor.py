@@ -0,0 +1,195 @@
+# apps/rag/services/pdf_extractor.py
+"""PDF 텍스트 추출 (PyMuPDF)
+
+회원 업로드(DocumentProcessor)와 비회원 업로드(doc_retriever)가 함께 쓰는 추출기입니다.
+페이지가 많은 PDF는 페이지 구간으로 나눠 프로세스 풀에서 동시에 추출하고,
+결과는 항상 페이지 순서대로 내보냅니다.
+
+문서마다 추출 시간(RAG_PDF_MAX_SECONDS)과 추출 텍스트 크기(RAG_PDF_MAX_TEXT_MB) 예산을 두어
+비정상적으로 큰 PDF가 워커를 오래 붙잡지 않도록 하고, 전체 텍스트에서 각 페이지가 시작하는
+위치(page_offsets)를 함께 돌려주어 인용 시 페이지 번호를 찾을 수 있게 합니다.
+"""
+import bisect
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+import fitz  # PyMuPDF
+from django.conf import settings
+
+# 파일 경로 또는 PDF 바이트
+PdfSource = Union[str, bytes]
+
+# 페이지 사이 구분 문자 (page_offsets 계산에 사용)
+PAGE_SEPARATOR = "\n"
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+class ExtractionBudgetExceeded(ValueError):
+    """문서별 추출 시간/텍스트 크기 예산 초과"""
+
+
+def _open(source: PdfSource):
+    if isinstance(source, (bytes, bytearray)):
+        return fitz.open(stream=source, filetype='pdf')
+    return fitz.open(source)
+
+
+def _extract_range(path: str, start: int, end: int) -> List[str]:
+    """페이지 구간 텍스트 추출 (프로세스 풀 작업)"""
+    with fitz.open(path) as doc:
+        return [doc[i].get_text() for i in range(start, end)]
+
+
+def page_ranges(page_count: int, pages_per_task: int) -> List[Tuple[int, int]]:
+    return [(start, min(start + pages_per_task, page_count)) for start in range(0, page_count, pages_per_task)]
+
+
+def get_pdf_executor() -> ProcessPoolExecutor:
+    """프로세스 공용 PDF 추출 풀 (처음 호출 시 생성)
+
+    요청 스레드가 있는 프로세스를 fork하지 않도록 spawn 방식으로 워커를 띄웁니다.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                max_workers = max(1, getattr(settings, 'RAG_PDF_WORKERS', 0) or os.cpu_count() or 1)
+                _executor = ProcessPoolExecutor(max_workers=max_workers,
+                                                mp_context=multiprocessing.get_context('spawn'))
+                print(f"🔧 PDF 추출 프로세스 풀 생성: 최대 {max_workers}개 워커")
+    return _executor
+
+
+def _reset_pdf_executor(broken: ProcessPoolExecutor):
+    """워커가 비정상 종료된 풀은 버리고 다음 호출에서 새로 생성"""
+    global _executor
+    with _executor_lock:
+        if _executor is broken:
+            _executor = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+class _Budget:
+    """추출 시간/텍스트 크기 예산 확인"""
+
+    def __init__(self, max_seconds: Optional[float], max_chars: Optional[int]):
+        self.deadline = time.monotonic() + max_seconds if max_seconds else None
+        self.max_seconds = max_seconds
+        self.max_chars = max_chars
+        self.chars = 0
+
+    def remaining(self) -> Optional[float]:
+        if self.deadline is None:
+            return None
+        remaining = self.deadline - time.monotonic()
+        if remaining <= 0:
+            raise ExtractionBudgetExceeded(f"PDF 추출 시간이 {self.max_seconds}초를 넘었습니다.")
+        return remaining
+
+    def add(self, text: str):
+        self.chars += len(text)
+        if self.max_chars and self.chars > self.max_chars:
+            raise ExtractionBudgetExceeded(f"추출된 텍스트가 {self.max_chars:,}자를 넘었습니다.")
+
+
+def _iter_sequential(doc, start: int, budget: _Budget) -> Iterator[Tuple[int, str]]:
+    for i in range(start, doc.page_count):
+        budget.remaining()
+        text = doc[i].get_text()
+        budget.add(text)
+        yield i, text
+
+
+def iter_pdf_pages(source: PdfSource, max_seconds: Optional[float] = None, max_chars: Optional[int] = None,
+                   parallel_min_pages: Optional[int] = None,
+                   pages_per_task: Optional[int] = None) -> Iterator[Tuple[int, str]]:
+    """(페이지 번호, 텍스트)를 페이지 순서대로 반환
+
+    페이지 수가 parallel_min_pages 이상이면 pages_per_task 페이지씩 프로세스 풀에서 추출합니다.
+    예산을 넘으면 남은 작업을 취소하고 ExtractionBudgetExceeded를 발생시킵니다.
+    """
+    if max_seconds is None:
+        max_seconds = getattr(settings, 'RAG_PDF_MAX_SECONDS', 120)
+    if max_chars is None:
+        max_chars = getattr(settings, 'RAG_PDF_MAX_TEXT_MB', 50) * 1024 * 1024
+    parallel_min_pages = parallel_min_pages or getattr(settings, 'RAG_PDF_PARALLEL_MIN_PAGES', 64)
+    pages_per_task = pages_per_task or getattr(settings, 'RAG_PDF_PAGES_PER_TASK', 32)
+    budget = _Budget(max_seconds, max_chars)
+
+    with _open(source) as doc:
+        page_count = doc.page_count
+        if page_count < parallel_min_pages:
+            yield from _iter_sequential(doc, 0, budget)
+            return
+
+    # 작업마다 PDF 바이트를 전달하지 않도록 업로드 데이터는 임시 파일로 저장 후 경로만 넘김
+    temp_path = None
+    if isinstance(source, (bytes, bytearray)):
+        with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as f:
+            f.write(source)
+            temp_path = f.name
+    path = temp_path or source
+
+    executor = get_pdf_executor()
+    ranges = page_ranges(page_count, pages_per_task)
+    futures = []
+    next_page = 0
+    try:
+        try:
+            futures = [executor.submit(_extract_range, path, start, end) for start, end in ranges]
+            for (start, _), future in zip(ranges, futures):
+                try:
+                    texts = future.result(timeout=budget.remaining())
+                except FutureTimeoutError:
+                    raise ExtractionBudgetExceeded(f"PDF 추출 시간이 {max_seconds}초를 넘었습니다.")
+                for offset, text in enumerate(texts):
+                    budget.add(text)
+                    yield start + offset, text
+                next_page = start + len(texts)
+        except BrokenProcessPool:
+            # 풀은 다음 호출에서 새로 만들고, 남은 페이지는 현재 프로세스에서 순차 추출
+            print("⚠️ PDF 추출 프로세스 풀 오류, 남은 페이지는 순차 추출합니다")
+            _reset_pdf_executor(executor)
+            with fitz.open(path) as doc:
+                yield from _iter_sequential(doc, next_page, budget)
+    finally:
+        # 중간에 멈추면 아직 시작하지 않은 구간은 취소 (실행 중인 구간은 끝날 때까지 진행)
+        for future in futures:
+            future.cancel()
+        if temp_path:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+
+
+def extract_pdf_text(source: PdfSource, **kwargs) -> Dict:
+    """전체 텍스트와 페이지별 시작 위치 반환
+
+    Returns:
+        {'text': 전체 텍스트, 'page_offsets': [각 페이지 시작 위치], 'page_count': 페이지 수}
+    """
+    parts = []
+    page_offsets = []
+    position = 0
+    for _, text in iter_pdf_pages(source, **kwargs):
+        if parts:
+            parts.append(PAGE_SEPARATOR)
+            position += len(PAGE_SEPARATOR)
+        page_offsets.append(position)
+        parts.append(text)
+        position += len(text)
+    return {'text': ''.join(parts), 'page_offsets': page_offsets, 'page_count': len(page_offsets)}
+
+
+def page_for_offset(page_offsets: List[int], offset: int) -> int:
+    """텍스트 위치가 속한 페이지 번호 (1부터 시작, 인용 표시용)"""
+    return max(1, bisect.bisect_right(page_offsets, offset))
@@ -1,9 +1,14 @@
 # apps/rag/services/qdrant_client.py
 import os
+import uuid
 from django.conf import settings
-from sentence_transformers import SentenceTransformer
 import numpy as np
 
+from .embedding_cache import cached_embeddings
+from .embedding_registry import embedding_registry, default_model_name
+from .qdrant_registry import get_async_qdrant_client, get_qdrant_client
+from .qdrant_upsert import upsert_points
+
 try:
     from qdrant_client import QdrantClient
     from qdrant_client.http import models
@@ -13,24 +18,26 @@ except ImportError:
     QDRANT_AVAILABLE = False
     print("⚠️ Qdrant 미설치")
 
+# 문서 단위 포인트 ID 생성용 네임스페이스 (문서 ID + 청크 순서 → 고정 UUID)
+POINT_ID_NAMESPACE = uuid.UUID('6f1c7b2e-9a43-4d0e-8f52-3c1d2b7a9e10')
+
+# 문서 단위 저장 모드에서 사용하는 공유 컬렉션 (한 번 생성 후 재생성하지 않음)
+DOCUMENT_COLLECTION_NAME = "contract_document_chunks"
+
 class QdrantVectorStore:
     """Qdrant 벡터 저장소 클래스"""
     
+    # 이 프로세스에서 존재를 확인한 컬렉션 (요청마다 조회하지 않도록 캐시)
+    _ensured_collections = set()
+    
     def __init__(self, collection_name="contract_chunks"):
         self.collection_name = collection_name
         self.client = None
         
+        # 프로세스 공용 클라이언트 (연결 풀 재사용, 처음 사용할 때 생성)
         if QDRANT_AVAILABLE:
             try:
-                # .env에서 설정 읽기
-                url = os.getenv('QDRANT_URL')
-                api_key = os.getenv('QDRANT_API_KEY')
-                
-                if url and api_key:
-                    self.client = QdrantClient(url=url, api_key=api_key)
-                    print(f"✅ Qdrant Cloud 연결 성공: {url}")
-                else:
-                    print("❌ Qdrant 설정이 없습니다")
+                self.client = get_qdrant_client()
             except Exception as e:
                 print(f"❌ Qdrant 연결 실패: {e}")
 
@@ -63,7 +70,7 @@ class QdrantVectorStore:
                 models.PointStruct(
                     id=idx,
                     vector=vector.tolist(),
-                    payload=payload
+                    payload=dict(payload)
                 )
                 for idx, (vector, payload) in enumerate(zip(vectors, payloads))
             ]
@@ -78,8 +85,127 @@ class QdrantVectorStore:
             print(f"❌ Qdrant 벡터 추가 실패: {e}")
             return False
 
-    def search(self, query_vector, top_k=5):
-        """벡터 검색"""
+    # --- 문서 단위 저장 모드 (컬렉션 재생성 없이 문서별 upsert/삭제/검색) ---
+
+    @staticmethod
+    def point_id(document_id, chunk_index):
+        """문서 ID와 청크 순서로 결정되는 포인트 ID"""
+        return str(uuid.uuid5(POINT_ID_NAMESPACE, f"{document_id}:{chunk_index}"))
+
+    @staticmethod
+    def document_filter(document_id, *conditions):
+        """document_id 페이로드 필터"""
+        return models.Filter(
+            must=[
+                models.FieldCondition(key="document_id", match=models.MatchValue(value=str(document_id))),
+                *conditions
+            ]
+        )
+
+    def ensure_collection(self, vector_size=384):
+        """컬렉션이 없을 때만 생성 (기존 벡터는 유지)"""
+        if not self.client:
+            return False
+
+        cache_key = (self.collection_name, vector_size)
+        if cache_key in self._ensured_collections:
+            return True
+
+        try:
+            if not self.client.collection_exists(self.collection_name):
+                try:
+                    self.client.create_collection(
+                        collection_name=self.collection_name,
+                        vectors_config=models.VectorParams(
+                            size=vector_size,
+                            distance=models.Distance.COSINE
+                        )
+                    )
+                    print(f"✅ Qdrant 컬렉션 '{self.collection_name}' 생성 완료")
+                except Exception:
+                    # 다른 워커가 동시에 생성한 경우
+                    if not self.client.collection_exists(self.collection_name):
+                        raise
+
+            # 문서 필터링용 페이로드 인덱스 (이미 있으면 무시됨)
+            self.client.create_payload_index(
+                collection_name=self.collection_name,
+                field_name="document_id",
+                field_schema=models.PayloadSchemaType.KEYWORD
+            )
+            self.client.create_payload_index(
+                collection_name=self.collection_name,
+                field_name="chunk_index",
+                field_schema=models.PayloadSchemaType.INTEGER
+            )
+
+            self._ensured_collections.add(cache_key)
+            return True
+        except Exception as e:
+            print(f"❌ Qdrant 컬렉션 확인 실패: {e}")
+            return False
+
+    def upsert_document_vectors(self, document_id, vectors, payloads, batch_size=None,
+                                chunk_indexes=None, chunk_count=None):
+        """문서 벡터 upsert (해당 문서의 포인트만 갱신)
+
+        chunk_indexes를 주면 vectors/payloads를 해당 청크 순서의 포인트로만 upsert하고
+        (수정본 재업로드 시 바뀐 청크), chunk_count 이후 순서의 포인트를 정리합니다.
+        """
+        if not self.client:
+            return False
+
+        try:
+            if chunk_indexes is None:
+                chunk_indexes = range(len(vectors))
+            points = [
+                models.PointStruct(
+                    id=self.point_id(document_id, idx),
+                    vector=vector.tolist(),
+                    payload={**payload, 'document_id': str(document_id), 'chunk_index': idx}
+                )
+                for idx, vector, payload in zip(chunk_indexes, vectors, payloads)
+            ]
+            if chunk_count is None:
+                chunk_count = len(points)
+
+            # 배치로 나눠 동시에 전송 (포인트 ID가 고정이라 재시도해도 중복 없음)
+            upsert_points(self.client, self.collection_name, points, batch_size=batch_size)
+
+            # 이전 처리에서 남은 청크(현재 청크 수 이후) 정리 - wait=True라 앞선 upsert 반영 확인도 겸함
+            self.client.delete(
+                collection_name=self.collection_name,
+                points_selector=models.FilterSelector(
+                    filter=self.document_filter(
+                        document_id,
+                        models.FieldCondition(key="chunk_index", range=models.Range(gte=chunk_count))
+                    )
+                )
+            )
+            print(f"✅ 문서 {document_id}: {len(points)}개 벡터 upsert 완료")
+            return True
+        except Exception as e:
+            print(f"❌ Qdrant 문서 벡터 upsert 실패: {e}")
+            return False
+
+    def delete_document(self, document_id):
+        """문서의 모든 포인트 삭제"""
+        if not self.client:
+            return False
+
+        try:
+            self.client.delete(
+                collection_name=self.collection_name,
+                points_selector=models.FilterSelector(filter=self.document_filter(document_id))
+            )
+            print(f"🗑️ 문서 {document_id}의 벡터 삭제 완료")
+            return True
+        except Exception as e:
+            print(f"❌ Qdrant 문서 벡터 삭제 실패: {e}")
+            return False
+
+    def search(self, query_vector, top_k=5, document_id=None):
+        """벡터 검색 (document_id가 있으면 해당 문서로 한정)"""
         if not self.client:
             return []
 
@@ -87,6 +213,7 @@ class QdrantVectorStore:
             results = self.client.search(
                 collection_name=self.collection_name,
                 query_vector=query_vector.tolist(),
+                query_filter=self.document_filter(document_id) if document_id else None,
                 limit=top_k
             )
             return results
@@ -94,27 +221,51 @@ class QdrantVectorStore:
             print(f"❌ Qdrant 검색 실패: {e}")
             return []
 
+    async def asearch(self, query_vector, top_k=5, document_id=None):
+        """벡터 검색 (비동기 클라이언트 사용, 결과 형식은 search와 동일)"""
+        client = get_async_qdrant_client() if QDRANT_AVAILABLE else None
+        if not client:
+            return []
+
+        try:
+            return await client.search(
+                collection_name=self.collection_name,
+                query_vector=query_vector.tolist(),
+                query_filter=self.document_filter(document_id) if document_id else None,
+                limit=top_k
+            )
+        except Exception as e:
+            print(f"❌ Qdrant 검색 실패: {e}")
+            return []
+
 class EmbeddingService:
-    """임베딩 서비스"""
+    """임베딩 서비스 (모델은 프로세스 전역 레지스트리에서 공유)"""
     
-    def __init__(self):
+    def __init__(self, model_name=None):
+        self.model_name = model_name or default_model_name()
         self.model = None
         self.initialize_model()
     
     def initialize_model(self):
-        """임베딩 모델 초기화"""
+        """임베딩 모델 초기화 (워커 프로세스당 최초 1회만 실제 로딩)"""
         try:
-            print("🔧 임베딩 모델 로딩 중...")
-            self.model = SentenceTransformer('all-MiniLM-L6-v2')
-            print("✅ 임베딩 모델 로딩 완료")
+            self.model = embedding_registry.get(self.model_name)
             return True
         except Exception as e:
             print(f"❌ 임베딩 모델 로딩 실패: {str(e)}")
             return False
     
     def encode(self, texts, show_progress_bar=False):
-        """텍스트를 벡터로 변환"""
+        """텍스트를 벡터로 변환 (이미 계산한 텍스트는 임베딩 캐시에서)"""
         if not self.model:
             raise Exception("임베딩 모델이 초기화되지 않았습니다")
         
-        return self.model.encode(texts, show_progress_bar=show_progress_bar)
\ No newline at end of file
+        single = isinstance(texts, str)
+        text_list = [texts] if single else list(texts)
+        
+        vectors = cached_embeddings(
+            self.model_name, text_list,
+            lambda missing: self.model.encode(missing, show_progress_bar=show_progress_bar)
+        )
+        embeddings = np.vstack(vectors) if vectors else np.empty((0, 0), dtype=np.float32)
+        return embeddings[0] if single else embeddings
\ No newline at end of file
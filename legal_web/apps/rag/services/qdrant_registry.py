@@ -0,0 +1,226 @@
+# apps/rag/services/qdrant_registry.py
+"""프로세스 공용 Qdrant 클라이언트 레지스트리
+
+모듈 import나 요청마다 QdrantClient를 새로 만들지 않고, 처음 사용할 때 한 번 만든
+클라이언트(연결 풀 keep-alive 재사용)를 모든 벡터 코드가 함께 씁니다.
+설정에 따라 gRPC 전송(prefer_grpc)을 사용할 수 있습니다.
+
+연결 오류가 연속으로 일정 횟수 나면 잠시 동안 호출을 바로 실패시켜(fast-fail)
+Qdrant 장애 시 요청마다 타임아웃까지 기다리지 않도록 합니다.
+
+비동기 뷰에서는 get_async_qdrant_client()로 AsyncQdrantClient를 받아 씁니다
+(상태 기록은 동기 클라이언트와 같은 이름으로 공유).
+"""
+import threading
+import time
+from typing import Dict, Optional
+
+import httpx
+from django.conf import settings
+
+try:
+    from qdrant_client import AsyncQdrantClient, QdrantClient
+    from qdrant_client.http.exceptions import ResponseHandlingException
+    QDRANT_AVAILABLE = True
+except ImportError:
+    QDRANT_AVAILABLE = False
+
+try:
+    import grpc
+except ImportError:
+    grpc = None
+
+
+class QdrantUnavailableError(Exception):
+    """Qdrant 연결 장애로 일정 시간 호출을 차단 중"""
+
+
+def is_connection_error(error: Exception) -> bool:
+    """서버 도달 불가/타임아웃 오류인지 (4xx 같은 요청 오류는 장애로 보지 않음)"""
+    if isinstance(error, (ConnectionError, TimeoutError, httpx.TransportError)):
+        return True
+    if QDRANT_AVAILABLE and isinstance(error, ResponseHandlingException):
+        return True
+    if grpc is not None and isinstance(error, grpc.RpcError):
+        return error.code() in (grpc.StatusCode.UNAVAILABLE, grpc.StatusCode.DEADLINE_EXCEEDED)
+    return False
+
+
+class _HealthState:
+    """연속 실패 횟수와 차단 해제 시각"""
+
+    def __init__(self):
+        self.failures = 0
+        self.open_until = 0.0
+        self.last_error = None
+        self.last_success_at = None
+
+
+class _TrackedClient:
+    """QdrantClient 호출 결과로 상태를 기록하는 얇은 래퍼 (속성/메서드는 그대로 위임)"""
+
+    def __init__(self, registry: 'QdrantClientRegistry', name: str, client):
+        self._registry = registry
+        self._name = name
+        self._client = client
+
+    def __getattr__(self, attr):
+        value = getattr(self._client, attr)
+        if not callable(value) or attr.startswith('_'):
+            return value
+
+        def call(*args, **kwargs):
+            self._registry.check_available(self._name)
+            try:
+                result = value(*args, **kwargs)
+            except Exception as e:
+                if is_connection_error(e):
+                    self._registry.record_failure(self._name, e)
+                raise
+            self._registry.record_success(self._name)
+            return result
+
+        return call
+
+
+class _TrackedAsyncClient(_TrackedClient):
+    """AsyncQdrantClient용 래퍼 (코루틴 결과로 상태 기록)"""
+
+    def __getattr__(self, attr):
+        value = getattr(self._client, attr)
+        if not callable(value) or attr.startswith('_'):
+            return value
+
+        async def call(*args, **kwargs):
+            self._registry.check_available(self._name)
+            try:
+                result = await value(*args, **kwargs)
+            except Exception as e:
+                if is_connection_error(e):
+                    self._registry.record_failure(self._name, e)
+                raise
+            self._registry.record_success(self._name)
+            return result
+
+        return call
+
+
+class QdrantClientRegistry:
+    """이름별 Qdrant 클라이언트를 지연 생성해 프로세스 안에서 공유"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clients = {}
+        self._async_clients = {}
+        self._health = {}
+
+    def _create(self, name: str, is_async: bool = False):
+        url = getattr(settings, 'QDRANT_URL', None)
+        if not url:
+            print("❌ Qdrant 설정이 없습니다")
+            return None
+
+        prefer_grpc = getattr(settings, 'QDRANT_PREFER_GRPC', False)
+        client_class, wrapper = (AsyncQdrantClient, _TrackedAsyncClient) if is_async else (QdrantClient, _TrackedClient)
+        client = client_class(
+            url=url,
+            api_key=getattr(settings, 'QDRANT_API_KEY', None) or None,
+            prefer_grpc=prefer_grpc,
+            grpc_port=getattr(settings, 'QDRANT_GRPC_PORT', 6334),
+            timeout=getattr(settings, 'QDRANT_TIMEOUT', 10),
+            # 생성 시 서버 버전 조회를 생략해 Qdrant 장애가 생성 자체를 막지 않도록
+            check_compatibility=False,
+        )
+        print(f"✅ Qdrant {'비동기 ' if is_async else ''}클라이언트 생성 ({name}, {'gRPC' if prefer_grpc else 'HTTP'}): {url}")
+        return wrapper(self, name, client)
+
+    def _get(self, clients: Dict, name: str, is_async: bool):
+        if not QDRANT_AVAILABLE:
+            return None
+
+        client = clients.get(name)
+        if client is None:
+            with self._lock:
+                client = clients.get(name)
+                if client is None:
+                    client = self._create(name, is_async)
+                    if client is not None:
+                        clients[name] = client
+                        self._health.setdefault(name, _HealthState())
+        return client
+
+    def get(self, name: str = 'default'):
+        """공유 클라이언트 (Qdrant 미설치/미설정이면 None)"""
+        return self._get(self._clients, name, is_async=False)
+
+    def get_async(self, name: str = 'default'):
+        """공유 비동기 클라이언트 (ASGI 워커의 이벤트 루프에서 사용)"""
+        return self._get(self._async_clients, name, is_async=True)
+
+    def check_available(self, name: str):
+        state = self._health.get(name)
+        if state and state.open_until > time.time():
+            raise QdrantUnavailableError(
+                f"Qdrant 연결 장애로 {state.open_until - time.time():.0f}초 동안 요청을 보내지 않습니다 ({state.last_error})"
+            )
+
+    def record_failure(self, name: str, error: Exception):
+        threshold = getattr(settings, 'QDRANT_FAILURE_THRESHOLD', 3)
+        retry_after = getattr(settings, 'QDRANT_RETRY_AFTER_SECONDS', 30)
+        with self._lock:
+            state = self._health.setdefault(name, _HealthState())
+            state.failures += 1
+            state.last_error = f"{type(error).__name__}: {error}"
+            if state.failures >= threshold:
+                state.open_until = time.time() + retry_after
+                print(f"⚠️ Qdrant({name}) 연속 {state.failures}회 연결 실패, {retry_after}초 동안 호출 차단")
+
+    def record_success(self, name: str):
+        state = self._health.get(name)
+        if state is None:
+            return
+        if state.failures:
+            with self._lock:
+                state.failures = 0
+                state.open_until = 0.0
+        state.last_success_at = time.time()
+
+    def health(self) -> Dict[str, Dict]:
+        """클라이언트별 상태 (모니터링용)"""
+        now = time.time()
+        return {
+            name: {
+                'available': state.open_until <= now,
+                'consecutive_failures': state.failures,
+                'retry_in_seconds': max(0, round(state.open_until - now)),
+                'last_error': state.last_error,
+                'last_success_at': state.last_success_at,
+            }
+            for name, state in self._health.items()
+        }
+
+    def reset(self):
+        """모든 클라이언트 닫기 (테스트/설정 변경용)"""
+        with self._lock:
+            for client in self._clients.values():
+                try:
+                    client._client.close()
+                except Exception:
+                    pass
+            self._clients.clear()
+            # 비동기 클라이언트는 이벤트 루프 밖에서 닫을 수 없으므로 참조만 정리
+            self._async_clients.clear()
+            self._health.clear()
+
+
+qdrant_registry = QdrantClientRegistry()
+
+
+def get_qdrant_client(name: str = 'default') -> Optional[object]:
+    """프로세스 공용 Qdrant 클라이언트"""
+    return qdrant_registry.get(name)
+
+
+def get_async_qdrant_client(name: str = 'default') -> Optional[object]:
+    """프로세스 공용 비동기 Qdrant 클라이언트"""
+    return qdrant_registry.get_async(name)
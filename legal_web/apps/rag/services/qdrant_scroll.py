@@ -0,0 +1,119 @@
+# apps/rag/services/qdrant_scroll.py
+"""Qdrant scroll 페이지 순회
+
+scroll 응답의 next_page_offset을 따라가며 포인트를 하나씩 내보내는 제너레이터입니다.
+문서 크기와 상관없이 메모리에는 (페이지 크기 × 미리 받아 둘 페이지 수)만 유지하며,
+다음 페이지는 백그라운드 스레드가 미리 받아 두어 네트워크 대기와 처리가 겹치도록 합니다.
+
+order_by를 주면 해당 정수 페이로드 값 순서로 순회합니다 (Qdrant 정렬 scroll은 offset 대신
+마지막 값부터 다시 조회하는 방식이라 이 모듈에서 이어받기를 처리).
+"""
+import queue
+import threading
+from typing import Iterator, Optional, Sequence, Union
+
+try:
+    from qdrant_client.http import models
+except ImportError:
+    models = None
+
+# 생산 스레드가 소비 측 종료를 확인하는 간격(초)
+_PUT_TIMEOUT_SECONDS = 0.5
+
+_DONE = object()
+
+
+def _iter_pages(client, collection_name: str, scroll_filter, page_size: int,
+                with_payload: Union[bool, Sequence[str]], order_by: Optional[str]):
+    """scroll 결과를 페이지(포인트 목록) 단위로 반환"""
+    if not order_by:
+        offset = None
+        while True:
+            points, offset = client.scroll(
+                collection_name=collection_name, scroll_filter=scroll_filter, limit=page_size,
+                offset=offset, with_payload=with_payload, with_vectors=False,
+            )
+            if points:
+                yield points
+            if offset is None:
+                return
+
+    # 정렬 scroll: 마지막 값부터 다시 조회하고 이미 받은 같은 값의 포인트는 건너뜀
+    start_from = None
+    seen_at_boundary = set()
+    while True:
+        points, _ = client.scroll(
+            collection_name=collection_name, scroll_filter=scroll_filter, limit=page_size,
+            with_payload=with_payload, with_vectors=False,
+            order_by=models.OrderBy(key=order_by, direction=models.Direction.ASC, start_from=start_from),
+        )
+        new_points = [point for point in points if point.id not in seen_at_boundary]
+        if new_points:
+            yield new_points
+        if len(points) < page_size or not new_points:
+            return
+
+        last_value = points[-1].payload[order_by] if with_payload is True or order_by in with_payload else None
+        if last_value is None:
+            raise ValueError(f"정렬 기준 필드 '{order_by}'를 payload에 포함해야 합니다.")
+        if last_value != start_from:
+            seen_at_boundary = set()
+        seen_at_boundary.update(point.id for point in points if point.payload[order_by] == last_value)
+        start_from = last_value
+
+
+def iter_scroll(client, collection_name: str, scroll_filter=None, page_size: int = 256,
+                payload_fields: Optional[Sequence[str]] = None, order_by: Optional[str] = None,
+                prefetch_pages: int = 2) -> Iterator:
+    """필터에 맞는 모든 포인트를 순서대로 하나씩 반환
+
+    payload_fields를 주면 해당 필드만 받아 전송량을 줄입니다 (order_by 필드는 자동 포함).
+    prefetch_pages가 0이면 백그라운드 스레드 없이 필요할 때 한 페이지씩 받습니다.
+    """
+    with_payload = True
+    if payload_fields is not None:
+        with_payload = list(dict.fromkeys([*payload_fields, *([order_by] if order_by else [])]))
+
+    pages = _iter_pages(client, collection_name, scroll_filter, page_size, with_payload, order_by)
+    if prefetch_pages <= 0:
+        for page in pages:
+            yield from page
+        return
+
+    buffer = queue.Queue(maxsize=prefetch_pages)
+    stop = threading.Event()
+
+    def produce():
+        try:
+            for page in pages:
+                while not stop.is_set():
+                    try:
+                        buffer.put(page, timeout=_PUT_TIMEOUT_SECONDS)
+                        break
+                    except queue.Full:
+                        continue
+                if stop.is_set():
+                    return
+            item = _DONE
+        except Exception as e:
+            item = e
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=_PUT_TIMEOUT_SECONDS)
+                return
+            except queue.Full:
+                continue
+
+    producer = threading.Thread(target=produce, name=f"qdrant-scroll-{collection_name}", daemon=True)
+    producer.start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is _DONE:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield from item
+    finally:
+        # 소비 측이 중간에 멈춰도 생산 스레드가 대기 상태로 남지 않도록
+        stop.set()
@@ -0,0 +1,65 @@
+# apps/rag/services/qdrant_upsert.py
+"""Qdrant 포인트 배치 upsert
+
+포인트를 일정 개수씩 나눠 여러 요청을 동시에 보내고, 연결 오류가 난 배치만 다시 보냅니다.
+포인트 ID가 결정적(uuid5)이어야 재시도/재처리 시 중복 없이 같은 포인트를 덮어씁니다.
+
+wait=False면 각 배치는 서버 접수만 확인하고 바로 다음으로 넘어가며,
+호출 측은 마지막에 wait=True 작업(예: 남은 청크 삭제)을 한 번 보내 반영 완료를 확인합니다.
+(Qdrant는 컬렉션의 변경 작업을 순서대로 적용하므로 마지막 작업이 끝나면 앞선 upsert도 반영된 상태)
+"""
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+from django.conf import settings
+
+from .qdrant_registry import is_connection_error
+
+# 백오프 상한(초)
+MAX_BACKOFF_SECONDS = 10
+
+
+def _upsert_batch(client, collection_name: str, batch: List, wait: bool, max_retries: int):
+    attempt = 0
+    while True:
+        try:
+            return client.upsert(collection_name=collection_name, points=batch, wait=wait)
+        except Exception as e:
+            if not is_connection_error(e) or attempt >= max_retries:
+                raise
+            delay = min(MAX_BACKOFF_SECONDS, 0.5 * (2 ** attempt)) * (0.5 + random.random() / 2)
+            attempt += 1
+            print(f"    - ⚠️ Qdrant upsert 배치 실패 ({type(e).__name__}), {delay:.1f}초 후 재시도 {attempt}/{max_retries}")
+            time.sleep(delay)
+
+
+def upsert_points(client, collection_name: str, points: List, batch_size: Optional[int] = None,
+                  max_workers: Optional[int] = None, wait: Optional[bool] = None,
+                  max_retries: Optional[int] = None) -> int:
+    """포인트를 배치로 나눠 동시에 upsert (모든 배치가 접수/반영될 때까지 대기, 배치 수 반환)"""
+    batch_size = batch_size or getattr(settings, 'QDRANT_UPSERT_BATCH_SIZE', 256)
+    max_workers = max_workers or getattr(settings, 'QDRANT_UPSERT_CONCURRENCY', 4)
+    wait = getattr(settings, 'QDRANT_UPSERT_WAIT', True) if wait is None else wait
+    max_retries = getattr(settings, 'QDRANT_UPSERT_RETRIES', 3) if max_retries is None else max_retries
+
+    batches = [points[start:start + batch_size] for start in range(0, len(points), batch_size)]
+    if len(batches) <= 1 or max_workers <= 1:
+        for batch in batches:
+            _upsert_batch(client, collection_name, batch, wait, max_retries)
+        return len(batches)
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(batches))) as executor:
+        futures = [
+            executor.submit(_upsert_batch, client, collection_name, batch, wait, max_retries)
+            for batch in batches
+        ]
+        try:
+            for future in futures:
+                future.result()
+        except Exception:
+            for future in futures:
+                future.cancel()
+            raise
+    return len(batches)
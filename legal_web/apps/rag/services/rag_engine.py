@@ -1,28 +1,160 @@
 # apps/rag/services/rag_engine.py
+import asyncio
 import re
+import time
+import uuid
+import numpy as np
+from asgiref.sync import sync_to_async
 from typing import List, Dict, Any, Optional, Tuple
-from .qdrant_client import QdrantVectorStore, EmbeddingService
+from collections.abc import Mapping
+from .article_diff import ArticleDiff, PreviousChunk, diff_articles
+from .chunk_table import ChunkTable, ChunkView
+from .qdrant_client import QdrantVectorStore, EmbeddingService, DOCUMENT_COLLECTION_NAME
 from .document_processor import DocumentProcessor, CONTRACT_TYPES_TERMS
+from .inverted_index import InvertedIndex, normalize_term
+from .relevance_gate import RelevanceGate
 
 class RAGEngine:
     """강화된 RAG 검색 엔진"""
     
-    def __init__(self):
-        self.vector_store = QdrantVectorStore()
-        self.embedding_service = EmbeddingService()
-        self.document_chunks = []
+    # 저장된 검색 아티팩트 형식 (청크/키워드 인덱스/임베딩 구조가 바뀌면 올려서 재처리 유도)
+    ARTIFACT_FORMAT = 1
+    
+    def __init__(self, document_id=None):
+        self.document_id = document_id  # 설정 시 공유 컬렉션에 문서 단위로 저장/검색
+        self._vector_store = None
+        self._embedding_service = None
+        self.document_chunks = ChunkTable()  # 원문 + 청크 위치 (청크는 ChunkView로 읽음)
         self.keyword_index = {}
         self.detected_contract_type = None
+        self.chunk_embeddings = None  # (청크 수, 차원) float32, 정규화된 임베딩 행렬
+        self._term_index = None
+        self._relevance_gate = None
+    
+    @property
+    def vector_store(self):
+        """Qdrant 저장소 (필요할 때 연결)"""
+        if self._vector_store is None:
+            if self.document_id:
+                self._vector_store = QdrantVectorStore(DOCUMENT_COLLECTION_NAME)
+            else:
+                self._vector_store = QdrantVectorStore()
+        return self._vector_store
+    
+    @property
+    def term_index(self) -> InvertedIndex:
+        """청크 n-gram 역색인 (처음 검색할 때 한 번 생성)"""
+        if self._term_index is None or len(self._term_index) != len(self.document_chunks):
+            start_time = time.time()
+            self._term_index = InvertedIndex(self.document_chunks)
+            print(f"🔧 역색인 생성: {len(self.document_chunks)}개 청크, {len(self._term_index.postings)}개 n-gram ({time.time() - start_time:.3f}초)")
+        return self._term_index
+    
+    @property
+    def relevance_gate(self) -> RelevanceGate:
+        """질문-문서 관련성 게이트 (역색인 기반)"""
+        term_index = self.term_index
+        if self._relevance_gate is None or self._relevance_gate.term_index is not term_index:
+            self._relevance_gate = RelevanceGate(term_index)
+        return self._relevance_gate
+    
+    @property
+    def embedding_service(self):
+        """임베딩 서비스 (필요할 때 모델 로딩)"""
+        if self._embedding_service is None:
+            self._embedding_service = EmbeddingService()
+        return self._embedding_service
+    
+    # DocumentChunk에서 엔진 복원에 읽는 컬럼
+    CHUNK_ROW_FIELDS = ('id', 'text', 'chunk_type', 'article_num', 'article_title', 'embedding')
+    
+    @classmethod
+    def has_artifacts(cls, document) -> bool:
+        """재처리 없이 복원할 수 있는 검색 아티팩트가 저장되어 있는지"""
+        return (document.artifact_version != 0
+                and document.artifact_format == cls.ARTIFACT_FORMAT
+                and document.keyword_index is not None)
+    
+    @classmethod
+    def load(cls, document) -> 'RAGEngine':
+        """업로드 시 저장된 검색 아티팩트로 엔진 복원 (문서 재처리 없음)"""
+        engine = cls(document_id=document.id)
+        
+        if not cls.has_artifacts(document):
+            print(f"⚠️ 저장된 검색 아티팩트가 없어 문서를 다시 처리합니다: {document.title}")
+            engine.process_document(document.text_content)
+            # 재처리로 새로 정한 청크 ID 대신 이미 저장된 DocumentChunk 행의 ID 사용
+            ids_by_index = dict(document.chunks.values_list('chunk_index', 'id'))
+            engine.document_chunks.set_chunk_ids(ids_by_index.get(i) for i in range(len(engine.document_chunks)))
+            return engine
+        
+        rows = document.chunks.order_by('chunk_index').values_list(*cls.CHUNK_ROW_FIELDS)
+        return engine._restore(document, rows)
+    
+    @classmethod
+    async def aload(cls, document) -> 'RAGEngine':
+        """load의 비동기 버전 (아티팩트가 없어 재처리해야 하면 스레드에서 동기 처리)"""
+        if not cls.has_artifacts(document):
+            return await sync_to_async(cls.load)(document)
+        
+        engine = cls(document_id=document.id)
+        rows = [row async for row in document.chunks.order_by('chunk_index').values_list(*cls.CHUNK_ROW_FIELDS)]
+        return engine._restore(document, rows)
+    
+    def _restore(self, document, rows) -> 'RAGEngine':
+        """DocumentChunk 행과 문서에 저장된 키워드 인덱스로 엔진 상태 구성"""
+        start_time = time.time()
+        rows = list(rows)
+        # 행 텍스트는 원문 하나로 이어 붙이고 청크는 위치만 보관
+        self.document_chunks = ChunkTable.from_rows(row[:-1] for row in rows)
+        embeddings = [row[-1] for row in rows]
+        
+        self.detected_contract_type = document.contract_type
+        self.keyword_index = document.keyword_index
+        
+        if embeddings and all(embedding is not None for embedding in embeddings):
+            self.chunk_embeddings = self._normalize_rows(
+                np.stack([np.frombuffer(bytes(embedding), dtype=np.float32) for embedding in embeddings])
+            )
+        
+        # 역색인/관련성 게이트는 로딩 시 한 번 생성 (질문마다 문서 전체를 훑지 않도록)
+        self._relevance_gate = RelevanceGate(self.term_index)
         
-    def process_document(self, text: str) -> Dict[str, Any]:
+        print(f"✅ 검색 아티팩트 로드 완료: {len(self.document_chunks)}개 청크 "
+              f"(v{document.artifact_version}, {(time.time() - start_time) * 1000:.1f}ms)")
+        return self
+    
+    @staticmethod
+    def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+        """코사인 유사도 계산용 행 정규화"""
+        matrix = np.asarray(matrix, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+    
+    def embedding_bytes(self, chunk_idx: int) -> Optional[bytes]:
+        """청크 임베딩을 DB 저장용 바이트로 반환"""
+        if self.chunk_embeddings is None:
+            return None
+        return self.chunk_embeddings[chunk_idx].astype(np.float32).tobytes()
+        
+    def process_document(self, text: str, document_id=None) -> Dict[str, Any]:
         """문서 전체 처리 파이프라인"""
         print("📄 문서 처리 파이프라인 시작...")
         
+        if document_id and document_id != self.document_id:
+            self.document_id = document_id
+            self._vector_store = None
+        
         # 1. 계약서 유형 감지
         self.detected_contract_type, confidence, type_info = DocumentProcessor.detect_contract_type(text)
         
         # 2. 조항별 추출
         self.document_chunks = DocumentProcessor.extract_articles_with_content(text)
+        # DocumentChunk PK를 미리 정해 두어 검색 결과가 DB 조회 없이 청크를 가리키도록
+        self.document_chunks.set_chunk_ids(uuid.uuid4() for _ in range(len(self.document_chunks)))
+        self._term_index = InvertedIndex(self.document_chunks)
+        self._relevance_gate = RelevanceGate(self._term_index)
         
         # 3. 키워드 인덱스 생성
         self.keyword_index = self._create_enhanced_keyword_index(self.document_chunks, self.detected_contract_type)
@@ -38,15 +170,120 @@ class RAGEngine:
             'keyword_groups': len(self.keyword_index)
         }
     
+    def process_revision(self, text: str, previous_chunks: List[PreviousChunk], reuse: bool = True) -> Dict[str, Any]:
+        """수정본 처리 파이프라인 (이전 버전과 내용이 같은 청크는 재사용하고 바뀐 청크만 임베딩)
+        
+        재사용 청크는 이전 DocumentChunk ID와 저장된 임베딩을 그대로 쓰므로 임베딩 비용이
+        바뀐 조항 수에 비례합니다. Qdrant 반영은 DB 저장 후 sync_revision_vectors로 수행합니다.
+        """
+        print("📄 수정본 처리 파이프라인 시작...")
+        
+        # 1. 계약서 유형 감지 및 조항별 추출
+        self.detected_contract_type, confidence, type_info = DocumentProcessor.detect_contract_type(text)
+        chunks = self.document_chunks = DocumentProcessor.extract_articles_with_content(text)
+        
+        # 2. 이전 버전과 조항 비교
+        diff = diff_articles([chunk.content_hash for chunk in chunks], previous_chunks, reuse=reuse)
+        
+        # 3. 바뀐 청크만 임베딩하고 나머지는 저장된 임베딩 사용
+        embeddings = {index: np.frombuffer(previous.embedding, dtype=np.float32)
+                      for index, previous in diff.reused.items()}
+        if diff.added:
+            print(f"🔢 바뀐 {len(diff.added)}개 청크 임베딩 중...")
+            encoded = self.embedding_service.encode([self._embedding_text(chunks[i]) for i in diff.added],
+                                                    show_progress_bar=True)
+            embeddings.update(zip(diff.added, encoded))
+        if len({len(vector) for vector in embeddings.values()}) > 1:
+            # 임베딩 모델이 바뀌어 이전 임베딩과 차원이 다르면 재사용하지 않음
+            print("⚠️ 이전 임베딩과 차원이 달라 전체 청크를 새로 처리합니다")
+            return self.process_revision(text, previous_chunks, reuse=False)
+        self.chunk_embeddings = (self._normalize_rows(np.stack([embeddings[i] for i in range(len(chunks))]))
+                                 if embeddings else None)
+        
+        # 재사용 청크는 이전 ID 유지 (채팅 기록의 used_chunks 연결 보존), 새 청크는 새 ID
+        chunks.set_chunk_ids(diff.reused[i].chunk_id if i in diff.reused else uuid.uuid4()
+                             for i in range(len(chunks)))
+        self._term_index = InvertedIndex(chunks)
+        self._relevance_gate = RelevanceGate(self._term_index)
+        
+        # 4. 키워드 인덱스 생성 (문서 전체 기준이라 다시 생성, 임베딩 호출 없음)
+        self.keyword_index = self._create_enhanced_keyword_index(chunks, self.detected_contract_type)
+        
+        print(f"✅ 수정본 비교 완료: 재사용 {len(diff.reused)}개, 새로 임베딩 {len(diff.added)}개, "
+              f"삭제 {len(diff.removed)}개")
+        return {
+            'contract_type': self.detected_contract_type,
+            'confidence': confidence,
+            'chunk_count': len(chunks),
+            'diff': diff,
+            'keyword_groups': len(self.keyword_index)
+        }
+    
+    def sync_revision_vectors(self, diff: ArticleDiff, full: bool = False) -> bool:
+        """수정본 벡터를 Qdrant에 반영
+        
+        포인트 ID가 (문서, 청크 순서)로 정해지므로 새 청크와 순서가 바뀐 재사용 청크만 upsert하고
+        (재사용 청크는 저장된 임베딩 사용), 청크 수 이후 순서의 포인트는 삭제합니다.
+        full=True면 모든 청크를 upsert합니다 (이전 버전의 벡터 인덱스가 없던 경우).
+        """
+        if self.chunk_embeddings is None or not self.vector_store.client:
+            return False
+        
+        try:
+            indexes = list(range(len(self.document_chunks))) if full else sorted(diff.added + diff.moved)
+            if (self.vector_store.ensure_collection(vector_size=self.chunk_embeddings.shape[1])
+                    and self.vector_store.upsert_document_vectors(
+                        self.document_id, self.chunk_embeddings[indexes],
+                        [self.document_chunks[i] for i in indexes],
+                        chunk_indexes=indexes, chunk_count=len(self.document_chunks))):
+                print(f"✅ Qdrant 수정본 반영 완료: {len(indexes)}개 포인트 갱신")
+                return True
+            
+            print("❌ Qdrant 수정본 반영 실패")
+            return False
+            
+        except Exception as e:
+            print(f"❌ Qdrant 수정본 반영 실패: {str(e)}")
+            return False
+    
     def search(self, query: str, top_k: int = 3) -> List[Dict[str, Any]]:
         """강화된 RAG 검색"""
+        all_matches = self._collect_matches(query)
+        if all_matches is None:
+            return []
+        
+        # 6. 벡터 검색 (최후 수단)
+        if len(all_matches) < 2:
+            print("🔢 벡터 검색 시도 (최후 수단)")
+            all_matches.extend(self._perform_vector_search(query, top_k))
+        else:
+            print("✅ 충분한 매칭 결과로 벡터 검색 생략")
+        
+        return self._rank_matches(all_matches, top_k)
+    
+    async def asearch(self, query: str, top_k: int = 3) -> List[Dict[str, Any]]:
+        """search의 비동기 버전 (벡터 검색 단계만 비동기로 대기)"""
+        all_matches = self._collect_matches(query)
+        if all_matches is None:
+            return []
+        
+        if len(all_matches) < 2:
+            print("🔢 벡터 검색 시도 (최후 수단)")
+            all_matches.extend(await self._aperform_vector_search(query, top_k))
+        else:
+            print("✅ 충분한 매칭 결과로 벡터 검색 생략")
+        
+        return self._rank_matches(all_matches, top_k)
+    
+    def _collect_matches(self, query: str) -> Optional[List[Dict[str, Any]]]:
+        """관련성 검사 후 조항/키워드 매칭 결과 수집 (문서와 무관한 질문이면 None)"""
         print(f"\n🔍 강화된 RAG 검색 시작: '{query}'")
         
         # 1. 문서 관련성 검사
         is_relevant, reason = self._enhanced_strict_document_relevance_check(query)
         if not is_relevant:
             print(f"❌ 문서 관련성 검사 실패: {reason}")
-            return []
+            return None
         
         print(f"✅ 문서 관련성 확인: {reason}")
         
@@ -61,7 +298,7 @@ class RAGEngine:
                     'chunk': match,
                     'score': 100,
                     'method': f'조항검색(제{match["article_num"]}조)',
-                    'index': match.get('index', 0)
+                    'index': match.index
                 })
         
         # 3. 문서 내 키워드 정확 매칭
@@ -83,15 +320,14 @@ class RAGEngine:
             
             for term in specialized_terms:
                 if term in query_lower:
-                    for i, chunk in enumerate(self.document_chunks):
-                        if term in chunk['text']:
-                            all_matches.append({
-                                'chunk': chunk,
-                                'score': 70,
-                                'method': f'특화검색({term})',
-                                'index': i
-                            })
-                            print(f"🎯 특화 검색 매칭: {term}")
+                    for i in self.term_index.chunks_containing(term):
+                        all_matches.append({
+                            'chunk': self.document_chunks[i],
+                            'score': 70,
+                            'method': f'특화검색({term})',
+                            'index': i
+                        })
+                        print(f"🎯 특화 검색 매칭: {term}")
         
         # 5. 키워드 그룹 검색
         keyword_mapping = {
@@ -116,14 +352,10 @@ class RAGEngine:
                     })
                     print(f"🔍 키워드 그룹 매칭: {keyword_group}")
         
-        # 6. 벡터 검색 (최후 수단)
-        if len(all_matches) < 2:
-            print("🔢 벡터 검색 시도 (최후 수단)")
-            vector_matches = self._perform_vector_search(query, top_k)
-            all_matches.extend(vector_matches)
-        else:
-            print("✅ 충분한 매칭 결과로 벡터 검색 생략")
-        
+        return all_matches
+    
+    def _rank_matches(self, all_matches: List[Dict[str, Any]], top_k: int) -> List[Dict[str, Any]]:
+        """중복 제거 후 점수순 상위 top_k개"""
         # 중복 제거 및 점수순 정렬
         unique_results = {}
         for match in all_matches:
@@ -132,11 +364,16 @@ class RAGEngine:
                 unique_results[chunk_idx] = match
         
         final_results = sorted(unique_results.values(), key=lambda x: x['score'], reverse=True)[:top_k]
+        # 청크 뷰는 원문 테이블을 가리키므로 응답/저장(JSON)용으로 일반 dict로 꺼냄
+        final_results = [
+            {**result, 'chunk': dict(result['chunk'])} if isinstance(result['chunk'], ChunkView) else result
+            for result in final_results
+        ]
         
         print(f"📊 최종 RAG 검색 결과: {len(final_results)}개 조항 선택")
         for i, result in enumerate(final_results):
             chunk = result['chunk']
-            if isinstance(chunk, dict):
+            if isinstance(chunk, Mapping):
                 article_info = f"제{chunk.get('article_num', '?')}조({chunk.get('article_title', 'Unknown')})"
             else:
                 article_info = f"제{chunk.article_num}조({chunk.article_title})" if hasattr(chunk, 'article_num') else "Unknown"
@@ -146,126 +383,11 @@ class RAGEngine:
     
     def _enhanced_strict_document_relevance_check(self, query: str) -> Tuple[bool, str]:
         """강화된 문서 관련성 검사"""
-        print(f"🔍 강화된 문서 관련성 검사: '{query}'")
-        
-        query_lower = query.lower().strip()
-        
-        # 1. 명백히 문서와 무관한 질문들
-        off_topic_patterns = [
-            r'(날씨|기상|온도|비|눈|맑음|흐림)',
-            r'(뉴스|신문|방송|언론|기사)',
-            r'(요리|음식|식당|맛집|레시피)',
-            r'(영화|드라마|노래|음악|엔터테인먼트)',
-            r'(게임|스포츠|축구|야구|농구)',
-            r'(정치|선거|대통령|국회|정당)',
-            r'(안녕|생일|나이|결혼|가족)',
-            r'(여행|휴가|관광|호텔|항공)',
-            r'(건강|병원|의사|약|치료)',
-            r'(학교|공부|시험|성적|교육)',
-            r'(컴퓨터|프로그래밍|인터넷|소프트웨어)',
-            r'(수학|과학|물리|화학|생물)',
-            r'(역사|지리|문화|예술|철학)',
-            r'(너는|당신은|ai는|인공지능)',
-            r'(어떻게|왜|언제) (생각|느끼|판단)',
-            r'(좋아하|싫어하|선호하|추천)',
-            r'^(안녕|hello|hi|헬로|하이)$',
-            r'^(고마워|감사|thanks|thank you)$',
-            r'^(응|네|예|yes|no|아니오)$',
-            r'(몇시|언제|지금|오늘|어제|내일)',
-            r'(시간|시각|날짜|요일)',
-            r'(어떻게 해|방법|하는법)(?!.*계약)',
-        ]
-        
-        for pattern in off_topic_patterns:
-            if re.search(pattern, query_lower):
-                print(f"❌ 문서 무관 패턴 감지: {pattern}")
-                return False, f"off_topic_pattern: {pattern}"
-        
-        # 2. 너무 짧거나 의미없는 질문
-        if len(query.strip()) < 2:
-            print("❌ 질문이 너무 짧음")
-            return False, "too_short"
-        
-        if query_lower in ['?', '??', '???', '.', '..', '...', 'ㅎ', 'ㅋ', 'ㅠ']:
-            print("❌ 의미없는 질문")
-            return False, "meaningless"
-        
-        # 3. 조항 번호 직접 언급 (최고 우선순위)
-        article_patterns = [
-            r'제\s*\d+\s*조',
-            r'\d+\s*조',
-            r'제\s*\d+',
-            r'조항\s*\d+',
-            r'article\s*\d+',
-            r'section\s*\d+',
-            r'clause\s*\d+'
-        ]
-        
-        for pattern in article_patterns:
-            if re.search(pattern, query_lower):
-                print(f"✅ 조항 패턴 감지: {pattern} (최고 우선순위)")
-                return True, f"article_pattern: {pattern}"
-        
-        # 4. 계약서 관련 핵심 키워드 체크
-        contract_keywords = [
-            '계약', '조항', '조', '항', '계약서', '협약', '약정', '협정',
-            '당사자', '발주자', '수급인', '임대인', '임차인', '갑', '을',
-            '의무', '책임', '권리', '권한', '이행', '준수', '완수',
-            '위반', '위배', '불이행', '미이행', '어김',
-            '대금', '비용', '요금', '수수료', '보증금', '계약금', '잔금',
-            '위약금', '연체료', '지체상금', '손해배상', '배상', '보상',
-            '급여', '임금', '월급', '보수', '수당',
-            '기간', '기한', '일자', '날짜', '시점', '완료', '종료', '만료',
-            '연장', '갱신', '연기', '지연',
-            '해지', '해제', '변경', '수정', '갱신', '연장', '파기',
-            '통지', '고지', '신고', '승인', '합의', '동의',
-            '조건', '기준', '방법', '절차', '과정', '내용', '범위',
-            '사항', '세부', '구체', '명시', '규정', '정함',
-            '법적', '법률', '소송', '분쟁', '중재', '판결',
-            '관할', '준거법', '효력', '무효',
-            '납품', '인도', '검수', '하자', '보증', '담보',
-            '면책', '귀책', '과실', '고의'
-        ]
-        
-        # 5. 문서에 실제 포함된 단어 확인
-        query_words = [word for word in query.split() if len(word) >= 2]
-        document_text_lower = ' '.join([chunk['text'] for chunk in self.document_chunks]).lower()
-        
-        # 계약 키워드 확인
-        found_keywords = [kw for kw in contract_keywords if kw in query_lower]
-        
-        # 문서 내 단어 확인
-        found_in_document = []
-        for word in query_words:
-            if word in document_text_lower:
-                found_in_document.append(word)
-        
-        # 6. 관련성 점수 계산
-        relevance_score = 0
-        relevance_score += len(found_keywords) * 10
-        relevance_score += len(found_in_document) * 5
-        
-        # 7. 최종 판단
-        is_relevant = False
-        reason = ""
-        
-        if found_keywords:
-            is_relevant = True
-            reason = f"contract_keywords: {found_keywords[:3]}"
-            print(f"✅ 계약 관련 키워드 발견: {found_keywords[:3]}")
-        elif len(found_in_document) >= 2:
-            is_relevant = True
-            reason = f"document_words: {found_in_document[:3]}"
-            print(f"✅ 문서 내 단어 발견: {found_in_document[:3]}")
-        else:
-            print(f"❌ 문서와 관련성 낮음 (키워드: {len(found_keywords)}, 문서단어: {len(found_in_document)}, 점수: {relevance_score})")
-            reason = f"low_relevance: keywords={len(found_keywords)}, doc_words={len(found_in_document)}"
-        
-        print(f"🔍 관련성 점수: {relevance_score}, 판정: {'관련' if is_relevant else '무관'}")
-        return is_relevant, reason
+        verdict = self.relevance_gate.check(query)
+        return verdict.is_relevant, verdict.reason
     
-    def _search_specific_articles(self, query: str) -> List[Dict]:
-        """조항 번호 직접 검색"""
+    def _search_specific_articles(self, query: str) -> List[Mapping]:
+        """조항 번호 직접 검색 (청크 번호는 ChunkView.index)"""
         print(f"🎯 조항 검색 시작: '{query}'")
         
         patterns = [
@@ -290,13 +412,11 @@ class RAGEngine:
                 article_num = int(match)
                 print(f"🔍 조항 검색: 제{article_num}조")
                 
-                for i, chunk in enumerate(self.document_chunks):
-                    if chunk.get('article_num') == article_num:
-                        chunk_with_index = chunk.copy()
-                        chunk_with_index['index'] = i
-                        found_articles.append(chunk_with_index)
-                        print(f"✅ 제{article_num}조 발견: {chunk['article_title']}")
-                        break
+                i = self.term_index.article_position(article_num)
+                if i is not None:
+                    chunk = self.document_chunks[i]
+                    found_articles.append(chunk)
+                    print(f"✅ 제{article_num}조 발견: {chunk['article_title']}")
                 else:
                     print(f"❌ 제{article_num}조를 찾을 수 없습니다")
         
@@ -322,18 +442,22 @@ class RAGEngine:
         
         print(f"🔍 의미있는 검색 단어: {meaningful_words}")
         
+        term_index = self.term_index
+        
         for word in meaningful_words:
             matches_for_word = []
             
-            for i, chunk in enumerate(self.document_chunks):
-                chunk_text = chunk['text']
+            # 유사 매칭은 조사를 뗀 어간으로 (어간 변화 고려)
+            exact_word = normalize_term(word, strip_particles=False)
+            stem = normalize_term(word)
+            if len(stem) < 2 or stem in stop_words:
+                continue
+            
+            for i, (title_count, similar_matches) in term_index.frequencies(stem).items():
+                chunk = self.document_chunks[i]
                 
                 # 정확 매칭
-                exact_count = chunk_text.count(word)
-                
-                # 유사 매칭 (어간 변화 고려)
-                word_pattern = word + r'[은는이가을를의에서로부터까지와과도나며으로써에게에서부터]*'
-                similar_matches = len(re.findall(word_pattern, chunk_text))
+                exact_count = similar_matches if exact_word == stem else term_index.body_count(i, exact_word)
                 
                 total_count = exact_count + similar_matches
                 
@@ -344,12 +468,13 @@ class RAGEngine:
                         'index': i,
                         'exact_count': exact_count,
                         'similar_count': similar_matches,
+                        'title_count': title_count,
                         'total_count': total_count,
                         'article_info': f"제{chunk.get('article_num', '?')}조({chunk.get('article_title', 'Unknown')})"
                     })
             
-            # 해당 단어의 매칭 결과를 빈도순으로 정렬
-            matches_for_word.sort(key=lambda x: x['total_count'], reverse=True)
+            # 해당 단어의 매칭 결과를 빈도순으로 정렬 (동률이면 제목 매칭 우선)
+            matches_for_word.sort(key=lambda x: (x['total_count'], x['title_count']), reverse=True)
             
             # 상위 3개만 선택
             for match in matches_for_word[:3]:
@@ -367,27 +492,81 @@ class RAGEngine:
         
         vector_matches = []
         
+        if self.chunk_embeddings is not None:
+            return self._perform_local_vector_search(query, top_k)
+        
         if self.vector_store.client and self.embedding_service.model:
             try:
                 query_embedding = self.embedding_service.encode([query])
-                results = self.vector_store.search(query_embedding[0], top_k=top_k)
-                
-                for result in results:
-                    if result.score > 0.5:  # 임계값
-                        vector_matches.append({
-                            'chunk': result.payload,
-                            'score': result.score * 20,
-                            'method': f'벡터검색({result.score:.3f})',
-                            'index': result.id
-                        })
-                        print(f"🔢 Qdrant 매칭: 점수 {result.score:.3f}")
+                results = self.vector_store.search(query_embedding[0], top_k=top_k, document_id=self.document_id)
+                vector_matches = self._qdrant_matches(results)
+            except Exception as e:
+                print(f"⚠️ Qdrant 검색 실패: {e}")
+        
+        print(f"🔢 벡터 검색 결과: {len(vector_matches)}개")
+        return vector_matches
+    
+    async def _aperform_vector_search(self, query: str, top_k: int) -> List[Dict]:
+        """벡터 검색 비동기 버전 (임베딩 계산은 스레드에서, Qdrant는 비동기 클라이언트로)"""
+        if self.chunk_embeddings is not None:
+            return await asyncio.to_thread(self._perform_local_vector_search, query, top_k)
+        
+        vector_matches = []
+        if self.vector_store.client and self.embedding_service.model:
+            try:
+                query_embedding = await asyncio.to_thread(self.embedding_service.encode, [query])
+                results = await self.vector_store.asearch(query_embedding[0], top_k=top_k, document_id=self.document_id)
+                vector_matches = self._qdrant_matches(results)
             except Exception as e:
                 print(f"⚠️ Qdrant 검색 실패: {e}")
         
         print(f"🔢 벡터 검색 결과: {len(vector_matches)}개")
         return vector_matches
     
-    def _create_enhanced_keyword_index(self, chunks: List[Dict], detected_contract_type: Optional[str] = None) -> Dict:
+    @staticmethod
+    def _qdrant_matches(results) -> List[Dict]:
+        """Qdrant 검색 결과를 검색 매칭 형태로 변환"""
+        vector_matches = []
+        for result in results:
+            if result.score > 0.5:  # 임계값
+                vector_matches.append({
+                    'chunk': result.payload,
+                    'score': result.score * 20,
+                    'method': f'벡터검색({result.score:.3f})',
+                    'index': result.payload.get('chunk_index', result.id)
+                })
+                print(f"🔢 Qdrant 매칭: 점수 {result.score:.3f}")
+        return vector_matches
+    
+    def _perform_local_vector_search(self, query: str, top_k: int) -> List[Dict]:
+        """저장된 임베딩 행렬로 메모리 내 벡터 검색 수행"""
+        vector_matches = []
+        
+        if not self.embedding_service.model:
+            print("⚠️ 임베딩 모델이 없어 벡터 검색을 건너뜁니다")
+            return vector_matches
+        
+        try:
+            query_embedding = self._normalize_rows(self.embedding_service.encode([query]))[0]
+            scores = self.chunk_embeddings @ query_embedding
+            
+            for idx in np.argsort(-scores)[:top_k]:
+                score = float(scores[idx])
+                if score > 0.5:  # 임계값
+                    vector_matches.append({
+                        'chunk': self.document_chunks[idx],
+                        'score': score * 20,
+                        'method': f'벡터검색({score:.3f})',
+                        'index': int(idx)
+                    })
+                    print(f"🔢 로컬 벡터 매칭: 점수 {score:.3f}")
+        except Exception as e:
+            print(f"⚠️ 로컬 벡터 검색 실패: {e}")
+        
+        print(f"🔢 벡터 검색 결과: {len(vector_matches)}개")
+        return vector_matches
+    
+    def _create_enhanced_keyword_index(self, chunks: ChunkTable, detected_contract_type: Optional[str] = None) -> Dict:
         """강화된 키워드 인덱스 생성"""
         print("🔍 강화된 키워드 인덱스 생성 중...")
         
@@ -468,37 +647,37 @@ class RAGEngine:
         print(f"✅ 총 {len(keyword_index)}개 키워드 그룹 생성")
         return keyword_index
     
-    def _create_vector_index(self, chunks: List[Dict]) -> bool:
+    @staticmethod
+    def _embedding_text(chunk) -> str:
+        """임베딩 입력 텍스트 (조항 제목을 반복해 제목 일치 검색 강화)"""
+        title = chunk.article_title
+        return f"{title} {title} {title} {chunk.text}"
+    
+    def _create_vector_index(self, chunks: ChunkTable) -> bool:
         """벡터 인덱스 생성"""
         try:
             print(f"🔢 {len(chunks)}개 청크에 대한 벡터 인덱스 생성 중...")
             
             # 텍스트 강화
-            enhanced_texts = []
-            payloads = []
+            enhanced_texts = [self._embedding_text(chunk) for chunk in chunks]
             
-            for chunk in chunks:
-                title = chunk['article_title']
-                text = chunk['text']
-                enhanced_text = f"{title} {title} {title} {text}"
-                enhanced_texts.append(enhanced_text)
-                
-                # Qdrant용 페이로드
-                payload = {
-                    'article_num': chunk['article_num'],
-                    'article_title': chunk['article_title'],
-                    'text': chunk['text'],
-                    'type': chunk['type']
-                }
-                payloads.append(payload)
+            # Qdrant용 페이로드는 청크 뷰 그대로 (text/article_num/article_title/type/chunk_id)
+            payloads = chunks
             
             # 임베딩 생성
             embeddings = self.embedding_service.encode(enhanced_texts, show_progress_bar=True)
             print(f"📊 임베딩 완료: {embeddings.shape}")
+            self.chunk_embeddings = self._normalize_rows(embeddings)
             
             # Qdrant에 저장
             if self.vector_store.client:
-                if self.vector_store.create_collection(vector_size=embeddings.shape[1]):
+                if self.document_id:
+                    # 문서 단위 저장: 공유 컬렉션은 유지하고 이 문서의 포인트만 갱신
+                    if (self.vector_store.ensure_collection(vector_size=embeddings.shape[1])
+                            and self.vector_store.upsert_document_vectors(self.document_id, embeddings, payloads)):
+                        print("✅ Qdrant 문서 벡터 인덱스 갱신 완료")
+                        return True
+                elif self.vector_store.create_collection(vector_size=embeddings.shape[1]):
                     if self.vector_store.add_vectors(embeddings, payloads):
                         print("✅ Qdrant 벡터 인덱스 생성 완료")
                         return True
@@ -0,0 +1,149 @@
+# apps/rag/services/relevance_gate.py
+"""질문-문서 관련성 게이트
+
+검색 전에 매번 실행되므로 패턴은 import 시 한 번만 컴파일하고,
+문서 쪽은 로딩 시 만들어 둔 역색인으로 확인해 질문 길이에 비례하는 비용만 듭니다.
+"""
+import re
+from typing import NamedTuple, Optional, Tuple
+
+from .inverted_index import InvertedIndex
+from .term_matcher import TermMatcher
+
+# 명백히 문서와 무관한 질문 패턴
+OFF_TOPIC_PATTERNS = [
+    r'(날씨|기상|온도|비|눈|맑음|흐림)',
+    r'(뉴스|신문|방송|언론|기사)',
+    r'(요리|음식|식당|맛집|레시피)',
+    r'(영화|드라마|노래|음악|엔터테인먼트)',
+    r'(게임|스포츠|축구|야구|농구)',
+    r'(정치|선거|대통령|국회|정당)',
+    r'(안녕|생일|나이|결혼|가족)',
+    r'(여행|휴가|관광|호텔|항공)',
+    r'(건강|병원|의사|약|치료)',
+    r'(학교|공부|시험|성적|교육)',
+    r'(컴퓨터|프로그래밍|인터넷|소프트웨어)',
+    r'(수학|과학|물리|화학|생물)',
+    r'(역사|지리|문화|예술|철학)',
+    r'(너는|당신은|ai는|인공지능)',
+    r'(어떻게|왜|언제) (생각|느끼|판단)',
+    r'(좋아하|싫어하|선호하|추천)',
+    r'^(안녕|hello|hi|헬로|하이)$',
+    r'^(고마워|감사|thanks|thank you)$',
+    r'^(응|네|예|yes|no|아니오)$',
+    r'(몇시|언제|지금|오늘|어제|내일)',
+    r'(시간|시각|날짜|요일)',
+    r'(어떻게 해|방법|하는법)(?!.*계약)',
+]
+
+# 조항 번호 직접 언급 패턴
+ARTICLE_PATTERNS = [
+    r'제\s*\d+\s*조',
+    r'\d+\s*조',
+    r'제\s*\d+',
+    r'조항\s*\d+',
+    r'article\s*\d+',
+    r'section\s*\d+',
+    r'clause\s*\d+'
+]
+
+# 계약서 관련 핵심 키워드
+CONTRACT_KEYWORDS = [
+    '계약', '조항', '조', '항', '계약서', '협약', '약정', '협정',
+    '당사자', '발주자', '수급인', '임대인', '임차인', '갑', '을',
+    '의무', '책임', '권리', '권한', '이행', '준수', '완수',
+    '위반', '위배', '불이행', '미이행', '어김',
+    '대금', '비용', '요금', '수수료', '보증금', '계약금', '잔금',
+    '위약금', '연체료', '지체상금', '손해배상', '배상', '보상',
+    '급여', '임금', '월급', '보수', '수당',
+    '기간', '기한', '일자', '날짜', '시점', '완료', '종료', '만료',
+    '연장', '갱신', '연기', '지연',
+    '해지', '해제', '변경', '수정', '갱신', '연장', '파기',
+    '통지', '고지', '신고', '승인', '합의', '동의',
+    '조건', '기준', '방법', '절차', '과정', '내용', '범위',
+    '사항', '세부', '구체', '명시', '규정', '정함',
+    '법적', '법률', '소송', '분쟁', '중재', '판결',
+    '관할', '준거법', '효력', '무효',
+    '납품', '인도', '검수', '하자', '보증', '담보',
+    '면책', '귀책', '과실', '고의'
+]
+
+MEANINGLESS_QUERIES = {'?', '??', '???', '.', '..', '...', 'ㅎ', 'ㅋ', 'ㅠ'}
+
+# import 시 한 번만 컴파일
+_OFF_TOPIC_REGEXES = [(pattern, re.compile(pattern)) for pattern in OFF_TOPIC_PATTERNS]
+_ARTICLE_REGEXES = [(pattern, re.compile(pattern)) for pattern in ARTICLE_PATTERNS]
+_CONTRACT_KEYWORD_CATEGORY = ('relevance', 'contract_keywords')
+_CONTRACT_KEYWORD_MATCHER = TermMatcher({_CONTRACT_KEYWORD_CATEGORY: CONTRACT_KEYWORDS})
+
+
+class RelevanceVerdict(NamedTuple):
+    """관련성 판정 결과와 근거"""
+    is_relevant: bool
+    reason: str
+    pattern: Optional[str] = None
+    contract_keywords: Tuple[str, ...] = ()  # 기본값을 모든 판정이 공유하므로 불변 튜플
+    document_words: Tuple[str, ...] = ()
+    score: int = 0
+
+
+class RelevanceGate:
+    """문서별 관련성 게이트 (문서 로딩 시 한 번 생성)"""
+
+    def __init__(self, term_index: InvertedIndex):
+        self.term_index = term_index
+
+    def check(self, query: str) -> RelevanceVerdict:
+        """질문이 문서와 관련 있는지 판정"""
+        print(f"🔍 강화된 문서 관련성 검사: '{query}'")
+
+        query_lower = query.lower().strip()
+
+        # 1. 명백히 문서와 무관한 질문들
+        for pattern, regex in _OFF_TOPIC_REGEXES:
+            if regex.search(query_lower):
+                print(f"❌ 문서 무관 패턴 감지: {pattern}")
+                return RelevanceVerdict(False, f"off_topic_pattern: {pattern}", pattern=pattern)
+
+        # 2. 너무 짧거나 의미없는 질문
+        if len(query.strip()) < 2:
+            print("❌ 질문이 너무 짧음")
+            return RelevanceVerdict(False, "too_short")
+
+        if query_lower in MEANINGLESS_QUERIES:
+            print("❌ 의미없는 질문")
+            return RelevanceVerdict(False, "meaningless")
+
+        # 3. 조항 번호 직접 언급 (최고 우선순위)
+        for pattern, regex in _ARTICLE_REGEXES:
+            if regex.search(query_lower):
+                print(f"✅ 조항 패턴 감지: {pattern} (최고 우선순위)")
+                return RelevanceVerdict(True, f"article_pattern: {pattern}", pattern=pattern)
+
+        # 4. 계약서 관련 핵심 키워드 체크
+        found_keywords = _CONTRACT_KEYWORD_MATCHER.matched_terms(query_lower).get(_CONTRACT_KEYWORD_CATEGORY, [])
+
+        # 5. 문서 내 단어 확인 (역색인 조회, 문서 길이와 무관)
+        query_words = [word for word in query.split() if len(word) >= 2]
+        found_in_document = [word for word in query_words if self.term_index.contains(word)]
+
+        # 6. 관련성 점수 계산
+        relevance_score = len(found_keywords) * 10 + len(found_in_document) * 5
+
+        # 7. 최종 판단
+        if found_keywords:
+            print(f"✅ 계약 관련 키워드 발견: {found_keywords[:3]}")
+            verdict = RelevanceVerdict(True, f"contract_keywords: {found_keywords[:3]}",
+                                       contract_keywords=tuple(found_keywords),
+                                       document_words=tuple(found_in_document), score=relevance_score)
+        elif len(found_in_document) >= 2:
+            print(f"✅ 문서 내 단어 발견: {found_in_document[:3]}")
+            verdict = RelevanceVerdict(True, f"document_words: {found_in_document[:3]}",
+                                       document_words=tuple(found_in_document), score=relevance_score)
+        else:
+            print(f"❌ 문서와 관련성 낮음 (키워드: {len(found_keywords)}, 문서단어: {len(found_in_document)}, 점수: {relevance_score})")
+            verdict = RelevanceVerdict(False, f"low_relevance: keywords={len(found_keywords)}, doc_words={len(found_in_document)}",
+                                       document_words=tuple(found_in_document), score=relevance_score)
+
+        print(f"🔍 관련성 점수: {relevance_score}, 판정: {'관련' if verdict.is_relevant else '무관'}")
+        return verdict
@@ -0,0 +1,53 @@
+# apps/rag/services/streaming.py
+"""채팅 답변 스트리밍 (Server-Sent Events)
+
+OpenAI `stream=True` 응답의 텍스트 조각을 그대로 SSE 이벤트로 내보내
+전체 생성 시간이 아니라 첫 토큰까지의 시간이 사용자가 느끼는 지연이 되도록 합니다.
+
+이벤트 형식:
+    meta  - 답변 생성 전에 알 수 있는 정보 (검색 정보, 문서 제목 등)
+    token - {"text": "..."} 답변 조각
+    done  - 저장된 메시지 ID 등 완료 정보
+    error - {"error": "..."}
+
+비동기 뷰에서는 이벤트 생성기를 async generator로 넘기면 ASGI 서버가 그대로 흘려보냅니다.
+"""
+import json
+from typing import AsyncIterable, AsyncIterator, Dict, Iterable, Iterator, Union
+
+from django.http import StreamingHttpResponse
+
+
+def sse_event(event: str, data: Dict) -> str:
+    """SSE 이벤트 한 건 직렬화"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def sse_response(events: Union[Iterable[str], AsyncIterable[str]]) -> StreamingHttpResponse:
+    """SSE 스트리밍 응답 (프록시 버퍼링 비활성화)"""
+    response = StreamingHttpResponse(events, content_type='text/event-stream; charset=utf-8')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def iter_completion_text(client, **kwargs) -> Iterator[str]:
+    """chat.completions 스트리밍 호출의 텍스트 조각"""
+    stream = client.chat.completions.create(stream=True, **kwargs)
+    for chunk in stream:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if delta:
+            yield delta
+
+
+async def aiter_completion_text(client, **kwargs) -> AsyncIterator[str]:
+    """iter_completion_text의 비동기 버전 (client는 AsyncOpenAI)"""
+    stream = await client.chat.completions.create(stream=True, **kwargs)
+    async for chunk in stream:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if delta:
+            yield delta
@@ -0,0 +1,179 @@
+# apps/rag/services/term_matcher.py
+"""다중 용어 매처 (Aho–Corasick 오토마톤)
+
+계약서 유형 용어, 위험/핵심 정보 용어, 법률 용어 사전을 하나의 오토마톤으로
+컴파일해 두고, 문서를 한 번만 훑어서 모든 등장 위치와 분류를 찾습니다.
+용어 수가 늘어나도 검색 시간은 문서 길이에 비례합니다.
+"""
+import threading
+from collections import deque
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+# 용어 분류 그룹 (분류 키는 (그룹, 이름) 튜플)
+CONTRACT_TYPE = 'contract_type'
+KEY_INFO = 'key_info'
+RISK = 'risk'
+LEGAL_TERM = 'legal_term'
+
+Category = Tuple[str, str]
+
+
+class TermHit(NamedTuple):
+    """용어 등장 정보"""
+    start: int
+    end: int
+    term: str
+    categories: Tuple[Category, ...]
+
+
+class TermMatcher:
+    """분류별 용어 목록을 컴파일한 Aho–Corasick 매처"""
+
+    def __init__(self, vocabularies: Dict[Category, Iterable[str]]):
+        # 상태별 전이/실패 링크/출력 (출력은 해당 상태에서 끝나는 용어 번호)
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+
+        self._terms = []  # 용어 번호 → 용어
+        self._term_categories = []  # 용어 번호 → 분류 튜플
+        # 분류 → {용어: 목록 내 순서} (결과 정렬 및 우선순위용)
+        self._rank = {}
+
+        term_ids = {}
+        for category, terms in vocabularies.items():
+            ranks = self._rank.setdefault(category, {})
+            for term in terms:
+                if not term or term in ranks:
+                    continue
+                ranks[term] = len(ranks)
+
+                term_id = term_ids.get(term)
+                if term_id is None:
+                    term_id = term_ids[term] = len(self._terms)
+                    self._terms.append(term)
+                    self._term_categories.append([])
+                    self._add(term, term_id)
+                self._term_categories[term_id].append(category)
+
+        self._term_categories = [tuple(categories) for categories in self._term_categories]
+        self._build_failure_links()
+
+    def _add(self, term: str, term_id: int):
+        state = 0
+        for char in term:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[state][char] = next_state
+            state = next_state
+        self._output[state].append(term_id)
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                if self._fail[next_state] == next_state:
+                    self._fail[next_state] = 0
+
+                # 실패 링크 쪽에서 끝나는 용어도 함께 출력
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def __len__(self):
+        return len(self._terms)
+
+    def find_all(self, text: str) -> List[TermHit]:
+        """텍스트를 한 번 훑어 모든 용어 등장 위치 반환 (겹침 포함, 끝 위치 순)"""
+        hits = []
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+
+        for pos, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+
+            for term_id in output[state]:
+                term = self._terms[term_id]
+                hits.append(TermHit(pos + 1 - len(term), pos + 1, term, self._term_categories[term_id]))
+
+        return hits
+
+    def matched_terms(self, text: str, group: Optional[str] = None,
+                      hits: Optional[List[TermHit]] = None) -> Dict[Category, List[str]]:
+        """분류별 등장 용어 (중복 제거, 용어 목록 순서)"""
+        if hits is None:
+            hits = self.find_all(text)
+
+        found = {}
+        for hit in hits:
+            for category in hit.categories:
+                if group is None or category[0] == group:
+                    found.setdefault(category, set()).add(hit.term)
+
+        return {
+            category: sorted(terms, key=self._rank[category].__getitem__)
+            for category, terms in found.items()
+        }
+
+    def leftmost_terms(self, hits: List[TermHit], category: Category) -> List[str]:
+        """정규식 교대 패턴(re.findall)과 같은 방식으로 겹치지 않는 용어 선택
+
+        왼쪽부터, 같은 위치에서는 목록 앞쪽 용어를 고르고 그 끝 이후부터 다시 찾습니다.
+        """
+        ranks = self._rank.get(category, {})
+        best_at = {}
+        for hit in hits:
+            if category in hit.categories:
+                current = best_at.get(hit.start)
+                if current is None or ranks[hit.term] < ranks[current.term]:
+                    best_at[hit.start] = hit
+
+        selected = []
+        position = 0
+        for start in sorted(best_at):
+            if start >= position:
+                hit = best_at[start]
+                selected.append(hit.term)
+                position = hit.end
+        return selected
+
+
+_shared_matcher = None
+_shared_matcher_lock = threading.Lock()
+
+
+def get_term_matcher() -> TermMatcher:
+    """계약서 유형/핵심 정보/위험/법률 용어 공용 매처 (처음 호출 시 한 번 컴파일)"""
+    global _shared_matcher
+    if _shared_matcher is None:
+        with _shared_matcher_lock:
+            if _shared_matcher is None:
+                # 용어 목록 모듈이 이 모듈을 import하므로 여기서 지연 import
+                from .document_processor import CONTRACT_TYPES_TERMS, KEY_INFO_TERMS, RISK_TERMS
+                from .translator import IMPROVED_LANGUAGES
+
+                vocabularies = {}
+                for contract_type, terms in CONTRACT_TYPES_TERMS.items():
+                    vocabularies[(CONTRACT_TYPE, contract_type)] = terms
+                for name, terms in KEY_INFO_TERMS.items():
+                    vocabularies[(KEY_INFO, name)] = terms
+                for name, terms in RISK_TERMS.items():
+                    vocabularies[(RISK, name)] = terms
+                for language, config in IMPROVED_LANGUAGES.items():
+                    if config.get('legal_terms'):
+                        vocabularies[(LEGAL_TERM, language)] = list(config['legal_terms'])
+
+                _shared_matcher = TermMatcher(vocabularies)
+                print(f"🔧 용어 매처 컴파일 완료: {len(_shared_matcher)}개 용어")
+    return _shared_matcher
@@ -1,8 +1,12 @@
 # apps/rag/services/translator.py
-import os
 import openai
 from django.conf import settings
 
+from .analysis_pool import run_chains
+from .llm_cache import acached_chat_completion, cached_chat_completion
+from .openai_client import get_async_openai_client, get_openai_client
+from .streaming import aiter_completion_text, iter_completion_text
+
 # 언어별 시스템 프롬프트 및 설정
 IMPROVED_LANGUAGES = {
     "한국어": {
@@ -64,12 +68,13 @@ class TranslationService:
     """번역 서비스 클래스"""
     
     def __init__(self):
-        # OpenAI 클라이언트 초기화
-        api_key = os.getenv('OPENAI_API_KEY')
-        if not api_key:
-            raise ValueError("OPENAI_API_KEY가 설정되지 않았습니다.")
-        
-        self.client = openai.OpenAI(api_key=api_key)
+        # 프로세스 공용 OpenAI 클라이언트 (요청마다 연결 풀을 새로 만들지 않음)
+        self.client = get_openai_client()
+    
+    @property
+    def async_client(self) -> openai.AsyncOpenAI:
+        """비동기 뷰용 OpenAI 클라이언트 (이벤트 루프별 공용 클라이언트)"""
+        return get_async_openai_client(self.client.api_key)
     
     def translate_to_target_language(self, korean_text: str, target_language: str, content_type: str = "분석") -> str:
         """한국어 텍스트를 목표 언어로 번역"""
@@ -78,6 +83,98 @@ class TranslationService:
 
         print(f"🔄 {content_type}을 {target_language}로 번역 중...")
 
+        messages = self._translation_messages(korean_text, target_language, content_type)
+        if messages is None:
+            print(f"❌ {target_language} 번역 지원하지 않음")
+            return korean_text
+
+        try:
+            translated_content = cached_chat_completion(
+                self.client,
+                model="gpt-3.5-turbo",
+                messages=messages,
+                max_tokens=2000,
+                temperature=0.1,
+                stop=None
+            ).strip()
+            print(f"✅ {target_language} 번역 완료")
+            return translated_content
+
+        except Exception as e:
+            print(f"❌ {target_language} 번역 실패: {str(e)}")
+            return korean_text
+
+    def stream_translate_to_target_language(self, korean_text: str, target_language: str, content_type: str = "분석"):
+        """번역 결과를 생성되는 대로 조각 단위로 반환 (실패시 한국어 원문)"""
+        if target_language == "한국어":
+            yield korean_text
+            return
+
+        messages = self._translation_messages(korean_text, target_language, content_type)
+        if messages is None:
+            yield korean_text
+            return
+
+        print(f"🔄 {content_type}을 {target_language}로 스트리밍 번역 중...")
+        started = False
+        try:
+            for delta in iter_completion_text(self.client, model="gpt-3.5-turbo", messages=messages,
+                                              max_tokens=2000, temperature=0.1):
+                started = True
+                yield delta
+        except Exception as e:
+            print(f"❌ {target_language} 스트리밍 번역 실패: {str(e)}")
+            if started:
+                raise
+            yield korean_text
+
+    async def atranslate_to_target_language(self, korean_text: str, target_language: str, content_type: str = "분석") -> str:
+        """translate_to_target_language의 비동기 버전"""
+        if target_language == "한국어":
+            return korean_text
+
+        messages = self._translation_messages(korean_text, target_language, content_type)
+        if messages is None:
+            print(f"❌ {target_language} 번역 지원하지 않음")
+            return korean_text
+
+        try:
+            translated_content = (await acached_chat_completion(
+                self.async_client,
+                model="gpt-3.5-turbo",
+                messages=messages,
+                max_tokens=2000,
+                temperature=0.1,
+                stop=None
+            )).strip()
+            print(f"✅ {target_language} 번역 완료")
+            return translated_content
+
+        except Exception as e:
+            print(f"❌ {target_language} 번역 실패: {str(e)}")
+            return korean_text
+
+    async def astream_translate_to_target_language(self, korean_text: str, target_language: str, content_type: str = "분석"):
+        """stream_translate_to_target_language의 비동기 버전"""
+        messages = None if target_language == "한국어" else self._translation_messages(korean_text, target_language, content_type)
+        if messages is None:
+            yield korean_text
+            return
+
+        started = False
+        try:
+            async for delta in aiter_completion_text(self.async_client, model="gpt-3.5-turbo", messages=messages,
+                                                     max_tokens=2000, temperature=0.1):
+                started = True
+                yield delta
+        except Exception as e:
+            print(f"❌ {target_language} 스트리밍 번역 실패: {str(e)}")
+            if started:
+                raise
+            yield korean_text
+
+    def _translation_messages(self, korean_text: str, target_language: str, content_type: str):
+        """번역 요청 메시지 (지원하지 않는 언어면 None)"""
         # 번역용 프롬프트
         translation_prompts = {
             "日本語": f"""다음 한국어 계약서 {content_type} 결과를 정확하게 일본어로 번역해주세요.
@@ -129,42 +226,20 @@ Traduzca esto al español natural manteniendo la estructura exacta."""
         system_prompt = translation_system_prompts.get(target_language)
 
         if not user_prompt or not system_prompt:
-            print(f"❌ {target_language} 번역 지원하지 않음")
-            return korean_text
-
-        try:
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                max_tokens=2000,
-                temperature=0.1,
-                stop=None
-            )
+            return None
 
-            translated_content = response.choices[0].message.content.strip()
-            print(f"✅ {target_language} 번역 완료")
-            return translated_content
-
-        except Exception as e:
-            print(f"❌ {target_language} 번역 실패: {str(e)}")
-            return korean_text
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
 
     def extract_legal_terms_from_korean_text(self, text: str) -> str:
         """한국어 텍스트에서만 어려운 법률 용어 추출 및 설명 제공"""
-        legal_terms = IMPROVED_LANGUAGES["한국어"]["legal_terms"]
-        found_terms = {}
+        from .term_matcher import get_term_matcher, LEGAL_TERM
 
-        for term, explanation in legal_terms.items():
-            if term in text:
-                found_terms[term] = explanation
-            elif len(term) >= 3:
-                import re
-                pattern = term + r'[은는이가을를의에서로부터까지와과도나며으로써에게에서부터]'
-                if re.search(pattern, text):
-                    found_terms[term] = explanation
+        legal_terms = IMPROVED_LANGUAGES["한국어"]["legal_terms"]
+        matched = get_term_matcher().matched_terms(text, group=LEGAL_TERM).get((LEGAL_TERM, "한국어"), [])
+        found_terms = {term: legal_terms[term] for term in matched}
 
         if found_terms:
             explanations = []
@@ -184,14 +259,15 @@ class AnalysisService:
     """분석 서비스 클래스"""
     
     def __init__(self):
-        # OpenAI 클라이언트 초기화
-        api_key = os.getenv('OPENAI_API_KEY')
-        if not api_key:
-            raise ValueError("OPENAI_API_KEY가 설정되지 않았습니다.")
-        
-        self.client = openai.OpenAI(api_key=api_key)
+        # 프로세스 공용 OpenAI 클라이언트 (번역 서비스와 같은 클라이언트)
+        self.client = get_openai_client()
         self.translator = TranslationService()
     
+    @property
+    def async_client(self) -> openai.AsyncOpenAI:
+        """비동기 뷰용 OpenAI 클라이언트 (번역 서비스와 공유)"""
+        return self.translator.async_client
+    
     def enhanced_korean_based_summary(self, text: str) -> str:
         """강화된 한국어 기준 요약 생성"""
         print("📋 강화된 한국어 기준 요약 생성 중...")
@@ -221,7 +297,8 @@ class AnalysisService:
 일반적이고 모호한 표현보다는 계약서에 실제로 명시된 내용을 기반으로 구체적으로 설명하세요."""
 
         try:
-            response = self.client.chat.completions.create(
+            return cached_chat_completion(
+                self.client,
                 model="gpt-3.5-turbo",
                 messages=[
                     {"role": "system", "content": """당신은 계약서 전문 분석가입니다. 다음 원칙을 따르세요:
@@ -233,9 +310,7 @@ class AnalysisService:
                 ],
                 max_tokens=1200,
                 temperature=0.1
-            )
-
-            return response.choices[0].message.content.strip()
+            ).strip()
         except Exception as e:
             print(f"❌ 강화된 한국어 요약 생성 실패: {e}")
             return self._fallback_korean_summary()
@@ -280,7 +355,8 @@ class AnalysisService:
 • **주의사항**: ○○를 반드시 확인하고 ○○해야 함"""
 
         try:
-            response = self.client.chat.completions.create(
+            result = cached_chat_completion(
+                self.client,
                 model="gpt-3.5-turbo",
                 messages=[
                     {"role": "system", "content": """당신은 계약서 위험 분석 전문가입니다. 다음 원칙을 엄격히 따르세요:
@@ -301,9 +377,7 @@ class AnalysisService:
                 ],
                 max_tokens=1500,
                 temperature=0.05
-            )
-
-            result = response.choices[0].message.content.strip()
+            ).strip()
             return result
 
         except Exception as e:
@@ -311,29 +385,119 @@ class AnalysisService:
             return self._fallback_korean_risk_analysis(risk_info)
 
     def unified_analysis_with_translation(self, text: str, target_language: str) -> tuple:
-        """강화된 한국어 분석 + 번역 통합 함수"""
+        """강화된 한국어 분석 + 번역 통합 함수 (요약/위험분석 흐름 동시 실행)"""
         print(f"🌍 {target_language} 통일된 분석 시작 (강화된 한국어 기준)")
 
-        # 1단계: 강화된 한국어 분석
-        print("📋 1단계: 강화된 한국어 기준 분석 수행...")
-        korean_summary = self.enhanced_korean_based_summary(text)
-        korean_risk_analysis = self.enhanced_korean_based_risk_analysis(text)
+        needs_translation = target_language != "한국어"
 
-        # 한국어인 경우 그대로 반환
-        if target_language == "한국어":
-            return korean_summary, korean_risk_analysis
+        def summary_chain():
+            korean_summary = self.enhanced_korean_based_summary(text)
+            if not needs_translation:
+                return korean_summary
+            return self.translator.translate_to_target_language(korean_summary, target_language, "요약")
+
+        def risk_chain():
+            korean_risk_analysis = self.enhanced_korean_based_risk_analysis(text)
+            if not needs_translation:
+                return korean_risk_analysis
+            return self.translator.translate_to_target_language(korean_risk_analysis, target_language, "위험분석")
 
-        # 2단계: 다른 언어인 경우 번역 수행
-        print(f"🔄 2단계: {target_language}로 번역 수행...")
-        translated_summary = self.translator.translate_to_target_language(korean_summary, target_language, "요약")
-        translated_risk = self.translator.translate_to_target_language(korean_risk_analysis, target_language, "위험분석")
+        # 1단계(한국어 분석)와 2단계(번역)를 흐름별로 이어서 실행, 두 흐름은 동시에 진행
+        print("📋 한국어 기준 분석" + (f" + {target_language} 번역" if needs_translation else "") + " 수행...")
+        summary, risk_analysis = run_chains(summary_chain, risk_chain)
 
-        return translated_summary, translated_risk
+        return summary, risk_analysis
 
     def generate_document_based_answer(self, question: str, context: str, target_language: str = "한국어") -> str:
         """문서 기반 답변 생성"""
         print(f"💬 문서 기반 답변 생성: {target_language}")
 
+        try:
+            # 한국어로 답변 생성 (문서 기반 강제)
+            response = self.client.chat.completions.create(
+                model="gpt-3.5-turbo",
+                messages=self._document_answer_messages(question, context),
+                max_tokens=1000,
+                temperature=0.03
+            )
+
+            korean_answer = response.choices[0].message.content.strip()
+
+            # 한국어가 아닌 경우 번역
+            if target_language != "한국어":
+                answer = self.translator.translate_to_target_language(korean_answer, target_language, "답변")
+            else:
+                answer = korean_answer
+
+            return answer
+
+        except Exception as e:
+            print(f"❌ 답변 생성 실패: {str(e)}")
+            return self._answer_error_message(e, target_language)
+
+    def stream_document_based_answer(self, question: str, context: str, target_language: str = "한국어"):
+        """문서 기반 답변을 생성되는 대로 조각 단위로 반환
+
+        한국어는 답변 자체를, 다른 언어는 한국어 답변 생성 후 번역 결과를 스트리밍합니다.
+        """
+        print(f"💬 문서 기반 답변 스트리밍: {target_language}")
+        messages = self._document_answer_messages(question, context)
+
+        if target_language == "한국어":
+            yield from iter_completion_text(self.client, model="gpt-3.5-turbo", messages=messages,
+                                            max_tokens=1000, temperature=0.03)
+            return
+
+        response = self.client.chat.completions.create(
+            model="gpt-3.5-turbo",
+            messages=messages,
+            max_tokens=1000,
+            temperature=0.03
+        )
+        korean_answer = response.choices[0].message.content.strip()
+        yield from self.translator.stream_translate_to_target_language(korean_answer, target_language, "답변")
+
+    async def agenerate_document_based_answer(self, question: str, context: str, target_language: str = "한국어") -> str:
+        """generate_document_based_answer의 비동기 버전 (AsyncOpenAI)"""
+        print(f"💬 문서 기반 답변 생성(async): {target_language}")
+
+        try:
+            response = await self.async_client.chat.completions.create(
+                model="gpt-3.5-turbo",
+                messages=self._document_answer_messages(question, context),
+                max_tokens=1000,
+                temperature=0.03
+            )
+            korean_answer = response.choices[0].message.content.strip()
+            return await self.translator.atranslate_to_target_language(korean_answer, target_language, "답변")
+
+        except Exception as e:
+            print(f"❌ 답변 생성 실패: {str(e)}")
+            return self._answer_error_message(e, target_language)
+
+    async def astream_document_based_answer(self, question: str, context: str, target_language: str = "한국어"):
+        """stream_document_based_answer의 비동기 버전 (AsyncOpenAI)"""
+        print(f"💬 문서 기반 답변 스트리밍(async): {target_language}")
+        messages = self._document_answer_messages(question, context)
+
+        if target_language == "한국어":
+            async for delta in aiter_completion_text(self.async_client, model="gpt-3.5-turbo", messages=messages,
+                                                     max_tokens=1000, temperature=0.03):
+                yield delta
+            return
+
+        response = await self.async_client.chat.completions.create(
+            model="gpt-3.5-turbo",
+            messages=messages,
+            max_tokens=1000,
+            temperature=0.03
+        )
+        korean_answer = response.choices[0].message.content.strip()
+        async for delta in self.translator.astream_translate_to_target_language(korean_answer, target_language, "답변"):
+            yield delta
+
+    def _document_answer_messages(self, question: str, context: str) -> list:
+        """문서 기반 답변 요청 메시지"""
         korean_prompt = f"""아래 계약서 조항들을 바탕으로 질문에 정확히 답변해주세요.
 
 질문: {question}
@@ -355,12 +519,8 @@ class AnalysisService:
 
 위 계약서 조항들의 내용만을 근거로 정확히 답변해주세요."""
 
-        try:
-            # 한국어로 답변 생성 (문서 기반 강제)
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": """당신은 계약서 전문 해석 AI입니다.
+        return [
+            {"role": "system", "content": """당신은 계약서 전문 해석 AI입니다.
 
 **절대적 규칙**:
 1. 제공된 계약서 조항의 내용만을 바탕으로 답변하세요
@@ -371,101 +531,29 @@ class AnalysisService:
 6. 한국어로만 답변하세요
 
 이 규칙을 위반하면 답변을 거부당합니다."""},
-                    {"role": "user", "content": korean_prompt}
-                ],
-                max_tokens=1000,
-                temperature=0.03
-            )
-
-            korean_answer = response.choices[0].message.content.strip()
-
-            # 한국어가 아닌 경우 번역
-            if target_language != "한국어":
-                answer = self.translator.translate_to_target_language(korean_answer, target_language, "답변")
-            else:
-                answer = korean_answer
-
-            return answer
-
-        except Exception as e:
-            print(f"❌ 답변 생성 실패: {str(e)}")
-            error_messages = {
-                "한국어": f"답변 생성 중 오류가 발생했습니다: {str(e)}",
-                "日本語": f"回答生成中にエラーが発生しました: {str(e)}",
-                "中文": f"生成回答时发生错误: {str(e)}",
-                "English": f"Error occurred while generating response: {str(e)}",
-                "Español": f"Error al generar respuesta: {str(e)}"
-            }
-            return error_messages.get(target_language, error_messages["한국어"])
+            {"role": "user", "content": korean_prompt}
+        ]
+
+    def _answer_error_message(self, error: Exception, target_language: str) -> str:
+        """답변 생성 실패 안내 (언어별)"""
+        error_messages = {
+            "한국어": f"답변 생성 중 오류가 발생했습니다: {str(error)}",
+            "日本語": f"回答生成中にエラーが発生しました: {str(error)}",
+            "中文": f"生成回答时发生错误: {str(error)}",
+            "English": f"Error occurred while generating response: {str(error)}",
+            "Español": f"Error al generar respuesta: {str(error)}"
+        }
+        return error_messages.get(target_language, error_messages["한국어"])
 
     def _extract_key_contract_info(self, text: str) -> dict:
         """계약서에서 핵심 정보 추출"""
-        from .document_processor import CONTRACT_TYPES_TERMS
-        import re
-
-        info = {
-            'contract_type': None,
-            'keywords': [],
-            'financial_terms': [],
-            'period_terms': []
-        }
-
-        # 계약 유형 감지
-        for contract_type in CONTRACT_TYPES_TERMS.keys():
-            if any(term in text for term in CONTRACT_TYPES_TERMS[contract_type][:3]):
-                info['contract_type'] = contract_type
-                break
-
-        # 금액 관련 용어
-        financial_pattern = r'(대금|비용|요금|수수료|보증금|위약금|연체료|지체상금|계약금|잔금)'
-        info['financial_terms'] = list(set(re.findall(financial_pattern, text)))
-
-        # 기간 관련 용어
-        period_pattern = r'(기간|기한|일자|날짜|시점|시기|완료|종료|만료)'
-        info['period_terms'] = list(set(re.findall(period_pattern, text)))
-
-        # 일반 키워드
-        general_keywords = ['계약', '당사자', '의무', '권리', '책임', '조건', '기준', '방법']
-        info['keywords'] = [kw for kw in general_keywords if kw in text]
-
-        return info
+        from .document_processor import DocumentProcessor
+        return DocumentProcessor.extract_key_contract_info(text)
 
     def _extract_detailed_risk_info(self, text: str) -> dict:
         """상세한 위험 관련 정보 추출"""
-        import re
-
-        risk_info = {
-            'risk_keywords': [],
-            'liability_terms': [],
-            'termination_terms': [],
-            'obligation_terms': [],
-            'penalty_terms': []
-        }
-
-        # 손해배상 관련
-        liability_pattern = r'(손해배상|배상책임|배상의무|손실보상|피해보상|손해|배상)'
-        risk_info['liability_terms'] = list(set(re.findall(liability_pattern, text)))
-
-        # 해지 관련
-        termination_pattern = r'(해지|해제|종료|중단|파기|취소|철회)'
-        risk_info['termination_terms'] = list(set(re.findall(termination_pattern, text)))
-
-        # 의무 관련
-        obligation_pattern = r'(의무|책임|이행|준수|완수|수행|실행)'
-        risk_info['obligation_terms'] = list(set(re.findall(obligation_pattern, text)))
-
-        # 제재 관련
-        penalty_pattern = r'(위약금|연체료|지체상금|벌금|과태료|제재|처벌|징계)'
-        risk_info['penalty_terms'] = list(set(re.findall(penalty_pattern, text)))
-
-        # 전체 위험 키워드
-        risk_info['risk_keywords'] = (
-            risk_info['liability_terms'] +
-            risk_info['termination_terms'] +
-            risk_info['penalty_terms']
-        )
-
-        return risk_info
+        from .document_processor import DocumentProcessor
+        return DocumentProcessor.extract_detailed_risk_info(text)
 
     def _fallback_korean_summary(self) -> str:
         """폴백 요약"""
@@ -560,7 +648,8 @@ class AnalysisService:
     위 형식으로 5가지 위험을 모두 분석하세요. "위험이 있다", "주의가 필요하다" 같은 모호한 표현은 사용 금지입니다."""
 
         try:
-            response = self.client.chat.completions.create(
+            return cached_chat_completion(
+                self.client,
                 model="gpt-3.5-turbo",
                 messages=[
                     {"role": "system", "content": "계약서 위험분석 전문가. 반드시 구체적이고 실용적인 분석만 제공. 모호한 표현 절대 금지."},
@@ -568,9 +657,7 @@ class AnalysisService:
                 ],
                 max_tokens=1500,
                 temperature=0.03
-            )
-
-            return response.choices[0].message.content.strip()
+            ).strip()
 
         except Exception as e:
             print(f"❌ 재시도도 실패: {e}")
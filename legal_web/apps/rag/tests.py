@@ -1,9 +1,48 @@
 # teamproject/legal_web/apps/rag/tests.py
 
-from django.test import TestCase, Client
+from django.test import TestCase, SimpleTestCase, Client, override_settings
 from django.urls import reverse
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils import timezone
+import asyncio
 import json
+import os
+import pickle
+import re
+import tempfile
+import time
+import unicodedata
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest import mock
+
+import numpy as np
+
+from .services.article_diff import PreviousChunk, diff_articles
+from .services.chunk_table import CHUNK_FIELDS, ChunkTable
+from .services.disk_cache import DiskLRUCache
+from .services.document_processor import DocumentProcessor
+from .services.engine_cache import EngineCache, estimate_engine_bytes
+from .services.embedding_cache import EmbeddingCache
+from .services.llm_cache import LLMResponseCache
+from .services.openai_client import get_async_openai_client, get_openai_client
+from .services.qdrant_scroll import iter_scroll
+from .services.qdrant_upsert import upsert_points
+from .services.qdrant_registry import QdrantClientRegistry, QdrantUnavailableError, _TrackedClient
+from .models import Document, IngestionJob
+from .services import job_queue
+from .services.job_queue import claim_next_job, enqueue_job, requeue_stale_jobs, run_job
+from .services.inverted_index import InvertedIndex, normalize_term
+from .services.qdrant_client import DOCUMENT_COLLECTION_NAME
+from .services.pdf_extractor import ExtractionBudgetExceeded, extract_pdf_text, page_for_offset
+from .services.rag_engine import RAGEngine
+from .services.relevance_gate import RelevanceGate, RelevanceVerdict
+from .services.term_matcher import TermMatcher
+from . import views
+from .views import discard_document
 
 # TestCase는 각 테스트 후 DB를 초기화해주는 등 테스트 환경을 제공합니다.
 class RagAPITestCase(TestCase):
@@ -118,4 +157,639 @@ class RagAPITestCase(TestCase):
         response_data = response.json()
         self.assertIn('error', response_data)
         self.assertIn('분석된 문서가 없습니다', response_data['error'])
-        print("✅ '분석 없이 질문 시 에러 처리' 테스트 통과")
\ No newline at end of file
+        print("✅ '분석 없이 질문 시 에러 처리' 테스트 통과")
+
+
+def _raising_job_handler(job, progress):
+    """작업 큐 테스트용: 항상 예외 (재시도 대상)"""
+    raise RuntimeError('일시 오류')
+
+
+def _succeeding_job_handler(job, progress):
+    """작업 큐 테스트용: 성공"""
+    progress('working', 50)
+    return {'success': True, 'value': job.payload.get('value')}
+
+
+def _slow_job_handler(job, progress):
+    """작업 큐 테스트용: 진행 보고 없이 오래 걸리는 단계"""
+    time.sleep(0.2)
+    return {'success': True}
+
+
+@override_settings(RAG_JOB_MAX_ATTEMPTS=2, RAG_JOB_STALE_SECONDS=60)
+class JobQueueTestCase(TestCase):
+    """DB 작업 큐 상태 전이 테스트 (등록 → 실행 → 재시도/실패, 중단 작업 복구)"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='worker-test', password='pw')
+        self.document = Document.objects.create(
+            user=self.user, title='계약서.txt', file='documents/test.txt', file_type='txt',
+            file_size=1, text_content=''
+        )
+
+    def use_handler(self, handler_name):
+        return mock.patch.dict(job_queue.JOB_HANDLERS, {'rag_document': f'apps.rag.tests.{handler_name}'})
+
+    def test_claim_takes_oldest_queued_job_once(self):
+        first = enqueue_job('rag_document', {'value': 1}, user=self.user, document=self.document)
+        second = enqueue_job('rag_document', {'value': 2}, user=self.user)
+        self.assertEqual(Document.objects.get(pk=self.document.pk).processing_status, 'queued')
+
+        claimed = claim_next_job('w1')
+        self.assertEqual((claimed.id, claimed.status, claimed.attempts, claimed.worker_id),
+                         (first.id, 'running', 1, 'w1'))
+        self.assertEqual(Document.objects.get(pk=self.document.pk).processing_status, 'processing')
+        self.assertEqual(claim_next_job('w2').id, second.id)
+        self.assertIsNone(claim_next_job('w3'))
+
+    def test_success_completes_job_and_document(self):
+        enqueue_job('rag_document', {'value': 7}, user=self.user, document=self.document)
+        with self.use_handler('_succeeding_job_handler'):
+            self.assertTrue(run_job(claim_next_job('w1')))
+
+        job = IngestionJob.objects.get()
+        self.assertEqual((job.status, job.progress, job.result['value']), ('completed', 100, 7))
+        self.assertEqual(Document.objects.get(pk=self.document.pk).processing_status, 'completed')
+
+    def test_exception_requeues_until_max_attempts_then_fails(self):
+        enqueue_job('rag_document', {}, user=self.user, document=self.document)
+        with self.use_handler('_raising_job_handler'):
+            self.assertFalse(run_job(claim_next_job('w1')))
+            job = IngestionJob.objects.get()
+            self.assertEqual((job.status, job.stage, job.attempts), ('queued', 'retry_queued', 1))
+            self.assertIn('일시 오류', job.error)
+            self.assertEqual(Document.objects.get(pk=self.document.pk).processing_status, 'queued')
+
+            self.assertFalse(run_job(claim_next_job('w1')))
+
+        job = IngestionJob.objects.get()
+        self.assertEqual((job.status, job.attempts), ('failed', 2))
+        self.assertIsNotNone(job.finished_at)
+        self.assertEqual(Document.objects.get(pk=self.document.pk).processing_status, 'failed')
+        self.assertIsNone(claim_next_job('w1'))
+
+    def test_document_processing_error_is_retried_before_discarding(self):
+        enqueue_job('rag_document', {'language': '한국어'}, user=self.user, document=self.document)
+        with mock.patch('apps.rag.views.QdrantVectorStore') as store_class, \
+                mock.patch('apps.rag.views.DocumentProcessor.extract_document',
+                           side_effect=RuntimeError('일시 오류')):
+            self.assertFalse(run_job(claim_next_job('w1')))
+            # 첫 실패는 재시도 대기 (문서 유지)
+            self.assertEqual(IngestionJob.objects.get().status, 'queued')
+            self.assertTrue(Document.objects.filter(pk=self.document.pk).exists())
+            store_class.return_value.delete_document.assert_not_called()
+
+            self.assertFalse(run_job(claim_next_job('w1')))
+
+        job = IngestionJob.objects.get()
+        self.assertEqual((job.status, job.attempts), ('failed', 2))
+        self.assertIn('일시 오류', job.error)
+        self.assertFalse(Document.objects.filter(pk=self.document.pk).exists())
+        store_class.return_value.delete_document.assert_called_once_with(self.document.id)
+
+    @override_settings(RAG_JOB_HEARTBEAT_SECONDS=0.02)
+    def test_heartbeat_is_sent_while_handler_runs(self):
+        enqueue_job('rag_document', {}, user=self.user)
+        with self.use_handler('_slow_job_handler'), \
+                mock.patch.object(job_queue.JobHeartbeat, 'touch') as touch:
+            self.assertTrue(run_job(claim_next_job('w1')))
+
+        self.assertGreaterEqual(touch.call_count, 2)
+        # 작업이 끝나면 heartbeat 스레드도 종료
+        calls = touch.call_count
+        time.sleep(0.05)
+        self.assertEqual(touch.call_count, calls)
+
+    def test_stale_running_jobs_are_requeued_or_failed(self):
+        enqueue_job('rag_document', {}, user=self.user, document=self.document)
+        job = claim_next_job('dead-worker')
+        IngestionJob.objects.filter(pk=job.pk).update(heartbeat_at=timezone.now() - timedelta(seconds=120))
+
+        self.assertEqual(requeue_stale_jobs(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.stage), ('queued', 'retry_queued'))
+        self.assertIn('dead-worker', job.error)
+
+        # 최대 시도 횟수까지 중단되면 다시 넣지 않고 실패 처리
+        job = claim_next_job('dead-worker')
+        self.assertEqual(job.attempts, 2)
+        IngestionJob.objects.filter(pk=job.pk).update(heartbeat_at=timezone.now() - timedelta(seconds=120))
+        self.assertEqual(requeue_stale_jobs(), 0)
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+        self.assertEqual(Document.objects.get(pk=self.document.pk).processing_status, 'failed')
+
+    def test_recent_running_job_is_not_requeued(self):
+        enqueue_job('rag_document', {}, user=self.user)
+        claim_next_job('w1')
+        self.assertEqual(requeue_stale_jobs(), 0)
+        self.assertEqual(IngestionJob.objects.get().status, 'running')
+
+    def test_analyze_job_keeps_upload_for_retries(self):
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            file_path = default_storage.save('uploads/terms.txt', ContentFile('제1조(목적) 본 약관은...'.encode('utf-8')))
+            enqueue_job('documents_analyze', {
+                'file_path': file_path, 'file_name': 'terms.txt', 'doc_type': 'terms', 'session_id': 's1',
+            }, user=self.user)
+
+            with mock.patch('apps.documents.doc_services.analyze_terms_document',
+                            side_effect=RuntimeError('일시 오류')):
+                self.assertFalse(run_job(claim_next_job('w1')))
+                # 재시도가 같은 파일을 다시 열 수 있어야 함
+                self.assertTrue(default_storage.exists(file_path))
+                self.assertEqual(IngestionJob.objects.get().status, 'queued')
+
+                self.assertFalse(run_job(claim_next_job('w1')))
+            self.assertEqual(IngestionJob.objects.get().status, 'failed')
+            self.assertFalse(default_storage.exists(file_path))
+
+
+class DiscardDocumentTestCase(TestCase):
+    """문서 삭제 시 공유 Qdrant 컬렉션 정리 테스트"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='discard-test', password='pw')
+
+    def create_document(self, **fields):
+        return Document.objects.create(
+            user=self.user, title='계약서.txt', file='documents/test.txt', file_type='txt',
+            file_size=1, text_content='', **fields
+        )
+
+    def test_deletes_shared_collection_vectors_before_document(self):
+        # 처리 도중 실패한 문서는 컬렉션 이름/색인 여부가 기록되지 않았어도 벡터를 지움
+        document = self.create_document(vector_indexed=False)
+        document_id = document.id
+        with mock.patch('apps.rag.views.QdrantVectorStore') as store_class:
+            discard_document(document)
+
+        store_class.assert_called_once_with(DOCUMENT_COLLECTION_NAME)
+        store_class.return_value.delete_document.assert_called_once_with(document_id)
+        self.assertFalse(Document.objects.filter(pk=document_id).exists())
+
+    def test_failed_processing_job_discards_document(self):
+        document = self.create_document()
+        job = enqueue_job('rag_document', {'language': '한국어'}, user=self.user, document=document)
+        with mock.patch('apps.rag.views.QdrantVectorStore') as store_class, \
+                mock.patch('apps.rag.views.DocumentUploadView._process_document',
+                           return_value={'success': False, 'error': '❌ 텍스트 추출 실패'}):
+            self.assertFalse(run_job(claim_next_job('w1')))
+
+        store_class.return_value.delete_document.assert_called_once_with(document.id)
+        self.assertFalse(Document.objects.filter(pk=document.pk).exists())
+        self.assertEqual(IngestionJob.objects.get(pk=job.pk).status, 'failed')
+
+
+class InvertedIndexTestCase(SimpleTestCase):
+    """문서 청크 n-gram 역색인 테스트"""
+
+    def setUp(self):
+        self.chunks = [
+            {'article_num': 1, 'article_title': '목적', 'text': '제1조(목적) 이 계약은 임대차에 관한 사항을 정한다.', 'type': 'article'},
+            {'article_num': 2, 'article_title': '보증금', 'text': '제2조(보증금) 임차인은 보증금을 지급한다. 보증금은 반환한다.', 'type': 'article'},
+            {'article_num': 3, 'article_title': '해지', 'text': '제3조(해지) 임대인은 계약을 해지할 수 있다.', 'type': 'article'},
+        ]
+        self.index = InvertedIndex(self.chunks)
+
+    def test_normalize_term_strips_particles(self):
+        self.assertEqual(normalize_term('보증금은'), '보증금')
+        self.assertEqual(normalize_term('해지를?'), '해지')
+        # 어간이 너무 짧아지면 조사를 떼지 않음
+        self.assertEqual(normalize_term('합의'), '합의')
+
+    def test_frequencies_match_substring_counts(self):
+        hits = self.index.frequencies('보증금')
+        self.assertEqual(list(hits), [1])
+        self.assertEqual(hits[1], (1, 3))
+        self.assertEqual(self.index.chunks_containing('계약'), [0, 2])
+        self.assertEqual(self.index.chunks_containing('없는단어'), [])
+
+    def test_postings_hold_title_and_body_frequencies(self):
+        # 3자 이하 질의어는 포스팅 빈도만으로 답함 (원문 확인 없음)
+        self.assertEqual(list(self.index.postings['보증금']), [1, 1, 3])
+        self.assertEqual(self.index.frequencies('해지'), {2: (1, 2)})
+        self.assertEqual(self.index.frequencies('금'), {1: (1, 3)})
+        # 긴 질의어는 후보 청크만 원문에서 확인
+        self.assertEqual(self.index.frequencies('보증금을 지급'), {1: (0, 1)})
+        self.assertEqual(self.index.frequencies('보증금 해지'), {})
+        self.assertTrue(self.index.contains('임대차'))
+        self.assertFalse(self.index.contains('위약금'))
+        self.assertFalse(hasattr(self.index, 'bodies'))
+
+    def test_article_position(self):
+        self.assertEqual(self.index.article_position(3), 2)
+        self.assertIsNone(self.index.article_position(10))
+
+    def test_relevance_verdicts_do_not_share_word_lists(self):
+        gate = RelevanceGate(self.index)
+        verdict = gate.check('보증금은 반환되나요?')
+        self.assertTrue(verdict.is_relevant)
+        self.assertIsInstance(verdict.document_words, tuple)
+        self.assertIsInstance(verdict.contract_keywords, tuple)
+        self.assertEqual(RelevanceVerdict(False, 'too_short').contract_keywords, ())
+
+
+class ChunkTableTestCase(SimpleTestCase):
+    """위치 기반 청크 테이블 테스트"""
+
+    def setUp(self):
+        self.text = "임대차 계약서\n\n" + "".join(
+            f"  제{num}조(조항{num})\n임차인은 매월 차임을 지급한다.\n" for num in range(1, 6)
+        )
+        self.chunks = DocumentProcessor.extract_articles_with_content(self.text)
+
+    def test_views_slice_original_text(self):
+        self.assertEqual(len(self.chunks), 5)
+        chunk = self.chunks[1]
+        self.assertEqual(chunk['text'], "제2조(조항2)\n임차인은 매월 차임을 지급한다.")
+        self.assertEqual((chunk.header, chunk.body), ("제2조(조항2)", "임차인은 매월 차임을 지급한다."))
+        self.assertEqual((chunk['article_num'], chunk.get('article_title'), chunk['type']), (2, '조항2', 'article'))
+        self.assertIs(self.chunks.source, self.text)
+        # Qdrant 페이로드처럼 dict로 펼칠 수 있음
+        self.assertEqual(tuple({**chunk}), CHUNK_FIELDS)
+        self.assertEqual(self.chunks[-1].index, 4)
+
+    def test_from_rows_and_pickle_size(self):
+        self.chunks.set_chunk_ids(f'id-{i}' for i in range(len(self.chunks)))
+        rows = [(c['chunk_id'], c['text'], c['type'], c['article_num'], c['article_title']) for c in self.chunks]
+        restored = ChunkTable.from_rows(rows)
+        self.assertEqual([dict(c) for c in restored], [dict(c) for c in self.chunks])
+
+        as_dicts = [dict(c, header=c.header, body=c.body) for c in restored]
+        self.assertLess(len(pickle.dumps(restored)), len(pickle.dumps(as_dicts)))
+        self.assertEqual([dict(c) for c in pickle.loads(pickle.dumps(restored))], [dict(c) for c in restored])
+
+    def test_search_results_are_json_serializable(self):
+        # 채팅 응답(JsonResponse)/SSE done 이벤트에 검색 결과가 그대로 들어감
+        engine = RAGEngine()
+        engine.document_chunks = self.chunks
+        engine.document_chunks.set_chunk_ids(f'id-{i}' for i in range(len(self.chunks)))
+        results = engine.search("제2조 차임")
+        self.assertTrue(results)
+        decoded = json.loads(json.dumps(results, ensure_ascii=False))
+        self.assertEqual(decoded[0]['chunk']['text'], self.chunks[1]['text'])
+        self.assertEqual(decoded[0]['chunk']['chunk_id'], 'id-1')
+
+
+class ArticleDiffTestCase(SimpleTestCase):
+    """수정본 조항 비교 테스트"""
+
+    def chunks(self, text):
+        return DocumentProcessor.extract_articles_with_content(text)
+
+    def previous(self, chunks):
+        return [PreviousChunk(f'id-{i}', chunk.content_hash, i, b'vector') for i, chunk in enumerate(chunks)]
+
+    def setUp(self):
+        self.articles = [f"제{num}조(조항{num})\n임차인은 매월 {num}일에 차임을 지급한다.\n" for num in range(1, 6)]
+        self.old_chunks = self.chunks("".join(self.articles))
+
+    def test_unchanged_revision_reuses_every_chunk(self):
+        new_chunks = self.chunks("".join(self.articles))
+        diff = diff_articles([c.content_hash for c in new_chunks], self.previous(self.old_chunks))
+        self.assertTrue(diff.unchanged)
+        self.assertEqual(diff.summary(), {'chunk_count': 5, 'reused': 5, 'added': 0, 'removed': 0, 'moved': 0})
+
+    def test_only_changed_and_shifted_articles_are_reprocessed(self):
+        # 제2조 수정, 제4조 삭제 → 제5조는 순서만 바뀜
+        articles = list(self.articles)
+        articles[1] = articles[1].replace("지급한다", "계좌로 지급한다")
+        del articles[3]
+        new_chunks = self.chunks("".join(articles))
+        diff = diff_articles([c.content_hash for c in new_chunks], self.previous(self.old_chunks))
+
+        self.assertEqual(diff.added, [1])
+        self.assertEqual(sorted(chunk.chunk_id for chunk in diff.removed), ['id-1', 'id-3'])
+        self.assertEqual({i: chunk.chunk_id for i, chunk in diff.reused.items()}, {0: 'id-0', 2: 'id-2', 3: 'id-4'})
+        self.assertEqual(diff.moved, [3])
+        self.assertFalse(diff.unchanged)
+
+    def test_rows_without_embedding_or_reuse_disabled_are_reprocessed(self):
+        hashes = [c.content_hash for c in self.old_chunks]
+        previous = self.previous(self.old_chunks)
+        previous[0] = previous[0]._replace(embedding=None)
+        self.assertEqual(diff_articles(hashes, previous).added, [0])
+        diff = diff_articles(hashes, previous, reuse=False)
+        self.assertEqual((len(diff.added), len(diff.removed), diff.reused), (5, 5, {}))
+
+
+class TermMatcherTestCase(SimpleTestCase):
+    """다중 용어 매처 테스트"""
+
+    def setUp(self):
+        self.matcher = TermMatcher({
+            ('risk', 'liability'): ['손해배상', '손해', '배상'],
+            ('contract_type', '임대차계약서'): ['임대인', '보증금', '손해배상'],
+        })
+
+    def test_find_all_returns_overlapping_hits_with_categories(self):
+        hits = self.matcher.find_all('임대인은 손해배상')
+        terms = [(hit.start, hit.term) for hit in hits]
+        self.assertIn((0, '임대인'), terms)
+        self.assertIn((5, '손해'), terms)
+        self.assertIn((5, '손해배상'), terms)
+        self.assertIn((7, '배상'), terms)
+
+        matched = self.matcher.matched_terms('임대인은 손해배상', group='contract_type')
+        self.assertEqual(matched, {('contract_type', '임대차계약서'): ['임대인', '손해배상']})
+
+    def test_leftmost_terms_follow_regex_alternation(self):
+        text = '손해배상 및 손해, 배상'
+        hits = self.matcher.find_all(text)
+        self.assertEqual(
+            self.matcher.leftmost_terms(hits, ('risk', 'liability')),
+            re.findall(r'(손해배상|손해|배상)', text)
+        )
+
+
+class EmbeddingCacheTestCase(SimpleTestCase):
+    """임베딩 캐시 테스트"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.store = DiskLRUCache(os.path.join(self.tmpdir.name, 'embeddings.sqlite3'), max_bytes=1024 * 1024)
+        self.cache = EmbeddingCache(self.store)
+        self.computed = []
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def compute(self, texts):
+        self.computed.append(list(texts))
+        return [[float(len(text)), 0.5] for text in texts]
+
+    def test_dedupes_within_batch_and_reuses_across_calls(self):
+        first = self.cache.embed('model', ['가 나', '가  나', '다'], self.compute)
+        self.assertEqual(self.computed, [['가 나', '다']])
+        self.assertEqual(first[0].tolist(), first[1].tolist())
+
+        second = self.cache.embed('model', ['다', '가 나'], self.compute)
+        self.assertEqual(len(self.computed), 1)
+        self.assertEqual(second[0].tolist(), first[2].tolist())
+        self.assertEqual(self.cache.stats()['hits'], 2)
+
+    def test_computes_the_normalized_text_used_for_the_key(self):
+        decomposed = unicodedata.normalize('NFD', '조항')
+        vectors = self.cache.embed('model', [f' {decomposed}\n 내용 '], self.compute)
+        self.assertEqual(self.computed, [['조항 내용']])
+
+        # 같은 키의 다른 표기는 캐시에서 같은 벡터를 받음
+        cached = self.cache.embed('model', ['조항 내용'], self.compute)
+        self.assertEqual(len(self.computed), 1)
+        self.assertEqual(cached[0].tolist(), vectors[0].tolist())
+
+    def test_model_is_part_of_key(self):
+        self.cache.embed('model-a', ['조항'], self.compute)
+        self.cache.embed('model-b', ['조항'], self.compute)
+        self.assertEqual(len(self.computed), 2)
+
+    def test_evicts_least_recently_used_entries(self):
+        store = DiskLRUCache(os.path.join(self.tmpdir.name, 'small.sqlite3'), max_bytes=100)
+        for i in range(10):
+            store.set(f'key{i}'.encode(), b'x' * 20)
+        self.assertLessEqual(store.stats()['total_bytes'], 100)
+        self.assertIsNotNone(store.get(b'key9'))
+        self.assertIsNone(store.get(b'key0'))
+
+
+class LLMResponseCacheTestCase(SimpleTestCase):
+    """LLM 응답 캐시 테스트"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache = LLMResponseCache(DiskLRUCache(os.path.join(self.tmpdir.name, 'llm.sqlite3'), max_bytes=1024 * 1024))
+        self.calls = []
+
+        def create(**kwargs):
+            self.calls.append(kwargs)
+            message = SimpleNamespace(content=f"응답 {len(self.calls)}")
+            return SimpleNamespace(choices=[SimpleNamespace(message=message)],
+                                   usage=SimpleNamespace(total_tokens=100))
+
+        self.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def complete(self, **overrides):
+        kwargs = {'model': 'gpt-4o-mini', 'messages': [{'role': 'user', 'content': '번역'}],
+                  'max_tokens': 100, 'temperature': 0.1, **overrides}
+        return self.cache.complete(self.client, **kwargs)
+
+    def test_same_request_is_served_from_cache(self):
+        self.assertEqual(self.complete(), '응답 1')
+        self.assertEqual(self.complete(), '응답 1')
+        self.assertEqual(len(self.calls), 1)
+
+        stats = self.cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['saved_tokens']), (1, 1, 100))
+
+    def test_parameters_are_part_of_key(self):
+        self.complete()
+        self.complete(temperature=0.5)
+        self.complete(max_tokens=200)
+        self.complete(messages=[{'role': 'user', 'content': '요약'}])
+        self.assertEqual(len(self.calls), 4)
+
+    def test_expired_entries_are_recomputed(self):
+        self.complete(ttl=-1)
+        self.complete()
+        self.assertEqual(len(self.calls), 2)
+
+    def test_async_client_shares_cache_with_sync_client(self):
+        async def acreate(**kwargs):
+            return self.client.chat.completions.create(**kwargs)
+
+        async_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=acreate)))
+        kwargs = {'model': 'gpt-4o-mini', 'messages': [{'role': 'user', 'content': '번역'}],
+                  'max_tokens': 100, 'temperature': 0.1}
+
+        self.assertEqual(asyncio.run(self.cache.acomplete(async_client, **kwargs)), '응답 1')
+        self.assertEqual(self.complete(), '응답 1')
+        self.assertEqual(len(self.calls), 1)
+
+
+class OpenAIClientTestCase(SimpleTestCase):
+    """공용 OpenAI/AsyncOpenAI 클라이언트 테스트"""
+
+    def test_sync_client_is_shared_across_requests(self):
+        first, second = get_openai_client('sk-test'), get_openai_client('sk-test')
+        self.assertIs(first, second)
+        # 일반 채팅 뷰도 같은 클라이언트 사용
+        self.assertIs(views.get_openai_client(), first)
+
+    def test_async_client_is_shared_within_event_loop(self):
+        async def two_requests():
+            return get_async_openai_client('sk-test'), get_async_openai_client('sk-test')
+
+        first, second = asyncio.run(two_requests())
+        self.assertIs(first, second)
+        # 다른 이벤트 루프는 연결이 묶이지 않도록 별도 클라이언트
+        other, _ = asyncio.run(two_requests())
+        self.assertIsNot(other, first)
+
+
+class EngineCacheTestCase(SimpleTestCase):
+    """복원된 엔진 캐시 테스트"""
+
+    def make_engine(self, chunk_count=3):
+        rows = [
+            (f'chunk-{i}', f"제{i + 1}조(조항{i + 1}) 임대인은 임차인에게 보증금을 반환한다.", 'article', i + 1, f'조항{i + 1}',
+             np.ones(8, dtype=np.float32).tobytes())
+            for i in range(chunk_count)
+        ]
+        document = SimpleNamespace(contract_type=None, keyword_index={}, artifact_version=1)
+        return RAGEngine(document_id='doc')._restore(document, rows)
+
+    def test_hit_and_version_replacement(self):
+        cache = EngineCache(max_bytes=10 * 1024 * 1024)
+        engine = self.make_engine()
+
+        self.assertIsNone(cache.get(('doc', 1)))
+        self.assertIs(cache.put(('doc', 1), engine), engine)
+        self.assertIs(cache.get(('doc', 1)), engine)
+        self.assertFalse(engine.chunk_embeddings.flags.writeable)
+
+        # 재처리로 버전이 바뀌면 이전 버전은 정리
+        cache.put(('doc', 2), self.make_engine())
+        self.assertIsNone(cache.get(('doc', 1)))
+
+        stats = cache.stats()
+        self.assertEqual((stats['engines'], stats['hits'], stats['misses'], stats['invalidations']), (1, 1, 2, 1))
+
+    def test_lru_eviction_within_budget(self):
+        size = estimate_engine_bytes(self.make_engine())
+        cache = EngineCache(max_bytes=int(size * 2.5))
+
+        cache.put(('a', 1), self.make_engine())
+        cache.put(('b', 1), self.make_engine())
+        cache.get(('a', 1))
+        cache.put(('c', 1), self.make_engine())
+
+        self.assertIsNotNone(cache.get(('a', 1)))
+        self.assertIsNone(cache.get(('b', 1)))
+        self.assertEqual(cache.stats()['evictions'], 1)
+        self.assertLessEqual(cache.stats()['bytes'], cache.max_bytes)
+
+    def test_invalidate_removes_document(self):
+        cache = EngineCache(max_bytes=10 * 1024 * 1024)
+        cache.put(('doc', 1), self.make_engine())
+        self.assertEqual(cache.invalidate('doc'), 1)
+        self.assertEqual(cache.stats()['bytes'], 0)
+
+
+class PdfExtractorTestCase(SimpleTestCase):
+    """PDF 텍스트 추출 테스트"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        import fitz
+
+        doc = fitz.open()
+        for i in range(5):
+            doc.new_page().insert_text((72, 72), f"page {i + 1} article")
+        cls.pdf = doc.tobytes()
+        doc.close()
+
+    def test_page_offsets_point_to_page_text(self):
+        extracted = extract_pdf_text(self.pdf, parallel_min_pages=100)
+        self.assertEqual(extracted['page_count'], 5)
+        for page, offset in enumerate(extracted['page_offsets'], start=1):
+            self.assertTrue(extracted['text'][offset:].startswith(f"page {page}"))
+            self.assertEqual(page_for_offset(extracted['page_offsets'], offset + 3), page)
+
+    def test_parallel_extraction_keeps_page_order(self):
+        sequential = extract_pdf_text(self.pdf, parallel_min_pages=100)
+        parallel = extract_pdf_text(self.pdf, parallel_min_pages=1, pages_per_task=2)
+        self.assertEqual(parallel, sequential)
+
+    def test_text_budget(self):
+        with self.assertRaises(ExtractionBudgetExceeded):
+            extract_pdf_text(self.pdf, max_chars=20, parallel_min_pages=100)
+
+
+@override_settings(QDRANT_FAILURE_THRESHOLD=2, QDRANT_RETRY_AFTER_SECONDS=60)
+class QdrantClientRegistryTestCase(SimpleTestCase):
+    """Qdrant 클라이언트 상태 추적 테스트"""
+
+    def setUp(self):
+        self.registry = QdrantClientRegistry()
+        self.calls = 0
+
+        def search(**kwargs):
+            self.calls += 1
+            raise ConnectionError('refused')
+
+        def count(**kwargs):
+            self.calls += 1
+            raise ValueError('bad request')
+
+        self.client = _TrackedClient(self.registry, 'default', SimpleNamespace(search=search, count=count))
+
+    def test_fast_fails_after_consecutive_connection_errors(self):
+        for _ in range(2):
+            with self.assertRaises(ConnectionError):
+                self.client.search(limit=1)
+        with self.assertRaises(QdrantUnavailableError):
+            self.client.search(limit=1)
+
+        self.assertEqual(self.calls, 2)
+        self.assertFalse(self.registry.health()['default']['available'])
+
+    def test_request_errors_do_not_open_circuit(self):
+        for _ in range(3):
+            with self.assertRaises(ValueError):
+                self.client.count()
+        self.assertEqual(self.registry.health(), {})
+
+
+class QdrantUpsertTestCase(SimpleTestCase):
+    """Qdrant 배치 upsert 테스트"""
+
+    def test_batches_run_concurrently_and_retry_failed_batch(self):
+        received = []
+        failed = set()
+
+        def upsert(collection_name, points, wait):
+            if points[0] == 4 and 4 not in failed:
+                failed.add(4)
+                raise ConnectionError('reset')
+            received.extend(points)
+
+        client = SimpleNamespace(upsert=upsert)
+        batches = upsert_points(client, 'c', list(range(10)), batch_size=4, max_workers=3, wait=False, max_retries=1)
+
+        self.assertEqual(batches, 3)
+        self.assertEqual(sorted(received), list(range(10)))
+
+
+class QdrantScrollTestCase(SimpleTestCase):
+    """Qdrant scroll 페이지 순회 테스트"""
+
+    def setUp(self):
+        self.points = [SimpleNamespace(id=i, payload={'text': f"t{i}"}) for i in range(25)]
+        self.requests = []
+
+        def scroll(collection_name, scroll_filter, limit, offset, with_payload, with_vectors):
+            self.requests.append((offset, with_payload))
+            start = offset or 0
+            next_offset = start + limit if start + limit < len(self.points) else None
+            return self.points[start:start + limit], next_offset
+
+        self.client = SimpleNamespace(scroll=scroll)
+
+    def test_follows_next_page_offset(self):
+        for prefetch_pages in (0, 2):
+            self.requests.clear()
+            texts = [point.payload['text'] for point in iter_scroll(
+                self.client, 'c', page_size=10, payload_fields=['text'], prefetch_pages=prefetch_pages)]
+            self.assertEqual(texts, [f"t{i}" for i in range(25)])
+            self.assertEqual(self.requests, [(None, ['text']), (10, ['text']), (20, ['text'])])
+
+    def test_stops_fetching_when_consumer_stops(self):
+        points = iter_scroll(self.client, 'c', page_size=5, prefetch_pages=0)
+        self.assertEqual(next(points).id, 0)
+        points.close()
+        self.assertEqual(len(self.requests), 1)
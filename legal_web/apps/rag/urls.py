@@ -16,6 +16,9 @@ urlpatterns = [
     # 채팅 및 질의응답
     path('chat/<uuid:document_id>/', views.ChatView.as_view(), name='chat'),
     path('api/chat/message/', views.chat_message, name='chat_message'),
+    path('api/chat/message/stream/', views.chat_message_stream, name='chat_message_stream'),
+    path('api/chat/message/async/', views.chat_message_async, name='chat_message_async'),
+    path('api/chat/message/stream/async/', views.chat_message_stream_async, name='chat_message_stream_async'),
     
     # 분석 결과
     path('analysis/<uuid:document_id>/', views.analysis_detail, name='analysis_detail'),
@@ -30,4 +33,8 @@ urlpatterns = [
     # 빠른 API들 (기존 chatbot 연동용)
     path('api/quick-upload/', views.quick_upload_api, name='quick_upload_api'),
     path('api/quick-chat/', views.quick_chat_api, name='quick_chat_api'),
+    path('api/quick-chat/stream/', views.quick_chat_stream, name='quick_chat_stream'),
+    
+    # 문서 처리 작업 상태 (업로드 후 폴링)
+    path('api/jobs/<uuid:job_id>/', views.job_status, name='job_status'),
 ]
\ No newline at end of file
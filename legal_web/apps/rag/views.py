@@ -2,8 +2,10 @@
 import json
 import time
 import os
+import uuid
+from collections.abc import Mapping
 import openai
-from django.shortcuts import render, get_object_or_404, redirect
+from django.shortcuts import render, get_object_or_404, aget_object_or_404, redirect
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods, require_POST
@@ -15,13 +17,25 @@ from django.core.files.storage import default_storage
 from django.core.files.base import ContentFile
 from django.urls import reverse
 from django.conf import settings
+from django.db import transaction
 
-from .models import Document, DocumentChunk, ChatSession, ChatMessage, DocumentAnalysis
+from .models import Document, DocumentChunk, ChatSession, ChatMessage, DocumentAnalysis, IngestionJob
+from .services.article_diff import load_previous_chunks
 from .services.document_processor import DocumentProcessor
 from .services.rag_engine import RAGEngine
+from .services.engine_cache import aload_engine, invalidate_document_engine, load_engine
+from .services.qdrant_client import QdrantVectorStore, DOCUMENT_COLLECTION_NAME
+from .services.job_queue import enqueue_job, is_async_ingestion_enabled, job_status_payload
+from .services.openai_client import get_openai_client
 from .services.translator import AnalysisService, IMPROVED_LANGUAGES, TranslationService
+from .services.streaming import iter_completion_text, sse_event, sse_response
 from .utils.file_handler import FileHandler
 
+# 백그라운드 처리가 끝나지 않은 문서로 채팅할 때 안내
+DOCUMENT_NOT_READY_MESSAGE = '문서를 아직 처리하고 있습니다. 처리가 끝난 뒤 다시 질문해주세요.'
+
+GENERAL_CHAT_SEARCH_INFO = '일반 법률 상담 (문서 기반 아님)'
+
 # apps/rag/views.py 상단에 추가할 함수들
 
 def load_api_key():
@@ -57,17 +71,6 @@ def load_api_key():
     except Exception as e:
         return f"❌ API 키 검증 실패: {str(e)}"
 
-def get_openai_client():
-    """OpenAI 클라이언트 가져오기"""
-    from django.conf import settings
-    import openai
-    
-    api_key = getattr(settings, 'OPENAI_API_KEY', None)
-    if not api_key:
-        raise ValueError("OPENAI_API_KEY가 설정되지 않았습니다.")
-    
-    return openai.OpenAI(api_key=api_key)
-
 # API 키 로드용 뷰 추가
 @require_http_methods(["POST"])
 @login_required  
@@ -108,6 +111,408 @@ class DocumentUploadView(View):
     
         return render(request, 'rag/upload.html', context)
 
+    @method_decorator(login_required)
+    @method_decorator(csrf_exempt)
+    def post(self, request):
+        """문서 업로드 및 처리"""
+        try:
+            if 'file' not in request.FILES:
+                return JsonResponse({'error': '파일이 선택되지 않았습니다.'}, status=400)
+            
+            uploaded_file = request.FILES['file']
+            language = request.POST.get('language', '한국어')
+            
+            # 파일 검증
+            if not FileHandler.validate_file(uploaded_file):
+                return JsonResponse({'error': '지원하지 않는 파일 형식입니다.'}, status=400)
+            
+            # 수정본 업로드 (기존 문서에 바뀐 조항만 반영)
+            previous_document = None
+            previous_document_id = request.POST.get('previous_document_id')
+            if previous_document_id:
+                previous_document = Document.objects.filter(id=previous_document_id, user=request.user).first()
+                if previous_document is None:
+                    return JsonResponse({'error': '수정할 문서를 찾을 수 없습니다.'}, status=404)
+                if not previous_document.is_ready:
+                    return JsonResponse({'error': '이전 버전의 처리가 끝난 뒤 수정본을 올릴 수 있습니다.'}, status=409)
+            
+            # 파일 저장
+            file_path = default_storage.save(
+                f'documents/{request.user.id}/{uploaded_file.name}',
+                ContentFile(uploaded_file.read())
+            )
+            
+            if previous_document is not None:
+                return self._upload_revision(previous_document, file_path, uploaded_file, language)
+            
+            # Document 객체 생성
+            document = Document.objects.create(
+                user=request.user,
+                title=uploaded_file.name,
+                file=file_path,
+                file_type=uploaded_file.name.split('.')[-1].lower(),
+                file_size=uploaded_file.size,
+                text_content='',  # 처리 후 업데이트
+                processing_status='queued' if is_async_ingestion_enabled() else 'processing'
+            )
+            
+            # 백그라운드 작업으로 처리 (작업 ID만 즉시 반환)
+            if is_async_ingestion_enabled():
+                job = enqueue_document_processing(document, language)
+                return JsonResponse({
+                    'success': True,
+                    'document_id': str(document.id),
+                    'job_id': str(job.id),
+                    'status_url': reverse('rag:job_status', kwargs={'job_id': job.id}),
+                    'redirect_url': reverse('rag:chat', kwargs={'document_id': document.id})
+                }, status=202)
+            
+            result = self._process_document(document, language)
+            
+            if result['success']:
+                return JsonResponse({
+                    'success': True,
+                    'document_id': str(document.id),
+                    'redirect_url': reverse('rag:chat', kwargs={'document_id': document.id})
+                })
+            else:
+                discard_document(document)  # 처리 실패시 삭제
+                return JsonResponse({'error': result['error']}, status=500)
+                
+        except Exception as e:
+            return JsonResponse({'error': f'문서 업로드 중 오류 발생: {str(e)}'}, status=500)
+    
+    def _process_document(self, document, language, progress=None, raise_errors=False):
+        """문서 처리 메인 로직
+        
+        progress: 백그라운드 작업의 진행 상황 보고 콜백
+        raise_errors: True면 예외를 실패 결과로 바꾸지 않고 그대로 던짐 (작업 큐가 일시 오류를 재시도하도록)
+        """
+        report = progress or (lambda stage, percent: None)
+        try:
+            start_time = time.time()
+            
+            # 1. 텍스트 추출
+            print(f"📄 문서 처리 시작: {document.title}")
+            report('extracting', 5)
+            extracted = DocumentProcessor.extract_document(
+                document.file.path, 
+                document.title
+            )
+            text_content = extracted['text']
+            
+            if text_content.startswith("❌"):
+                return {'success': False, 'error': text_content}
+            
+            # 2. RAG 엔진 초기화 및 처리
+            report('indexing', 15)
+            rag_engine = RAGEngine(document_id=document.id)
+            process_result = rag_engine.process_document(text_content)
+            
+            # 3. 문서 정보 업데이트
+            document.text_content = text_content
+            document.page_offsets = extracted['page_offsets']
+            document.contract_type = process_result.get('contract_type')
+            document.confidence_score = process_result.get('confidence', {}).get('percentage') if process_result.get('confidence') else None
+            document.chunk_count = process_result.get('chunk_count', 0)
+            document.vector_indexed = process_result.get('vector_index_created', False)
+            document.qdrant_collection_name = rag_engine.vector_store.collection_name
+            document.save()
+            
+            # 4. 청크 및 검색 아티팩트 저장 (채팅 시 RAGEngine.load로 복원)
+            report('saving_chunks', 45)
+            self._save_document_chunks(document, rag_engine)
+            self._save_retrieval_artifacts(document, rag_engine)
+            
+            # 5. 분석 수행 및 저장
+            report('analyzing', 55)
+            analysis_service = AnalysisService()
+            summary, risk_analysis = analysis_service.unified_analysis_with_translation(text_content, language)
+            
+            # 요약/위험 분석 저장 (작업 재시도 시 이전 시도의 결과를 덮어씀)
+            for analysis_type, content in (('summary', summary), ('risk_analysis', risk_analysis)):
+                DocumentAnalysis.objects.update_or_create(
+                    document=document,
+                    analysis_type=analysis_type,
+                    language=language,
+                    defaults={'content': content, 'processing_time': time.time() - start_time}
+                )
+            
+            # 6. 처리 완료 시간 업데이트
+            report('finalizing', 95)
+            from django.utils import timezone
+            document.processed_at = timezone.now()
+            if progress is None:
+                document.processing_status = 'completed'
+                document.processing_progress = 100
+            document.save()
+            
+            print(f"✅ 문서 처리 완료: {document.title} ({time.time() - start_time:.2f}초)")
+            
+            return {
+                'success': True,
+                'contract_type': process_result.get('contract_type'),
+                'chunk_count': process_result.get('chunk_count'),
+                'vector_indexed': process_result.get('vector_index_created')
+            }
+            
+        except Exception as e:
+            print(f"❌ 문서 처리 실패: {str(e)}")
+            if raise_errors:
+                raise
+            return {'success': False, 'error': str(e)}
+    
+    def _chunk_object(self, document, rag_engine, i):
+        """엔진의 i번째 청크로 DocumentChunk 객체 생성 (임베딩/내용 해시 포함)"""
+        chunk_data = rag_engine.document_chunks[i]
+        return DocumentChunk(
+            id=chunk_data.get('chunk_id') or uuid.uuid4(),  # 검색 결과/Qdrant 페이로드와 같은 ID
+            document=document,
+            text=chunk_data['text'],
+            chunk_type=chunk_data['type'],
+            article_num=chunk_data.get('article_num'),
+            article_title=chunk_data.get('article_title', ''),
+            chunk_index=i,
+            char_count=len(chunk_data['text']),
+            vector_id=i,  # Qdrant에서의 ID
+            embedding=rag_engine.embedding_bytes(i),
+            content_hash=chunk_data.content_hash
+        )
+    
+    def _save_document_chunks(self, document, rag_engine):
+        """문서 청크들을 임베딩과 함께 DB에 저장"""
+        chunk_objects = [self._chunk_object(document, rag_engine, i) for i in range(len(rag_engine.document_chunks))]
+        
+        # 재처리 시 이전 청크 교체
+        DocumentChunk.objects.filter(document=document).delete()
+        DocumentChunk.objects.bulk_create(chunk_objects)
+        print(f"✅ {len(chunk_objects)}개 청크 DB 저장 완료")
+    
+    def _save_retrieval_artifacts(self, document, rag_engine):
+        """키워드 인덱스 저장 및 아티팩트 버전 갱신"""
+        document.keyword_index = rag_engine.keyword_index
+        document.artifact_version = document.artifact_version + 1
+        document.artifact_format = RAGEngine.ARTIFACT_FORMAT
+        document.save(update_fields=['keyword_index', 'artifact_version', 'artifact_format', 'updated_at'])
+        invalidate_document_engine(document.id)
+        print(f"✅ 검색 아티팩트 저장 완료 (v{document.artifact_version})")
+    
+    def _upload_revision(self, document, file_path, uploaded_file, language):
+        """수정본 업로드 처리 (처리가 끝날 때까지 이전 버전 유지)"""
+        revision = {
+            'file': file_path,
+            'title': uploaded_file.name,
+            'file_type': uploaded_file.name.split('.')[-1].lower(),
+            'file_size': uploaded_file.size,
+        }
+        
+        if is_async_ingestion_enabled():
+            job = enqueue_document_processing(document, language, revision=revision)
+            return JsonResponse({
+                'success': True,
+                'document_id': str(document.id),
+                'job_id': str(job.id),
+                'status_url': reverse('rag:job_status', kwargs={'job_id': job.id}),
+                'redirect_url': reverse('rag:chat', kwargs={'document_id': document.id})
+            }, status=202)
+        
+        document.processing_status = 'processing'
+        document.save(update_fields=['processing_status', 'updated_at'])
+        result = self._process_revision(document, revision, language)
+        
+        if result['success']:
+            return JsonResponse({
+                'success': True,
+                'document_id': str(document.id),
+                'revision': result['revision'],
+                'redirect_url': reverse('rag:chat', kwargs={'document_id': document.id})
+            })
+        return JsonResponse({'error': result['error']}, status=500)
+    
+    def _process_revision(self, document, revision, language, progress=None, raise_errors=False):
+        """수정본 처리 로직 (바뀐 조항만 임베딩/벡터 반영, 내용이 같은 조항은 이전 결과 재사용)
+        
+        청크와 문서 정보는 한 트랜잭션으로 교체하므로 그 전에 실패하면 이전 버전이 그대로 남습니다.
+        raise_errors가 True면 예외를 그대로 던지고 수정본 파일도 남겨 둡니다 (재시도 후 정리는 호출한 쪽에서).
+        """
+        report = progress or (lambda stage, percent: None)
+        saved = False
+        try:
+            start_time = time.time()
+            
+            # 1. 텍스트 추출
+            print(f"📄 수정본 처리 시작: {document.title} → {revision['title']}")
+            report('extracting', 5)
+            extracted = DocumentProcessor.extract_document(
+                default_storage.path(revision['file']),
+                revision['title']
+            )
+            text_content = extracted['text']
+            
+            if text_content.startswith("❌"):
+                self._discard_revision(document, revision, saved)
+                return {'success': False, 'error': text_content}
+            
+            # 2. 이전 버전과 조항 비교 (바뀐 청크만 임베딩)
+            report('diffing', 15)
+            rag_engine = RAGEngine(document_id=document.id)
+            process_result = rag_engine.process_revision(
+                text_content,
+                load_previous_chunks(document),
+                reuse=getattr(settings, 'RAG_INCREMENTAL_REINGEST', True)
+            )
+            diff = process_result['diff']
+            
+            # 3. 청크 및 문서 정보 교체
+            report('saving_chunks', 45)
+            previous_file = document.file.name
+            was_vector_indexed = document.vector_indexed
+            with transaction.atomic():
+                self._save_revision_chunks(document, rag_engine, diff)
+                document.title = revision['title']
+                document.file = revision['file']
+                document.file_type = revision['file_type']
+                document.file_size = revision['file_size']
+                document.text_content = text_content
+                document.page_offsets = extracted['page_offsets']
+                document.contract_type = process_result.get('contract_type')
+                document.confidence_score = process_result.get('confidence', {}).get('percentage') if process_result.get('confidence') else None
+                document.chunk_count = process_result.get('chunk_count', 0)
+                document.vector_indexed = False  # Qdrant 반영 후 갱신
+                document.qdrant_collection_name = rag_engine.vector_store.collection_name
+                document.save()
+                self._save_retrieval_artifacts(document, rag_engine)
+            saved = True
+            if previous_file and previous_file != revision['file']:
+                default_storage.delete(previous_file)
+            
+            # 4. 벡터 반영 (이전 버전의 벡터 인덱스가 없었으면 전체 upsert)
+            report('indexing', 60)
+            document.vector_indexed = rag_engine.sync_revision_vectors(diff, full=not was_vector_indexed)
+            document.save(update_fields=['vector_indexed', 'updated_at'])
+            
+            # 5. 분석 (요약/위험 분석은 문서 전체 기준이라 내용이 바뀐 경우에만 다시 수행)
+            report('analyzing', 70)
+            if diff.unchanged and DocumentAnalysis.objects.filter(document=document, language=language).exists():
+                print("♻️ 바뀐 조항이 없어 기존 분석을 유지합니다")
+            else:
+                analysis_service = AnalysisService()
+                summary, risk_analysis = analysis_service.unified_analysis_with_translation(text_content, language)
+                
+                # 내용이 바뀌었으면 다른 언어 분석도 이전 버전 기준이므로 함께 삭제
+                stale_analyses = DocumentAnalysis.objects.filter(document=document)
+                if diff.unchanged:
+                    stale_analyses = stale_analyses.filter(language=language)
+                with transaction.atomic():
+                    stale_analyses.delete()
+                    for analysis_type, content in (('summary', summary), ('risk_analysis', risk_analysis)):
+                        DocumentAnalysis.objects.create(
+                            document=document,
+                            analysis_type=analysis_type,
+                            language=language,
+                            content=content,
+                            processing_time=time.time() - start_time
+                        )
+            
+            # 6. 처리 완료 시간 업데이트
+            report('finalizing', 95)
+            from django.utils import timezone
+            document.processed_at = timezone.now()
+            if progress is None:
+                document.processing_status = 'completed'
+                document.processing_progress = 100
+            document.save()
+            
+            print(f"✅ 수정본 처리 완료: {document.title} ({time.time() - start_time:.2f}초, {diff.summary()})")
+            
+            return {
+                'success': True,
+                'contract_type': process_result.get('contract_type'),
+                'chunk_count': process_result.get('chunk_count'),
+                'vector_indexed': document.vector_indexed,
+                'revision': diff.summary()
+            }
+            
+        except Exception as e:
+            print(f"❌ 수정본 처리 실패: {str(e)}")
+            if raise_errors:
+                raise
+            self._discard_revision(document, revision, saved)
+            return {'success': False, 'error': str(e)}
+    
+    def _save_revision_chunks(self, document, rag_engine, diff):
+        """수정본 청크 반영 (삭제된 청크 삭제, 재사용 청크 순서 갱신, 새 청크만 추가)"""
+        chunks = rag_engine.document_chunks
+        DocumentChunk.objects.filter(id__in=[previous.chunk_id for previous in diff.removed]).delete()
+        
+        # 순서가 바뀐 재사용 청크: (document, chunk_index) 고유 제약과 겹치지 않도록 임시 순서를 거쳐 갱신
+        moved = [DocumentChunk(id=chunks[i].chunk_id, chunk_index=i, vector_id=i) for i in diff.moved]
+        if moved:
+            offset = 1 + max(len(chunks), *(previous.chunk_index for previous in diff.reused.values()))
+            for chunk_obj in moved:
+                chunk_obj.chunk_index += offset
+            DocumentChunk.objects.bulk_update(moved, ['chunk_index'])
+            for chunk_obj in moved:
+                chunk_obj.chunk_index -= offset
+            DocumentChunk.objects.bulk_update(moved, ['chunk_index', 'vector_id'])
+        
+        DocumentChunk.objects.bulk_create([self._chunk_object(document, rag_engine, i) for i in diff.added])
+        print(f"✅ 청크 DB 반영 완료: 추가 {len(diff.added)}개, 순서 변경 {len(moved)}개, 삭제 {len(diff.removed)}개")
+    
+    def _discard_revision(self, document, revision, saved):
+        """수정본 처리 실패 시 정리 (청크 교체 전이면 새 파일만 지우고 이전 버전 유지)"""
+        if not saved and default_storage.exists(revision['file']):
+            default_storage.delete(revision['file'])
+        Document.objects.filter(pk=document.pk).update(processing_status='completed')
+
+def enqueue_document_processing(document, language, revision=None):
+    """업로드 문서 처리 작업 등록 (revision: 수정본 파일 정보)"""
+    payload = {'language': language}
+    if revision is not None:
+        payload['revision'] = revision
+    return enqueue_job(
+        'rag_document',
+        payload=payload,
+        user=document.user,
+        document=document
+    )
+
+def discard_document(document):
+    """문서와 공유 컬렉션의 벡터 삭제 (처리 실패/사용자 삭제 공통)
+    
+    공유 컬렉션의 포인트는 문서를 지워도 남으므로 먼저 삭제합니다. 처리 도중 실패한 문서는
+    vector_indexed/qdrant_collection_name이 기록되기 전에 일부 벡터가 올라갔을 수 있어 항상 시도하며,
+    Qdrant 삭제가 실패해도 문서는 삭제합니다.
+    """
+    document_id = document.id
+    QdrantVectorStore(DOCUMENT_COLLECTION_NAME).delete_document(document_id)
+    document.delete()
+    invalidate_document_engine(document_id)
+
+@require_http_methods(["GET"])
+def job_status(request, job_id):
+    """문서 처리 작업 상태 조회 API (업로드 화면에서 폴링)"""
+    job = get_object_or_404(IngestionJob, id=job_id)
+    
+    # 요청자 확인 (회원은 사용자, 비회원은 세션 키)
+    if job.user_id:
+        if not request.user.is_authenticated or request.user.id != job.user_id:
+            return JsonResponse({'error': '작업을 찾을 수 없습니다.'}, status=404)
+    elif not job.session_key or job.session_key != request.session.session_key:
+        return JsonResponse({'error': '작업을 찾을 수 없습니다.'}, status=404)
+    
+    # 세션에 저장해야 하는 결과(비회원 검색 인덱스 등)는 요청자 세션으로 옮기고 작업에서 제거
+    if job.status == 'completed' and job.result and job.result.get('session_data'):
+        for key, value in job.result.pop('session_data').items():
+            request.session[key] = value
+        job.save(update_fields=['result'])
+    
+    data = job_status_payload(job)
+    if job.status == 'completed' and job.document_id and job.job_type == 'rag_document':
+        data['redirect_url'] = reverse('rag:chat', kwargs={'document_id': job.document_id})
+    
+    return JsonResponse(data)
+
 @require_http_methods(["POST"])
 @login_required
 @csrf_exempt
@@ -220,10 +625,20 @@ def quick_upload_api(request):
             file=file_path,
             file_type=uploaded_file.name.split('.')[-1].lower(),
             file_size=uploaded_file.size,
-            text_content=''
+            text_content='',
+            processing_status='queued' if is_async_ingestion_enabled() else 'processing'
         )
         
-        # 비동기 처리 (실제로는 동기)
+        # 백그라운드 작업으로 처리 (작업 ID만 즉시 반환)
+        if is_async_ingestion_enabled():
+            job = enqueue_document_processing(document, language)
+            return JsonResponse({
+                'success': True,
+                'document_id': str(document.id),
+                'job_id': str(job.id),
+                'status_url': reverse('rag:job_status', kwargs={'job_id': job.id})
+            }, status=202)
+        
         result = DocumentUploadView()._process_document(document, language)
         
         if result['success']:
@@ -235,7 +650,7 @@ def quick_upload_api(request):
                 'text_preview': document.text_content[:500] + '...' if len(document.text_content) > 500 else document.text_content
             })
         else:
-            document.delete()
+            discard_document(document)
             return JsonResponse({'error': result['error']}, status=500)
             
     except Exception as e:
@@ -262,6 +677,9 @@ def quick_chat_api(request):
         # 문서 기반 RAG 채팅
         document = get_object_or_404(Document, id=document_id, user=request.user)
         
+        if not document.is_ready:
+            return JsonResponse({'error': DOCUMENT_NOT_READY_MESSAGE}, status=409)
+        
         # 채팅 세션 생성 또는 조회
         chat_session, created = ChatSession.objects.get_or_create(
             user=request.user,
@@ -301,28 +719,68 @@ def quick_chat_api(request):
     except Exception as e:
         return JsonResponse({'error': f'채팅 처리 중 오류 발생: {str(e)}'}, status=500)
 
+@require_POST
+@login_required
+@csrf_exempt
+def quick_chat_stream(request):
+    """빠른 채팅 스트리밍 API (SSE) - quick_chat_api와 같은 요청 형식"""
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({'error': '잘못된 요청 형식입니다.'}, status=400)
+    
+    message = data.get('message', '').strip()
+    document_id = data.get('document_id')
+    language = data.get('language', '한국어')
+    
+    if not message:
+        return JsonResponse({'error': '메시지가 없습니다.'}, status=400)
+    
+    if not document_id:
+        # 문서 없이 일반 채팅
+        return sse_response(_stream_general_chat(message, language))
+    
+    document = get_object_or_404(Document, id=document_id, user=request.user)
+    
+    if not document.is_ready:
+        return JsonResponse({'error': DOCUMENT_NOT_READY_MESSAGE}, status=409)
+    
+    chat_session, created = ChatSession.objects.get_or_create(
+        user=request.user,
+        document=document,
+        defaults={
+            'title': f"{document.title} 빠른상담",
+            'language': language
+        }
+    )
+    
+    def save_history(response_data, response_time):
+        if not data.get('save_history', True):
+            return None
+        ChatMessage.objects.create(
+            session=chat_session,
+            message_type='user',
+            content=message
+        )
+        return ChatMessage.objects.create(
+            session=chat_session,
+            message_type='assistant',
+            content=response_data['response'],
+            search_results=response_data.get('search_results')
+        ).id
+    
+    meta = {'document_title': document.title, 'contract_type': document.contract_type}
+    return sse_response(_stream_rag_answer(chat_session, message, save_history, meta=meta))
+
 def _handle_general_chat(message, language):
     """일반 채팅 처리 (문서 없는 경우)"""
     try:
-        # OpenAI 클라이언트 직접 사용
+        # 프로세스 공용 OpenAI 클라이언트 (연결 풀 재사용)
         client = get_openai_client()
         
-        system_prompts = {
-            "한국어": "당신은 법률 전문 AI 어시스턴트입니다. 법률 관련 질문에 정확하고 이해하기 쉽게 답변해주세요.",
-            "English": "You are a legal AI assistant. Please provide accurate and easy-to-understand answers to legal questions.",
-            "日本語": "あなたは法律専門のAIアシスタントです。法律関連の質問に正確で分かりやすく回答してください。",
-            "中文": "您是法律专业AI助手。请对法律相关问题提供准确且易懂的回答。",
-            "Español": "Eres un asistente de IA legal. Proporciona respuestas precisas y fáciles de entender a preguntas legales."
-        }
-        
-        system_prompt = system_prompts.get(language, system_prompts["한국어"])
-        
         response = client.chat.completions.create(
             model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": message}
-            ],
+            messages=_general_chat_messages(message, language),
             max_tokens=1000,
             temperature=0.3
         )
@@ -332,7 +790,7 @@ def _handle_general_chat(message, language):
         return JsonResponse({
             'success': True,
             'response': reply,
-            'search_info': '일반 법률 상담 (문서 기반 아님)',
+            'search_info': GENERAL_CHAT_SEARCH_INFO,
             'document_title': None,
             'contract_type': None
         })
@@ -342,144 +800,39 @@ def _handle_general_chat(message, language):
             'success': False,
             'error': f'일반 채팅 처리 중 오류: {str(e)}'
         }, status=500)
-    
-    @method_decorator(login_required)
-    @method_decorator(csrf_exempt)
-    def post(self, request):
-        """문서 업로드 및 처리"""
-        try:
-            if 'file' not in request.FILES:
-                return JsonResponse({'error': '파일이 선택되지 않았습니다.'}, status=400)
-            
-            uploaded_file = request.FILES['file']
-            language = request.POST.get('language', '한국어')
-            
-            # 파일 검증
-            if not FileHandler.validate_file(uploaded_file):
-                return JsonResponse({'error': '지원하지 않는 파일 형식입니다.'}, status=400)
-            
-            # 파일 저장
-            file_path = default_storage.save(
-                f'documents/{request.user.id}/{uploaded_file.name}',
-                ContentFile(uploaded_file.read())
-            )
-            
-            # Document 객체 생성
-            document = Document.objects.create(
-                user=request.user,
-                title=uploaded_file.name,
-                file=file_path,
-                file_type=uploaded_file.name.split('.')[-1].lower(),
-                file_size=uploaded_file.size,
-                text_content=''  # 처리 후 업데이트
-            )
-            
-            # 비동기 처리를 위한 태스크 시작 (실제로는 동기 처리)
-            result = self._process_document(document, language)
-            
-            if result['success']:
-                return JsonResponse({
-                    'success': True,
-                    'document_id': str(document.id),
-                    'redirect_url': reverse('rag:chat', kwargs={'document_id': document.id})
-                })
-            else:
-                document.delete()  # 처리 실패시 삭제
-                return JsonResponse({'error': result['error']}, status=500)
-                
-        except Exception as e:
-            return JsonResponse({'error': f'문서 업로드 중 오류 발생: {str(e)}'}, status=500)
-    
-    def _process_document(self, document, language):
-        """문서 처리 메인 로직"""
-        try:
-            start_time = time.time()
-            
-            # 1. 텍스트 추출
-            print(f"📄 문서 처리 시작: {document.title}")
-            text_content = DocumentProcessor.extract_text_from_file(
-                document.file.path, 
-                document.title
-            )
-            
-            if text_content.startswith("❌"):
-                return {'success': False, 'error': text_content}
-            
-            # 2. RAG 엔진 초기화 및 처리
-            rag_engine = RAGEngine()
-            process_result = rag_engine.process_document(text_content)
-            
-            # 3. 문서 정보 업데이트
-            document.text_content = text_content
-            document.contract_type = process_result.get('contract_type')
-            document.confidence_score = process_result.get('confidence', {}).get('percentage') if process_result.get('confidence') else None
-            document.chunk_count = process_result.get('chunk_count', 0)
-            document.vector_indexed = process_result.get('vector_index_created', False)
-            document.qdrant_collection_name = f"contract_chunks_{document.id}"
-            document.save()
-            
-            # 4. 청크 저장
-            self._save_document_chunks(document, rag_engine.document_chunks)
-            
-            # 5. 분석 수행 및 저장
-            analysis_service = AnalysisService()
-            summary, risk_analysis = analysis_service.unified_analysis_with_translation(text_content, language)
-            
-            # 요약 분석 저장
-            DocumentAnalysis.objects.create(
-                document=document,
-                analysis_type='summary',
-                language=language,
-                content=summary,
-                processing_time=time.time() - start_time
-            )
-            
-            # 위험 분석 저장
-            DocumentAnalysis.objects.create(
-                document=document,
-                analysis_type='risk_analysis',
-                language=language,
-                content=risk_analysis,
-                processing_time=time.time() - start_time
-            )
-            
-            # 6. 처리 완료 시간 업데이트
-            from django.utils import timezone
-            document.processed_at = timezone.now()
-            document.save()
-            
-            print(f"✅ 문서 처리 완료: {document.title} ({time.time() - start_time:.2f}초)")
-            
-            return {
-                'success': True,
-                'contract_type': process_result.get('contract_type'),
-                'chunk_count': process_result.get('chunk_count'),
-                'vector_indexed': process_result.get('vector_index_created')
-            }
-            
-        except Exception as e:
-            print(f"❌ 문서 처리 실패: {str(e)}")
-            return {'success': False, 'error': str(e)}
-    
-    def _save_document_chunks(self, document, chunks):
-        """문서 청크들을 DB에 저장"""
-        chunk_objects = []
-        
-        for i, chunk_data in enumerate(chunks):
-            chunk_obj = DocumentChunk(
-                document=document,
-                text=chunk_data['text'],
-                chunk_type=chunk_data['type'],
-                article_num=chunk_data.get('article_num'),
-                article_title=chunk_data.get('article_title', ''),
-                chunk_index=i,
-                char_count=len(chunk_data['text']),
-                vector_id=i  # Qdrant에서의 ID
-            )
-            chunk_objects.append(chunk_obj)
+
+def _stream_general_chat(message, language):
+    """일반 채팅 SSE 이벤트 생성기 (문서 없는 경우)"""
+    try:
+        yield sse_event('meta', {'search_info': GENERAL_CHAT_SEARCH_INFO, 'document_title': None, 'contract_type': None})
         
-        DocumentChunk.objects.bulk_create(chunk_objects)
-        print(f"✅ {len(chunk_objects)}개 청크 DB 저장 완료")
+        reply_parts = []
+        for delta in iter_completion_text(get_openai_client(), model="gpt-3.5-turbo",
+                                          messages=_general_chat_messages(message, language),
+                                          max_tokens=1000, temperature=0.3):
+            reply_parts.append(delta)
+            yield sse_event('token', {'text': delta})
+        
+        yield sse_event('done', {'response': ''.join(reply_parts).strip(), 'search_info': GENERAL_CHAT_SEARCH_INFO})
+        
+    except Exception as e:
+        yield sse_event('error', {'error': f'일반 채팅 처리 중 오류: {str(e)}'})
+
+def _general_chat_messages(message, language):
+    """일반 법률 상담 요청 메시지"""
+    system_prompts = {
+        "한국어": "당신은 법률 전문 AI 어시스턴트입니다. 법률 관련 질문에 정확하고 이해하기 쉽게 답변해주세요.",
+        "English": "You are a legal AI assistant. Please provide accurate and easy-to-understand answers to legal questions.",
+        "日本語": "あなたは法律専門のAIアシスタントです。法律関連の質問に正確で分かりやすく回答してください。",
+        "中文": "您是法律专业AI助手。请对法律相关问题提供准确且易懂的回答。",
+        "Español": "Eres un asistente de IA legal. Proporciona respuestas precisas y fáciles de entender a preguntas legales."
+    }
+    
+    system_prompt = system_prompts.get(language, system_prompts["한국어"])
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": message}
+    ]
 
 class ChatView(View):
     """RAG 기반 채팅 뷰"""
@@ -542,6 +895,9 @@ def chat_message(request):
         # 채팅 세션 조회
         chat_session = get_object_or_404(ChatSession, id=session_id, user=request.user)
         
+        if not chat_session.document.is_ready:
+            return JsonResponse({'error': DOCUMENT_NOT_READY_MESSAGE}, status=409)
+        
         # 사용자 메시지 저장
         user_message = ChatMessage.objects.create(
             session=chat_session,
@@ -555,25 +911,7 @@ def chat_message(request):
         response_time = time.time() - start_time
         
         # AI 응답 저장
-        ai_message = ChatMessage.objects.create(
-            session=chat_session,
-            message_type='assistant',
-            content=response_data['response'],
-            search_results=response_data.get('search_results'),
-            search_method=response_data.get('search_method'),
-            response_time=response_time
-        )
-        
-        # 사용된 청크들 연결
-        if response_data.get('used_chunk_ids'):
-            used_chunks = DocumentChunk.objects.filter(
-                id__in=response_data['used_chunk_ids']
-            )
-            ai_message.used_chunks.set(used_chunks)
-        
-        # 세션 메시지 수 업데이트
-        chat_session.message_count = chat_session.messages.count()
-        chat_session.save()
+        ai_message = _save_assistant_message(chat_session, response_data, response_time)
         
         return JsonResponse({
             'success': True,
@@ -586,105 +924,186 @@ def chat_message(request):
         print(f"❌ 채팅 메시지 처리 오류: {str(e)}")
         return JsonResponse({'error': f'메시지 처리 중 오류 발생: {str(e)}'}, status=500)
 
-def _generate_rag_response(chat_session, user_message):
-    """RAG 기반 응답 생성"""
+@require_POST
+@login_required
+@csrf_exempt
+def chat_message_stream(request):
+    """채팅 메시지 스트리밍 API (SSE) - 답변은 스트림이 끝난 뒤 저장"""
     try:
-        document = chat_session.document
-        language = chat_session.language
-        
-        # RAG 엔진 초기화
-        rag_engine = RAGEngine()
-        
-        # 문서 다시 로드 (메모리에서 처리하기 위해)
-        rag_engine.process_document(document.text_content)
-        
-        # RAG 검색 수행
-        search_results = rag_engine.search(user_message, top_k=3)
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({'error': '잘못된 요청 형식입니다.'}, status=400)
+    
+    message_content = data.get('message', '').strip()
+    if not message_content:
+        return JsonResponse({'error': '메시지 내용이 없습니다.'}, status=400)
+    
+    chat_session = get_object_or_404(ChatSession, id=data.get('session_id'), user=request.user)
+    
+    if not chat_session.document.is_ready:
+        return JsonResponse({'error': DOCUMENT_NOT_READY_MESSAGE}, status=409)
+    
+    # 사용자 메시지 저장
+    ChatMessage.objects.create(
+        session=chat_session,
+        message_type='user',
+        content=message_content
+    )
+    
+    def save_answer(response_data, response_time):
+        return _save_assistant_message(chat_session, response_data, response_time).id
+    
+    return sse_response(_stream_rag_answer(chat_session, message_content, save_answer))
+
+# ----- 비동기(ASGI) 채팅 API -----
+# 요청 형식과 응답은 위 동기 API와 같고, OpenAI/Qdrant/DB 대기 중에 워커 스레드를 점유하지 않습니다.
+# ASGI 서버(uvicorn config.asgi:application)로 실행할 때 사용합니다.
+
+async def _aget_chat_session(request, session_id):
+    """요청 사용자의 채팅 세션 (문서 함께 로드)"""
+    user = await request.auser()
+    return await aget_object_or_404(ChatSession.objects.select_related('document'), id=session_id, user=user)
+
+@require_POST
+@login_required
+@csrf_exempt
+async def chat_message_async(request):
+    """채팅 메시지 처리 API (비동기)"""
+    try:
+        data = json.loads(request.body)
+        message_content = data.get('message', '').strip()
         
-        if not search_results:
-            # 문서와 관련 없는 질문
-            lang_config = IMPROVED_LANGUAGES.get(language, IMPROVED_LANGUAGES['한국어'])
-            return {
-                'response': lang_config.get('off_topic_response', 
-                    "죄송합니다. 업로드하신 계약서 내용에 대해서만 답변드릴 수 있습니다."),
-                'search_results': [],
-                'search_method': 'off_topic_check',
-                'search_info': '',
-                'used_chunk_ids': []
-            }
+        if not message_content:
+            return JsonResponse({'error': '메시지 내용이 없습니다.'}, status=400)
         
-        # 컨텍스트 구성
-        context_parts = []
-        used_chunk_ids = []
-        search_methods = []
-        
-        for i, result in enumerate(search_results):
-            chunk = result['chunk']
-            if isinstance(chunk, dict):
-                article_info = f"제{chunk.get('article_num', '?')}조({chunk.get('article_title', 'Unknown')})"
-                chunk_text = chunk.get('text', '')
-                # chunk ID 찾기 (실제로는 DocumentChunk에서)
-                chunk_obj = DocumentChunk.objects.filter(
-                    document=document,
-                    article_num=chunk.get('article_num'),
-                    text=chunk_text
-                ).first()
-                if chunk_obj:
-                    used_chunk_ids.append(str(chunk_obj.id))
-            else:
-                article_info = "Unknown"
-                chunk_text = str(chunk)
-            
-            method = result['method']
-            search_methods.append(method)
-            context_parts.append(f"[{article_info} - {method}로 검색됨]\n{chunk_text}")
+        chat_session = await _aget_chat_session(request, data.get('session_id'))
         
-        context = "\n\n".join(context_parts)
+        if not chat_session.document.is_ready:
+            return JsonResponse({'error': DOCUMENT_NOT_READY_MESSAGE}, status=409)
         
-        # 응답 생성
-        analysis_service = AnalysisService()
-        response = analysis_service.generate_document_based_answer(
-            user_message, context, language
+        await ChatMessage.objects.acreate(
+            session=chat_session,
+            message_type='user',
+            content=message_content
         )
         
-        # 검색 정보 구성
-        unique_articles = set()
-        for result in search_results:
-            chunk = result['chunk']
-            if isinstance(chunk, dict) and chunk.get('article_num'):
-                unique_articles.add(f"제{chunk['article_num']}조")
-        
-        article_count = len(unique_articles)
-        
-        search_info_messages = {
-            "한국어": f"🔍 **문서 기반 답변**: {article_count}개 조항 (**100% 계약서 내용 기반**)",
-            "日本語": f"🔍 **文書ベース回答**: {article_count}個の条項 (**100%契約書内容ベース**)",
-            "中文": f"🔍 **基于文档的回答**: {article_count}个条款 (**100%基于合同内容**)",
-            "English": f"🔍 **Document-based Answer**: {article_count} clauses (**100% contract content based**)",
-            "Español": f"🔍 **Respuesta basada en documento**: {article_count} cláusulas (**100% basado en contenido del contrato**)"
-        }
+        start_time = time.time()
+        response_data = await _agenerate_rag_response(chat_session, message_content)
+        response_time = time.time() - start_time
         
-        search_info = search_info_messages.get(language, search_info_messages['한국어'])
+        ai_message = await _asave_assistant_message(chat_session, response_data, response_time)
+        
+        return JsonResponse({
+            'success': True,
+            'response': response_data['response'],
+            'search_info': response_data.get('search_info', ''),
+            'message_id': str(ai_message.id)
+        })
         
-        # 한국어인 경우 법률 용어 설명 추가
-        if language == "한국어":
-            translator = TranslationService()
-            legal_terms_explanation = translator.extract_legal_terms_from_korean_text(response)
-            response += legal_terms_explanation
+    except Exception as e:
+        print(f"❌ 채팅 메시지 처리 오류: {str(e)}")
+        return JsonResponse({'error': f'메시지 처리 중 오류 발생: {str(e)}'}, status=500)
+
+@require_POST
+@login_required
+@csrf_exempt
+async def chat_message_stream_async(request):
+    """채팅 메시지 스트리밍 API (SSE, 비동기)"""
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({'error': '잘못된 요청 형식입니다.'}, status=400)
+    
+    message_content = data.get('message', '').strip()
+    if not message_content:
+        return JsonResponse({'error': '메시지 내용이 없습니다.'}, status=400)
+    
+    chat_session = await _aget_chat_session(request, data.get('session_id'))
+    
+    if not chat_session.document.is_ready:
+        return JsonResponse({'error': DOCUMENT_NOT_READY_MESSAGE}, status=409)
+    
+    await ChatMessage.objects.acreate(
+        session=chat_session,
+        message_type='user',
+        content=message_content
+    )
+    
+    async def save_answer(response_data, response_time):
+        return (await _asave_assistant_message(chat_session, response_data, response_time)).id
+    
+    return sse_response(_astream_rag_answer(chat_session, message_content, save_answer))
+
+async def _agenerate_rag_response(chat_session, user_message):
+    """_generate_rag_response의 비동기 버전"""
+    try:
+        prepared = await _aprepare_rag_answer(chat_session, user_message)
+        if prepared.get('response') is not None:
+            return prepared
+
+        response = await AnalysisService().agenerate_document_based_answer(
+            user_message, prepared['context'], chat_session.language
+        )
+        return _complete_rag_answer(prepared, response, chat_session.language)
         
+    except Exception as e:
+        print(f"❌ RAG 응답 생성 오류: {str(e)}")
         return {
-            'response': response + f"\n\n{search_info}",
-            'search_results': [
-                {
-                    'chunk_text': result['chunk'].get('text', '')[:200] + '...',
-                    'method': result['method'],
-                    'score': result['score']
-                } for result in search_results
-            ],
-            'search_method': ', '.join(set(search_methods)),
-            'search_info': search_info,
-            'used_chunk_ids': used_chunk_ids
+            'response': f"응답 생성 중 오류가 발생했습니다: {str(e)}",
+            'search_results': [],
+            'search_method': 'error',
+            'search_info': '',
+            'used_chunk_ids': []
         }
+
+async def _astream_rag_answer(chat_session, user_message, on_complete, meta=None):
+    """_stream_rag_answer의 비동기 버전 (on_complete도 코루틴)"""
+    start_time = time.time()
+    try:
+        prepared = await _aprepare_rag_answer(chat_session, user_message)
+        yield sse_event('meta', dict(meta or {}, search_info=prepared['search_info']))
+
+        if prepared.get('response') is not None:
+            response_data = prepared
+            yield sse_event('token', {'text': response_data['response']})
+        else:
+            answer_parts = []
+            async for delta in AnalysisService().astream_document_based_answer(
+                user_message, prepared['context'], chat_session.language
+            ):
+                answer_parts.append(delta)
+                yield sse_event('token', {'text': delta})
+
+            answer = ''.join(answer_parts)
+            response_data = _complete_rag_answer(prepared, answer, chat_session.language)
+            yield sse_event('token', {'text': response_data['response'][len(answer):]})
+
+        message_id = await on_complete(response_data, time.time() - start_time)
+        yield sse_event('done', {
+            'response': response_data['response'],
+            'search_info': response_data.get('search_info', ''),
+            'message_id': str(message_id) if message_id else None
+        })
+
+    except Exception as e:
+        print(f"❌ RAG 스트리밍 응답 오류: {str(e)}")
+        yield sse_event('error', {'error': f'응답 생성 중 오류가 발생했습니다: {str(e)}'})
+
+def _generate_rag_response(chat_session, user_message):
+    """RAG 기반 응답 생성"""
+    try:
+        prepared = _prepare_rag_answer(chat_session, user_message)
+        if prepared.get('response') is not None:
+            # 문서와 관련 없는 질문
+            return prepared
+
+        # 응답 생성
+        analysis_service = AnalysisService()
+        response = analysis_service.generate_document_based_answer(
+            user_message, prepared['context'], chat_session.language
+        )
+
+        return _complete_rag_answer(prepared, response, chat_session.language)
         
     except Exception as e:
         print(f"❌ RAG 응답 생성 오류: {str(e)}")
@@ -696,6 +1115,232 @@ def _generate_rag_response(chat_session, user_message):
             'used_chunk_ids': []
         }
 
+def _prepare_rag_answer(chat_session, user_message):
+    """RAG 검색 및 컨텍스트 구성 (답변 생성 전 단계)
+
+    문서와 관련 없는 질문이면 최종 안내 문구를 'response'에 담아 반환합니다.
+    """
+    document = chat_session.document
+    
+    # 업로드 시 저장된 검색 아티팩트로 RAG 엔진 복원 (같은 버전이면 워커 캐시 재사용)
+    rag_engine = load_engine(document)
+    
+    # RAG 검색 수행
+    search_results = rag_engine.search(user_message, top_k=3)
+    if not search_results:
+        return _off_topic_answer(chat_session.language)
+    
+    # 청크 ID는 검색 결과에 들어 있음 (chunk_id가 없는 이전 Qdrant 페이로드만 한 번에 조회)
+    ids_by_index = {}
+    missing_indexes = _missing_chunk_indexes(search_results)
+    if missing_indexes:
+        ids_by_index = dict(
+            DocumentChunk.objects.filter(document=document, chunk_index__in=missing_indexes)
+            .values_list('chunk_index', 'id')
+        )
+    
+    return _build_rag_context(search_results, chat_session.language, ids_by_index)
+
+async def _aprepare_rag_answer(chat_session, user_message):
+    """_prepare_rag_answer의 비동기 버전 (chat_session.document는 select_related로 미리 로드)"""
+    document = chat_session.document
+    
+    rag_engine = await aload_engine(document)
+    search_results = await rag_engine.asearch(user_message, top_k=3)
+    if not search_results:
+        return _off_topic_answer(chat_session.language)
+    
+    ids_by_index = {}
+    missing_indexes = _missing_chunk_indexes(search_results)
+    if missing_indexes:
+        ids_by_index = {
+            chunk_index: chunk_id async for chunk_index, chunk_id in
+            DocumentChunk.objects.filter(document=document, chunk_index__in=missing_indexes)
+            .values_list('chunk_index', 'id')
+        }
+    
+    return _build_rag_context(search_results, chat_session.language, ids_by_index)
+
+def _off_topic_answer(language):
+    """문서와 관련 없는 질문에 대한 안내 응답"""
+    lang_config = IMPROVED_LANGUAGES.get(language, IMPROVED_LANGUAGES['한국어'])
+    return {
+        'response': lang_config.get('off_topic_response', 
+            "죄송합니다. 업로드하신 계약서 내용에 대해서만 답변드릴 수 있습니다."),
+        'search_results': [],
+        'search_method': 'off_topic_check',
+        'search_info': '',
+        'used_chunk_ids': []
+    }
+
+def _missing_chunk_indexes(search_results):
+    """chunk_id 없이 검색된 청크(이전 Qdrant 페이로드)의 순서 번호"""
+    return [
+        result['index'] for result in search_results
+        if isinstance(result['chunk'], Mapping) and not result['chunk'].get('chunk_id')
+    ]
+
+def _build_rag_context(search_results, language, ids_by_index):
+    """검색 결과로 답변 생성용 컨텍스트와 검색 정보 구성"""
+    context_parts = []
+    used_chunk_ids = []
+    search_methods = []
+    
+    for i, result in enumerate(search_results):
+        chunk = result['chunk']
+        if isinstance(chunk, Mapping):
+            article_info = f"제{chunk.get('article_num', '?')}조({chunk.get('article_title', 'Unknown')})"
+            chunk_text = chunk.get('text', '')
+            chunk_id = chunk.get('chunk_id') or ids_by_index.get(result['index'])
+            if chunk_id:
+                used_chunk_ids.append(str(chunk_id))
+        else:
+            article_info = "Unknown"
+            chunk_text = str(chunk)
+        
+        method = result['method']
+        search_methods.append(method)
+        context_parts.append(f"[{article_info} - {method}로 검색됨]\n{chunk_text}")
+    
+    # 검색 정보 구성
+    unique_articles = set()
+    for result in search_results:
+        chunk = result['chunk']
+        if isinstance(chunk, Mapping) and chunk.get('article_num'):
+            unique_articles.add(f"제{chunk['article_num']}조")
+    
+    article_count = len(unique_articles)
+    
+    search_info_messages = {
+        "한국어": f"🔍 **문서 기반 답변**: {article_count}개 조항 (**100% 계약서 내용 기반**)",
+        "日本語": f"🔍 **文書ベース回答**: {article_count}個の条項 (**100%契約書内容ベース**)",
+        "中文": f"🔍 **基于文档的回答**: {article_count}个条款 (**100%基于合同内容**)",
+        "English": f"🔍 **Document-based Answer**: {article_count} clauses (**100% contract content based**)",
+        "Español": f"🔍 **Respuesta basada en documento**: {article_count} cláusulas (**100% basado en contenido del contrato**)"
+    }
+    
+    return {
+        'response': None,
+        'context': "\n\n".join(context_parts),
+        'search_results': [
+            {
+                'chunk_text': result['chunk'].get('text', '')[:200] + '...',
+                'method': result['method'],
+                'score': result['score']
+            } for result in search_results
+        ],
+        'search_method': ', '.join(set(search_methods)),
+        'search_info': search_info_messages.get(language, search_info_messages['한국어']),
+        'used_chunk_ids': used_chunk_ids
+    }
+
+def _complete_rag_answer(prepared, answer, language):
+    """생성된 답변에 법률 용어 설명과 검색 정보를 붙여 최종 응답 구성"""
+    response = answer
+    
+    # 한국어인 경우 법률 용어 설명 추가
+    if language == "한국어":
+        translator = TranslationService()
+        legal_terms_explanation = translator.extract_legal_terms_from_korean_text(response)
+        response += legal_terms_explanation
+    
+    return {
+        'response': response + f"\n\n{prepared['search_info']}",
+        'search_results': prepared['search_results'],
+        'search_method': prepared['search_method'],
+        'search_info': prepared['search_info'],
+        'used_chunk_ids': prepared['used_chunk_ids']
+    }
+
+def _stream_rag_answer(chat_session, user_message, on_complete, meta=None):
+    """RAG 답변 SSE 이벤트 생성기
+
+    on_complete(response_data, response_time)는 스트림이 끝난 뒤 메시지를 저장하고
+    저장된 답변 메시지 ID(없으면 None)를 반환합니다.
+    """
+    start_time = time.time()
+    try:
+        prepared = _prepare_rag_answer(chat_session, user_message)
+        yield sse_event('meta', dict(meta or {}, search_info=prepared['search_info']))
+
+        if prepared.get('response') is not None:
+            # 문서와 관련 없는 질문은 안내 문구를 한 번에 전송
+            response_data = prepared
+            yield sse_event('token', {'text': response_data['response']})
+        else:
+            analysis_service = AnalysisService()
+            answer_parts = []
+            for delta in analysis_service.stream_document_based_answer(
+                user_message, prepared['context'], chat_session.language
+            ):
+                answer_parts.append(delta)
+                yield sse_event('token', {'text': delta})
+
+            answer = ''.join(answer_parts)
+            response_data = _complete_rag_answer(prepared, answer, chat_session.language)
+            # 법률 용어 설명과 검색 정보는 답변 뒤에 이어서 전송
+            yield sse_event('token', {'text': response_data['response'][len(answer):]})
+
+        message_id = on_complete(response_data, time.time() - start_time)
+        yield sse_event('done', {
+            'response': response_data['response'],
+            'search_info': response_data.get('search_info', ''),
+            'message_id': str(message_id) if message_id else None
+        })
+
+    except Exception as e:
+        print(f"❌ RAG 스트리밍 응답 오류: {str(e)}")
+        yield sse_event('error', {'error': f'응답 생성 중 오류가 발생했습니다: {str(e)}'})
+
+def _save_assistant_message(chat_session, response_data, response_time):
+    """AI 응답 저장 및 세션 메시지 수 갱신"""
+    ai_message = ChatMessage.objects.create(
+        session=chat_session,
+        message_type='assistant',
+        content=response_data['response'],
+        search_results=response_data.get('search_results'),
+        search_method=response_data.get('search_method'),
+        response_time=response_time
+    )
+    
+    # 사용된 청크들 연결
+    # 새 메시지라 기존 연결이 없으므로 중간 테이블에 한 번에 insert
+    if response_data.get('used_chunk_ids'):
+        through = ChatMessage.used_chunks.through
+        through.objects.bulk_create(
+            [through(chatmessage_id=ai_message.id, documentchunk_id=chunk_id)
+             for chunk_id in dict.fromkeys(response_data['used_chunk_ids'])],
+            ignore_conflicts=True
+        )
+    
+    # 세션 메시지 수 업데이트
+    chat_session.message_count = chat_session.messages.count()
+    chat_session.save()
+    return ai_message
+
+async def _asave_assistant_message(chat_session, response_data, response_time):
+    """_save_assistant_message의 비동기 버전"""
+    ai_message = await ChatMessage.objects.acreate(
+        session=chat_session,
+        message_type='assistant',
+        content=response_data['response'],
+        search_results=response_data.get('search_results'),
+        search_method=response_data.get('search_method'),
+        response_time=response_time
+    )
+    
+    if response_data.get('used_chunk_ids'):
+        through = ChatMessage.used_chunks.through
+        await through.objects.abulk_create(
+            [through(chatmessage_id=ai_message.id, documentchunk_id=chunk_id)
+             for chunk_id in dict.fromkeys(response_data['used_chunk_ids'])],
+            ignore_conflicts=True
+        )
+    
+    chat_session.message_count = await chat_session.messages.acount()
+    await chat_session.asave()
+    return ai_message
+
 @require_http_methods(["GET"])
 @login_required
 def document_list(request):
@@ -717,8 +1362,8 @@ def delete_document(request, document_id):
         document = get_object_or_404(Document, id=document_id, user=request.user)
         document_title = document.title
         
-        # 관련 채팅 세션도 함께 삭제됨 (CASCADE)
-        document.delete()
+        # 공유 컬렉션의 벡터와 함께 삭제 (관련 채팅 세션도 함께 삭제됨, CASCADE)
+        discard_document(document)
         
         return JsonResponse({
             'success': True,
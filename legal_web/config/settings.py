@@ -27,6 +27,78 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
 QDRANT_URL = os.getenv("QDRANT_URL")
 QDRANT_API_KEY = os.getenv("QDRANT_API_KEY")
+# Qdrant 클라이언트 (프로세스당 하나를 공유, gRPC 사용 시 포트 6334 개방 필요)
+QDRANT_PREFER_GRPC = os.getenv("QDRANT_PREFER_GRPC", "False").lower() == "true"
+QDRANT_GRPC_PORT = int(os.getenv("QDRANT_GRPC_PORT", "6334"))
+QDRANT_TIMEOUT = int(os.getenv("QDRANT_TIMEOUT", "10"))
+# 연속 연결 실패가 이 횟수에 이르면 QDRANT_RETRY_AFTER_SECONDS 동안 요청을 바로 실패 처리
+QDRANT_FAILURE_THRESHOLD = int(os.getenv("QDRANT_FAILURE_THRESHOLD", "3"))
+QDRANT_RETRY_AFTER_SECONDS = int(os.getenv("QDRANT_RETRY_AFTER_SECONDS", "30"))
+# 벡터 upsert: 요청당 포인트 수, 동시 요청 수, 연결 오류 재시도 횟수
+QDRANT_UPSERT_BATCH_SIZE = int(os.getenv("QDRANT_UPSERT_BATCH_SIZE", "256"))
+QDRANT_UPSERT_CONCURRENCY = int(os.getenv("QDRANT_UPSERT_CONCURRENCY", "4"))
+QDRANT_UPSERT_RETRIES = int(os.getenv("QDRANT_UPSERT_RETRIES", "3"))
+# False면 배치마다 반영을 기다리지 않고, 마지막 정리 작업(wait=True)에서 한 번에 반영 확인
+QDRANT_UPSERT_WAIT = os.getenv("QDRANT_UPSERT_WAIT", "True").lower() == "true"
+
+# 임베딩 모델 설정 (워커 프로세스당 한 번만 로딩)
+RAG_EMBEDDING_MODEL = os.getenv("RAG_EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+# gunicorn --preload 사용 시 포크 전에 모델을 로딩해 워커 간 메모리 공유
+RAG_PRELOAD_EMBEDDING_MODEL = os.getenv("RAG_PRELOAD_EMBEDDING_MODEL", "False").lower() == "true"
+# 로컬 캐시/저장소 파일의 기본 위치는 BASE_DIR/cache (.gitignore 대상, 운영에서는 저장소 밖 경로 권장)
+# 임베딩 캐시 (모델+텍스트 해시 → float16 벡터, 로컬 SQLite 파일, 용량 초과 시 오래된 것부터 삭제)
+RAG_EMBEDDING_CACHE = os.getenv("RAG_EMBEDDING_CACHE", "True").lower() == "true"
+RAG_EMBEDDING_CACHE_PATH = os.getenv("RAG_EMBEDDING_CACHE_PATH", os.path.join(BASE_DIR, 'cache', 'embeddings.sqlite3'))
+RAG_EMBEDDING_CACHE_MAX_MB = int(os.getenv("RAG_EMBEDDING_CACHE_MAX_MB", "512"))
+# 번역/요약/위험분석 LLM 응답 캐시 (같은 프롬프트+파라미터면 다시 호출하지 않음, TTL 0이면 만료 없음)
+RAG_LLM_CACHE = os.getenv("RAG_LLM_CACHE", "True").lower() == "true"
+RAG_LLM_CACHE_PATH = os.getenv("RAG_LLM_CACHE_PATH", os.path.join(BASE_DIR, 'cache', 'llm_responses.sqlite3'))
+RAG_LLM_CACHE_MAX_MB = int(os.getenv("RAG_LLM_CACHE_MAX_MB", "256"))
+RAG_LLM_CACHE_TTL_SECONDS = int(os.getenv("RAG_LLM_CACHE_TTL_SECONDS", "2592000"))
+# 복원된 문서 검색 엔진 워커 메모리 캐시 (문서 ID + 아티팩트 버전 기준, 예산 초과 시 오래 안 쓴 것부터 제거)
+RAG_ENGINE_CACHE = os.getenv("RAG_ENGINE_CACHE", "True").lower() == "true"
+RAG_ENGINE_CACHE_MAX_MB = int(os.getenv("RAG_ENGINE_CACHE_MAX_MB", "256"))
+
+# 업로드 문서 백그라운드 처리 (기본 False, True로 켤 때는 `python manage.py run_ingestion_worker` 워커를 반드시 함께 실행)
+RAG_ASYNC_INGESTION = os.getenv("RAG_ASYNC_INGESTION", "False").lower() == "true"
+# 작업 실패 시 최대 시도 횟수
+RAG_JOB_MAX_ATTEMPTS = int(os.getenv("RAG_JOB_MAX_ATTEMPTS", "3"))
+# 이 시간(초) 동안 진행 보고가 없는 실행 중 작업은 워커가 죽은 것으로 보고 다시 대기열에 넣음
+RAG_JOB_STALE_SECONDS = int(os.getenv("RAG_JOB_STALE_SECONDS", "600"))
+# 작업 실행 중 heartbeat 갱신 간격(초, RAG_JOB_STALE_SECONDS보다 충분히 짧게)
+RAG_JOB_HEARTBEAT_SECONDS = int(os.getenv("RAG_JOB_HEARTBEAT_SECONDS", "60"))
+# 수정본 재업로드(previous_document_id) 시 내용이 같은 조항의 청크/임베딩 재사용 (False면 전체 재임베딩)
+RAG_INCREMENTAL_REINGEST = os.getenv("RAG_INCREMENTAL_REINGEST", "True").lower() == "true"
+# 비회원 FAISS 인덱스 서버 저장소 (세션에는 핸들만 저장, 마지막 사용 후 TTL 지나면 삭제)
+RAG_INDEX_STORE_DIR = os.getenv("RAG_INDEX_STORE_DIR", os.path.join(BASE_DIR, 'cache', 'session_indexes'))
+RAG_INDEX_STORE_TTL_SECONDS = int(os.getenv("RAG_INDEX_STORE_TTL_SECONDS", "86400"))
+RAG_INDEX_STORE_MAX_MB = int(os.getenv("RAG_INDEX_STORE_MAX_MB", "1024"))
+# 프로세스 메모리에 열어 둘 최근 인덱스 수
+RAG_INDEX_STORE_MEMORY_ITEMS = int(os.getenv("RAG_INDEX_STORE_MEMORY_ITEMS", "32"))
+# 비회원 로컬 벡터 인덱스: 이 청크 수 이하면 NumPy 행렬 검색, 초과하면 FAISS 내적 인덱스
+RAG_LOCAL_INDEX_NUMPY_MAX = int(os.getenv("RAG_LOCAL_INDEX_NUMPY_MAX", "500"))
+# 벡터 저장 형식 (float32 / float16 / int8 - float16은 메모리 1/2, int8은 1/4)
+RAG_LOCAL_INDEX_STORAGE = os.getenv("RAG_LOCAL_INDEX_STORAGE", "float16")
+
+# PDF 텍스트 추출: 이 페이지 수 이상이면 페이지 구간별로 프로세스 풀에서 동시에 추출 (워커 0이면 CPU 수)
+RAG_PDF_PARALLEL_MIN_PAGES = int(os.getenv("RAG_PDF_PARALLEL_MIN_PAGES", "64"))
+RAG_PDF_PAGES_PER_TASK = int(os.getenv("RAG_PDF_PAGES_PER_TASK", "32"))
+RAG_PDF_WORKERS = int(os.getenv("RAG_PDF_WORKERS", "0"))
+# 문서당 추출 예산 (넘으면 업로드 실패 처리)
+RAG_PDF_MAX_SECONDS = int(os.getenv("RAG_PDF_MAX_SECONDS", "120"))
+RAG_PDF_MAX_TEXT_MB = int(os.getenv("RAG_PDF_MAX_TEXT_MB", "50"))
+
+# 요약/위험분석(+번역) LLM 호출 동시 실행 여부와 프로세스당 최대 동시 호출 수
+ANALYSIS_PARALLEL = os.getenv("ANALYSIS_PARALLEL", "True").lower() == "true"
+ANALYSIS_MAX_WORKERS = int(os.getenv("ANALYSIS_MAX_WORKERS", "4"))
+# 약관 Map-Reduce 요약: 조각 요약 동시 실행 수, Reduce 한 번에 넣을 요약본 토큰 상한
+MAP_REDUCE_MAX_WORKERS = int(os.getenv("MAP_REDUCE_MAX_WORKERS", "8"))
+MAP_REDUCE_TOKEN_BUDGET = int(os.getenv("MAP_REDUCE_TOKEN_BUDGET", "12000"))
+# OpenAI 임베딩 요청: 요청당 토큰/개수 상한, 동시 요청 배치 수, 일시 오류 재시도 횟수
+EMBEDDING_BATCH_MAX_TOKENS = int(os.getenv("EMBEDDING_BATCH_MAX_TOKENS", "200000"))
+EMBEDDING_BATCH_MAX_ITEMS = int(os.getenv("EMBEDDING_BATCH_MAX_ITEMS", "512"))
+EMBEDDING_MAX_CONCURRENCY = int(os.getenv("EMBEDDING_MAX_CONCURRENCY", "4"))
+EMBEDDING_MAX_RETRIES = int(os.getenv("EMBEDDING_MAX_RETRIES", "5"))
 
 
 
@@ -14,3 +14,11 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
 application = get_wsgi_application()
+
+# pre-fork 서버(gunicorn --preload)는 이 모듈을 포크 전에 import하므로,
+# 여기서 임베딩 모델을 로딩하면 워커들이 copy-on-write로 공유합니다.
+from django.conf import settings  # noqa: E402
+
+if settings.RAG_PRELOAD_EMBEDDING_MODEL:
+    from apps.rag.services.embedding_registry import embedding_registry  # noqa: E402
+    embedding_registry.preload()
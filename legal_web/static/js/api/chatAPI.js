@@ -0,0 +1,88 @@
+// static/js/api/chatAPI.js
+
+/**
+ * 채팅 답변 스트리밍 요청 (Server-Sent Events).
+ * 서버는 meta → token... → done (또는 error) 순서로 이벤트를 보냅니다.
+ * POST 본문이 필요해 EventSource 대신 fetch 스트림을 직접 읽습니다.
+ *
+ * @param {string} url - 스트리밍 API 주소 (예: '/chatbot/chat-api/stream/')
+ * @param {Object} payload - JSON 요청 본문
+ * @param {Object} handlers - { onMeta, onToken, onDone, onError } 콜백
+ * @param {Object} [options] - { csrfToken, signal }
+ * @returns {Promise<string>} 전체 답변 텍스트
+ */
+export async function streamChat(url, payload, handlers = {}, options = {}) {
+    const { onMeta, onToken, onDone, onError } = handlers;
+
+    const response = await fetch(url, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+            'Accept': 'text/event-stream',
+            'X-CSRFToken': options.csrfToken || '',
+        },
+        credentials: 'same-origin',
+        body: JSON.stringify(payload),
+        signal: options.signal,
+    });
+
+    // 스트림 시작 전 오류(400/409 등)는 JSON으로 옵니다.
+    const contentType = response.headers.get('Content-Type') || '';
+    if (!response.ok || !contentType.includes('text/event-stream')) {
+        const data = await response.json().catch(() => ({ error: '서버로부터 응답을 받지 못했습니다.' }));
+        const message = data.error || `요청 실패 (${response.status})`;
+        if (onError) onError(message, data);
+        throw new Error(message);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder('utf-8');
+    let buffer = '';
+    let fullText = '';
+
+    const dispatch = (rawEvent) => {
+        let eventName = 'message';
+        const dataLines = [];
+        for (const line of rawEvent.split('\n')) {
+            if (line.startsWith('event:')) {
+                eventName = line.slice(6).trim();
+            } else if (line.startsWith('data:')) {
+                dataLines.push(line.slice(5).trimStart());
+            }
+        }
+        if (dataLines.length === 0) return;
+
+        const data = JSON.parse(dataLines.join('\n'));
+        switch (eventName) {
+            case 'meta':
+                if (onMeta) onMeta(data);
+                break;
+            case 'token':
+                fullText += data.text || '';
+                if (onToken) onToken(data.text || '', fullText);
+                break;
+            case 'done':
+                if (onDone) onDone(data, fullText);
+                break;
+            case 'error':
+                if (onError) onError(data.error, data);
+                break;
+        }
+    };
+
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+
+        buffer += decoder.decode(value, { stream: true });
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const rawEvent = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+            if (rawEvent.trim()) dispatch(rawEvent);
+        }
+    }
+    if (buffer.trim()) dispatch(buffer);
+
+    return fullText;
+}
@@ -0,0 +1,28 @@
+// static/js/api/jobAPI.js
+
+/**
+ * 문서 처리 작업이 끝날 때까지 상태 조회 API를 폴링합니다.
+ * @param {string} statusUrl - 업로드 응답의 status_url.
+ * @param {function(Object):void} [onProgress] - 상태가 바뀔 때마다 호출 (stage, progress 포함).
+ * @param {number} [intervalMs=1500] - 조회 간격.
+ * @returns {Promise<Object>} 완료 시 작업 상태 객체 (status === 'completed').
+ */
+export async function waitForJob(statusUrl, onProgress, intervalMs = 1500) {
+    while (true) {
+        const response = await fetch(statusUrl, { credentials: 'same-origin' });
+        const data = await response.json().catch(() => ({}));
+
+        if (!response.ok) {
+            throw new Error(data.error || `작업 상태 조회 실패 (${response.status})`);
+        }
+
+        if (onProgress) onProgress(data);
+
+        if (data.status === 'completed') return data;
+        if (data.status === 'failed') {
+            throw new Error(data.error || '문서 처리에 실패했습니다.');
+        }
+
+        await new Promise(resolve => setTimeout(resolve, intervalMs));
+    }
+}
@@ -113,9 +113,15 @@ class EnhancedChatManager {
                 body: formData
             });
 
-            const data = await response.json();
+            let data = await response.json();
 
-            if (response.ok) {
+            if (response.ok && data.queued && data.status_url) {
+                // 백그라운드 처리: 작업이 끝날 때까지 상태 조회
+                this.showMessage('system', data.message);
+                data = await this.waitForJob(data.status_url);
+            }
+
+            if (response.ok && !data.error) {
                 if (data.rag_processed) {
                     // RAG 처리 성공
                     this.currentDocument = {
@@ -152,6 +158,38 @@ class EnhancedChatManager {
         }
     }
 
+    async waitForJob(statusUrl) {
+        // 문서 처리 작업 상태를 폴링하고, 완료되면 업로드 응답과 같은 형태로 반환
+        let lastStage = null;
+        while (true) {
+            const response = await fetch(statusUrl);
+            const job = await response.json();
+
+            if (!response.ok || job.status === 'failed') {
+                return { error: job.error || '문서 처리에 실패했습니다.' };
+            }
+
+            if (job.stage !== lastStage) {
+                this.showMessage('system', `⏳ 문서 처리 중: ${job.stage} (${job.progress}%)`);
+                lastStage = job.stage;
+            }
+
+            if (job.status === 'completed') {
+                const result = job.result || {};
+                return {
+                    rag_processed: true,
+                    document_id: result.document_id,
+                    contract_type: result.contract_type,
+                    chunk_count: result.chunk_count,
+                    vector_indexed: result.vector_indexed,
+                    message: `RAG 처리 완료: ${result.contract_type || '계약서'} 유형 감지`
+                };
+            }
+
+            await new Promise(resolve => setTimeout(resolve, 1500));
+        }
+    }
+
     async sendMessage() {
         const input = document.getElementById('chatInput');
         const message = input.value.trim();
@@ -175,28 +213,42 @@ class EnhancedChatManager {
                 requestData.document_id = this.currentDocument.document_id;
             }
 
-            const response = await fetch('/chatbot/chat-api/', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                    'X-CSRFToken': this.getCSRFToken(),
-                },
-                body: JSON.stringify(requestData)
-            });
-
-            const data = await response.json();
+            // 답변은 생성되는 대로 스트리밍으로 표시
+            const { streamChat } = await import('./api/chatAPI.js');
+            let assistantDiv = null;
+            let meta = {};
+            let errorShown = false;
 
-            if (response.ok) {
-                // AI 응답 표시
-                this.showMessage('assistant', data.reply);
+            await streamChat('/chatbot/chat-api/stream/', requestData, {
+                onMeta: (data) => {
+                    meta = data;
+                },
+                onToken: (text, fullText) => {
+                    if (!assistantDiv) {
+                        assistantDiv = this.showMessage('assistant', '');
+                    }
+                    this.updateMessage(assistantDiv, fullText);
+                },
+                onDone: (data) => {
+                    if (data.reply) {
+                        if (!assistantDiv) {
+                            assistantDiv = this.showMessage('assistant', '');
+                        }
+                        this.updateMessage(assistantDiv, data.reply);
+                    }
 
-                // RAG 정보 표시
-                if (data.rag_used) {
-                    this.showRAGInfo(data);
+                    // RAG 정보 표시
+                    if (meta.rag_used) {
+                        this.showRAGInfo({ ...meta, ...data });
+                    }
+                },
+                onError: (error) => {
+                    errorShown = true;
+                    this.showMessage('system', `❌ ${error}`);
                 }
-            } else {
-                this.showMessage('system', `❌ ${data.error}`);
-            }
+            }, { csrfToken: this.getCSRFToken() }).catch((error) => {
+                if (!errorShown) throw error;
+            });
 
         } catch (error) {
             console.error('메시지 전송 오류:', error);
@@ -237,6 +289,20 @@ class EnhancedChatManager {
         if (welcomeMessage) {
             welcomeMessage.style.display = 'none';
         }
+
+        return messageDiv;
+    }
+
+    updateMessage(messageDiv, content) {
+        const contentDiv = messageDiv?.querySelector('.message-content');
+        if (!contentDiv) return;
+
+        contentDiv.innerHTML = this.formatMessage(content);
+
+        const messagesContainer = document.getElementById('chatMessages');
+        if (messagesContainer) {
+            messagesContainer.scrollTop = messagesContainer.scrollHeight;
+        }
     }
 
     showRAGInfo(data) {
@@ -58,25 +58,32 @@ RAG.fallbackSendMessage = function() {
     
     if (!message) return;
     
-    // 기존 API 호출 방식 사용
-    fetch('/chatbot/chat-api/', {
-        method: 'POST',
-        headers: {
-            'Content-Type': 'application/json',
-            'X-CSRFToken': RAG.getCSRFToken(),
-        },
-        body: JSON.stringify({ message: message })
-    })
-    .then(response => response.json())
-    .then(data => {
-        RAG.showMessage('user', message);
-        RAG.showMessage('assistant', data.reply || data.error);
-        input.value = '';
-    })
-    .catch(error => {
-        console.error('메시지 전송 오류:', error);
-        RAG.showMessage('system', '❌ 메시지 전송 중 오류가 발생했습니다.');
-    });
+    RAG.showMessage('user', message);
+    input.value = '';
+
+    // 답변은 생성되는 대로 스트리밍으로 표시
+    let assistantDiv = null;
+    import('./api/chatAPI.js')
+        .then(({ streamChat }) => streamChat('/chatbot/chat-api/stream/', { message: message }, {
+            onToken: (text, fullText) => {
+                if (!assistantDiv) {
+                    assistantDiv = RAG.showMessage('assistant', '');
+                }
+                RAG.updateMessage(assistantDiv, fullText);
+            },
+            onDone: (data) => {
+                if (!assistantDiv && data.reply) {
+                    RAG.showMessage('assistant', data.reply);
+                }
+            },
+            onError: (error) => {
+                RAG.showMessage('assistant', error);
+            }
+        }, { csrfToken: RAG.getCSRFToken() }))
+        .catch(error => {
+            console.error('메시지 전송 오류:', error);
+            RAG.showMessage('system', '❌ 메시지 전송 중 오류가 발생했습니다.');
+        });
 };
 
 RAG.fallbackFileUpload = function(event) {
@@ -137,4 +144,17 @@ RAG.showMessage = function(type, content) {
             `;
             messagesContainer.appendChild(messageDiv);
             messagesContainer.scrollTop = messagesContainer.scrollHeight;
-        };
\ No newline at end of file
+            return messageDiv;
+        };
+
+RAG.updateMessage = function(messageDiv, content) {
+    const contentDiv = messageDiv?.querySelector('.message-content');
+    if (!contentDiv) return;
+
+    contentDiv.innerHTML = content;
+
+    const messagesContainer = document.getElementById('chatMessages');
+    if (messagesContainer) {
+        messagesContainer.scrollTop = messagesContainer.scrollHeight;
+    }
+};
\ No newline at end of file
@@ -8,6 +8,7 @@ import { getActiveTab, chatSessions, openTabs } from '../state/chatTabState.js';
 import { renderTabBar } from './chatTabUI.js';
 import { saveTabState } from '../state/chatTabState.js';
 import { applyTranslations } from '../data/translation.js';
+import { waitForJob } from '../api/jobAPI.js';
 
 // DOM 요소 참조
 let welcomeMessageDiv;
@@ -492,10 +493,23 @@ async function uploadFileToServer(file, docType, sessionId) {
             body: formData,
         });
 
-        const data = await response.json();
+        const data = await response.json().catch(() => ({}));
 
         if (response.ok) {
-            const data = await response.json();
+            // 백그라운드 처리: 작업이 끝날 때까지 상태 조회
+            if (data.job_id && data.status_url) {
+                const job = await waitForJob(data.status_url, (status) => {
+                    console.log(`문서 처리 중: ${status.stage} (${status.progress}%)`);
+                });
+                const result = job.result || {};
+                console.log('파일 분석 완료:', result);
+                return {
+                    success: true,
+                    text: result.summary || result.text || '',
+                    message: result.message || '파일 업로드가 완료되었습니다.'
+                };
+            }
+
             console.log('파일 업로드 성공:', data);
             return {
                 success: true,
@@ -503,7 +517,7 @@ async function uploadFileToServer(file, docType, sessionId) {
                 message: data.message || '파일 업로드가 완료되었습니다.'
             };
         } else {
-            const errorData = await response.json().catch(() => ({}));
+            const errorData = data;
             console.error('파일 업로드 실패:', response.status, errorData);
             return {
                 success: false,